@@ -38,13 +38,38 @@ const SkillProgress = styled(Box)(({ theme }) => ({
   marginBottom: theme.spacing(2),
 }));
 
+// Submissions are scored in the background; /status says when results exist
+const STATUS_POLL_MS = 2000;
+
 function Results() {
   const { assessmentId } = useParams();
   const [results, setResults] = useState(null);
   const [leaderboard, setLeaderboard] = useState([]);
+  const [status, setStatus] = useState(null);
 
   useEffect(() => {
-    loadResults();
+    let cancelled = false;
+    let timer;
+    const poll = async () => {
+      try {
+        const statusRes = await api.get(`/assessments/${assessmentId}/status`);
+        if (cancelled) return;
+        setStatus(statusRes.data.status);
+        if (statusRes.data.status === 'evaluated') {
+          loadResults();
+          return;
+        }
+      } catch (err) {
+        console.error('Failed to load status:', err);
+      }
+      // Keep polling a failed evaluation too: an admin can re-run it
+      if (!cancelled) timer = setTimeout(poll, STATUS_POLL_MS);
+    };
+    poll();
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
   }, [assessmentId]);
 
   const loadResults = async () => {
@@ -62,9 +87,12 @@ function Results() {
   };
 
   if (!results) {
+    let message = 'Loading results...';
+    if (status === 'completed') message = 'Your answers are submitted and being scored...';
+    if (status === 'failed') message = 'Your answers are saved, but scoring failed. It will be re-run by the hiring team.';
     return (
       <Container sx={{ mt: 4, display: 'flex', justifyContent: 'center' }}>
-        <Typography>Loading results...</Typography>
+        <Typography>{message}</Typography>
       </Container>
     );
   }
@@ -0,0 +1,426 @@
+import math
+import struct
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from cache import TTLCache
+from models import db, ActivityDetector, ActivityLogChunk, Assessment, QuestionTiming
+
+EVENT_TYPES = {"tab_switch": 1, "focus_loss": 2, "paste": 3, "answer": 4}
+EVENT_NAMES = {code: name for name, code in EVENT_TYPES.items()}
+
+# type, milliseconds after the chunk's started_at, value (answer seconds,
+# paste length, seconds away), index into the assessment's question_set
+_PACKED_EVENT = struct.Struct('<BIfB')
+_NO_QUESTION = 0xFF
+_MAX_OFFSET_MS = 0xFFFFFFFF
+_MAX_VALUE = 1e9
+_MAX_CLOCK_SKEW_MS = 24 * 3600 * 1000
+
+
+_DETECTOR_FIELDS = ('burst_at', 'burst', 'received_at', 'focus_losses', 'large_pastes', 'fast_answers')
+
+
+class _Detector:
+    """Running proctoring signals for one assessment, as kept in activity_detectors"""
+    __slots__ = _DETECTOR_FIELDS + ('reasons',)
+
+    def __init__(self, row=None, received_at: Optional[float] = None):
+        self.burst_at = None
+        self.burst = 0.0  # exponentially decayed count of recent focus losses
+        self.received_at = received_at
+        self.focus_losses = 0
+        self.large_pastes = 0
+        self.fast_answers = 0
+        self.reasons = ()
+        if row is not None:
+            for field in _DETECTOR_FIELDS:
+                setattr(self, field, getattr(row, field))
+            self.reasons = tuple(row.reasons or ())
+
+    def values(self) -> Dict:
+        values = {field: getattr(self, field) for field in _DETECTOR_FIELDS}
+        values["reasons"] = list(self.reasons)
+        return values
+
+
+class ActivityMonitor:
+    """Ingests proctoring events and flags anomalies from them.
+
+    ``ingest`` queues events in memory; a background thread takes
+    everything queued every ``flush_interval`` seconds and, in one
+    transaction, runs it through each assessment's detector, appends it as
+    one packed ``ActivityLogChunk`` per assessment (10 bytes an event) and
+    sets ``anomaly_detected`` for newly flagged assessments.
+
+    An assessment is flagged when any of these trips:
+
+      focus_burst    more than ``burst_threshold`` tab switches or focus
+                     losses within roughly ``burst_window`` seconds
+      focus_losses   more than ``max_focus_losses`` in total
+      large_pastes   ``max_large_pastes`` pastes of ``large_paste_chars``
+                     or more
+      fast_answers   ``max_fast_answers`` answers quicker than
+                     ``min_answer_seconds``, or more than ``fast_answer_z``
+                     standard deviations below the question's mean log
+                     answer time across candidates
+
+    Detector state (``activity_detectors``) and per-question answer times
+    (``question_timings``) are rows read with FOR UPDATE and written back
+    by the flush, so every worker's events count against the same
+    thresholds and the reasons can be read from any worker. Burst timing
+    trusts the server clock: an event is placed at its client timestamp
+    only within the span from the previous batch's arrival (or the
+    assessment's start) to its own batch's arrival.
+    """
+
+    def __init__(self, flush_interval: float = 1.0, max_pending: int = 100000,
+                 burst_window: float = 30, burst_threshold: float = 5, max_focus_losses: int = 15,
+                 large_paste_chars: int = 200, max_large_pastes: int = 3,
+                 min_answer_seconds: float = 3, fast_answer_z: float = 3.0, max_fast_answers: int = 3,
+                 min_timing_samples: int = 30, max_tracked: int = 100000, app=None):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.burst_window = burst_window
+        self.burst_threshold = burst_threshold
+        self.max_focus_losses = max_focus_losses
+        self.large_paste_chars = large_paste_chars
+        self.max_large_pastes = max_large_pastes
+        self.min_answer_seconds = min_answer_seconds
+        self.fast_answer_z = fast_answer_z
+        self.max_fast_answers = max_fast_answers
+        self.min_timing_samples = min_timing_samples
+        self.app = app
+        # assessment id -> {question id: index in question_set} while in progress
+        self.open_assessments = TTLCache(max_size=max_tracked, ttl=300)
+        # assessment id -> [(server receive time ms, events)] awaiting the next flush
+        self._pending: Dict[str, List[Tuple[float, List[Tuple]]]] = {}
+        self._pending_count = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flush_wanted = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self.events = 0
+        self.rejected = 0
+        self.flagged = 0
+        self.chunks_written = 0
+        self.bytes_written = 0
+        self.flushes = 0
+        self.flush_errors = 0
+
+    def lookup(self, assessment_id: str) -> Optional[Dict[str, int]]:
+        """Question positions of an in-progress assessment, None otherwise"""
+        positions = self.open_assessments.get(assessment_id)
+        if positions is not None:
+            return positions
+
+        table = Assessment.__table__
+        with db.session.no_autoflush:
+            row = db.session.execute(
+                db.select(table.c.question_set, table.c.status).where(table.c.id == assessment_id)
+            ).first()
+        if row is None or row.status != 'in_progress':
+            return None
+
+        positions = {question_id: i for i, question_id in enumerate(row.question_set or ())}
+        self.open_assessments.set(assessment_id, positions)
+        return positions
+
+    def close(self, assessment_id: str):
+        """Stop accepting events for an assessment in this process"""
+        self.open_assessments.pop(assessment_id)
+
+    def ingest(self, assessment_id: str, positions: Dict[str, int], events: List[Dict],
+               received_ms: Optional[float] = None) -> int:
+        """Queue events for the next flush; returns how many were accepted.
+
+        received_ms is when the request arrived, now unless a recorded
+        stream is being replayed.
+        """
+        now_ms = received_ms if received_ms is not None else time.time() * 1000
+        parsed = []
+        for event in events:
+            try:
+                code = EVENT_TYPES[event['type']]
+                at_ms = float(event.get('ts') or now_ms)
+                value = float(event.get('duration') or event.get('length') or 0)
+            except (AttributeError, KeyError, TypeError, ValueError):
+                continue
+            question_id = event.get('question_id')
+            question_id = question_id if isinstance(question_id, str) else None
+            if not abs(at_ms - now_ms) < _MAX_CLOCK_SKEW_MS:
+                at_ms = now_ms  # missing or implausible client clock
+            if math.isfinite(value):
+                position = positions.get(question_id, _NO_QUESTION)
+                parsed.append((code, at_ms, min(value, _MAX_VALUE),
+                               position if position < _NO_QUESTION else _NO_QUESTION, question_id))
+
+        with self._lock:
+            if parsed:
+                self._pending.setdefault(assessment_id, []).append((now_ms, parsed))
+            self._pending_count += len(parsed)
+            self.events += len(parsed)
+            self.rejected += len(events) - len(parsed)
+            due = self._pending_count >= self.max_pending
+
+        self._request_flush(now=due)
+        return len(parsed)
+
+    def _evaluate(self, pending: Dict[str, List[Tuple[float, List[Tuple]]]]) -> List[str]:
+        """Run queued events through the stored detectors and write them back; returns newly flagged ids"""
+        detectors, timings = ActivityDetector.__table__, QuestionTiming.__table__
+        ids = sorted(pending)
+        rows = {row.assessment_id: row for row in _locked_rows(detectors, detectors.c.assessment_id, ids)}
+        fresh = [assessment_id for assessment_id in ids if assessment_id not in rows]
+        started = {}
+        for start in range(0, len(fresh), 1000):
+            started.update(db.session.execute(
+                db.select(Assessment.id, Assessment.start_time).where(Assessment.id.in_(fresh[start:start + 1000]))
+            ).tuples().all())
+
+        question_ids = sorted({
+            event[4] for batches in pending.values() for _, events in batches for event in events
+            if event[0] == EVENT_TYPES['answer'] and event[4] is not None
+        })
+        answer_times = {
+            row.question_id: [row.samples, row.mean, row.m2]
+            for row in _locked_rows(timings, timings.c.question_id, question_ids)
+        }
+        known_questions = set(answer_times)
+
+        updates, inserts, flagged = [], [], []
+        for assessment_id in ids:
+            if assessment_id in rows:
+                detector = _Detector(rows[assessment_id])
+            else:
+                start_time = started.get(assessment_id)
+                detector = _Detector(received_at=start_time.replace(tzinfo=timezone.utc).timestamp()
+                                     if start_time is not None else None)
+            was_flagged = bool(detector.reasons)
+            for received_ms, events in pending[assessment_id]:
+                received = received_ms / 1000
+                floor = min(detector.received_at, received) if detector.received_at is not None else None
+                for code, at_ms, value, _, question_id in events:
+                    at = min(at_ms / 1000, received)
+                    if floor is not None:
+                        at = max(at, floor)
+                    self._observe(detector, code, at, value, question_id, answer_times)
+                detector.received_at = max(detector.received_at or received, received)
+            if detector.reasons and not was_flagged:
+                flagged.append(assessment_id)
+
+            values = detector.values()
+            if assessment_id in rows:
+                updates.append(dict(values, key=assessment_id))
+            else:
+                inserts.append(dict(values, assessment_id=assessment_id))
+
+        # Two workers creating the same row fail one flush, which is retried
+        # and then finds the row
+        if updates:
+            db.session.execute(detectors.update().where(detectors.c.assessment_id == db.bindparam('key')), updates)
+        if inserts:
+            db.session.execute(detectors.insert(), inserts)
+        timing_updates, timing_inserts = [], []
+        for question_id, (samples, mean, m2) in answer_times.items():
+            values = {"samples": samples, "mean": mean, "m2": m2}
+            if question_id in known_questions:
+                timing_updates.append(dict(values, key=question_id))
+            else:
+                timing_inserts.append(dict(values, question_id=question_id))
+        if timing_updates:
+            db.session.execute(timings.update().where(timings.c.question_id == db.bindparam('key')), timing_updates)
+        if timing_inserts:
+            db.session.execute(timings.insert(), timing_inserts)
+        return flagged
+
+    def _observe(self, detector: _Detector, code: int, at: float, value: float,
+                 question_id: Optional[str], answer_times: Dict[str, List[float]]):
+        reasons = []
+        if code in (EVENT_TYPES['tab_switch'], EVENT_TYPES['focus_loss']):
+            # Decay by the time since the last one; out-of-order events don't decay
+            if detector.burst_at is None or at > detector.burst_at:
+                if detector.burst_at is not None:
+                    detector.burst *= math.exp((detector.burst_at - at) / self.burst_window)
+                detector.burst_at = at
+            detector.burst += 1
+            detector.focus_losses += 1
+            if detector.burst > self.burst_threshold:
+                reasons.append('focus_burst')
+            if detector.focus_losses > self.max_focus_losses:
+                reasons.append('focus_losses')
+        elif code == EVENT_TYPES['paste']:
+            if value >= self.large_paste_chars:
+                detector.large_pastes += 1
+                if detector.large_pastes >= self.max_large_pastes:
+                    reasons.append('large_pastes')
+        elif code == EVENT_TYPES['answer'] and value > 0:
+            if self._is_fast(question_id, value, answer_times):
+                detector.fast_answers += 1
+                if detector.fast_answers >= self.max_fast_answers:
+                    reasons.append('fast_answers')
+
+        new = [reason for reason in reasons if reason not in detector.reasons]
+        if new:
+            detector.reasons += tuple(new)
+
+    def _is_fast(self, question_id: Optional[str], seconds: float, answer_times: Dict[str, List[float]]) -> bool:
+        if seconds < self.min_answer_seconds:
+            return True
+        if question_id is None:
+            return False
+
+        # Welford's running mean and variance of log seconds per question
+        x = math.log(seconds)
+        timing = answer_times.setdefault(question_id, [0, 0.0, 0.0])
+        fast = False
+        if timing[0] >= self.min_timing_samples:
+            std = math.sqrt(timing[2] / (timing[0] - 1))
+            fast = std > 0 and (x - timing[1]) / std < -self.fast_answer_z
+        timing[0] += 1
+        delta = x - timing[1]
+        timing[1] += delta / timing[0]
+        timing[2] += delta * (x - timing[1])
+        return fast
+
+    def reasons(self, assessment_id: str) -> Tuple[str, ...]:
+        """Why the assessment was flagged as of the last flush, empty if it hasn't been"""
+        reasons = db.session.execute(
+            db.select(ActivityDetector.reasons).where(ActivityDetector.assessment_id == assessment_id)
+        ).scalar()
+        return tuple(reasons or ())
+
+    def _request_flush(self, now: bool = False):
+        if self.app is None:
+            if now:
+                self.flush()
+            return
+
+        # Started lazily so each forked worker gets its own thread
+        if self._flusher is None or not self._flusher.is_alive():
+            with self._lock:
+                if self._flusher is None or not self._flusher.is_alive():
+                    self._flusher = threading.Thread(
+                        target=self._flush_loop, name='activity-log-flush', daemon=True
+                    )
+                    self._flusher.start()
+        if now:
+            self._flush_wanted.set()
+
+    def _flush_loop(self):
+        while True:
+            self._flush_wanted.wait(self.flush_interval)
+            self._flush_wanted.clear()
+            with self.app.app_context():
+                self.flush()
+
+    def flush(self):
+        """Evaluate queued events, append them to the log and write new anomaly flags in one transaction"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._pending_count = 0
+            if not pending:
+                return
+            chunks = [
+                pack_chunk(assessment_id, [event[:4] for _, events in batches for event in events])
+                for assessment_id, batches in pending.items()
+            ]
+
+            table = Assessment.__table__
+            try:
+                flagged = self._evaluate(pending)
+                for start in range(0, len(chunks), 1000):
+                    db.session.execute(ActivityLogChunk.__table__.insert(), chunks[start:start + 1000])
+                if flagged:
+                    db.session.execute(
+                        table.update().where(table.c.id.in_(flagged)).values(anomaly_detected=True)
+                    )
+                db.session.commit()
+            except Exception:
+                # Keep the events for the next flush rather than losing them;
+                # the detectors rolled back with them
+                db.session.rollback()
+                self.flush_errors += 1
+                with self._lock:
+                    for assessment_id, batches in pending.items():
+                        self._pending[assessment_id] = batches + self._pending.get(assessment_id, [])
+                        self._pending_count += sum(len(events) for _, events in batches)
+                return
+
+            self.flushes += 1
+            self.flagged += len(flagged)
+            self.chunks_written += len(chunks)
+            self.bytes_written += sum(len(chunk['events']) for chunk in chunks)
+
+    def stats(self) -> Dict:
+        return {
+            "events": self.events,
+            "rejected": self.rejected,
+            "flagged": self.flagged,
+            "tracked_assessments": len(self.open_assessments),
+            "pending_events": self._pending_count,
+            "chunks_written": self.chunks_written,
+            "bytes_written": self.bytes_written,
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors
+        }
+
+
+def _locked_rows(table, key, values: List) -> List:
+    """Rows of table whose key is in values, locked for update, 1000 keys per query"""
+    rows = []
+    for start in range(0, len(values), 1000):
+        rows.extend(db.session.execute(
+            db.select(table).where(key.in_(values[start:start + 1000])).with_for_update()
+        ).all())
+    return rows
+
+
+def pack_chunk(assessment_id: str, events: List[Tuple]) -> Dict:
+    """An activity_log_chunks row for (type code, epoch ms, value, question index) events"""
+    base_ms = min(event[1] for event in events)
+    packed = b''.join(
+        _PACKED_EVENT.pack(code, min(int(at_ms - base_ms), _MAX_OFFSET_MS), value, question_index)
+        for code, at_ms, value, question_index in events
+    )
+    return {
+        "id": str(uuid.uuid4()),
+        "assessment_id": assessment_id,
+        "started_at": datetime.utcfromtimestamp(base_ms / 1000),
+        "event_count": len(events),
+        "events": packed,
+        "created_at": datetime.utcnow()
+    }
+
+
+def unpack_chunk(chunk: ActivityLogChunk, question_set: List[str]) -> List[Dict]:
+    """Decoded events of a logged chunk; at_ms is relative to chunk.started_at"""
+    events = []
+    for code, offset_ms, value, question_index in _PACKED_EVENT.iter_unpack(chunk.events):
+        events.append({
+            "type": EVENT_NAMES.get(code, 'unknown'),
+            "at_ms": offset_ms,
+            "value": value,
+            "question_id": question_set[question_index]
+            if question_index != _NO_QUESTION and question_index < len(question_set) else None
+        })
+    return events
+
+
+def activity_summary(assessment: Assessment) -> Dict:
+    """Event counts per type from the assessment's logged chunks"""
+    counts = Counter()
+    answer_seconds = []
+    for chunk in ActivityLogChunk.query.filter_by(assessment_id=assessment.id).order_by(ActivityLogChunk.started_at):
+        for event in unpack_chunk(chunk, assessment.question_set or []):
+            counts[event['type']] += 1
+            if event['type'] == 'answer':
+                answer_seconds.append(event['value'])
+    return {
+        "event_counts": dict(counts),
+        "median_answer_seconds": sorted(answer_seconds)[len(answer_seconds) // 2] if answer_seconds else None
+    }
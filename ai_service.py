@@ -1,29 +1,56 @@
-import openai
 import json
 import re
 from typing import Dict, List, Any
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
-import textstat
 from IITG.project_route.config import Config
+from llm_client import OpenAIChatClient, run_concurrently
+from jd_parse_cache import JDParseCache
+from embedding_service import EmbeddingService
 
-# Download NLTK data
-nltk.download('punkt', quiet=True)
-nltk.download('stopwords', quiet=True)
+# Heavy libraries (openai, sentence_transformers, sklearn) are imported on
+# first use so that importing this module, and every worker start, stays fast
+
+QUESTION_TYPE_MIX = {"mcq": 0.4, "coding": 0.3, "subjective": 0.3}
+
+QUESTION_TYPE_FIELDS = {
+    "mcq": "options (array of 4 strings) and correct_answer (one of the options)",
+    "coding": "code_template, test_cases (array of {input, output}) and programming_language",
+    "subjective": "model_answer and rubric (object with scoring criteria and keywords)"
+}
 
 class AIService:
-    def __init__(self):
+    def __init__(self, completion_client=None, jd_cache: JDParseCache = None,
+                 embedding_service: EmbeddingService = None):
         self.openai_api_key = Config.OPENAI_API_KEY
-        openai.api_key = self.openai_api_key
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2',device='cpu')
-        
+        self.completion_client = completion_client or OpenAIChatClient(
+            api_key=self.openai_api_key, model=Config.LLM_MODEL
+        )
+        self.jd_cache = jd_cache or JDParseCache(
+            max_size=Config.JD_CACHE_SIZE, ttl=Config.JD_CACHE_TTL
+        )
+        self.embeddings = embedding_service or EmbeddingService(
+            model_name=Config.EMBEDDING_MODEL,
+            max_batch_size=Config.EMBEDDING_BATCH_SIZE,
+            max_wait_ms=Config.EMBEDDING_BATCH_WAIT_MS,
+            cache_size=Config.EMBEDDING_CACHE_SIZE,
+            storage_dtype=Config.EMBEDDING_STORAGE_DTYPE
+        )
+        
+    def preload(self):
+        """Load the embedding model now instead of on first use.
+        
+        Call in a pre-forking master (gunicorn preload_app) so workers share
+        the model's memory copy-on-write instead of each loading their own.
+        """
+        self.embeddings.model
+    
     def parse_job_description(self, jd_text: str) -> Dict:
         """Extract skills and requirements from job description"""
         
+        cached = self.jd_cache.get(jd_text)
+        if cached is not None:
+            return cached
+        
         prompt = f"""
         Analyze this job description and extract the following information in JSON format:
         
@@ -44,18 +71,21 @@ class AIService:
         """
         
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3
+            content = self.completion_client.complete(
+                prompt, temperature=0.3, timeout=Config.LLM_REQUEST_TIMEOUT
             )
             
-            result = json.loads(response.choices[0].message.content)
-            return result
+            result = json.loads(content)
+            if not isinstance(result, dict):
+                raise ValueError("Expected a JSON object")
             
         except Exception as e:
-            # Fallback to rule-based extraction
+            # Fallback to rule-based extraction (not cached, so the next
+            # request for this JD gets another chance at the LLM)
             return self._fallback_jd_parsing(jd_text)
+        
+        self.jd_cache.set(jd_text, result)
+        return result
     
     def _fallback_jd_parsing(self, jd_text: str) -> Dict:
         """Rule-based fallback for JD parsing"""
@@ -89,41 +119,79 @@ class AIService:
         if not skills:
             skills = ["general programming", "problem solving"]
         
-        prompt = f"""
-        Generate {num_questions} assessment questions for a {jd_data.get('experience_level', 'mid')} 
-        level position with these skills: {', '.join(skills[:5])}
+        # One small completion per (question type, skill) chunk, run
+        # concurrently: wall-clock time is roughly the slowest chunk, and a
+        # malformed response only loses that chunk
+        chunks = self._plan_question_chunks(skills[:5], num_questions)
+        results = run_concurrently(
+            lambda chunk: self._generate_question_chunk(jd_data, chunk),
+            chunks,
+            max_workers=Config.LLM_MAX_CONCURRENCY,
+            retries=Config.LLM_MAX_RETRIES
+        )
+        
+        questions = [q for chunk_questions in results if chunk_questions for q in chunk_questions]
+        if not questions:
+            return self._generate_fallback_questions(skills, num_questions)
+        
+        return questions
+    
+    def _plan_question_chunks(self, skills: List[str], num_questions: int) -> List[Dict]:
+        """Split the question mix into (question_type, skill, count) chunks"""
+        counts = {
+            "mcq": round(num_questions * QUESTION_TYPE_MIX["mcq"]),
+            "coding": round(num_questions * QUESTION_TYPE_MIX["coding"])
+        }
+        counts["subjective"] = max(num_questions - counts["mcq"] - counts["coding"], 0)
+        
+        chunks = []
+        for question_type, count in counts.items():
+            per_skill = {}
+            for i in range(count):
+                skill = skills[i % len(skills)]
+                per_skill[skill] = per_skill.get(skill, 0) + 1
+            
+            for skill, skill_count in per_skill.items():
+                chunks.append({"question_type": question_type, "skill": skill, "count": skill_count})
+        
+        return chunks
+    
+    def _generate_question_chunk(self, jd_data: Dict, chunk: Dict) -> List[Dict]:
+        """Generate one chunk of questions; raises on a failed or malformed completion"""
+        question_type = chunk["question_type"]
         
-        Create a mix of:
-        1. Multiple Choice Questions (MCQs) - 40%
-        2. Coding/Programming Questions - 30%
-        3. Subjective/Scenario-based Questions - 30%
+        prompt = f"""
+        Generate {chunk['count']} {question_type} assessment questions for a 
+        {jd_data.get('experience_level', 'mid')} level position, testing the skill: {chunk['skill']}
         
         Difficulty level: {jd_data.get('difficulty_level', 'medium')}
         
         For each question provide:
-        - question_type: "mcq", "coding", or "subjective"
-        - skill_category: which skill this tests
+        - question_type: "{question_type}"
+        - skill_category: "{chunk['skill']}"
         - difficulty: "easy", "medium", "hard"
         - question_text: the actual question
-        - For MCQs: options array and correct_answer
-        - For coding: code_template, test_cases, programming_language
-        - For subjective: model_answer and rubric
+        - {QUESTION_TYPE_FIELDS[question_type]}
         
         Return as JSON array.
         """
         
-        try:
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7
-            )
-            
-            questions = json.loads(response.choices[0].message.content)
-            return questions
-            
-        except Exception as e:
-            return self._generate_fallback_questions(skills, num_questions)
+        content = self.completion_client.complete(
+            prompt, temperature=0.7, timeout=Config.LLM_REQUEST_TIMEOUT
+        )
+        
+        questions = json.loads(content)
+        if isinstance(questions, dict):
+            questions = questions.get('questions', [])
+        if not isinstance(questions, list):
+            raise ValueError("Expected a JSON array of questions")
+        
+        questions = [q for q in questions if isinstance(q, dict) and q.get('question_text')]
+        for q in questions:
+            q['question_type'] = question_type
+            q.setdefault('skill_category', chunk['skill'])
+        
+        return questions[:chunk['count']]
     
     def _generate_fallback_questions(self, skills: List[str], num_questions: int) -> List[Dict]:
         """Generate fallback questions"""
@@ -173,6 +241,24 @@ class AIService:
     def evaluate_subjective_answer(self, question: Dict, answer: str) -> Dict:
         """AI-based evaluation of subjective answers"""
         
+        try:
+            return self._llm_evaluate_subjective(question, answer)
+            
+        except Exception as e:
+            return {
+                "score": 50,
+                "feedback": "Automated evaluation unavailable",
+                "strengths": [],
+                "weaknesses": ["Could not evaluate"],
+                "plagiarism_flag": False
+            }
+    
+    def score_subjective_answer(self, question: Dict, answer: str) -> float:
+        """LLM score (0-100) for one answer; raises instead of falling back"""
+        evaluation = self._llm_evaluate_subjective(question, answer)
+        return min(max(float(evaluation["score"]), 0.0), 100.0)
+    
+    def _llm_evaluate_subjective(self, question: Dict, answer: str) -> Dict:
         prompt = f"""
         Evaluate this answer for the question:
         
@@ -190,31 +276,20 @@ class AIService:
         - plagiarism_flag: boolean if answer seems copied
         """
         
-        try:
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3
-            )
-            
-            evaluation = json.loads(response.choices[0].message.content)
-            return evaluation
-            
-        except Exception as e:
-            return {
-                "score": 50,
-                "feedback": "Automated evaluation unavailable",
-                "strengths": [],
-                "weaknesses": ["Could not evaluate"],
-                "plagiarism_flag": False
-            }
+        content = self.completion_client.complete(
+            prompt, temperature=0.3, timeout=Config.LLM_REQUEST_TIMEOUT
+        )
+        
+        return json.loads(content)
     
     def detect_plagiarism(self, answers: List[str]) -> float:
         """Detect similarity between answers"""
         if len(answers) < 2:
             return 0.0
         
-        embeddings = self.embedding_model.encode(answers)
+        from sklearn.metrics.pairwise import cosine_similarity
+        
+        embeddings = self.embeddings.encode(answers)
         similarities = cosine_similarity(embeddings)
         
         # Get max similarity excluding self-comparison
@@ -239,31 +314,4 @@ class AIService:
                     "priority": "high" if gap > 0.5 else "medium"
                 }
         
-        return skill_gaps
-
-class QuestionBankManager:
-    """Manage question bank to avoid repetition"""
-    
-    def __init__(self):
-        self.used_questions = set()
-    
-    def get_unique_questions(self, all_questions: List[Dict], num_needed: int) -> List[Dict]:
-        """Select unique questions that haven't been used recently"""
-        
-        # Filter out recently used questions
-        available = [q for q in all_questions if q.get('id') not in self.used_questions]
-        
-        if len(available) < num_needed:
-            # Reset if we're running out of questions
-            self.used_questions.clear()
-            available = all_questions
-        
-        # Select random subset
-        import random
-        selected = random.sample(available, min(num_needed, len(available)))
-        
-        # Mark as used
-        for q in selected:
-            self.used_questions.add(q.get('id'))
-        
-        return selected
\ No newline at end of file
+        return skill_gaps
\ No newline at end of file
@@ -0,0 +1,309 @@
+import logging
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.exc import IntegrityError, OperationalError
+from cache import TTLCache
+from models import db, Assessment, CandidateAnswer
+
+logger = logging.getLogger(__name__)
+
+MAX_TIME_SPENT = 2 ** 31 - 1
+
+
+def well_formed(answer: Dict) -> bool:
+    """Whether an answer's fields fit their columns: text or null answer and code, whole seconds"""
+    time_spent = answer.get('time_spent')
+    return (
+        all(answer.get(field) is None or isinstance(answer[field], str) for field in ('answer', 'code'))
+        and (time_spent is None or type(time_spent) is int and 0 <= time_spent <= MAX_TIME_SPENT)
+    )
+
+
+class AnswerAutosaveBuffer:
+    """Write-behind buffer for per-question autosaves during an assessment.
+
+    Autosaves land in memory keyed by (assessment, question), so a candidate
+    retyping an answer ten times between flushes costs one row write: the
+    last save wins. A background thread writes everything pending every
+    ``flush_interval`` seconds as one upsert per ``batch_size`` answers in a
+    single transaction (a group commit), or sooner once ``max_pending``
+    answers are waiting.
+
+    Rows carry the server time of the save they hold, and an update only
+    applies over an older row, so a worker flushing late cannot roll back a
+    newer answer saved through another worker. Answers for assessments that
+    are no longer in progress are dropped at flush time. A batch the
+    database rejects is retried one answer at a time and the answers that
+    still fail are logged and dropped; if the database can't be reached,
+    everything unwritten waits for the next flush.
+
+    Submit ``take``s that assessment's pending answers and ``write``s them
+    in its own transaction before reading the persisted sheet.
+    """
+
+    def __init__(self, flush_interval: float = 1.0, max_pending: int = 20000,
+                 batch_size: int = 1000, open_cache_size: int = 50000,
+                 open_cache_ttl: float = 300, app=None):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.app = app
+        # assessment id -> (candidate id, question ids) while in progress
+        self.open_assessments = TTLCache(max_size=open_cache_size, ttl=open_cache_ttl)
+        self._pending: Dict[str, Dict[str, Dict]] = {}
+        self._pending_count = 0
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flush_wanted = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self.saves = 0
+        self.coalesced = 0
+        self.rows_written = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.flush_errors = 0
+        self.rejected = 0
+
+    def lookup(self, assessment_id: str) -> Optional[Tuple[str, frozenset]]:
+        """(candidate id, question ids) of an in-progress assessment, None otherwise"""
+        info = self.open_assessments.get(assessment_id)
+        if info is not None:
+            return info
+
+        table = Assessment.__table__
+        with db.session.no_autoflush:
+            row = db.session.execute(
+                db.select(table.c.candidate_id, table.c.question_set, table.c.status)
+                .where(table.c.id == assessment_id)
+            ).first()
+        if row is None or row.status != 'in_progress':
+            return None
+
+        info = (row.candidate_id, frozenset(row.question_set or ()))
+        self.open_assessments.set(assessment_id, info)
+        return info
+
+    def close(self, assessment_id: str):
+        """Stop accepting autosaves for an assessment in this process"""
+        self.open_assessments.pop(assessment_id)
+
+    def put(self, assessment_id: str, candidate_id: str, answers: List[Dict]) -> int:
+        """Buffer answers, replacing any pending save for the same question"""
+        saved_at = datetime.utcnow()
+        with self._pending_lock:
+            sheet = self._pending.setdefault(assessment_id, {})
+            for answer in answers:
+                question_id = answer['question_id']
+                if question_id in sheet:
+                    self.coalesced += 1
+                else:
+                    self._pending_count += 1
+                sheet[question_id] = {
+                    "assessment_id": assessment_id,
+                    "candidate_id": candidate_id,
+                    "question_id": question_id,
+                    "answer": answer.get('answer'),
+                    "code": answer.get('code'),
+                    "time_spent": answer.get('time_spent'),
+                    "saved_at": saved_at
+                }
+            self.saves += len(answers)
+            due = self._pending_count >= self.max_pending
+
+        self._request_flush(now=due)
+        return len(answers)
+
+    def pending(self, assessment_id: str) -> List[Dict]:
+        """Answers for the assessment not yet written to the database"""
+        with self._pending_lock:
+            return list(self._pending.get(assessment_id, {}).values())
+
+    def take(self, assessment_id: str) -> List[Dict]:
+        """Remove and return the assessment's pending answers"""
+        # Waits out a background flush that may already hold some of them,
+        # so once they are written the persisted sheet is complete. Call it
+        # before taking the database write lock: that flush may need it.
+        with self._flush_lock:
+            with self._pending_lock:
+                sheet = self._pending.pop(assessment_id, {})
+                self._pending_count -= len(sheet)
+        return list(sheet.values())
+
+    def write(self, entries: List[Dict]):
+        """Upsert answers from ``take`` in the caller's transaction (not committed)"""
+        if entries:
+            self._upsert(entries, open_only=False)
+
+    def _request_flush(self, now: bool = False):
+        if self.app is None:
+            if now:
+                self.flush()
+            return
+
+        # Started lazily so each forked worker gets its own thread
+        if self._flusher is None or not self._flusher.is_alive():
+            with self._pending_lock:
+                if self._flusher is None or not self._flusher.is_alive():
+                    self._flusher = threading.Thread(
+                        target=self._flush_loop, name='answer-autosave-flush', daemon=True
+                    )
+                    self._flusher.start()
+        if now:
+            self._flush_wanted.set()
+
+    def _flush_loop(self):
+        while True:
+            self._flush_wanted.wait(self.flush_interval)
+            self._flush_wanted.clear()
+            with self.app.app_context():
+                self.flush()
+
+    def flush(self):
+        """Write every pending answer, one transaction per batch"""
+        with self._flush_lock:
+            with self._pending_lock:
+                pending, self._pending = self._pending, {}
+                self._pending_count = 0
+            entries = [entry for sheet in pending.values() for entry in sheet.values()]
+
+            for start in range(0, len(entries), self.batch_size):
+                batch = entries[start:start + self.batch_size]
+                try:
+                    self._write(batch)
+                    self.flushes += 1
+                    continue
+                except OperationalError:
+                    db.session.rollback()
+                    self.flush_errors += 1
+                    unwritten = batch
+                except Exception:
+                    db.session.rollback()
+                    self.flush_errors += 1
+                    unwritten = self._write_each(batch)
+                if unwritten:
+                    self._requeue(unwritten + entries[start + self.batch_size:])
+                    break
+
+    def _write_each(self, entries: List[Dict]) -> List[Dict]:
+        """Write a rejected batch one answer at a time; returns what is left if the database goes away"""
+        for position, entry in enumerate(entries):
+            try:
+                self._write([entry])
+            except OperationalError:
+                db.session.rollback()
+                return entries[position:]
+            except Exception:
+                db.session.rollback()
+                self.rejected += 1
+                logger.exception("Dropping autosaved answer to question %s of assessment %s",
+                                 entry['question_id'], entry['assessment_id'])
+        return []
+
+    def _write(self, entries: List[Dict]):
+        try:
+            self._upsert(entries, open_only=True)
+            db.session.commit()
+        except IntegrityError:
+            # Another worker inserted one of these rows first; the retry
+            # sees it and updates instead
+            db.session.rollback()
+            self._upsert(entries, open_only=True)
+            db.session.commit()
+
+    def _upsert(self, entries: List[Dict], open_only: bool):
+        table = CandidateAnswer.__table__
+        assessment_ids = {entry['assessment_id'] for entry in entries}
+
+        if open_only:
+            status_table = Assessment.__table__
+            open_ids = set(db.session.execute(
+                db.select(status_table.c.id).where(
+                    status_table.c.id.in_(assessment_ids), status_table.c.status == 'in_progress'
+                )
+            ).scalars())
+            kept = [entry for entry in entries if entry['assessment_id'] in open_ids]
+            self.dropped += len(entries) - len(kept)
+            entries = kept
+            if not entries:
+                return
+
+        existing = {
+            (row.assessment_id, row.question_id): row.id
+            for row in db.session.execute(
+                db.select(table.c.id, table.c.assessment_id, table.c.question_id)
+                .where(table.c.assessment_id.in_({entry['assessment_id'] for entry in entries}))
+            )
+        }
+
+        updates, inserts = [], []
+        for entry in entries:
+            row_id = existing.get((entry['assessment_id'], entry['question_id']))
+            if row_id is None:
+                inserts.append({
+                    "id": str(uuid.uuid4()),
+                    "assessment_id": entry['assessment_id'],
+                    "candidate_id": entry['candidate_id'],
+                    "question_id": entry['question_id'],
+                    "answer": entry['answer'],
+                    "code": entry['code'],
+                    "time_spent": entry['time_spent'],
+                    "created_at": entry['saved_at'],
+                    "updated_at": entry['saved_at']
+                })
+            else:
+                updates.append({
+                    "row_id": row_id,
+                    "new_answer": entry['answer'],
+                    "new_code": entry['code'],
+                    "new_time_spent": entry['time_spent'],
+                    "saved_at": entry['saved_at']
+                })
+
+        if updates:
+            db.session.execute(
+                table.update()
+                .where(table.c.id == db.bindparam('row_id'), table.c.updated_at <= db.bindparam('saved_at'))
+                .values(answer=db.bindparam('new_answer'), code=db.bindparam('new_code'),
+                        time_spent=db.bindparam('new_time_spent'), updated_at=db.bindparam('saved_at')),
+                updates
+            )
+        if inserts:
+            db.session.execute(table.insert(), inserts)
+        self.rows_written += len(entries)
+
+    def _requeue(self, entries: List[Dict]):
+        # Put unwritten answers back unless a newer save arrived meanwhile
+        with self._pending_lock:
+            for entry in entries:
+                sheet = self._pending.setdefault(entry['assessment_id'], {})
+                if entry['question_id'] not in sheet:
+                    sheet[entry['question_id']] = entry
+                    self._pending_count += 1
+
+    def stats(self) -> Dict:
+        return {
+            "saves": self.saves,
+            "coalesced": self.coalesced,
+            "rows_written": self.rows_written,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+            "rejected": self.rejected,
+            "pending_answers": self._pending_count,
+            "open_assessments": len(self.open_assessments)
+        }
+
+
+def persisted_answers(assessment_id: str) -> List[Dict]:
+    """The assessment's saved answer sheet in the shape submit and evaluation use"""
+    table = CandidateAnswer.__table__
+    rows = db.session.execute(
+        db.select(table.c.question_id, table.c.answer, table.c.code, table.c.time_spent)
+        .where(table.c.assessment_id == assessment_id)
+    ).all()
+    return [
+        {"question_id": row.question_id, "answer": row.answer, "code": row.code, "time_spent": row.time_spent}
+        for row in rows
+    ]
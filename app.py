@@ -1,15 +1,41 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
 import uuid
 from datetime import datetime, timedelta
+import csv
+import hashlib
+import io
 import json
 import os
+import time
+import zipfile
+from werkzeug.wsgi import get_input_stream
 
 from IITG.project_route.config import Config
-from IITG.models.models import db, JobDescription, Question, Assessment, Candidate, User, Company, Leaderboard
-from services.ai_service import AIService, QuestionBankManager
+from IITG.models.models import db, JobDescription, Question, Assessment, Candidate, CandidateAnswer, User, Company, Leaderboard, ResumeImport, RegradeRun
+import atexit
+from services.ai_service import AIService
 from services.evaluation_service import EvaluationService
+from services.leaderboard_service import LeaderboardService
+from services.candidate_profile import CandidateProfileService
+from services.stats_rollup import StatsRollup
+from services.task_queue import TaskQueue
+from services.jd_parse_cache import JDParseCache, SQLJDParseStore
+from services.plagiarism_service import CrossCandidateSimilarity
+from services.subjective_scoring import SubjectiveScorer
+from services.question_selection import QuestionSelector
+from services.question_catalog import QuestionCatalog
+from services.packet_pool import AssessmentPacketPool, new_assessment_code
+from services.answer_autosave import AnswerAutosaveBuffer, persisted_answers, well_formed
+from services.activity_monitor import ActivityMonitor, activity_summary
+from services.migrations import migrate
+from services.sqlite_writer import SQLiteWriter, apply_pragmas
+from services.resume_parser import ResumeIngestor, UploadTooLarge, allowed_file
+from services.candidate_matching import CandidateMatchIndex, normalize_skill
+from services.embedding_service import to_bytes
+from services.cohort_analytics import CohortAnalytics
+from services.regrade import RegradeEngine
 
 app = Flask(__name__)
 app.config.from_object(Config)
@@ -19,14 +45,139 @@ jwt = JWTManager(app)
 # Initialize database
 db.init_app(app)
 
+# SQLite profile: WAL and tuned pragmas on every connection, and one
+# group-committing writer thread for the start/submit/evaluation writes
+with app.app_context():
+    if db.engine.dialect.name == 'sqlite':
+        apply_pragmas(db.engine, Config.SQLITE_PRAGMAS)
+    db_writer = SQLiteWriter(
+        app,
+        url=db.engine.url,
+        enabled=Config.SQLITE_GROUP_COMMIT,
+        pragmas=Config.SQLITE_PRAGMAS,
+        max_batch=Config.SQLITE_GROUP_COMMIT_MAX_BATCH,
+        max_wait=Config.SQLITE_GROUP_COMMIT_WAIT_MS / 1000,
+        lock_timeout=Config.SQLITE_LOCK_TIMEOUT
+    )
+
 # Initialize services
-ai_service = AIService()
-question_manager = QuestionBankManager()
-evaluation_service = EvaluationService()
+jd_parse_cache = JDParseCache(
+    max_size=Config.JD_CACHE_SIZE,
+    ttl=Config.JD_CACHE_TTL,
+    store=SQLJDParseStore(ttl=Config.JD_CACHE_TTL, max_rows=Config.JD_CACHE_MAX_ROWS)
+    if Config.JD_CACHE_PERSISTENT else None
+)
+ai_service = AIService(jd_cache=jd_parse_cache)
+if Config.PRELOAD_MODELS:
+    ai_service.preload()
+similarity_checker = CrossCandidateSimilarity(
+    ai_service.embeddings,
+    lsh_tables=Config.SIMILARITY_LSH_TABLES,
+    lsh_bits=Config.SIMILARITY_LSH_BITS,
+    minhash_permutations=Config.MINHASH_PERMUTATIONS,
+    minhash_bands=Config.MINHASH_BANDS,
+    max_jobs=Config.SIMILARITY_INDEX_JOBS
+)
+question_selector = QuestionSelector(
+    refresh_interval=Config.QUESTION_INDEX_REFRESH,
+    flush_every=Config.QUESTION_EXPOSURE_FLUSH_EVERY,
+    flush_interval=Config.QUESTION_EXPOSURE_FLUSH_INTERVAL,
+    app=app
+)
+question_catalog = QuestionCatalog(max_jobs=Config.QUESTION_CATALOG_SIZE)
+packet_pool = AssessmentPacketPool(
+    question_selector, question_catalog, prefetch=Config.PACKET_POOL_PREFETCH
+)
+answer_autosave = AnswerAutosaveBuffer(
+    flush_interval=Config.AUTOSAVE_FLUSH_INTERVAL,
+    max_pending=Config.AUTOSAVE_MAX_PENDING,
+    batch_size=Config.AUTOSAVE_BATCH_SIZE,
+    app=app
+)
+activity_monitor = ActivityMonitor(
+    flush_interval=Config.ACTIVITY_FLUSH_INTERVAL,
+    burst_window=Config.ACTIVITY_BURST_WINDOW,
+    burst_threshold=Config.ACTIVITY_BURST_THRESHOLD,
+    max_focus_losses=Config.ACTIVITY_MAX_FOCUS_LOSSES,
+    large_paste_chars=Config.ACTIVITY_LARGE_PASTE_CHARS,
+    max_large_pastes=Config.ACTIVITY_MAX_LARGE_PASTES,
+    min_answer_seconds=Config.ACTIVITY_MIN_ANSWER_SECONDS,
+    fast_answer_z=Config.ACTIVITY_FAST_ANSWER_Z,
+    max_fast_answers=Config.ACTIVITY_MAX_FAST_ANSWERS,
+    app=app
+)
+resume_ingestor = ResumeIngestor(
+    Config.UPLOAD_FOLDER,
+    workers=Config.RESUME_PARSE_WORKERS,
+    extensions=Config.ALLOWED_EXTENSIONS,
+    max_file_bytes=Config.MAX_CONTENT_LENGTH,
+    max_files=Config.RESUME_BULK_MAX_FILES,
+    max_text_chars=Config.RESUME_MAX_TEXT_CHARS,
+    parse_timeout=Config.RESUME_PARSE_TIMEOUT,
+    memory_mb=Config.RESUME_PARSE_MEMORY_MB
+)
+candidate_matcher = CandidateMatchIndex(
+    claimed_weight=Config.MATCH_CLAIMED_WEIGHT,
+    embedding_weight=Config.MATCH_EMBEDDING_WEIGHT,
+    shortlist=Config.MATCH_SHORTLIST,
+    sync_interval=Config.MATCH_SYNC_INTERVAL
+)
+cohort_analytics = CohortAnalytics(max_jobs=Config.COHORT_ANALYTICS_JOBS)
 
-# Create tables
-with app.app_context():
-    db.create_all()
+@atexit.register
+def flush_question_exposures():
+    with app.app_context():
+        question_selector.flush()
+
+@atexit.register
+def flush_autosaved_answers():
+    with app.app_context():
+        answer_autosave.flush()
+
+@atexit.register
+def flush_stats_rollup():
+    with app.app_context():
+        stats_rollup.flush()
+
+@atexit.register
+def flush_activity_log():
+    with app.app_context():
+        activity_monitor.flush()
+
+@atexit.register
+def stop_db_writer():
+    db_writer.stop()
+
+evaluation_service = EvaluationService(subjective_scorer=SubjectiveScorer(
+    ai_service.embeddings,
+    llm_evaluator=ai_service.score_subjective_answer if Config.SUBJECTIVE_LLM_RESCORE else None,
+    weights=Config.SUBJECTIVE_WEIGHTS,
+    similarity_range=Config.SUBJECTIVE_SIMILARITY_RANGE,
+    llm_band=Config.SUBJECTIVE_LLM_BAND,
+    llm_concurrency=Config.LLM_MAX_CONCURRENCY
+))
+regrade_engine = RegradeEngine(evaluation_service, chunk_size=Config.REGRADE_CHUNK_SIZE)
+leaderboard_service = LeaderboardService(version_shards=Config.LEADERBOARD_VERSION_SHARDS)
+candidate_profiles = CandidateProfileService()
+stats_rollup = StatsRollup(
+    flush_interval=Config.STATS_FLUSH_INTERVAL,
+    rate_window=Config.STATS_RATE_WINDOW,
+    retention=Config.STATS_RETENTION_MINUTES,
+    cache_ttl=Config.DASHBOARD_CACHE_TTL,
+    app=app
+)
+task_queue = TaskQueue(app, backend=Config.TASK_QUEUE_BACKEND, max_workers=Config.TASK_QUEUE_WORKERS)
+
+# Bring the schema up to date
+if Config.AUTO_MIGRATE:
+    with app.app_context():
+        migrate(db.engine)
+
+@app.cli.command('migrate')
+def migrate_command():
+    """Apply pending schema migrations"""
+    applied = migrate(db.engine)
+    print(f"Applied {', '.join(applied)}" if applied else "Schema is up to date")
 
 # ============ Authentication Routes ============
 
@@ -133,6 +284,8 @@ def create_job_description():
     
     db.session.commit()
     
+    embed_job_questions.delay(jd.id)
+    
     return jsonify({
         "message": "Job description created with questions",
         "job_id": jd.id,
@@ -144,95 +297,212 @@ def create_job_description():
 @app.route('/api/assessments/start', methods=['POST'])
 def start_assessment():
     data = request.json
-    candidate_email = data.get('email')
-    
-    # Find or create candidate
-    candidate = Candidate.query.filter_by(email=candidate_email).first()
-    if not candidate:
-        candidate = Candidate(
-            id=str(uuid.uuid4()),
-            email=candidate_email,
-            name=data.get('name', ''),
-            resume_text=data.get('resume_text', '')
-        )
-        db.session.add(candidate)
+    candidate = {
+        "email": data.get('email'),
+        "name": data.get('name', ''),
+        "resume_text": data.get('resume_text', '')
+    }
     
+    # Reads first: the write job (and, on SQLite, the database write lock)
+    # should only span the candidate lookup and the inserts
     jd = JobDescription.query.get(data.get('job_id'))
     if not jd:
         return jsonify({"error": "Job description not found"}), 404
     
-    # Get unique questions
-    all_questions = Question.query.filter_by(job_description_id=jd.id, is_active=True).all()
-    questions_data = [{
-        'id': q.id,
-        'question_type': q.question_type,
-        'skill_category': q.skill_category,
-        'difficulty': q.difficulty,
-        'question_text': q.question_text,
-        'options': q.options
-    } for q in all_questions]
-    
-    # Select unique questions
-    selected_questions = question_manager.get_unique_questions(questions_data, 10)
-    
-    # Create assessment
-    assessment = Assessment(
-        id=str(uuid.uuid4()),
-        job_description_id=jd.id,
-        candidate_id=candidate.id,
-        assessment_code=f"ASS-{datetime.now().strftime('%Y%m%d')}-{str(uuid.uuid4())[:8]}",
-        status='in_progress',
-        start_time=datetime.utcnow(),
-        question_set=[q['id'] for q in selected_questions]
+    # Scheduled drive: bind a pre-built packet instead of building one now
+    if jd.scheduled_start is not None:
+        started = db_writer.run(start_from_packet, jd.id, jd.question_version, candidate)
+        if started is not None:
+            stats_rollup.record_started(jd.id)
+            return packet_start_response(started, jd)
+    
+    # Pick the question set from the job's stratified index and serve the
+    # candidate-facing fields from the cached catalog
+    question_ids = question_selector.select(
+        jd.id, Config.QUESTIONS_PER_ASSESSMENT, version=jd.question_version
     )
+    selected_questions = question_catalog.questions(jd.id, jd.question_version, question_ids)
     
-    db.session.add(assessment)
-    db.session.commit()
+    started = db_writer.run(create_assessment, jd.id, candidate, [q['id'] for q in selected_questions])
+    stats_rollup.record_started(jd.id)
     
     return jsonify({
-        "assessment_id": assessment.id,
+        "assessment_id": started["assessment_id"],
         "questions": selected_questions,
         "duration": jd.assessment_duration,
-        "start_time": assessment.start_time.isoformat()
+        "start_time": started["start_time"].isoformat()
+    }), 200
+
+@app.route('/api/jobs/<job_id>/packet-pool', methods=['POST'])
+@jwt_required()
+def schedule_packet_pool(job_id):
+    data = request.json or {}
+    
+    jd = JobDescription.query.get(job_id)
+    if not jd:
+        return jsonify({"error": "Job description not found"}), 404
+    
+    count = int(data.get('count', 0))
+    if count <= 0 or count > Config.PACKET_POOL_MAX_BUILD:
+        return jsonify({"error": f"count must be between 1 and {Config.PACKET_POOL_MAX_BUILD}"}), 400
+    
+    start_time = data.get('start_time')
+    jd.scheduled_start = datetime.fromisoformat(start_time) if start_time else datetime.utcnow()
+    db.session.commit()
+    
+    build_assessment_packets.delay(jd.id, count)
+    
+    return jsonify({
+        "job_id": jd.id,
+        "scheduled_start": jd.scheduled_start.isoformat(),
+        "requested": count,
+        "ready": packet_pool.ready_count(jd.id)
+    }), 202
+
+@app.route('/api/jobs/<job_id>/packet-pool', methods=['GET'])
+@jwt_required()
+def get_packet_pool(job_id):
+    jd = JobDescription.query.get(job_id)
+    if not jd:
+        return jsonify({"error": "Job description not found"}), 404
+    
+    return jsonify({
+        "job_id": jd.id,
+        "scheduled_start": jd.scheduled_start.isoformat() if jd.scheduled_start else None,
+        "ready": packet_pool.ready_count(jd.id)
     }), 200
 
+@app.route('/api/assessments/<assessment_id>/answers', methods=['PUT', 'POST'])
+def autosave_answers(assessment_id):
+    data = request.json or {}
+    answers = data['answers'] if 'answers' in data else [data]
+    
+    info = answer_autosave.lookup(assessment_id)
+    if info is None:
+        return jsonify({"error": "Assessment is not accepting answers"}), 409
+    candidate_id, question_ids = info
+    
+    if not isinstance(answers, list) or not all(
+        isinstance(a, dict) and a.get('question_id') in question_ids for a in answers
+    ):
+        return jsonify({"error": "Each answer needs a question_id from this assessment"}), 400
+    if not all(well_formed(a) for a in answers):
+        return jsonify({"error": "answer and code must be strings and time_spent whole seconds"}), 400
+    
+    # Buffered in memory; written by the next group commit
+    saved = answer_autosave.put(assessment_id, candidate_id, answers)
+    return jsonify({"saved": saved}), 202
+
+@app.route('/api/assessments/<assessment_id>/answers', methods=['GET'])
+def get_saved_answers(assessment_id):
+    assessment = Assessment.query.get(assessment_id)
+    if not assessment:
+        return jsonify({"error": "Assessment not found"}), 404
+    
+    # Saved rows overlaid with answers still waiting for a flush
+    answers = {a['question_id']: a for a in persisted_answers(assessment_id)}
+    for entry in answer_autosave.pending(assessment_id):
+        answers[entry['question_id']] = {
+            "question_id": entry['question_id'],
+            "answer": entry['answer'],
+            "code": entry['code'],
+            "time_spent": entry['time_spent']
+        }
+    
+    return jsonify({"assessment_id": assessment_id, "answers": list(answers.values())}), 200
+
+@app.route('/api/assessments/<assessment_id>/activity', methods=['POST'])
+def log_activity(assessment_id):
+    data = request.json or {}
+    events = data['events'] if 'events' in data else [data]
+    if not isinstance(events, list) or len(events) > Config.ACTIVITY_MAX_BATCH:
+        return jsonify({"error": f"Send a list of at most {Config.ACTIVITY_MAX_BATCH} events"}), 400
+    
+    positions = activity_monitor.lookup(assessment_id)
+    if positions is None:
+        return jsonify({"error": "Assessment is not accepting activity"}), 409
+    
+    # Checked against the anomaly rules and appended to the log by the next flush
+    accepted = activity_monitor.ingest(assessment_id, positions, events)
+    return jsonify({"accepted": accepted, "rejected": len(events) - accepted}), 202
+
+@app.route('/api/assessments/<assessment_id>/activity', methods=['GET'])
+@jwt_required()
+def get_activity(assessment_id):
+    assessment = Assessment.query.get(assessment_id)
+    if not assessment:
+        return jsonify({"error": "Assessment not found"}), 404
+    
+    summary = activity_summary(assessment)
+    summary.update({
+        "assessment_id": assessment.id,
+        "anomaly_detected": assessment.anomaly_detected,
+        "anomaly_reasons": list(activity_monitor.reasons(assessment.id))
+    })
+    return jsonify(summary), 200
+
 @app.route('/api/assessments/<assessment_id>/submit', methods=['POST'])
 def submit_assessment(assessment_id):
-    data = request.json
+    data = request.json or {}
     answers = data.get('answers', [])
+    if not isinstance(answers, list):
+        return jsonify({"error": "answers must be a list"}), 400
+    answers = [a for a in answers if isinstance(a, dict) and a.get('question_id')]
+    if not all(well_formed(a) for a in answers):
+        return jsonify({"error": "answer and code must be strings and time_spent whole seconds"}), 400
     
     assessment = Assessment.query.get(assessment_id)
     if not assessment:
         return jsonify({"error": "Assessment not found"}), 404
     
-    # Evaluate answers
-    evaluation_result = evaluation_service.evaluate_assessment(assessment, answers)
+    # A retried submit must not enqueue a second evaluation
+    if assessment.status in ('completed', 'evaluated', 'failed'):
+        return jsonify(submission_status(assessment)), 202
     
-    # Update assessment
-    assessment.status = 'completed'
-    assessment.completed_at = datetime.utcnow()
-    assessment.total_score = evaluation_result['total_score']
-    assessment.section_scores = evaluation_result['section_scores']
-    assessment.skill_scores = evaluation_result['skill_scores']
-    assessment.is_passed = evaluation_result['total_score'] >= assessment.job_description.cutoff_score
-    assessment.plagiarism_score = evaluation_result.get('plagiarism_score', 0)
+    # Answers posted with the submit are the final saves; together with
+    # anything still buffered they are written in the submit's transaction,
+    # and the persisted rows become the sheet evaluate_submission scores
+    answer_autosave.close(assessment.id)
+    activity_monitor.close(assessment.id)
+    if answers:
+        answer_autosave.put(assessment.id, assessment.candidate_id, answers)
+    status = db_writer.run(record_submission, assessment.id, answer_autosave.take(assessment.id))
+    if status is None:
+        # A concurrent retry submitted it first
+        db.session.refresh(assessment)
+        return jsonify(submission_status(assessment)), 202
+    stats_rollup.record_submitted(assessment.job_description_id)
     
-    # Update candidate stats
-    candidate = Candidate.query.get(assessment.candidate_id)
-    candidate.total_assessments += 1
-    candidate.avg_score = (candidate.avg_score * (candidate.total_assessments - 1) + 
-                          evaluation_result['total_score']) / candidate.total_assessments
+    evaluate_submission.delay(assessment.id)
     
-    # Update leaderboard
-    update_leaderboard(assessment)
+    return jsonify(status), 202
+
+@app.route('/api/assessments/<assessment_id>/status', methods=['GET'])
+def get_submission_status(assessment_id):
+    assessment = Assessment.query.get(assessment_id)
+    if not assessment:
+        return jsonify({"error": "Assessment not found"}), 404
     
-    db.session.commit()
+    return jsonify(submission_status(assessment)), 200
+
+@app.route('/api/assessments/<assessment_id>/retry', methods=['POST'])
+@jwt_required()
+def retry_evaluation(assessment_id):
+    user = User.query.get(get_jwt_identity())
+    if user.role != 'admin':
+        return jsonify({"error": "Unauthorized"}), 403
     
-    return jsonify({
-        "assessment_result": evaluation_result,
-        "is_passed": assessment.is_passed,
-        "cutoff_score": assessment.job_description.cutoff_score
-    }), 200
+    assessment = Assessment.query.get(assessment_id)
+    if not assessment:
+        return jsonify({"error": "Assessment not found"}), 404
+    # A failed evaluation, or a submission still waiting on one, is queued again
+    status = db_writer.run(requeue_evaluation, assessment.id)
+    if status is None:
+        db.session.refresh(assessment)
+        return jsonify({"error": f"Assessment is {assessment.status}"}), 409
+    evaluate_submission.delay(assessment.id)
+    
+    return jsonify(status), 202
 
 # ============ Evaluation & Results Routes ============
 
@@ -242,6 +512,10 @@ def get_assessment_results(assessment_id):
     if not assessment:
         return jsonify({"error": "Assessment not found"}), 404
     
+    # Results exist only once the background evaluation has finished
+    if assessment.status != 'evaluated':
+        return jsonify(submission_status(assessment)), 202
+    
     # Get detailed results
     results = {
         "assessment_id": assessment.id,
@@ -262,66 +536,192 @@ def get_assessment_results(assessment_id):
     ).first()
     
     if leaderboard_entry:
-        results['rank'] = leaderboard_entry.rank
-        results['percentile'] = leaderboard_entry.percentile
+        results.update(leaderboard_service.position(leaderboard_entry))
     
     return jsonify(results), 200
 
 @app.route('/api/jobs/<job_id>/leaderboard', methods=['GET'])
 def get_leaderboard(job_id):
     page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
-    
-    leaderboard = Leaderboard.query.filter_by(
-        job_description_id=job_id
-    ).order_by(
-        Leaderboard.score.desc()
-    ).paginate(page=page, per_page=per_page)
-    
-    result = []
-    for entry in leaderboard.items:
-        result.append({
-            "rank": entry.rank,
-            "candidate_name": entry.candidate.name,
-            "score": entry.score,
-            "percentile": entry.percentile,
-            "time_efficiency": entry.time_efficiency,
-            "accuracy_rate": entry.accuracy_rate
-        })
+    per_page = min(request.args.get('per_page', 20, type=int), Config.LEADERBOARD_MAX_PER_PAGE)
+    cursor = request.args.get('cursor')
+    if page < 1 or per_page < 1:
+        return jsonify({"error": "page and per_page must be positive"}), 400
+    
+    # Unchanged leaderboards answer 304 before any page query runs
+    version = leaderboard_service.version(job_id)
+    etag = leaderboard_etag(job_id, version)
+    if request.if_none_match.contains(etag):
+        return not_modified(etag)
+    
+    if cursor:
+        # Keyset mode: deep pages cost the same as the first
+        try:
+            cursor = leaderboard_service.decode_cursor(cursor)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        ranked, total = leaderboard_service.after(job_id, cursor, per_page, version)
+    else:
+        ranked, total = leaderboard_service.page(job_id, page, per_page, version)
+    
+    response = jsonify({
+        "leaderboard": [leaderboard_row(row) for row in ranked],
+        "total": total,
+        "pages": -(-total // per_page),
+        "current_page": None if cursor else page,
+        "next_cursor": leaderboard_service.encode_cursor(ranked[-1], version)
+        if len(ranked) == per_page else None
+    })
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response, 200
+
+@app.route('/api/jobs/<job_id>/leaderboard/export', methods=['GET'])
+@jwt_required()
+def export_leaderboard(job_id):
+    limit = min(request.args.get('limit', Config.LEADERBOARD_EXPORT_MAX, type=int), Config.LEADERBOARD_EXPORT_MAX)
+    export_format = request.args.get('format', 'csv')
+    if limit < 1 or export_format not in ('csv', 'ndjson'):
+        return jsonify({"error": "limit must be positive and format csv or ndjson"}), 400
+    
+    etag = leaderboard_etag(job_id, leaderboard_service.version(job_id))
+    if request.if_none_match.contains(etag):
+        return not_modified(etag)
+    
+    columns = ["rank", "candidate_name", "score", "percentile", "time_efficiency", "accuracy_rate"]
+    
+    def generate():
+        # Rows are read and sent in batches; the export is never held in memory
+        if export_format == 'csv':
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=columns)
+            writer.writeheader()
+            for row in leaderboard_service.stream(job_id, limit):
+                writer.writerow(leaderboard_row(row))
+                if buffer.tell() > 64 * 1024:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+            yield buffer.getvalue()
+        else:
+            for row in leaderboard_service.stream(job_id, limit):
+                yield json.dumps(leaderboard_row(row)) + '\n'
+    
+    response = Response(
+        stream_with_context(generate()),
+        mimetype='text/csv' if export_format == 'csv' else 'application/x-ndjson',
+        headers={"Content-Disposition": f"attachment; filename=leaderboard-{job_id}.{export_format}"}
+    )
+    response.set_etag(etag)
+    return response
+
+@app.route('/api/jobs/<job_id>/matches', methods=['GET'])
+@jwt_required()
+def get_job_matches(job_id):
+    jd = JobDescription.query.get(job_id)
+    if not jd:
+        return jsonify({"error": "Job description not found"}), 404
+    
+    limit = min(max(request.args.get('limit', 50, type=int), 1), Config.MATCH_MAX_LIMIT)
+    min_experience = request.args.get('min_experience', 0.0, type=float)
+    required = {
+        normalize_skill(skill): float(level) for skill, level in (jd.required_skills or {}).items()
+        if isinstance(level, (int, float))
+    }
+    
+    # The whole pool is scored in the in-memory index; the JD's embedding
+    # is cached, so repeat queries for a job don't run the model
+    candidate_matcher.sync()
+    query_vector = None
+    if candidate_matcher.embeddings is not None and Config.MATCH_EMBEDDING_WEIGHT > 0:
+        query_vector = ai_service.embeddings.encode_one(jd.description or jd.title)
+    matches = candidate_matcher.top_k(required, limit, min_experience, query_vector)
+    
+    names = dict(db.session.execute(
+        db.select(Candidate.id, Candidate.name).where(Candidate.id.in_([m["candidate_id"] for m in matches]))
+    ).all()) if matches else {}
+    for match in matches:
+        match["candidate_name"] = names.get(match["candidate_id"])
+        match["skill_gaps"] = ai_service.analyze_skill_gaps(match["skills"], required)
     
     return jsonify({
-        "leaderboard": result,
-        "total": leaderboard.total,
-        "pages": leaderboard.pages,
-        "current_page": page
+        "job_id": jd.id,
+        "required_skills": required,
+        "pool_size": len(candidate_matcher),
+        "matches": matches
     }), 200
 
+@app.route('/api/jobs/<job_id>/skill-gaps', methods=['GET'])
+@jwt_required()
+def get_skill_gaps(job_id):
+    jd = JobDescription.query.get(job_id)
+    if not jd:
+        return jsonify({"error": "Job description not found"}), 404
+    
+    # Recomputed only after another evaluated submission lands (or the
+    # requirements change)
+    version = leaderboard_service.version(jd.id)
+    etag = skill_gaps_etag(jd, version)
+    if request.if_none_match.contains(etag):
+        return not_modified(etag)
+    
+    response = jsonify(cohort_analytics.analyze(jd.id, jd.required_skills, version))
+    response.set_etag(etag)
+    return response
+
+@app.route('/api/jobs/<job_id>/skill-gaps/export', methods=['GET'])
+@jwt_required()
+def export_skill_gaps(job_id):
+    export_format = request.args.get('format', 'csv')
+    if export_format not in ('csv', 'json'):
+        return jsonify({"error": "format must be csv or json"}), 400
+    
+    jd = JobDescription.query.get(job_id)
+    if not jd:
+        return jsonify({"error": "Job description not found"}), 404
+    
+    version = leaderboard_service.version(jd.id)
+    etag = skill_gaps_etag(jd, version)
+    if request.if_none_match.contains(etag):
+        return not_modified(etag)
+    
+    report = cohort_analytics.analyze(jd.id, jd.required_skills, version)
+    if export_format == 'json':
+        body = json.dumps(report)
+    else:
+        rows = [skill_gap_row(entry, report["bands"]) for entry in report["skills"]]
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=list(rows[0]) if rows else ["skill"])
+        writer.writeheader()
+        writer.writerows(rows)
+        body = buffer.getvalue()
+    
+    response = Response(
+        body,
+        mimetype='text/csv' if export_format == 'csv' else 'application/json',
+        headers={"Content-Disposition": f"attachment; filename=skill-gaps-{job_id}.{export_format}"}
+    )
+    response.set_etag(etag)
+    return response
+
 @app.route('/api/candidates/<candidate_id>/report', methods=['GET'])
 def get_candidate_report(candidate_id):
     candidate = Candidate.query.get(candidate_id)
     if not candidate:
         return jsonify({"error": "Candidate not found"}), 404
     
-    assessments = Assessment.query.filter_by(candidate_id=candidate_id).all()
-    
-    # Analyze performance
-    skill_performance = {}
-    for assessment in assessments:
-        if assessment.skill_scores:
-            for skill, score in assessment.skill_scores.items():
-                if skill not in skill_performance:
-                    skill_performance[skill] = []
-                skill_performance[skill].append(score)
+    page = request.args.get('page', 1, type=int)
+    per_page = min(request.args.get('per_page', 20, type=int), 100)
+    if page < 1 or per_page < 1:
+        return jsonify({"error": "page and per_page must be positive"}), 400
     
-    # Calculate averages
-    avg_skill_scores = {}
-    for skill, scores in skill_performance.items():
-        avg_skill_scores[skill] = sum(scores) / len(scores)
+    # Candidates evaluated before profiles were kept are backfilled once
+    if (candidate.profiled_assessments or 0) < (candidate.total_assessments or 0):
+        candidate_profiles.rebuild(candidate.id)
+        db.session.commit()
     
-    # Identify strengths and weaknesses
-    sorted_skills = sorted(avg_skill_scores.items(), key=lambda x: x[1], reverse=True)
-    strengths = [skill for skill, score in sorted_skills[:3] if score >= 70]
-    weaknesses = [skill for skill, score in sorted_skills[-3:] if score < 70]
+    profile = candidate_profiles.profile(candidate.id)
+    history, history_total = candidate_profiles.history(candidate.id, page, per_page)
     
     report = {
         "candidate_id": candidate.id,
@@ -329,60 +729,611 @@ def get_candidate_report(candidate_id):
         "email": candidate.email,
         "total_assessments": candidate.total_assessments,
         "average_score": candidate.avg_score,
-        "skill_performance": avg_skill_scores,
-        "strengths": strengths,
-        "weaknesses": weaknesses,
-        "assessment_history": [
-            {
-                "job_title": assessment.job_description.title,
-                "score": assessment.total_score,
-                "status": "Passed" if assessment.is_passed else "Failed",
-                "date": assessment.completed_at.isoformat() if assessment.completed_at else None
-            }
-            for assessment in assessments
-        ]
+        "skill_performance": {skill: stats["average"] for skill, stats in profile["skills"].items()},
+        "skill_profile": profile["skills"],
+        "strengths": profile["strengths"],
+        "weaknesses": profile["weaknesses"],
+        "assessment_history": history,
+        "history_total": history_total,
+        "history_pages": -(-history_total // per_page),
+        "current_page": page
     }
     
     return jsonify(report), 200
 
-# ============ Utility Functions ============
+# ============ Resume Routes ============
 
-def update_leaderboard(assessment: Assessment):
-    """Update leaderboard for a job role"""
+@app.route('/api/candidates/resume', methods=['POST'])
+@jwt_required()
+def upload_resume():
+    upload = request.files.get('file')
+    if upload is None or not upload.filename:
+        return jsonify({"error": "No file uploaded"}), 400
+    if not allowed_file(upload.filename, Config.ALLOWED_EXTENSIONS):
+        return jsonify({"error": "Unsupported file type"}), 400
     
-    # Get all assessments for this job
-    all_assessments = Assessment.query.filter_by(
-        job_description_id=assessment.job_description_id,
-        status='completed'
-    ).order_by(Assessment.total_score.desc()).all()
+    # Werkzeug spools large multipart files to a temporary file; it is
+    # copied across in chunks and parsed in the background
+    import_id = str(uuid.uuid4())
+    path = resume_ingestor.save_upload(import_id, upload.stream, upload.filename)
+    fields = {key: request.form[key].strip() for key in ('email', 'name') if request.form.get(key)}
+    return queue_resume_import(import_id, 'single', path, fields)
+
+@app.route('/api/candidates/resumes/bulk', methods=['POST'])
+@jwt_required()
+def upload_resume_zip():
+    import_id = str(uuid.uuid4())
+    if request.mimetype == 'multipart/form-data':
+        upload = request.files.get('file')
+        if upload is None or not upload.filename:
+            return jsonify({"error": "No file uploaded"}), 400
+        stream, max_bytes = upload.stream, Config.MAX_CONTENT_LENGTH
+    else:
+        # A raw application/zip body is read straight off the socket, so it
+        # can exceed MAX_CONTENT_LENGTH, up to RESUME_BULK_MAX_BYTES
+        max_bytes = Config.RESUME_BULK_MAX_BYTES
+        stream = get_input_stream(request.environ, max_content_length=max_bytes)
     
-    # Calculate ranks
-    for idx, assmt in enumerate(all_assessments, 1):
-        percentile = (len(all_assessments) - idx) / len(all_assessments) * 100
-        
-        leaderboard = Leaderboard.query.filter_by(
-            job_description_id=assmt.job_description_id,
-            assessment_id=assmt.id
-        ).first()
-        
-        if not leaderboard:
-            leaderboard = Leaderboard(
-                id=str(uuid.uuid4()),
-                job_description_id=assmt.job_description_id,
-                assessment_id=assmt.id,
-                candidate_id=assmt.candidate_id
+    try:
+        path = resume_ingestor.save_upload(import_id, stream, 'upload.zip', max_bytes)
+    except UploadTooLarge as e:
+        return jsonify({"error": str(e)}), 413
+    if not zipfile.is_zipfile(path):
+        os.remove(path)
+        return jsonify({"error": "Expected a zip archive"}), 400
+    
+    return queue_resume_import(import_id, 'bulk', path, None)
+
+@app.route('/api/resume-imports/<import_id>', methods=['GET'])
+@jwt_required()
+def get_resume_import(import_id):
+    resume_import = ResumeImport.query.get(import_id)
+    if not resume_import:
+        return jsonify({"error": "Resume import not found"}), 404
+    
+    return jsonify({
+        "import_id": resume_import.id,
+        "kind": resume_import.kind,
+        "status": resume_import.status,
+        "total_files": resume_import.total_files,
+        "parsed": resume_import.parsed,
+        "failed": resume_import.failed,
+        "errors": resume_import.errors or [],
+        "created_at": resume_import.created_at.isoformat(),
+        "completed_at": resume_import.completed_at.isoformat() if resume_import.completed_at else None
+    }), 200
+
+# ============ Background Jobs ============
+
+@task_queue.task
+def evaluate_submission(assessment_id):
+    """Score a submitted assessment and update candidate stats and leaderboard"""
+    assessment = Assessment.query.get(assessment_id)
+    # Without an answer sheet there is nothing to score; a zero would
+    # overwrite whatever the submission was scored at
+    if not assessment or assessment.status != 'completed' or assessment.submitted_answers is None:
+        return
+    
+    # Scoring and the similarity check only read; everything they produce
+    # is written afterwards in one job
+    try:
+        evaluation_result = evaluation_service.evaluate_assessment(
+            assessment, assessment.submitted_answers
+        )
+    except Exception:
+        db_writer.run(mark_evaluation_failed, assessment.id)
+        raise
+    
+    # Compare against earlier candidates' answers to the same questions
+    similarity, answer_embeddings = None, {}
+    try:
+        similarity, answer_embeddings = similarity_checker.check(assessment)
+    except Exception:
+        app.logger.exception("Similarity check failed for assessment %s", assessment.id)
+    
+    recorded = db_writer.run(record_evaluation, assessment.id, evaluation_result, similarity, answer_embeddings)
+    if recorded is not None:
+        stats_rollup.record_evaluated(*recorded)
+
+@task_queue.periodic(Config.EVALUATION_REQUEUE_INTERVAL)
+def requeue_lost_evaluations():
+    """Queue again the evaluations a restarted worker took with it"""
+    # A worker with its own backlog leaves the sweep to idle ones; a busy
+    # worker's queued evaluations taken over here are no-ops when it gets to them
+    if task_queue.pending():
+        return
+    cutoff = datetime.utcnow() - timedelta(seconds=Config.EVALUATION_REQUEUE_AFTER)
+    for assessment_id in db_writer.run(claim_lost_evaluations, cutoff, Config.EVALUATION_REQUEUE_BATCH):
+        app.logger.warning("Re-queueing evaluation of assessment %s", assessment_id)
+        evaluate_submission.delay(assessment_id)
+
+@task_queue.task
+def regrade_assessments(run_id):
+    """Re-score a job's evaluated assessments, resuming after the run's cursor"""
+    run = RegradeRun.query.get(run_id)
+    if not run or run.status != 'queued':
+        return
+    job_id, forced = run.job_description_id, set(run.question_ids or [])
+    cutoff = JobDescription.query.get(job_id).cutoff_score
+    ids = regrade_engine.pending_ids(job_id, run.cursor)
+    db_writer.run(start_regrade, run_id, len(ids))
+    questions = regrade_engine.questions(job_id)
+    
+    # Each chunk is written in one transaction together with the cursor, so
+    # a run that dies part-way resumes after the last chunk written
+    checkpoint = time.perf_counter()
+    try:
+        for rows in regrade_engine.chunks(ids):
+            updates, rescored, skipped = regrade_engine.regrade(rows, questions, cutoff, forced)
+            score_delta, passed_delta = db_writer.run(
+                save_regrade_chunk, run_id, rows[-1].id, len(rows), updates, rescored, skipped,
+                time.perf_counter() - checkpoint
             )
-            db.session.add(leaderboard)
-        
-        leaderboard.rank = idx
-        leaderboard.score = assmt.total_score
-        leaderboard.percentile = percentile
+            checkpoint = time.perf_counter()
+            if score_delta or passed_delta:
+                stats_rollup.record_regraded(job_id, score_delta, passed_delta)
+        db_writer.run(finish_regrade, run_id, time.perf_counter() - checkpoint)
+    except Exception as e:
+        db_writer.run(fail_regrade, run_id, f"{type(e).__name__}: {e}")
+        raise
+
+@task_queue.task
+def import_resumes(import_id):
+    """Parse an uploaded resume or bulk zip and fill in the candidates"""
+    resume_import = ResumeImport.query.get(import_id)
+    if not resume_import or resume_import.status != 'queued':
+        return
+    kind, source = resume_import.kind, resume_import.source_path
+    single_fields = resume_import.candidate_fields or {}
+    db_writer.run(set_resume_import_status, import_id, 'processing')
+    
+    if kind == 'bulk':
+        files = resume_ingestor.unpack(source, resume_ingestor.import_dir(import_id))
+    else:
+        files = [(os.path.basename(source), source, None, single_fields)]
+    
+    # Files stream through the pool; each batch of results is written while
+    # the workers parse the next
+    rows, failures = [], []
+    
+    def extracted():
+        for name, path, error, fields in files:
+            if error is not None:
+                failures.append({"file": name, "error": error})
+            else:
+                yield path, name, fields
+    
+    try:
+        for (path, name, fields), result in resume_ingestor.parse(extracted()):
+            row = resume_candidate_row(name, fields, result)
+            if "error" in row:
+                failures.append(row)
+            else:
+                rows.append(row)
+            if len(rows) + len(failures) >= Config.RESUME_WRITE_BATCH:
+                embed_resumes(rows)
+                db_writer.run(save_parsed_resumes, import_id, rows, failures)
+                rows, failures = [], []
+        embed_resumes(rows)
+        db_writer.run(save_parsed_resumes, import_id, rows, failures, True)
+    except Exception:
+        db_writer.run(set_resume_import_status, import_id, 'failed')
+        raise
+    finally:
+        if kind == 'bulk' and os.path.exists(source):
+            os.remove(source)
+
+@task_queue.task
+def embed_job_questions(job_id):
+    """Compute and store Question.embedding for a job's questions"""
+    questions = Question.query.filter_by(job_description_id=job_id).all()
+    ai_service.embeddings.question_embeddings(questions)
+    db.session.commit()
+
+@task_queue.task
+def build_assessment_packets(job_id, count):
+    """Pre-build assessment packets for a scheduled drive"""
+    jd = JobDescription.query.get(job_id)
+    if jd:
+        packet_pool.build(jd.id, jd.question_version, count, Config.QUESTIONS_PER_ASSESSMENT)
+
+# ============ Write Jobs ============
+# Run through db_writer.run: on SQLite they execute on the writer thread,
+# grouped into one commit with other callers' jobs. They don't commit and
+# return plain values.
+
+def find_or_create_candidate(fields: dict) -> str:
+    """Id of the candidate with this email, inserted if new"""
+    candidate_id = db.session.execute(
+        db.select(Candidate.id).where(Candidate.email == fields["email"])
+    ).scalar()
+    if candidate_id is None:
+        candidate_id = str(uuid.uuid4())
+        db.session.add(Candidate(id=candidate_id, **fields))
+    return candidate_id
+
+def create_assessment(job_id: str, candidate_fields: dict, question_set: list) -> dict:
+    """Insert an in-progress assessment for the candidate"""
+    assessment = Assessment(
+        id=str(uuid.uuid4()),
+        job_description_id=job_id,
+        candidate_id=find_or_create_candidate(candidate_fields),
+        assessment_code=new_assessment_code(),
+        status='in_progress',
+        start_time=datetime.utcnow(),
+        question_set=question_set
+    )
+    db.session.add(assessment)
+    return {"assessment_id": assessment.id, "start_time": assessment.start_time}
+
+def start_from_packet(job_id: str, question_version: int, candidate_fields: dict):
+    """Claim a pre-built packet and insert its assessment; None if the pool is empty"""
+    packet = packet_pool.claim(job_id, question_version)
+    if packet is None:
+        return None
+    
+    assessment = Assessment(
+        id=packet.assessment_id,
+        job_description_id=job_id,
+        candidate_id=find_or_create_candidate(candidate_fields),
+        assessment_code=packet.assessment_code,
+        status='in_progress',
+        start_time=datetime.utcnow(),
+        question_set=packet.question_set
+    )
+    db.session.add(assessment)
+    return {
+        "assessment_id": assessment.id,
+        "start_time": assessment.start_time,
+        "questions_json": packet.questions_json
+    }
+
+def record_submission(assessment_id: str, answers: list):
+    """Write the final answers and mark the assessment submitted; None if it already was"""
+    assessment = Assessment.query.get(assessment_id)
+    if assessment.status in ('completed', 'evaluated', 'failed'):
+        return None
+    
+    answer_autosave.write(answers)
+    assessment.submitted_answers = persisted_answers(assessment_id)
+    assessment.status = 'completed'
+    assessment.completed_at = datetime.utcnow()
+    assessment.evaluation_queued_at = assessment.completed_at
+    return submission_status(assessment)
+
+def record_evaluation(assessment_id: str, evaluation_result: dict, similarity, answer_embeddings: dict = None):
+    """Store an evaluation and update candidate stats and leaderboard; None if already recorded"""
+    assessment = Assessment.query.get(assessment_id)
+    if assessment.status != 'completed':
+        return None
+    
+    # Update assessment
+    assessment.status = 'evaluated'
+    assessment.evaluated_at = datetime.utcnow()
+    assessment.total_score = evaluation_result['total_score']
+    assessment.section_scores = evaluation_result['section_scores']
+    assessment.skill_scores = evaluation_result['skill_scores']
+    assessment.answer_scores = evaluation_result.get('answer_scores')
+    assessment.is_passed = evaluation_result['total_score'] >= assessment.job_description.cutoff_score
+    assessment.plagiarism_score = evaluation_result.get('plagiarism_score', 0)
+    if similarity is not None:
+        assessment.similarity_with_others = similarity
+    if answer_embeddings:
+        # Later similarity checks index these instead of re-embedding the answers
+        answers = CandidateAnswer.__table__
+        db.session.execute(
+            answers.update()
+            .where(answers.c.assessment_id == assessment_id, answers.c.question_id == db.bindparam('question'))
+            .values(embedding=db.bindparam('blob')),
+            [{"question": question_id, "blob": blob} for question_id, blob in answer_embeddings.items()]
+        )
+    
+    # Update candidate stats
+    candidate = Candidate.query.get(assessment.candidate_id)
+    candidate.total_assessments += 1
+    candidate.avg_score = (candidate.avg_score * (candidate.total_assessments - 1) + 
+                          evaluation_result['total_score']) / candidate.total_assessments
+    candidate_profiles.record(assessment)
+    candidate.skills_updated_at = datetime.utcnow()
+    
+    # Update leaderboard
+    update_leaderboard(assessment)
+    
+    return assessment.job_description_id, assessment.total_score, assessment.is_passed
+
+def start_regrade(run_id: str, remaining: int):
+    run = RegradeRun.query.get(run_id)
+    run.status = 'running'
+    run.started_at = run.started_at or datetime.utcnow()
+    run.total = run.processed + remaining
+
+def save_regrade_chunk(run_id: str, cursor: str, processed: int, updates: list,
+                       rescored: int, skipped: int, seconds: float):
+    """Bulk-write a chunk's new scores and advance the run; returns the (score, passed) deltas"""
+    now = datetime.utcnow()
+    run = RegradeRun.query.get(run_id)
+    changed = [u for u in updates if u["changed"]]
+    assessments = Assessment.__table__
+    if changed:
+        # evaluated_at moves so every worker's cohort catch-up rereads them
+        db.session.execute(
+            assessments.update().where(assessments.c.id == db.bindparam('p_id')).values(
+                total_score=db.bindparam('p_total'), section_scores=db.bindparam('p_sections'),
+                skill_scores=db.bindparam('p_skills'), is_passed=db.bindparam('p_passed'),
+                answer_scores=db.bindparam('p_answers'), evaluated_at=now
+            ),
+            [{"p_id": u["id"], "p_total": u["total_score"], "p_sections": u["section_scores"],
+              "p_skills": u["skill_scores"], "p_passed": u["is_passed"], "p_answers": u["answer_scores"]}
+             for u in changed]
+        )
+        # Ranks are derived from these at read time. The version moves in
+        # this chunk's transaction, so ETags, cached totals and the cohort
+        # cache never outlive scores already rewritten, even if the run
+        # fails or is killed before the next chunk
+        leaderboard_service.bump(run.job_description_id)
+        leaderboards = Leaderboard.__table__
+        db.session.execute(
+            leaderboards.update().where(leaderboards.c.assessment_id == db.bindparam('p_id'))
+            .values(score=db.bindparam('p_score'), updated_at=now),
+            [{"p_id": u["id"], "p_score": u["total_score"]} for u in changed]
+        )
         
-        # Calculate time efficiency if time_taken is available
-        if assmt.time_taken and len(assmt.question_set) > 0:
-            leaderboard.time_efficiency = len(assmt.question_set) / (assmt.time_taken / 60)
+        candidate_ids = sorted({u["candidate_id"] for u in changed})
+        candidate_profiles.rebuild_many(candidate_ids)
+        candidates = Candidate.__table__
+        average = db.select(db.func.coalesce(db.func.avg(assessments.c.total_score), 0.0)).where(
+            assessments.c.candidate_id == candidates.c.id, assessments.c.status == 'evaluated'
+        ).scalar_subquery()
+        db.session.execute(
+            candidates.update().where(candidates.c.id.in_(candidate_ids))
+            .values(avg_score=average, skills_updated_at=now)
+        )
+    
+    refreshed = [u for u in updates if not u["changed"]]
+    if refreshed:
+        # Same scores, answers now stamped with current grading versions
+        db.session.execute(
+            assessments.update().where(assessments.c.id == db.bindparam('p_id'))
+            .values(answer_scores=db.bindparam('p_answers')),
+            [{"p_id": u["id"], "p_answers": u["answer_scores"]} for u in refreshed]
+        )
+    
+    run.cursor = cursor
+    run.processed += processed
+    run.regraded += len(changed)
+    run.rescored_answers += rescored
+    run.skipped += skipped
+    run.seconds += seconds
+    return sum(u["score_delta"] for u in changed), sum(u["passed_delta"] for u in changed)
+
+def finish_regrade(run_id: str, seconds: float):
+    run = RegradeRun.query.get(run_id)
+    run.status = 'completed'
+    run.seconds += seconds
+    run.completed_at = datetime.utcnow()
+
+def fail_regrade(run_id: str, error: str):
+    run = RegradeRun.query.get(run_id)
+    if run.regraded:
+        # The chunks written before the failure stand: never let a cache
+        # keyed on the version from before the run serve again
+        leaderboard_service.bump(run.job_description_id)
+    run.status = 'failed'
+    run.error = error[:2000]
+
+def save_parsed_resumes(import_id: str, rows: list, failures: list, finished: bool = False):
+    """Upsert parsed candidates by email and advance the import's counters"""
+    by_email = {row["email"]: row for row in rows}  # the last resume for an email wins
+    now = datetime.utcnow()
+    existing = {
+        candidate.email: candidate
+        for candidate in Candidate.query.filter(Candidate.email.in_(list(by_email))).all()
+    } if by_email else {}
+    for email, row in by_email.items():
+        candidate = existing.get(email)
+        if candidate is None:
+            db.session.add(Candidate(id=str(uuid.uuid4()), skills_updated_at=now, **row))
+            continue
+        for key, value in row.items():
+            if key != 'name' or not candidate.name:
+                setattr(candidate, key, value)
+        candidate.skills_updated_at = now
+    
+    resume_import = ResumeImport.query.get(import_id)
+    resume_import.total_files += len(rows) + len(failures)
+    resume_import.parsed += len(rows)
+    resume_import.failed += len(failures)
+    if failures and len(resume_import.errors or []) < Config.RESUME_MAX_ERRORS:
+        resume_import.errors = ((resume_import.errors or []) + failures)[:Config.RESUME_MAX_ERRORS]
+    if finished:
+        resume_import.status = 'completed'
+        resume_import.completed_at = datetime.utcnow()
+
+def set_resume_import_status(import_id: str, status: str):
+    resume_import = ResumeImport.query.get(import_id)
+    resume_import.status = status
+    if status == 'failed':
+        resume_import.completed_at = datetime.utcnow()
+
+def mark_evaluation_failed(assessment_id: str):
+    assessment = Assessment.query.get(assessment_id)
+    if assessment.status == 'completed':
+        assessment.status = 'failed'
+
+def claim_lost_evaluations(cutoff: datetime, limit: int) -> list:
+    """Ids of submissions queued before cutoff and still unevaluated, re-stamped as queued now"""
+    assessments = Assessment.__table__
+    ids = db.session.execute(
+        db.select(assessments.c.id)
+        .where(assessments.c.status == 'completed', assessments.c.evaluation_queued_at < cutoff,
+               assessments.c.submitted_answers.isnot(None))
+        .order_by(assessments.c.evaluation_queued_at).limit(limit)
+    ).scalars().all()
+    claimed = []
+    now = datetime.utcnow()
+    for assessment_id in ids:
+        # Conditional, so of two workers sweeping at once only one claims each
+        result = db.session.execute(
+            assessments.update()
+            .where(assessments.c.id == assessment_id, assessments.c.status == 'completed',
+                   assessments.c.evaluation_queued_at < cutoff)
+            .values(evaluation_queued_at=now)
+        )
+        if result.rowcount:
+            claimed.append(assessment_id)
+    return claimed
+
+def requeue_evaluation(assessment_id: str):
+    """Mark a failed or waiting submission queued again; None if it was evaluated meanwhile"""
+    assessment = Assessment.query.get(assessment_id)
+    if assessment.status not in ('completed', 'failed'):
+        return None
+    assessment.status = 'completed'
+    assessment.evaluation_queued_at = datetime.utcnow()
+    return submission_status(assessment)
+
+# ============ Utility Functions ============
+
+def submission_status(assessment: Assessment) -> dict:
+    """Polling payload for a submitted assessment"""
+    status = {
+        "assessment_id": assessment.id,
+        "status": assessment.status,
+        "completed_at": assessment.completed_at.isoformat() if assessment.completed_at else None,
+        "evaluated_at": assessment.evaluated_at.isoformat() if assessment.evaluated_at else None,
+        "results_url": f"/api/assessments/{assessment.id}/results"
+    }
+    
+    if assessment.status == 'evaluated':
+        status["total_score"] = assessment.total_score
+        status["is_passed"] = assessment.is_passed
+        status["cutoff_score"] = assessment.job_description.cutoff_score
     
+    return status
+
+def packet_start_response(started: dict, jd: JobDescription) -> Response:
+    """Start response around a packet's pre-serialized question list"""
+    body = '{"assessment_id": %s, "duration": %s, "questions": %s, "start_time": %s}' % (
+        json.dumps(started["assessment_id"]),
+        json.dumps(jd.assessment_duration),
+        started["questions_json"],
+        json.dumps(started["start_time"].isoformat())
+    )
+    return Response(body, status=200, mimetype='application/json')
+
+def queue_resume_import(import_id: str, kind: str, path: str, fields) -> Response:
+    db.session.add(ResumeImport(
+        id=import_id, kind=kind, source_path=path, candidate_fields=fields, created_by=get_jwt_identity()
+    ))
     db.session.commit()
+    import_resumes.delay(import_id)
+    return jsonify({"import_id": import_id, "status": "queued"}), 202
+
+def embed_resumes(rows: list):
+    """Attach resume_embedding to parsed rows; matching falls back to skills alone without it"""
+    if not rows or not Config.MATCH_RESUME_EMBEDDINGS:
+        return
+    try:
+        # The model reads about the first 256 tokens; don't tokenize the rest
+        vectors = ai_service.embeddings.encode([row["resume_text"][:2000] for row in rows], cache=False)
+    except Exception:
+        app.logger.exception("Resume embedding failed")
+        return
+    for row, vector in zip(rows, vectors):
+        row["resume_embedding"] = to_bytes(vector, ai_service.embeddings.storage_dtype)
+
+def resume_candidate_row(name: str, fields: dict, parsed: dict) -> dict:
+    """Candidate columns from a parsed resume, or {"file", "error"}"""
+    if "error" in parsed:
+        return {"file": name, "error": parsed["error"]}
+    email = fields.get('email') or parsed["email"]
+    if not email:
+        return {"file": name, "error": "No email address found"}
+    
+    return {
+        "email": email,
+        "name": (fields.get('name') or parsed["headline"] or os.path.splitext(name)[0])[:100],
+        "resume_text": parsed["text"],
+        "claimed_skills": list(parsed["skills"]),
+        "experience_years": parsed["experience_years"],
+        "parsed_resume_data": {
+            "skills": parsed["skills"],
+            "experience_years": parsed["experience_years"],
+            "phone": parsed["phone"],
+            "file": name
+        }
+    }
+
+def leaderboard_row(row: dict) -> dict:
+    entry = row["entry"]
+    return {
+        "rank": row["rank"],
+        "candidate_name": entry.candidate_name,
+        "score": entry.score,
+        "percentile": row["percentile"],
+        "time_efficiency": entry.time_efficiency,
+        "accuracy_rate": entry.accuracy_rate
+    }
+
+def leaderboard_etag(job_id: str, version) -> str:
+    """Validator for a leaderboard response: the job's leaderboard version and the query"""
+    return hashlib.sha1(f"{job_id}:{version}:{request.query_string.decode()}".encode()).hexdigest()
+
+def not_modified(etag: str) -> Response:
+    response = Response(status=304)
+    response.set_etag(etag)
+    return response
+
+def skill_gaps_etag(jd: JobDescription, version: int) -> str:
+    requirements = json.dumps(jd.required_skills, sort_keys=True)
+    return leaderboard_etag(jd.id, f"{version}:{requirements}")
+
+def skill_gap_row(entry: dict, bands: list) -> dict:
+    """One skill of a cohort report, flattened for CSV"""
+    gap = entry.get("gap", {})
+    row = {
+        "skill": entry["skill"],
+        "required": entry["required"],
+        "assessed": entry["assessed"],
+        "mean": entry["mean"],
+        "std": entry["std"],
+        **entry["percentiles"],
+        "pass_rate": entry["pass_rate"],
+        "pass_rate_meeting_requirement": entry.get("pass_rate_meeting_requirement"),
+        "pass_rate_below_requirement": entry.get("pass_rate_below_requirement"),
+        "gap_mean": gap.get("mean"),
+        "gap_significant_share": gap.get("significant_share"),
+        "gap_high_share": gap.get("high_share"),
+        "gap_histogram": " ".join(map(str, gap.get("histogram", [])))
+    }
+    for band in bands:
+        row[f"mean_{band['band']}"] = band["skill_means"].get(entry["skill"])
+    return row
+
+def regrade_status(run: RegradeRun) -> dict:
+    return {
+        "regrade_id": run.id,
+        "job_id": run.job_description_id,
+        "status": run.status,
+        "question_ids": run.question_ids or [],
+        "total": run.total,
+        "processed": run.processed,
+        "regraded": run.regraded,
+        "rescored_answers": run.rescored_answers,
+        "skipped": run.skipped,
+        "seconds": round(run.seconds, 2),
+        "assessments_per_second": round(run.processed / run.seconds, 1) if run.seconds else None,
+        "error": run.error,
+        "created_at": run.created_at.isoformat() if run.created_at else None,
+        "completed_at": run.completed_at.isoformat() if run.completed_at else None
+    }
+
+def update_leaderboard(assessment: Assessment):
+    """Update leaderboard for a job role"""
+    
+    # Only this assessment's entry changes; ranks are derived at read time.
+    # Committed with the caller's transaction.
+    leaderboard_service.record(assessment)
 
 # ============ Admin Routes ============
 
@@ -395,31 +1346,115 @@ def admin_dashboard():
     if user.role != 'admin':
         return jsonify({"error": "Unauthorized"}), 403
     
-    # Get statistics
-    total_candidates = Candidate.query.count()
-    total_assessments = Assessment.query.count()
-    total_jobs = JobDescription.query.count()
-    
-    # Recent activity
-    recent_assessments = Assessment.query.order_by(
-        Assessment.created_at.desc()
-    ).limit(10).all()
-    
-    recent_activity = []
-    for assessment in recent_assessments:
-        recent_activity.append({
-            "candidate": assessment.candidate.name,
-            "job_title": assessment.job_description.title,
-            "score": assessment.total_score,
-            "status": assessment.status,
-            "time": assessment.created_at.isoformat()
-        })
+    # Served from the job_stats rollup, cached for DASHBOARD_CACHE_TTL
+    return jsonify(stats_rollup.dashboard()), 200
+
+@app.route('/api/admin/stats/rebuild', methods=['POST'])
+@jwt_required()
+def rebuild_stats():
+    user_id = get_jwt_identity()
+    user = User.query.get(user_id)
+    
+    if user.role != 'admin':
+        return jsonify({"error": "Unauthorized"}), 403
+    
+    stats_rollup.rebuild()
+    return jsonify(stats_rollup.dashboard()), 200
+
+@app.route('/api/jobs/<job_id>/regrade', methods=['POST'])
+@jwt_required()
+def regrade_job(job_id):
+    user_id = get_jwt_identity()
+    user = User.query.get(user_id)
+    
+    if user.role != 'admin':
+        return jsonify({"error": "Unauthorized"}), 403
+    
+    jd = JobDescription.query.get(job_id)
+    if not jd:
+        return jsonify({"error": "Job not found"}), 404
+    
+    # Answers to questions whose grading_version moved are rescored anyway;
+    # question_ids forces others, e.g. after a scoring code fix
+    data = request.get_json(silent=True) or {}
+    question_ids = data.get('question_ids') or []
+    if not isinstance(question_ids, list) or not all(isinstance(q, str) for q in question_ids):
+        return jsonify({"error": "question_ids must be a list of question ids"}), 400
+    
+    active = RegradeRun.query.filter(
+        RegradeRun.job_description_id == job_id, RegradeRun.status.in_(('queued', 'running'))
+    ).first()
+    if active:
+        return jsonify({"error": "A re-grade of this job is already in progress", "regrade_id": active.id}), 409
+    
+    run = RegradeRun(id=str(uuid.uuid4()), job_description_id=job_id, question_ids=question_ids, created_by=user_id)
+    db.session.add(run)
+    db.session.commit()
+    regrade_assessments.delay(run.id)
+    
+    return jsonify(regrade_status(run)), 202
+
+@app.route('/api/regrades/<run_id>', methods=['GET'])
+@jwt_required()
+def get_regrade(run_id):
+    user = User.query.get(get_jwt_identity())
+    if user.role != 'admin':
+        return jsonify({"error": "Unauthorized"}), 403
+    
+    run = RegradeRun.query.get(run_id)
+    if not run:
+        return jsonify({"error": "Re-grade not found"}), 404
+    
+    return jsonify(regrade_status(run)), 200
+
+@app.route('/api/regrades/<run_id>/resume', methods=['POST'])
+@jwt_required()
+def resume_regrade(run_id):
+    user = User.query.get(get_jwt_identity())
+    if user.role != 'admin':
+        return jsonify({"error": "Unauthorized"}), 403
+    
+    run = RegradeRun.query.get(run_id)
+    if not run:
+        return jsonify({"error": "Re-grade not found"}), 404
+    # A failed run, or one left 'running' by a worker that died, carries on
+    # after its cursor
+    if run.status not in ('failed', 'running'):
+        return jsonify({"error": f"Re-grade is {run.status}"}), 409
+    
+    run.status = 'queued'
+    run.error = None
+    db.session.commit()
+    regrade_assessments.delay(run.id)
+    
+    return jsonify(regrade_status(run)), 202
+
+@app.route('/api/admin/metrics', methods=['GET'])
+@jwt_required()
+def admin_metrics():
+    user_id = get_jwt_identity()
+    user = User.query.get(user_id)
+    
+    if user.role != 'admin':
+        return jsonify({"error": "Unauthorized"}), 403
     
     return jsonify({
-        "total_candidates": total_candidates,
-        "total_assessments": total_assessments,
-        "total_jobs": total_jobs,
-        "recent_activity": recent_activity
+        "jd_parse_cache": jd_parse_cache.stats(),
+        "embeddings": ai_service.embeddings.stats(),
+        "subjective_scoring": evaluation_service.subjective_scorer.stats(),
+        "verdict_cache": evaluation_service.verdict_cache.stats(),
+        "question_selection": question_selector.stats(),
+        "question_catalog": question_catalog.stats(),
+        "packet_pool": packet_pool.stats(),
+        "answer_autosave": answer_autosave.stats(),
+        "activity": activity_monitor.stats(),
+        "stats_rollup": stats_rollup.stats(),
+        "sqlite_writer": db_writer.stats(),
+        "resume_ingestion": resume_ingestor.stats(),
+        "candidate_matching": candidate_matcher.stats(),
+        "cohort_analytics": cohort_analytics.stats(),
+        "answer_similarity": similarity_checker.stats(),
+        "regrades": regrade_engine.stats()
     }), 200
 
 # ============ Error Handlers ============
@@ -0,0 +1,127 @@
+"""Proctoring event ingestion: throughput, log size and detection quality.
+
+Seeds in-progress assessments in a throwaway SQLite database and
+generates a synthetic event stream for each: answer timings drawn around
+a per-question typical time, occasional tab switches and small pastes.
+A share of assessments also cheat in one way: a burst of tab switches,
+repeated large pastes, or answers far quicker than anyone else's.
+
+Threads post each assessment's events in batches through
+ActivityMonitor.lookup and ingest, each batch received as of its latest
+event, while the background flusher evaluates and logs them. Reports events/s including the final flush, bytes per logged
+event, and how many cheaters were flagged against false alarms.
+
+    python benchmarks/bench_activity.py [assessments] [threads] [batch]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from models import db, Assessment, ActivityLogChunk
+from activity_monitor import ActivityMonitor
+
+QUESTION_BANK = 200
+PER_ASSESSMENT = 10
+CHEAT_SHARE = 0.1
+
+
+def synthetic_stream(rng, question_set, typical, cheat):
+    """Time-ordered events for one assessment"""
+    at = time.time() * 1000 - 3600 * 1000
+    events = []
+    for question_id in question_set:
+        seconds = rng.lognormvariate(typical[question_id], 0.4)
+        if cheat == 'fast':
+            seconds = rng.uniform(1, 4)
+        if rng.random() < 0.15:
+            events.append({'type': 'tab_switch', 'ts': at + rng.uniform(0, seconds * 1000)})
+        if rng.random() < 0.2:
+            events.append({'type': 'paste', 'length': rng.randint(5, 60), 'question_id': question_id,
+                           'ts': at + rng.uniform(0, seconds * 1000)})
+        if cheat == 'paste':
+            events.append({'type': 'paste', 'length': rng.randint(300, 2000), 'question_id': question_id,
+                           'ts': at + 500})
+        at += seconds * 1000
+        events.append({'type': 'answer', 'question_id': question_id, 'duration': seconds, 'ts': at})
+        if rng.random() < 0.3:
+            events.append({'type': 'focus_loss', 'duration': rng.uniform(1, 20), 'ts': at + 60000})
+        at += 120000
+    if cheat == 'burst':
+        events.extend({'type': 'tab_switch', 'ts': at + k * 2000} for k in range(8))
+    return events
+
+
+def seed(rng, n):
+    bank = [str(uuid.uuid4()) for _ in range(QUESTION_BANK)]
+    typical = {question_id: rng.uniform(3.5, 5.0) for question_id in bank}
+    assessments, streams, cheaters = [], {}, set()
+    for _ in range(n):
+        assessment_id = str(uuid.uuid4())
+        question_set = rng.sample(bank, PER_ASSESSMENT)
+        cheat = rng.choice(['burst', 'paste', 'fast']) if rng.random() < CHEAT_SHARE else None
+        if cheat:
+            cheaters.add(assessment_id)
+        assessments.append(dict(id=assessment_id, status='in_progress', question_set=question_set,
+                                start_time=datetime.utcnow() - timedelta(hours=1, seconds=1)))
+        streams[assessment_id] = synthetic_stream(rng, question_set, typical, cheat)
+    db.session.bulk_insert_mappings(Assessment, assessments)
+    db.session.commit()
+    return streams, cheaters
+
+
+if __name__ == '__main__':
+    num_assessments = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    batch = int(sys.argv[3]) if len(sys.argv) > 3 else 25
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        db.init_app(app)
+        with app.app_context():
+            db.create_all()
+            streams, cheaters = seed(random.Random(3), num_assessments)
+        total = sum(len(events) for events in streams.values())
+
+        monitor = ActivityMonitor(app=app)
+        # Interleave assessments the way concurrent candidates would
+        requests = [(assessment_id, events[i:i + batch])
+                    for assessment_id, events in streams.items() for i in range(0, len(events), batch)]
+        requests.sort(key=lambda request: request[1][0]['ts'])
+
+        def worker(chunk):
+            with app.app_context():
+                for assessment_id, events in chunk:
+                    monitor.ingest(assessment_id, monitor.lookup(assessment_id), events,
+                                   received_ms=max(event['ts'] for event in events))
+                db.session.remove()
+
+        begin = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(worker, [requests[i::threads] for i in range(threads)]))
+        accepted = time.perf_counter() - begin
+        with app.app_context():
+            monitor.flush()
+            flagged = set(db.session.execute(
+                db.select(Assessment.id).where(Assessment.anomaly_detected.is_(True))
+            ).scalars())
+            logged = db.session.query(db.func.sum(ActivityLogChunk.event_count)).scalar()
+        elapsed = time.perf_counter() - begin
+
+        stats = monitor.stats()
+        print(f"{total} events from {num_assessments} assessments in {len(requests)} requests, {threads} threads")
+        print(f"ingest {total / accepted:10.0f} events/s   end to end {total / elapsed:10.0f} events/s   "
+              f"({stats['flushes']} flushes)")
+        print(f"log: {logged} events in {stats['chunks_written']} chunks, "
+              f"{stats['bytes_written'] / max(logged, 1):.1f} bytes/event")
+        caught = len(flagged & cheaters)
+        print(f"flagged {len(flagged)}: {caught} of {len(cheaters)} cheaters, "
+              f"{len(flagged - cheaters)} of {num_assessments - len(cheaters)} honest")
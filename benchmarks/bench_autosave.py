@@ -0,0 +1,110 @@
+"""Answer autosave throughput: a commit per save vs the write-behind buffer.
+
+Seeds in-progress assessments in a throwaway SQLite database, then many
+threads fire per-question autosaves at random (assessment, question)
+pairs, the way a live drive's editors do. The baseline upserts and
+commits each save in its own transaction; AnswerAutosaveBuffer buffers
+them and group-commits every flush interval. Reports saves/s including
+the final flush, transactions, and rows written.
+
+    python benchmarks/bench_autosave.py [assessments] [saves] [threads]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy.exc import IntegrityError
+from models import db, Assessment, CandidateAnswer
+from answer_autosave import AnswerAutosaveBuffer
+
+QUESTIONS = 10
+
+
+def seed(n):
+    assessments = [dict(id=str(uuid.uuid4()), candidate_id=str(uuid.uuid4()), status='in_progress',
+                        question_set=[f'q{i}' for i in range(QUESTIONS)]) for _ in range(n)]
+    db.session.bulk_insert_mappings(Assessment, assessments)
+    db.session.commit()
+    return [(a['id'], a['candidate_id']) for a in assessments]
+
+
+def save_per_commit(assessment_id, candidate_id, answer):
+    try:
+        upsert_and_commit(assessment_id, candidate_id, answer)
+    except IntegrityError:
+        # Two threads inserted the same question's first save
+        db.session.rollback()
+        upsert_and_commit(assessment_id, candidate_id, answer)
+
+
+def upsert_and_commit(assessment_id, candidate_id, answer):
+    row = CandidateAnswer.query.filter_by(assessment_id=assessment_id, question_id=answer['question_id']).first()
+    if row is None:
+        row = CandidateAnswer(id=str(uuid.uuid4()), assessment_id=assessment_id, candidate_id=candidate_id,
+                              question_id=answer['question_id'])
+        db.session.add(row)
+    row.answer = answer['answer']
+    row.time_spent = answer['time_spent']
+    row.updated_at = datetime.utcnow()
+    db.session.commit()
+
+
+def drive(app, save_fn, assessments, saves, threads):
+    rng = random.Random(7)
+    plan = [(rng.choice(assessments), f'q{rng.randrange(QUESTIONS)}', i) for i in range(saves)]
+    chunks = [plan[i::threads] for i in range(threads)]
+
+    def worker(chunk):
+        with app.app_context():
+            for (assessment_id, candidate_id), question_id, i in chunk:
+                save_fn(assessment_id, candidate_id,
+                        {'question_id': question_id, 'answer': f'draft {i} ' * 20, 'time_spent': i})
+            db.session.remove()
+
+    begin = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(worker, chunks))
+    return time.perf_counter() - begin
+
+
+if __name__ == '__main__':
+    num_assessments = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    saves = int(sys.argv[2]) if len(sys.argv) > 2 else 50000
+    threads = int(sys.argv[3]) if len(sys.argv) > 3 else 16
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        db.init_app(app)
+        with app.app_context():
+            db.create_all()
+            baseline_set = seed(num_assessments)
+            buffered_set = seed(num_assessments)
+
+        sample = min(saves, 5000)
+        elapsed = drive(app, save_per_commit, baseline_set, sample, threads)
+        print(f"{'commit per save':<16} {sample / elapsed:9.1f} saves/s  {sample} transactions  ({sample} saves)")
+
+        buffer = AnswerAutosaveBuffer(flush_interval=0.5, app=app)
+        elapsed = drive(app, lambda a, c, answer: buffer.put(a, c, [answer]), buffered_set, saves, threads)
+        accepted = saves / elapsed
+        begin = time.perf_counter()
+        with app.app_context():
+            buffer.flush()
+            rows = CandidateAnswer.query.filter(
+                CandidateAnswer.assessment_id.in_([a for a, _ in buffered_set])
+            ).count()
+        elapsed += time.perf_counter() - begin
+        stats = buffer.stats()
+        print(f"{'write-behind':<16} {saves / elapsed:9.1f} saves/s  {stats['flushes']} transactions  "
+              f"({saves} saves, {accepted:.0f}/s accepted)")
+        print(f"rows written {stats['rows_written']} (coalesced {stats['coalesced']}), "
+              f"{rows} answer rows persisted")
@@ -0,0 +1,162 @@
+"""Top-k candidate matching for a job description over a large pool.
+
+Fills a CandidateMatchIndex with synthetic candidates (3-10 of 60 skills
+each, a mix of resume-claimed and assessed proficiencies, a 384-d resume
+embedding) and times:
+
+  loop       what the endpoint would otherwise do: analyze_skill_gaps
+             against every candidate's skill dict, then sort. Timed on
+             the first 100k candidates and scaled to the pool (the DB
+             reads it also needs are left out)
+  index      CandidateMatchIndex.top_k, skills only
+  rerank     top_k with the JD embedding: the best MATCH_SHORTLIST skill
+             fits re-ranked by resume similarity
+
+over random JDs of 4-8 required skills, plus a single-candidate update
+(what sync does for each changed row) and a full load() of a smaller
+pool from SQLite. The index's top-k skill fits are checked against an
+exact float computation on the same quantized values.
+
+    python benchmarks/bench_candidate_matching.py [candidates] [db_candidates]
+"""
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from flask import Flask
+from ai_service import AIService
+from candidate_matching import CandidateMatchIndex
+from embedding_service import to_bytes
+from models import db
+
+SKILLS = [f'skill{i}' for i in range(60)]
+DIM = 384
+CHUNK = 50000
+QUERIES = 50
+K = 50
+
+
+def synthetic(rng, start, count, with_embeddings=True):
+    """(records, skill dicts) for candidates start..start+count"""
+    counts = rng.integers(3, 11, size=count)
+    popularity = 1 / np.arange(1, len(SKILLS) + 1)
+    popularity /= popularity.sum()
+    vectors = rng.standard_normal((count, DIM)).astype(np.float16) if with_embeddings else None
+    records, dicts = [], []
+    for i in range(count):
+        chosen = rng.choice(len(SKILLS), size=counts[i], replace=False, p=popularity)
+        # a third of the skills assessed (0..1), the rest claimed at 0.6
+        levels = np.where(rng.random(counts[i]) < 1 / 3, rng.random(counts[i]), 0.6)
+        skills = {SKILLS[s]: float(v) for s, v in zip(chosen, levels)}
+        records.append((f'c{start + i}', skills, float(rng.integers(0, 20)),
+                        vectors[i] if vectors is not None else None))
+        dicts.append(skills)
+    return records, dicts
+
+
+def random_jd(rng):
+    chosen = rng.choice(len(SKILLS), size=int(rng.integers(4, 9)), replace=False)
+    return {SKILLS[s]: round(float(rng.uniform(0.4, 1.0)), 2) for s in chosen}
+
+
+def timed(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - begin) * 1000)
+    return timings
+
+
+def check_exact(index, required):
+    """The index's skill fits against float math on the stored uint8 levels"""
+    n = len(index)
+    levels = {s: round(v * 255) for s, v in required.items()}
+    covered = np.zeros(n, dtype=np.float64)
+    for skill, level in levels.items():
+        covered += np.minimum(index.columns[skill][:n].astype(np.float64), level)
+    fits = np.sort(covered / sum(levels.values()))[::-1][:K]
+    got = np.array([m["skill_fit"] for m in index.top_k(required, K)]) / 100
+    return np.allclose(got, fits, atol=1e-3)
+
+
+def db_load(n):
+    """Seconds for CandidateMatchIndex.load() over n candidate rows in SQLite"""
+    rng = np.random.default_rng(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        db.init_app(app)
+        with app.app_context():
+            db.create_all()
+            raw = db.engine.raw_connection()
+            for start in range(0, n, CHUNK):
+                records, _ = synthetic(rng, start, min(CHUNK, n - start))
+                raw.cursor().executemany(
+                    'INSERT INTO candidates (id, email, name, claimed_skills, experience_years, resume_embedding, '
+                    'total_assessments, avg_score, profiled_assessments) VALUES (?, ?, ?, ?, ?, ?, 0, 0, 0)',
+                    [(str(uuid.uuid4()), f'{cid}@example.com', cid, json.dumps(sorted(skills)), years,
+                      to_bytes(vector)) for cid, skills, years, vector in records]
+                )
+            raw.commit()
+            raw.close()
+            index = CandidateMatchIndex()
+            begin = time.perf_counter()
+            index.load()
+            return time.perf_counter() - begin, index.stats()
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    db_n = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    rng = np.random.default_rng(22)
+
+    index = CandidateMatchIndex()
+    index.reserve(n)
+    loop_dicts = []
+    begin = time.perf_counter()
+    for start in range(0, n, CHUNK):
+        records, dicts = synthetic(rng, start, min(CHUNK, n - start))
+        index.add(records)
+        if len(loop_dicts) < 100000:
+            loop_dicts.extend(dicts[:100000 - len(loop_dicts)])
+    print(f"built {n} candidates in {time.perf_counter() - begin:.1f}s: {index.stats()}")
+
+    jds = [random_jd(rng) for _ in range(QUERIES)]
+    vectors = rng.standard_normal((QUERIES, DIM)).astype(np.float32)
+
+    service = AIService.__new__(AIService)
+    sample = jds[:3]
+    begin = time.perf_counter()
+    for required in sample:
+        scored = []
+        for i, skills in enumerate(loop_dicts):
+            gaps = service.analyze_skill_gaps(skills, required)
+            shortfall = sum(max(0, v - skills.get(s, 0)) for s, v in required.items())
+            scored.append((1 - shortfall / sum(required.values()), i, gaps))
+        scored.sort(key=lambda item: -item[0])
+    loop_ms = (time.perf_counter() - begin) * 1000 / len(sample) * n / len(loop_dicts)
+
+    index_ms = [t for i, jd in enumerate(jds) for t in timed(lambda: index.top_k(jd, K), 1)]
+    rerank_ms = [t for i, jd in enumerate(jds) for t in timed(lambda: index.top_k(jd, K, query_vector=vectors[i]), 1)]
+    update_ms = timed(lambda: index.add(synthetic(rng, int(rng.integers(0, n)), 1)[0]), 200)
+    exact = all(check_exact(index, jd) for jd in jds[:10])
+
+    print(f"\n{'top-' + str(K) + ' over ' + str(n):<24} {'p50 ms':>9} {'p99 ms':>9}")
+    print(f"{'loop (scaled)':<24} {loop_ms:>9.0f} {'':>9}")
+    for label, timings in (('index', index_ms), ('index + rerank', rerank_ms), ('update one candidate', update_ms)):
+        timings = sorted(timings)
+        print(f"{label:<24} {statistics.median(timings):>9.2f} {timings[int(0.99 * (len(timings) - 1))]:>9.2f}")
+    print(f"skill fits match exact computation: {exact}")
+
+    if db_n:
+        seconds, stats = db_load(db_n)
+        print(f"\nload() of {db_n} candidates from SQLite: {seconds:.1f}s ({db_n / seconds:.0f}/s), "
+              f"{stats['memory_mb']} MiB")
@@ -0,0 +1,113 @@
+"""Candidate report cost as a candidate's history grows.
+
+Imports app.py against a throwaway SQLite database and seeds one
+candidate per history length with evaluated assessments across several
+jobs. For each, times and counts the SELECTs (QueryCounter) of:
+
+  legacy    what get_candidate_report did before: load every assessment,
+            average skill_scores in Python, lazy-load each job title
+  report    GET /api/candidates/<id>/report, served from the skill
+            profile and one joined page of history
+
+The first report view of each candidate backfills its profile and is
+not timed. Skill averages of both paths are checked to agree. Exits
+non-zero if the report's SELECT count, on its first or its last history
+page, depends on the number of assessments.
+
+    python benchmarks/bench_candidate_report.py 10 100 1000
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SKILLS = ['python', 'sql', 'docker', 'aws', 'react', 'git']
+REPEAT = 20
+
+
+def seed(n, jobs):
+    from models import db, Assessment, Candidate
+
+    rng = random.Random(n)
+    candidate_id = str(uuid.uuid4())
+    db.session.add(Candidate(id=candidate_id, email=f'{candidate_id}@example.com', name='Bench',
+                             total_assessments=n, avg_score=50.0))
+    start = datetime(2024, 1, 1)
+    db.session.bulk_insert_mappings(Assessment, [dict(
+        id=str(uuid.uuid4()), candidate_id=candidate_id, job_description_id=rng.choice(jobs),
+        status='evaluated', total_score=rng.uniform(0, 100), is_passed=rng.random() < 0.5,
+        completed_at=start + timedelta(hours=i),
+        skill_scores={skill: rng.uniform(0, 100) for skill in rng.sample(SKILLS, 4)}
+    ) for i in range(n)])
+    db.session.commit()
+    return candidate_id
+
+
+def legacy_report(candidate_id):
+    from models import Assessment
+
+    assessments = Assessment.query.filter_by(candidate_id=candidate_id).all()
+    skill_performance = {}
+    for assessment in assessments:
+        for skill, score in (assessment.skill_scores or {}).items():
+            skill_performance.setdefault(skill, []).append(score)
+    averages = {skill: sum(scores) / len(scores) for skill, scores in skill_performance.items()}
+    history = [{"job_title": a.job_description.title, "score": a.total_score} for a in assessments]
+    return averages, history
+
+
+def measure(fn):
+    from models import db
+    from instrumentation import QueryCounter
+
+    with QueryCounter(db.engine) as counter:
+        result = fn()
+    selects = counter.selects
+    begin = time.perf_counter()
+    for _ in range(REPEAT):
+        fn()
+    return result, selects, (time.perf_counter() - begin) / REPEAT * 1000
+
+
+if __name__ == '__main__':
+    sizes = [int(a) for a in sys.argv[1:]] or [10, 100, 1000]
+
+    tmp = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+    os.environ.setdefault('TASK_QUEUE_BACKEND', 'eager')
+    import app as app_module
+    from models import db, JobDescription
+
+    client = app_module.app.test_client()
+    with app_module.app.app_context():
+        jobs = [str(uuid.uuid4()) for _ in range(200)]
+        db.session.add_all(JobDescription(id=job_id, title=f'job {i}', description='bench')
+                           for i, job_id in enumerate(jobs))
+        db.session.commit()
+
+        print(f"{'history':>8} {'legacy SELECTs':>15} {'legacy ms':>10} {'report SELECTs':>15} {'report ms':>10}")
+        counts = set()
+        for n in sizes:
+            candidate_id = seed(n, jobs)
+            url = f'/api/candidates/{candidate_id}/report'
+            assert client.get(url).status_code == 200  # backfills the profile
+
+            def legacy():
+                result = legacy_report(candidate_id)
+                db.session.expire_all()
+                return result
+
+            (averages, _), legacy_selects, legacy_ms = measure(legacy)
+            report, report_selects, report_ms = measure(lambda: client.get(url).json)
+            assert all(abs(report['skill_performance'][s] - v) < 1e-6 for s, v in averages.items())
+            assert report['history_total'] == n
+            _, last_page_selects, _ = measure(lambda: client.get(f"{url}?page={report['history_pages']}").json)
+            counts.update([report_selects, last_page_selects])
+            print(f"{n:>8} {legacy_selects:>15} {legacy_ms:>10.1f} {report_selects:>15} {report_ms:>10.1f}")
+    if len(counts) > 1:
+        sys.exit(f"Report SELECT count depends on the number of assessments: {sorted(counts)}")
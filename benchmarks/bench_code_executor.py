@@ -0,0 +1,72 @@
+"""Coding evaluation throughput: interpreter-per-test-case vs warm executor pool.
+
+Evaluates a batch of coding answers (default 10 questions x 10 test cases)
+with the old path, which writes a temp file and starts ``python`` for every
+test case, and with CodeExecutorPool, which runs each answer's cases in one
+forked sandbox on a pre-started worker.
+
+    python benchmarks/bench_code_executor.py [questions] [cases]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import wait
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from code_executor import CodeExecutorPool
+
+SOLUTION = "def solution(s):\n    return s[::-1]\n"
+
+
+def make_cases(n):
+    return [{"input": repr(f"case{i}"), "output": repr(f"case{i}"[::-1])} for i in range(n)]
+
+
+def legacy_evaluate(code, test_cases):
+    """The pre-pool EvaluationService.evaluate_coding, kept here for comparison"""
+    passed = 0
+    for test_case in test_cases:
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
+            f.write(code + '\n\n')
+            f.write(f"result = solution({test_case['input']})\n")
+            f.write(f"print(str(result) == str({test_case['output']}))")
+            temp_file = f.name
+        result = subprocess.run([sys.executable, temp_file], capture_output=True, text=True, timeout=5)
+        if result.stdout.strip() == 'True':
+            passed += 1
+        os.unlink(temp_file)
+    return passed / len(test_cases) * 100
+
+
+def main(questions=10, cases=10, rounds=3):
+    test_cases = make_cases(cases)
+    total_cases = questions * cases
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        scores = [legacy_evaluate(SOLUTION, test_cases) for _ in range(questions)]
+    legacy = (time.perf_counter() - start) / rounds
+    assert all(score == 100 for score in scores)
+
+    pool = CodeExecutorPool()
+    pool.warm()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        futures = [pool.submit(SOLUTION, test_cases) for _ in range(questions)]
+        wait(futures)
+    pooled = (time.perf_counter() - start) / rounds
+    assert all(all(v["passed"] for v in f.result()) for f in futures)
+    pool.shutdown()
+
+    print(f"batch: {questions} questions x {cases} cases, {pool.workers} workers")
+    print(f"{'path':<22} {'batch ms':>10} {'cases/s':>10}")
+    print(f"{'subprocess per case':<22} {legacy * 1000:>10.1f} {total_cases / legacy:>10.0f}")
+    print(f"{'warm executor pool':<22} {pooled * 1000:>10.1f} {total_cases / pooled:>10.0f}")
+    print(f"speedup: {legacy / pooled:.1f}x")
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:3]])
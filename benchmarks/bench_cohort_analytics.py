@@ -0,0 +1,115 @@
+"""Cohort skill-gap analytics for one job with many evaluated assessments.
+
+Seeds a throwaway SQLite database with one job and N evaluated assessments
+(4-8 of 20 skills scored 0-100 each, the ix_assessments_job_evaluated
+index in place) and times:
+
+  loop         what a cohort view would otherwise take: every assessment
+               loaded through the ORM, analyze_skill_gaps per candidate,
+               then gap histograms, pass rates by skill and percentiles
+               accumulated in Python
+  first        CohortAnalytics.analyze on a cold cache: the full matrix
+               read plus the vectorized summary
+  cached       analyze again at the same leaderboard version
+  incremental  analyze after 100 more evaluations and a version bump: only
+               the new rows are read and upserted, the summary recomputed
+
+The vectorized per-skill means and p50s are checked against the loop's.
+
+    python benchmarks/bench_cohort_analytics.py [assessments]
+"""
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from flask import Flask
+from ai_service import AIService
+from cohort_analytics import CohortAnalytics
+from models import db, Assessment
+
+SKILLS = [f'skill{i}' for i in range(20)]
+REQUIRED = {f'skill{i}': round(0.5 + 0.05 * i, 2) for i in range(6)}
+JOB_ID = 'bench-job'
+CHUNK = 50000
+
+
+def seed(raw, rng, start, count, evaluated_at):
+    rows = []
+    for i in range(start, start + count):
+        skills = {s: round(rng.uniform(0, 100), 1) for s in rng.sample(SKILLS, rng.randint(4, 8))}
+        total = sum(skills.values()) / len(skills)
+        rows.append((str(uuid.uuid4()), JOB_ID, f'c{i}', 'evaluated', json.dumps(skills), total,
+                     total >= 60, evaluated_at, evaluated_at))
+    raw.cursor().executemany(
+        'INSERT INTO assessments (id, job_description_id, candidate_id, status, skill_scores, total_score, '
+        'is_passed, evaluated_at, completed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', rows
+    )
+    raw.commit()
+
+
+def loop(service):
+    """The per-candidate path: ORM rows, analyze_skill_gaps, Python accumulators"""
+    scores, passed, gaps = {}, {}, {s: [0] * 11 for s in REQUIRED}
+    for assessment in Assessment.query.filter_by(job_description_id=JOB_ID, status='evaluated'):
+        skill_scores = assessment.skill_scores or {}
+        current = {s: v / 100 for s, v in skill_scores.items()}
+        service.analyze_skill_gaps(current, REQUIRED)
+        for skill, value in skill_scores.items():
+            scores.setdefault(skill, []).append(value)
+            passed[skill] = passed.get(skill, 0) + bool(assessment.is_passed)
+            if skill in REQUIRED:
+                gap = max(0, REQUIRED[skill] * 100 - value)
+                gaps[skill][min(int(gap // 10), 10)] += 1
+    return {s: (statistics.fmean(v), float(np.percentile(v, 50)), passed[s] / len(v)) for s, v in scores.items()}
+
+
+def timed(fn):
+    begin = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - begin) * 1000, result
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = random.Random(23)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        db.init_app(app)
+        with app.app_context():
+            db.create_all()
+            raw = db.engine.raw_connection()
+            evaluated_at = datetime.utcnow() - timedelta(hours=1)
+            for start in range(0, n, CHUNK):
+                seed(raw, rng, start, min(CHUNK, n - start), evaluated_at)
+            print(f"seeded {n} evaluated assessments")
+
+            loop_ms, expected = timed(lambda: loop(AIService.__new__(AIService)))
+            analytics = CohortAnalytics()
+            first_ms, result = timed(lambda: analytics.analyze(JOB_ID, REQUIRED, 1))
+            cached_ms = statistics.median(timed(lambda: analytics.analyze(JOB_ID, REQUIRED, 1))[0] for _ in range(20))
+
+            seed(raw, rng, n, 100, datetime.utcnow())
+            incremental_ms, result = timed(lambda: analytics.analyze(JOB_ID, REQUIRED, 2))
+            raw.close()
+
+        matches = all(
+            abs(e["mean"] - expected[e["skill"]][0]) < 0.01 and abs(e["percentiles"]["p50"] - expected[e["skill"]][1]) < 0.01
+            for e in analytics.analyze(JOB_ID, REQUIRED, 1)["skills"] if e["assessed"]
+        )
+        print(f"\n{'cohort of ' + str(n):<20} {'ms':>10}")
+        for label, ms in (('loop', loop_ms), ('first', first_ms), ('cached', cached_ms),
+                          ('incremental (+100)', incremental_ms)):
+            print(f"{label:<20} {ms:>10.2f}")
+        print(f"cohort after update: {result['cohort_size']}; stats {analytics.stats()}")
+        print(f"means and p50 match the loop: {matches}")
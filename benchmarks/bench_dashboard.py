@@ -0,0 +1,148 @@
+"""Admin dashboard cost as the assessments table grows.
+
+Imports app.py against a throwaway SQLite database and seeds assessments
+across a few hundred jobs and companies. Times and counts the SELECTs
+(QueryCounter) of:
+
+  legacy    what admin_dashboard did before: three COUNT(*)s and the
+            ten most recent assessments with a lazy candidate and job
+            load each (no per-job figures at all)
+  scan      the per-job aggregates computed straight from assessments
+            with one GROUP BY, i.e. what the dashboard would cost
+            without the rollup
+  rollup    StatsRollup._compute(): job_stats, the minute buckets and
+            one joined recent-activity query
+  cached    GET /api/admin/dashboard while the snapshot is fresh
+
+Rollup totals are checked against the scan.
+
+    python benchmarks/bench_dashboard.py [assessments] [jobs]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+REPEAT = 10
+
+
+def seed(n, job_count):
+    from models import db, Assessment, Candidate, Company, JobDescription
+
+    rng = random.Random(18)
+    companies = [str(uuid.uuid4()) for _ in range(max(1, job_count // 10))]
+    db.session.bulk_insert_mappings(Company, [dict(id=c, name=f'company {i}', email=f'{c}@example.com') for i, c in enumerate(companies)])
+    jobs = [str(uuid.uuid4()) for _ in range(job_count)]
+    db.session.bulk_insert_mappings(JobDescription, [
+        dict(id=j, title=f'job {i}', description='bench', company_id=rng.choice(companies))
+        for i, j in enumerate(jobs)
+    ])
+    candidates = [str(uuid.uuid4()) for _ in range(max(1, n // 4))]
+    db.session.bulk_insert_mappings(Candidate, [
+        dict(id=c, email=f'{c}@example.com', name=f'Candidate {i}') for i, c in enumerate(candidates)
+    ])
+
+    now = datetime.utcnow()
+    for start in range(0, n, 20000):
+        rows = []
+        for _ in range(start, min(n, start + 20000)):
+            status = rng.choice(['in_progress', 'submitted', 'evaluated', 'evaluated', 'evaluated'])
+            created = now - timedelta(minutes=rng.uniform(0, 60 * 24 * 30))
+            evaluated = status == 'evaluated'
+            rows.append(dict(
+                id=str(uuid.uuid4()), candidate_id=rng.choice(candidates), job_description_id=rng.choice(jobs),
+                status=status, created_at=created,
+                completed_at=created + timedelta(minutes=30) if status != 'in_progress' else None,
+                total_score=rng.uniform(0, 100) if evaluated else None,
+                is_passed=rng.random() < 0.4 if evaluated else None
+            ))
+        db.session.bulk_insert_mappings(Assessment, rows)
+    db.session.commit()
+
+
+def legacy_dashboard():
+    from models import db, Assessment, Candidate, JobDescription
+
+    result = {
+        "total_candidates": Candidate.query.count(),
+        "total_assessments": Assessment.query.count(),
+        "total_jobs": JobDescription.query.count(),
+        "recent_activity": [
+            {"candidate": a.candidate.name, "job_title": a.job_description.title, "score": a.total_score}
+            for a in Assessment.query.order_by(Assessment.created_at.desc()).limit(10).all()
+        ]
+    }
+    db.session.expire_all()
+    return result
+
+
+def scan():
+    from models import db, Assessment
+
+    evaluated = Assessment.status == 'evaluated'
+    return db.session.execute(
+        db.select(
+            Assessment.job_description_id, db.func.count(),
+            db.func.sum(db.case((evaluated, 1), else_=0)),
+            db.func.sum(db.case((db.and_(evaluated, Assessment.is_passed.is_(True)), 1), else_=0)),
+            db.func.avg(db.case((evaluated, Assessment.total_score)))
+        ).group_by(Assessment.job_description_id)
+    ).all()
+
+
+def measure(fn):
+    from models import db
+    from instrumentation import QueryCounter
+
+    with QueryCounter(db.engine) as counter:
+        result = fn()
+    selects = counter.selects
+    begin = time.perf_counter()
+    for _ in range(REPEAT):
+        fn()
+    return result, selects, (time.perf_counter() - begin) / REPEAT * 1000
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    job_count = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    tmp = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+    os.environ.setdefault('TASK_QUEUE_BACKEND', 'eager')
+    import app as app_module
+    from models import db, User
+    from flask_jwt_extended import create_access_token
+
+    client = app_module.app.test_client()
+    rollup = app_module.stats_rollup
+    with app_module.app.app_context():
+        seed(n, job_count)
+        admin = User(id=str(uuid.uuid4()), email='admin@example.com', password_hash='-', role='admin')
+        db.session.add(admin)
+        db.session.commit()
+        headers = {'Authorization': f'Bearer {create_access_token(identity=admin.id)}'}
+
+        begin = time.perf_counter()
+        rollup.rebuild()
+        print(f"{n} assessments, {job_count} jobs; backfill took {time.perf_counter() - begin:.2f}s")
+
+        rows, *_ = measure(scan)
+        client.get('/api/admin/dashboard', headers=headers)  # warms the snapshot
+        print(f"{'path':>8} {'SELECTs':>8} {'ms':>9}")
+        for name, fn in [
+            ('legacy', legacy_dashboard),
+            ('scan', scan),
+            ('rollup', rollup._compute),
+            ('cached', lambda: client.get('/api/admin/dashboard', headers=headers).json),
+        ]:
+            result, selects, ms = measure(fn)
+            print(f"{name:>8} {selects:>8} {ms:>9.2f}")
+            if name == 'rollup':
+                assert result['total_assessments'] == sum(row[1] for row in rows) == n
+                assert sum(company['evaluated'] for company in result['companies']) == sum(row[2] for row in rows)
@@ -0,0 +1,80 @@
+"""Embedding throughput under concurrent load: per-request encode vs EmbeddingService.
+
+Simulates many request threads each embedding a handful of answers. The
+baseline calls model.encode once per request (what detect_plagiarism did);
+EmbeddingService coalesces concurrent misses into micro-batches and serves
+repeated texts from its LRU.
+
+By default a stand-in model is used whose cost is a fixed per-call
+overhead plus a per-text cost, and which runs one forward pass at a time
+like a CPU-bound model. Pass --real to use all-MiniLM-L6-v2.
+
+    python benchmarks/bench_embeddings.py [--real] [threads] [requests_per_thread]
+"""
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from embedding_service import EmbeddingService
+
+CALL_OVERHEAD = 0.004  # seconds per encode() call
+PER_TEXT = 0.0003  # seconds per text
+
+
+class StandInModel:
+    def __init__(self, dim=384):
+        self.dim = dim
+        self.lock = threading.Lock()
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True):
+        with self.lock:
+            time.sleep(CALL_OVERHEAD + PER_TEXT * len(texts))
+        return np.random.rand(len(texts), self.dim).astype(np.float32)
+
+
+def make_requests(threads, per_thread, vocabulary):
+    rng = random.Random(42)
+    return [[[rng.choice(vocabulary) for _ in range(rng.randint(2, 6))]
+             for _ in range(per_thread)] for _ in range(threads)]
+
+
+def drive(encode, requests):
+    def worker(batches):
+        for texts in batches:
+            encode(texts)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(requests)) as pool:
+        list(pool.map(worker, requests))
+    elapsed = time.perf_counter() - start
+    return sum(len(t) for batches in requests for t in batches) / elapsed
+
+
+if __name__ == '__main__':
+    args = [a for a in sys.argv[1:] if a != '--real']
+    threads = int(args[0]) if args else 32
+    per_thread = int(args[1]) if len(args) > 1 else 50
+
+    if '--real' in sys.argv:
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer('all-MiniLM-L6-v2', device='cpu')
+    else:
+        model = StandInModel()
+
+    unique = [f"candidate answer number {i} about databases and indexing" for i in range(20000)]
+    repeated = unique[:500]
+
+    print(f"{threads} threads x {per_thread} requests")
+    print(f"{'workload':<18} {'per-request encode':>20} {'EmbeddingService':>18}  (embeddings/s)")
+    for label, vocabulary in (('all unique', unique), ('repeated texts', repeated)):
+        requests = make_requests(threads, per_thread, vocabulary)
+        baseline = drive(lambda texts: model.encode(texts), requests)
+        service = EmbeddingService(model=model, max_batch_size=256, cache_size=50000)
+        batched = drive(service.encode, requests)
+        print(f"{label:<18} {baseline:>20.0f} {batched:>18.0f}")
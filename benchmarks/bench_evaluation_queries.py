@@ -0,0 +1,60 @@
+"""SELECTs and latency per submission as the number of questions grows.
+
+Runs EvaluationService.evaluate_assessment on MCQ-only sheets of increasing
+size against a throwaway SQLite database and reports the statement count
+seen by QueryCounter. Exits non-zero if the count changes with the number
+of questions, so it doubles as the check for N+1 regressions.
+
+    python benchmarks/bench_evaluation_queries.py 5 20 100 500
+"""
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from models import db, Question, Assessment
+from evaluation_service import EvaluationService
+from instrumentation import QueryCounter
+
+
+def run(app, service, n):
+    job_id = str(uuid.uuid4())
+    questions = [dict(id=str(uuid.uuid4()), job_description_id=job_id, question_type='mcq',
+                      skill_category='python', question_text=f'q{i}', options=['a', 'b'],
+                      correct_answer='a') for i in range(n)]
+    db.session.bulk_insert_mappings(Question, questions)
+    assessment = Assessment(id=str(uuid.uuid4()), job_description_id=job_id,
+                            question_set=[q['id'] for q in questions])
+    db.session.add(assessment)
+    db.session.commit()
+
+    answers = [{'question_id': q['id'], 'answer': 'a'} for q in questions]
+    with QueryCounter(db.engine) as counter:
+        start = time.perf_counter()
+        result = service.evaluate_assessment(assessment, answers)
+        elapsed = time.perf_counter() - start
+    assert result['total_score'] == 100
+    return counter.selects, elapsed * 1000
+
+
+if __name__ == '__main__':
+    sizes = [int(a) for a in sys.argv[1:]] or [5, 20, 100, 500]
+    with tempfile.TemporaryDirectory() as tmp:
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        db.init_app(app)
+        with app.app_context():
+            db.create_all()
+            service = EvaluationService()
+            print(f"{'questions':>10} {'SELECTs':>8} {'ms':>8}")
+            counts = set()
+            for n in sizes:
+                selects, ms = run(app, service, n)
+                counts.add(selects)
+                print(f"{n:>10} {selects:>8} {ms:>8.1f}")
+    if len(counts) > 1:
+        sys.exit(f"SELECT count depends on the number of questions: {sorted(counts)}")
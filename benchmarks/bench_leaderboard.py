@@ -0,0 +1,103 @@
+"""Per-submit leaderboard cost: full re-rank vs incremental entry update.
+
+Seeds N completed assessments for one job into a throwaway SQLite database
+and times a single leaderboard update with the old full re-rank and with
+LeaderboardService.record() + a read-time rank lookup.
+
+    python benchmarks/bench_leaderboard.py 1000 5000 20000
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from models import db, Assessment, Leaderboard
+from leaderboard_service import LeaderboardService
+
+
+def make_app(path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    db.init_app(app)
+    return app
+
+
+def seed(job_id, n):
+    assessments, entries = [], []
+    for _ in range(n):
+        aid = str(uuid.uuid4())
+        score = random.uniform(0, 100)
+        assessments.append(dict(id=aid, job_description_id=job_id, candidate_id=str(uuid.uuid4()),
+                                status='completed', total_score=score, question_set=[]))
+        entries.append(dict(id=str(uuid.uuid4()), job_description_id=job_id, assessment_id=aid,
+                            score=score))
+    db.session.bulk_insert_mappings(Assessment, assessments)
+    db.session.bulk_insert_mappings(Leaderboard, entries)
+    db.session.commit()
+
+
+def new_assessment(job_id):
+    assessment = Assessment(id=str(uuid.uuid4()), job_description_id=job_id,
+                            candidate_id=str(uuid.uuid4()), status='completed',
+                            total_score=random.uniform(0, 100), question_set=[])
+    db.session.add(assessment)
+    db.session.flush()
+    return assessment
+
+
+def full_rerank(assessment):
+    """The pre-incremental update_leaderboard, kept here for comparison"""
+    all_assessments = Assessment.query.filter_by(
+        job_description_id=assessment.job_description_id, status='completed'
+    ).order_by(Assessment.total_score.desc()).all()
+
+    for idx, assmt in enumerate(all_assessments, 1):
+        entry = Leaderboard.query.filter_by(
+            job_description_id=assmt.job_description_id, assessment_id=assmt.id
+        ).first()
+        if not entry:
+            entry = Leaderboard(id=str(uuid.uuid4()), job_description_id=assmt.job_description_id,
+                                assessment_id=assmt.id, candidate_id=assmt.candidate_id)
+            db.session.add(entry)
+        entry.rank = idx
+        entry.score = assmt.total_score
+        entry.percentile = (len(all_assessments) - idx) / len(all_assessments) * 100
+    db.session.commit()
+
+
+def incremental(service, assessment):
+    entry = service.record(assessment)
+    db.session.commit()
+    service.position(entry)
+
+
+def run(n, repeats=3):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, 'bench.db'))
+        with app.app_context():
+            db.create_all()
+            job_id = str(uuid.uuid4())
+            seed(job_id, n)
+            service = LeaderboardService()
+
+            timings = {}
+            for label, fn in (('incremental', lambda a: incremental(service, a)),
+                              ('full_rerank', full_rerank)):
+                start = time.perf_counter()
+                for _ in range(repeats):
+                    fn(new_assessment(job_id))
+                timings[label] = (time.perf_counter() - start) / repeats * 1000
+    return timings
+
+
+if __name__ == '__main__':
+    sizes = [int(a) for a in sys.argv[1:]] or [1000, 5000, 20000]
+    print(f"{'N':>8} {'full re-rank ms':>16} {'incremental ms':>15}")
+    for n in sizes:
+        t = run(n)
+        print(f"{n:>8} {t['full_rerank']:>16.1f} {t['incremental']:>15.2f}")
@@ -0,0 +1,98 @@
+"""Leaderboard page latency at depth: offset paging vs keyset cursors.
+
+Imports app.py against a throwaway SQLite database and seeds one job's
+leaderboard (scores rounded to one decimal so there are plenty of ties),
+each entry with its own candidate. Times reading a page at increasing
+depth through:
+
+  legacy    the old get_leaderboard body: Leaderboard.query.paginate()
+            plus a lazy candidate load per entry
+  offset    GET /api/jobs/<id>/leaderboard?page=N (candidate joined)
+  cursor    GET ...?cursor=<last entry of page N-1>
+  304       the cursor request again with If-None-Match
+
+Cursor pages are checked against offset pages (same entries and ranks).
+
+    python benchmarks/bench_leaderboard_pages.py [entries] [per_page] [pages...]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+REPEAT = 20
+
+
+def seed(job_id, n):
+    from models import db, Candidate, JobDescription, Leaderboard
+
+    rng = random.Random(5)
+    db.session.add(JobDescription(id=job_id, title='bench', description='bench'))
+    candidates, entries = [], []
+    for i in range(n):
+        candidate_id = str(uuid.uuid4())
+        candidates.append(dict(id=candidate_id, email=f'{candidate_id}@example.com', name=f'Candidate {i}'))
+        entries.append(dict(id=str(uuid.uuid4()), job_description_id=job_id, assessment_id=str(uuid.uuid4()),
+                            candidate_id=candidate_id, score=round(rng.uniform(0, 100), 1)))
+    for start in range(0, n, 10000):
+        db.session.bulk_insert_mappings(Candidate, candidates[start:start + 10000])
+        db.session.bulk_insert_mappings(Leaderboard, entries[start:start + 10000])
+    db.session.commit()
+
+
+def legacy_page(job_id, page, per_page):
+    from models import db, Leaderboard
+
+    pagination = Leaderboard.query.filter_by(job_description_id=job_id).order_by(
+        Leaderboard.score.desc(), Leaderboard.id
+    ).paginate(page=page, per_page=per_page)
+    result = [{"candidate_name": entry.candidate.name, "score": entry.score} for entry in pagination.items]
+    db.session.expire_all()
+    return result
+
+
+def timed(fn):
+    fn()
+    begin = time.perf_counter()
+    for _ in range(REPEAT):
+        result = fn()
+    return result, (time.perf_counter() - begin) / REPEAT * 1000
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    per_page = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    depths = [int(a) for a in sys.argv[3:]] or [1, 50, 500, 2000]
+
+    tmp = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+    os.environ.setdefault('TASK_QUEUE_BACKEND', 'eager')
+    import app as app_module
+
+    client = app_module.app.test_client()
+    job_id = str(uuid.uuid4())
+    with app_module.app.app_context():
+        seed(job_id, n)
+
+        url = f'/api/jobs/{job_id}/leaderboard?per_page={per_page}'
+        print(f"{n} entries, {per_page} per page")
+        print(f"{'page':>6} {'legacy ms':>10} {'offset ms':>10} {'cursor ms':>10} {'304 ms':>8}")
+        for page in depths:
+            if page > 1:
+                previous = client.get(f'{url}&page={page - 1}').json
+                cursor_url = f"{url}&cursor={previous['next_cursor']}"
+            else:
+                cursor_url = url
+
+            _, legacy_ms = timed(lambda: legacy_page(job_id, page, per_page))
+            offset, offset_ms = timed(lambda: client.get(f'{url}&page={page}').json)
+            response, cursor_ms = timed(lambda: client.get(cursor_url))
+            etag = response.headers['ETag']
+            _, not_modified_ms = timed(lambda: client.get(cursor_url, headers={'If-None-Match': etag}))
+
+            assert response.json['leaderboard'] == offset['leaderboard'], page
+            print(f"{page:>6} {legacy_ms:>10.1f} {offset_ms:>10.1f} {cursor_ms:>10.1f} {not_modified_ms:>8.2f}")
@@ -0,0 +1,98 @@
+"""Burst start latency: building each assessment on demand vs claiming pre-built packets.
+
+Imports app.py against a throwaway SQLite database, seeds one job with a
+question bank, then fires a burst of /api/assessments/start requests from
+many threads at once (each a new candidate) and reports latency
+percentiles. The same burst is run against a second job after building
+one packet per start with AssessmentPacketPool.
+
+    python benchmarks/bench_packet_pool.py [starts] [threads] [questions]
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def seed_job(app_module, num_questions):
+    from models import db, JobDescription, Question
+
+    rng = random.Random(1)
+    job_id = str(uuid.uuid4())
+    db.session.add(JobDescription(id=job_id, title='drive', description='drive', assessment_duration=3600))
+    db.session.bulk_insert_mappings(Question, [dict(
+        id=str(uuid.uuid4()), job_description_id=job_id,
+        question_type=rng.choice(['mcq', 'coding', 'subjective']),
+        skill_category=rng.choice(['python', 'sql', 'docker', 'aws']),
+        difficulty=rng.choice(['easy', 'medium', 'hard']),
+        question_text=f'question {i} ' + 'lorem ipsum ' * 20, options=['a', 'b', 'c', 'd'],
+        correct_answer='a', usage_count=0, is_active=True
+    ) for i in range(num_questions)])
+    db.session.commit()
+    return job_id
+
+
+def burst(app, job_id, starts, threads):
+    barrier = threading.Barrier(threads)
+    per_thread = [list(range(i, starts, threads)) for i in range(threads)]
+
+    def worker(indexes):
+        client = app.test_client()
+        latencies = []
+        barrier.wait()
+        for i in indexes:
+            t0 = time.perf_counter()
+            r = client.post('/api/assessments/start', json={
+                'email': f'{job_id[:8]}-{i}@example.com', 'name': f'C{i}', 'job_id': job_id
+            })
+            latencies.append(time.perf_counter() - t0)
+            assert r.status_code == 200, r.data
+        return latencies
+
+    begin = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = sorted(ms * 1000 for chunk in pool.map(worker, per_thread) for ms in chunk)
+    elapsed = time.perf_counter() - begin
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+    return starts / elapsed, statistics.median(latencies), pct(0.95), pct(0.99)
+
+
+if __name__ == '__main__':
+    starts = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    num_questions = int(sys.argv[3]) if len(sys.argv) > 3 else 500
+
+    tmp = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+    os.environ.setdefault('TASK_QUEUE_BACKEND', 'eager')
+    import app as app_module
+    from models import db, JobDescription
+
+    with app_module.app.app_context():
+        on_demand_job = seed_job(app_module, num_questions)
+        packet_job = seed_job(app_module, num_questions)
+
+        jd = db.session.get(JobDescription, packet_job)
+        jd.scheduled_start = jd.created_at
+        db.session.commit()
+        t0 = time.perf_counter()
+        app_module.packet_pool.build(jd.id, jd.question_version, starts,
+                                     app_module.Config.QUESTIONS_PER_ASSESSMENT)
+        build_time = time.perf_counter() - t0
+
+    print(f"built {starts} packets ahead of time in {build_time:.1f} s")
+    print(f"{'':<10} {'starts/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for label, job_id in (('on demand', on_demand_job), ('packets', packet_job)):
+        rate, p50, p95, p99 = burst(app_module.app, job_id, starts, threads)
+        print(f"{label:<10} {rate:9.1f} {p50:8.1f} {p95:8.1f} {p99:8.1f}")
+    print(f"packet pool: {app_module.packet_pool.stats()}")
@@ -0,0 +1,236 @@
+"""Query plans and latencies of the routes' queries before and after migrations.
+
+Builds the schema from the models with every secondary index dropped
+(what db.create_all() gave before the indexes existed), seeds realistic
+volumes into a throwaway SQLite database, then for each query the routes
+and services issue prints SQLite's EXPLAIN QUERY PLAN and the median
+latency:
+
+  before    no secondary indexes
+  after     migrations.migrate() run against the populated database, so
+            its index builds are timed too
+
+Jobs get a skewed share of assessments (a few hiring drives dominate);
+query parameters come from the busiest job.
+
+    python benchmarks/bench_query_plans.py [assessments] [jobs]
+"""
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import event, inspect, text
+from models import db, Assessment, Candidate, JobDescription, Leaderboard, Question
+from migrations import migrate
+from leaderboard_service import LeaderboardService
+
+SKILLS = ['python', 'sql', 'docker', 'aws', 'react', 'git']
+STATUSES = ['evaluated'] * 90 + ['in_progress'] * 6 + ['submitted'] * 2 + ['failed'] * 2
+QUESTIONS_PER_JOB = 50
+REPEAT = 5
+
+
+def stamp(moment):
+    return moment.strftime('%Y-%m-%d %H:%M:%S.%f')
+
+
+def drop_secondary_indexes():
+    inspector = inspect(db.engine)
+    with db.engine.begin() as conn:
+        for table in inspector.get_table_names():
+            for index in inspector.get_indexes(table):
+                conn.execute(text(f'DROP INDEX "{index["name"]}"'))
+
+
+def seed(n, job_count):
+    rng = random.Random(19)
+    now = datetime.utcnow()
+    jobs = [str(uuid.uuid4()) for _ in range(job_count)]
+    weights = [1 / (i + 1) for i in range(job_count)]
+    candidates = [str(uuid.uuid4()) for _ in range(max(1, n // 4))]
+
+    raw = db.engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.executemany(
+            'INSERT INTO job_descriptions (id, title, description, question_version) '
+            'VALUES (?, ?, ?, 0)',
+            [(job_id, f'job {i}', 'bench') for i, job_id in enumerate(jobs)]
+        )
+        cursor.executemany(
+            'INSERT INTO questions (id, job_description_id, question_type, skill_category, difficulty, '
+            'question_text, is_active, grading_version) VALUES (?, ?, ?, ?, ?, ?, ?, 0)',
+            [(str(uuid.uuid4()), job_id, rng.choice(['mcq', 'coding', 'subjective']), rng.choice(SKILLS),
+              rng.choice(['easy', 'medium', 'hard']), f'question {i}', rng.random() < 0.9)
+             for job_id in jobs for i in range(QUESTIONS_PER_JOB)]
+        )
+        cursor.executemany(
+            'INSERT INTO candidates (id, email, name, total_assessments, avg_score, profiled_assessments) '
+            'VALUES (?, ?, ?, 0, 0, 0)',
+            [(c, f'{c}@example.com', f'Candidate {i}') for i, c in enumerate(candidates)]
+        )
+
+        for start in range(0, n, 50000):
+            size = min(n, start + 50000) - start
+            job_ids = rng.choices(jobs, weights=weights, k=size)
+            assessments, entries = [], []
+            for job_id in job_ids:
+                assessment_id = str(uuid.uuid4())
+                candidate_id = rng.choice(candidates)
+                status = rng.choice(STATUSES)
+                created = now - timedelta(minutes=rng.uniform(0, 60 * 24 * 365))
+                completed = stamp(created + timedelta(minutes=45)) if status != 'in_progress' else None
+                score = round(rng.uniform(0, 100), 1) if status == 'evaluated' else 0.0
+                assessments.append((
+                    assessment_id, job_id, candidate_id, status, score, score >= 70,
+                    json.dumps({skill: rng.uniform(0, 100) for skill in rng.sample(SKILLS, 3)}),
+                    stamp(created), completed
+                ))
+                if status == 'evaluated':
+                    entries.append((str(uuid.uuid4()), job_id, assessment_id, candidate_id, score))
+            cursor.executemany(
+                'INSERT INTO assessments (id, job_description_id, candidate_id, status, total_score, is_passed, '
+                'skill_scores, created_at, completed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', assessments
+            )
+            cursor.executemany(
+                'INSERT INTO leaderboards (id, job_description_id, assessment_id, candidate_id, score) '
+                'VALUES (?, ?, ?, ?, ?)', entries
+            )
+        raw.commit()
+    finally:
+        raw.close()
+
+    busiest = jobs[0]
+    sample = db.session.execute(
+        db.select(Assessment.id, Assessment.candidate_id, Assessment.total_score)
+        .where(Assessment.job_description_id == busiest, Assessment.status == 'evaluated').limit(1)
+    ).one()
+    deep = db.session.execute(
+        LeaderboardService.ordered(busiest).limit(1).offset(n // job_count)
+    ).one()
+    return {
+        "job": busiest, "assessment": sample.id, "candidate": sample.candidate_id,
+        "email": f'{sample.candidate_id}@example.com', "score": sample.total_score,
+        "cursor_score": deep.score, "cursor_id": deep.id, "watermark": now - timedelta(hours=1)
+    }
+
+
+def queries(p):
+    """(label, statement) for what each route and service runs"""
+    evaluated = Assessment.status == 'evaluated'
+    return [
+        ('start: active questions', db.select(
+            Question.id, Question.question_type, Question.skill_category, Question.difficulty,
+            Question.question_text, Question.options
+        ).where(Question.job_description_id == p["job"], Question.is_active.isnot(False))),
+        ('start: candidate by email', db.select(Candidate.id).where(Candidate.email == p["email"])),
+        ('results: leaderboard entry', db.select(Leaderboard.id, Leaderboard.score)
+         .where(Leaderboard.assessment_id == p["assessment"])),
+        ('results: rank', db.select(db.func.count()).select_from(Leaderboard)
+         .where(Leaderboard.job_description_id == p["job"], Leaderboard.score > p["score"])),
+        ('leaderboard: total', db.select(db.func.count()).select_from(Leaderboard)
+         .where(Leaderboard.job_description_id == p["job"])),
+        ('leaderboard: first page', LeaderboardService.ordered(p["job"])
+         .where(Leaderboard.score.isnot(None)).limit(20)),
+        ('leaderboard: cursor page', LeaderboardService.ordered(p["job"]).where(
+            Leaderboard.score.isnot(None), Leaderboard.score <= p["cursor_score"],
+            db.or_(Leaderboard.score < p["cursor_score"], Leaderboard.id > p["cursor_id"])
+        ).limit(20)),
+        ('report: history page', db.select(
+            Assessment.id, Assessment.total_score, Assessment.completed_at, JobDescription.title
+        ).outerjoin(JobDescription, JobDescription.id == Assessment.job_description_id)
+         .where(Assessment.candidate_id == p["candidate"])
+         .order_by(Assessment.completed_at.desc().nullslast(), Assessment.id).limit(10)),
+        ('report: history count', db.select(db.func.count()).select_from(Assessment)
+         .where(Assessment.candidate_id == p["candidate"])),
+        ('report: profile rebuild', db.select(Assessment.skill_scores)
+         .where(Assessment.candidate_id == p["candidate"], evaluated)),
+        ('evaluate: plagiarism sync', db.select(Assessment.id, Assessment.candidate_id, Assessment.completed_at)
+         .where(Assessment.job_description_id == p["job"], Assessment.completed_at.isnot(None),
+                Assessment.completed_at >= p["watermark"])),
+        ('job: best evaluated', db.select(Assessment.id, Assessment.total_score)
+         .where(Assessment.job_description_id == p["job"], evaluated)
+         .order_by(Assessment.total_score.desc()).limit(50)),
+        ('job: status counts', db.select(Assessment.status, db.func.count())
+         .where(Assessment.job_description_id == p["job"]).group_by(Assessment.status)),
+        ('dashboard: recent activity', db.select(
+            Assessment.total_score, Assessment.status, Assessment.created_at, Candidate.name, JobDescription.title
+        ).outerjoin(Candidate, Candidate.id == Assessment.candidate_id)
+         .outerjoin(JobDescription, JobDescription.id == Assessment.job_description_id)
+         .order_by(Assessment.created_at.desc()).limit(10)),
+        ('dashboard: stats rebuild', db.select(
+            Assessment.job_description_id, db.func.count(),
+            db.func.sum(db.case((evaluated, Assessment.total_score), else_=0.0))
+        ).group_by(Assessment.job_description_id)),
+    ]
+
+
+def measure(statement):
+    """Median ms over REPEAT runs, and the plan of the SQL actually sent"""
+    sent = []
+
+    def capture(conn, cursor, sql, parameters, context, executemany):
+        sent.append((sql, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        db.session.execute(statement).all()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+    timings = []
+    for _ in range(REPEAT):
+        begin = time.perf_counter()
+        db.session.execute(statement).all()
+        timings.append((time.perf_counter() - begin) * 1000)
+
+    sql, parameters = sent[-1]
+    plan = db.session.connection().exec_driver_sql('EXPLAIN QUERY PLAN ' + sql, parameters).all()
+    return statistics.median(timings), [row[-1] for row in plan]
+
+
+def report(label, results):
+    print(f"\n== {label}")
+    for name, (ms, plan) in results.items():
+        print(f"{name:<28} {ms:>9.2f} ms  {' | '.join(plan)}")
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    job_count = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        db.init_app(app)
+        with app.app_context():
+            db.create_all()
+            drop_secondary_indexes()
+            begin = time.perf_counter()
+            params = seed(n, job_count)
+            print(f"seeded {n} assessments over {job_count} jobs in {time.perf_counter() - begin:.1f}s")
+
+            before = {name: measure(statement) for name, statement in queries(params)}
+            db.session.commit()
+            report('before (no secondary indexes)', before)
+
+            begin = time.perf_counter()
+            applied = migrate(db.engine)
+            print(f"\nmigrate() applied {', '.join(applied)} in {time.perf_counter() - begin:.1f}s")
+
+            after = {name: measure(statement) for name, statement in queries(params)}
+            db.session.commit()
+            report('after migrate()', after)
+
+            print(f"\n{'query':<28} {'before ms':>10} {'after ms':>10} {'speedup':>8}")
+            for name, (ms, _) in after.items():
+                print(f"{name:<28} {before[name][0]:>10.2f} {ms:>10.2f} {before[name][0] / ms:>7.0f}x")
@@ -0,0 +1,112 @@
+"""Question loading at assessment start: ORM queries vs the cached QuestionCatalog.
+
+Seeds one job in a throwaway SQLite database and runs concurrent starts,
+timing only how each start builds its candidate-facing question list:
+
+  full scan   load every active question of the job as ORM rows (with
+              answers, test cases and rubrics) and project them
+  selected    QuestionSelector picks the ids, one IN query loads those rows
+  catalog     QuestionSelector picks the ids, QuestionCatalog serves them
+
+    python benchmarks/bench_question_catalog.py [questions] [starts] [threads]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from models import db, Question, JobDescription
+from question_catalog import QuestionCatalog
+from question_selection import QuestionSelector
+
+PER_START = 10
+
+
+def seed(job_id, n):
+    rng = random.Random(1)
+    db.session.add(JobDescription(id=job_id, title='bench', description='bench'))
+    db.session.bulk_insert_mappings(Question, [dict(
+        id=str(uuid.uuid4()), job_description_id=job_id,
+        question_type=rng.choice(['mcq', 'coding', 'subjective']),
+        skill_category=rng.choice(['python', 'sql', 'docker']), difficulty='medium',
+        question_text=f'question {i} ' + 'lorem ipsum ' * 20, options=['a', 'b', 'c', 'd'],
+        correct_answer='a', model_answer='model answer ' * 50, rubric={'keywords': ['x'] * 10},
+        test_cases=[{'input': 'x' * 50, 'output': 'y' * 50}] * 5, code_template='def f(): pass',
+        usage_count=0, is_active=True
+    ) for i in range(n)])
+    db.session.commit()
+
+
+def project(q):
+    return {'id': q.id, 'question_type': q.question_type, 'skill_category': q.skill_category,
+            'difficulty': q.difficulty, 'question_text': q.question_text, 'options': q.options}
+
+
+def full_scan(job_id, version):
+    questions = Question.query.filter_by(job_description_id=job_id, is_active=True).all()
+    return random.sample([project(q) for q in questions], PER_START)
+
+
+def selected(selector):
+    def start(job_id, version):
+        ids = selector.select(job_id, PER_START, version=version)
+        rows = {q.id: q for q in Question.query.filter(Question.id.in_(ids)).all()}
+        return [project(rows[i]) for i in ids]
+    return start
+
+
+def catalog(selector, question_catalog):
+    def start(job_id, version):
+        ids = selector.select(job_id, PER_START, version=version)
+        return question_catalog.questions(job_id, version, ids)
+    return start
+
+
+def drive(app, start_fn, job_id, starts, threads):
+    def one(_):
+        with app.app_context():
+            try:
+                version = db.session.get(JobDescription, job_id).question_version
+                questions = start_fn(job_id, version)
+            finally:
+                db.session.remove()
+            assert len(questions) == PER_START
+
+    begin = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(one, range(starts)))
+    return starts / (time.perf_counter() - begin)
+
+
+if __name__ == '__main__':
+    num_questions = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    starts = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    threads = int(sys.argv[3]) if len(sys.argv) > 3 else 16
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        db.init_app(app)
+        job_id = str(uuid.uuid4())
+        with app.app_context():
+            db.create_all()
+            seed(job_id, num_questions)
+
+        question_catalog = QuestionCatalog()
+        variants = [
+            ('full scan', full_scan),
+            ('selected', selected(QuestionSelector())),
+            ('catalog', catalog(QuestionSelector(), question_catalog))
+        ]
+        for label, start_fn in variants:
+            rate = drive(app, start_fn, job_id, starts, threads)
+            print(f"{label:<10} {rate:9.1f} starts/s")
+
+        stats = question_catalog.stats()
+        print(f"catalog hit rate {stats['hit_rate']:.4f} ({stats['hits']} hits, {stats['misses']} misses)")
@@ -0,0 +1,51 @@
+"""Question-generation wall clock: one big completion vs concurrent chunks.
+
+Uses a fake completion client whose latency grows with the number of
+questions requested (fixed overhead + per-question generation time), the
+way real completions scale with output tokens.
+
+    python benchmarks/bench_question_generation.py [num_questions]
+"""
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_service import AIService
+
+OVERHEAD = 0.4  # seconds per call
+PER_QUESTION = 0.25  # seconds per generated question
+
+
+class FakeCompletionClient:
+    def complete(self, prompt, temperature=0.7, timeout=None):
+        count = int(re.search(r'Generate (\d+)', prompt).group(1))
+        question_type = re.search(r'question_type: "(\w+)"', prompt)
+        time.sleep(OVERHEAD + PER_QUESTION * count)
+        return json.dumps([{
+            "question_type": question_type.group(1) if question_type else "mcq",
+            "question_text": f"Question {i}"
+        } for i in range(count)])
+
+
+if __name__ == '__main__':
+    num_questions = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    jd_data = {"technical_skills": {s: 0.8 for s in ["python", "sql", "docker", "aws", "react"]}}
+    service = AIService(completion_client=FakeCompletionClient())
+
+    client = service.completion_client
+    start = time.perf_counter()
+    client.complete(f"Generate {num_questions} assessment questions")
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    questions = service.generate_questions(jd_data, num_questions=num_questions)
+    chunked = time.perf_counter() - start
+
+    chunks = service._plan_question_chunks(list(jd_data["technical_skills"]), num_questions)
+    print(f"{num_questions} questions, {len(chunks)} chunks")
+    print(f"single completion:   {single:6.2f}s")
+    print(f"concurrent chunks:   {chunked:6.2f}s ({len(questions)} questions merged)")
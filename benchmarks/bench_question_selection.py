@@ -0,0 +1,117 @@
+"""Question-set selection at assessment start: full-bank scan vs QuestionSelector.
+
+Seeds one job with a large question bank in a throwaway SQLite database
+and runs many concurrent starts. The baseline is what start_assessment did
+before: load every active question of the job into dicts and sample from a
+per-process "used" set. The selector picks from its stratified index and
+loads only the chosen rows. The baseline is timed on a sample of starts
+since a full run would take minutes.
+
+After the run, reports the spread of usage_count across the bank and the
+type mix of the last question set.
+
+    python benchmarks/bench_question_selection.py [questions] [starts] [threads]
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from models import db, Question
+from question_selection import QuestionSelector
+
+SKILLS = ['python', 'sql', 'docker', 'aws', 'react', 'java', 'git', 'linux', 'kafka', 'redis']
+DIFFICULTIES = ['easy', 'medium', 'hard']
+TYPES = ['mcq'] * 4 + ['coding'] * 3 + ['subjective'] * 3
+PER_START = 10
+
+
+def seed(job_id, n):
+    rng = random.Random(1)
+    rows = [dict(id=str(uuid.uuid4()), job_description_id=job_id, question_type=rng.choice(TYPES),
+                 skill_category=rng.choice(SKILLS), difficulty=rng.choice(DIFFICULTIES),
+                 question_text=f'question {i}', options=['a', 'b', 'c', 'd'], usage_count=0,
+                 is_active=True) for i in range(n)]
+    for start in range(0, n, 5000):
+        db.session.bulk_insert_mappings(Question, rows[start:start + 5000])
+    db.session.commit()
+
+
+def legacy_start(job_id, used):
+    questions = Question.query.filter_by(job_description_id=job_id, is_active=True).all()
+    data = [{'id': q.id, 'question_type': q.question_type, 'skill_category': q.skill_category,
+             'difficulty': q.difficulty, 'question_text': q.question_text, 'options': q.options}
+            for q in questions]
+    available = [q for q in data if q['id'] not in used]
+    if len(available) < PER_START:
+        used.clear()
+        available = data
+    selected = random.sample(available, PER_START)
+    used.update(q['id'] for q in selected)
+    return selected
+
+
+def selector_start(selector, job_id):
+    ids = selector.select(job_id, PER_START)
+    questions = {q.id: q for q in Question.query.filter(Question.id.in_(ids)).all()}
+    return [{'id': q.id, 'question_type': q.question_type, 'skill_category': q.skill_category,
+             'difficulty': q.difficulty, 'question_text': q.question_text, 'options': q.options}
+            for q in (questions[i] for i in ids)]
+
+
+def drive(app, start_fn, starts, threads):
+    def timed(_):
+        with app.app_context():
+            t0 = time.perf_counter()
+            result = start_fn()
+            db.session.remove()
+            return time.perf_counter() - t0, result
+
+    begin = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(timed, range(starts)))
+    elapsed = time.perf_counter() - begin
+
+    latencies = sorted(r[0] * 1000 for r in results)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return starts / elapsed, statistics.median(latencies), p99, results[-1][1]
+
+
+if __name__ == '__main__':
+    num_questions = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    starts = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    threads = int(sys.argv[3]) if len(sys.argv) > 3 else 16
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        db.init_app(app)
+        job_id = str(uuid.uuid4())
+        with app.app_context():
+            db.create_all()
+            seed(job_id, num_questions)
+
+        used = set()
+        sample = min(starts, 20)
+        rate, p50, p99, _ = drive(app, lambda: legacy_start(job_id, used), sample, threads)
+        print(f"{'full-bank scan':<16} {rate:9.1f} starts/s  p50 {p50:8.1f} ms  p99 {p99:8.1f} ms  ({sample} starts)")
+
+        selector = QuestionSelector()
+        rate, p50, p99, last = drive(app, lambda: selector_start(selector, job_id), starts, threads)
+        print(f"{'QuestionSelector':<16} {rate:9.1f} starts/s  p50 {p50:8.1f} ms  p99 {p99:8.1f} ms  ({starts} starts)")
+
+        with app.app_context():
+            selector.flush()
+            counts = [row[0] or 0 for row in db.session.query(Question.usage_count).all()]
+        print(f"usage_count: total {sum(counts)}  min {min(counts)}  max {max(counts)}  "
+              f"flushes {selector.flushes}")
+        print(f"last set mix: {dict(Counter(q['question_type'] for q in last))}, "
+              f"skills {len({q['skill_category'] for q in last})}")
@@ -0,0 +1,171 @@
+"""Bulk re-grade of a job with many evaluated assessments.
+
+Seeds a throwaway SQLite database with one job of 20 questions (12 MCQ,
+4 coding, 4 subjective) and N evaluated assessments answering all of
+them; coding answers are drawn from a few dozen variants per question,
+as a drive's are. Then times, through regrade_assessments on the eager
+task queue:
+
+  full       the assessments as evaluated before per-answer scores were
+             stored: every answer of every sheet is rescored
+  one key    one MCQ's correct_answer fixed: only its answers rescored,
+             the rest of each sheet re-aggregated from stored scores
+  test case  one coding question's test cases changed
+
+against what re-scoring took without the engine: evaluate_assessment
+per sheet and a commit per assessment with its leaderboard entry (timed
+on a sample and scaled to N).
+
+    python benchmarks/bench_regrade.py [assessments]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CHUNK = 10000
+SAMPLE = 1000
+WORDS = 'index query cache latency join partition replica shard commit rollback lock thread'.split()
+
+
+def load_app(tmp):
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+    os.environ['TASK_QUEUE_BACKEND'] = 'eager'
+    os.environ['SUBJECTIVE_LLM_RESCORE'] = 'false'
+    import app as app_module
+    return app_module
+
+
+def seed(app_module, n):
+    from models import db, Candidate, JobDescription, Question, User
+    rng = random.Random(25)
+    job_id = str(uuid.uuid4())
+    with app_module.app.app_context():
+        db.session.add(User(id='bench', email='bench@example.com', role='admin'))
+        db.session.add(JobDescription(id=job_id, title='Bench', description='bench', cutoff_score=50.0))
+        questions = []
+        for i in range(20):
+            kind = 'mcq' if i < 12 else 'coding' if i < 16 else 'subjective'
+            questions.append(Question(
+                id=str(uuid.uuid4()), job_description_id=job_id, question_type=kind,
+                skill_category=['python', 'sql', 'systems'][i % 3], question_text=f'q{i}',
+                correct_answer='Option A' if kind == 'mcq' else None, programming_language='python',
+                test_cases=[{"input": repr(f"case{k}"), "output": repr(f"case{k}"[::-1])} for k in range(5)]
+                if kind == 'coding' else None,
+                model_answer=' '.join(rng.sample(WORDS, 8)) if kind == 'subjective' else None
+            ))
+        db.session.add_all(questions)
+        db.session.commit()
+        layout = [(q.id, q.question_type) for q in questions]
+
+        variants = {
+            question_id: [
+                f"def solution(text{v}):\n    return text{v}[::-1]\n" if v % 3 else
+                f"def solution(s):\n    return s[{v}::-1]\n" for v in range(30)
+            ] for question_id, kind in layout if kind == 'coding'
+        }
+        raw = db.engine.raw_connection()
+        now = datetime.utcnow()
+        for start in range(0, n, CHUNK):
+            candidates, assessments, entries = [], [], []
+            for i in range(start, min(n, start + CHUNK)):
+                candidate_id, assessment_id = str(uuid.uuid4()), str(uuid.uuid4())
+                answers = []
+                for question_id, kind in layout:
+                    if kind == 'mcq':
+                        answers.append({"question_id": question_id, "answer": rng.choice(['Option A', 'Option B'])})
+                    elif kind == 'coding':
+                        answers.append({"question_id": question_id, "code": rng.choice(variants[question_id])})
+                    else:
+                        answers.append({"question_id": question_id, "answer": ' '.join(rng.sample(WORDS, 6))})
+                candidates.append((candidate_id, f'c{i}@example.com', f'C{i}', 0, 0.0, 0))
+                assessments.append((assessment_id, job_id, candidate_id, f'code{i}', 'evaluated',
+                                    json.dumps([q for q, _ in layout]), json.dumps(answers), now, now))
+                entries.append((str(uuid.uuid4()), job_id, assessment_id, candidate_id, 0.0))
+            raw.cursor().executemany(
+                'INSERT INTO candidates (id, email, name, total_assessments, avg_score, profiled_assessments) '
+                'VALUES (?, ?, ?, ?, ?, ?)', candidates)
+            raw.cursor().executemany(
+                'INSERT INTO assessments (id, job_description_id, candidate_id, assessment_code, status, '
+                'question_set, submitted_answers, completed_at, evaluated_at, total_score, is_passed) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0, 0)', assessments)
+            raw.cursor().executemany(
+                'INSERT INTO leaderboards (id, job_description_id, assessment_id, candidate_id, score) '
+                'VALUES (?, ?, ?, ?, ?)', entries)
+            raw.commit()
+        raw.close()
+    return job_id, layout
+
+
+def regrade(app_module, job_id, question_ids=None):
+    from models import db, RegradeRun
+    with app_module.app.app_context():
+        run_id = str(uuid.uuid4())
+        db.session.add(RegradeRun(id=run_id, job_description_id=job_id, question_ids=question_ids or []))
+        db.session.commit()
+        begin = time.perf_counter()
+        app_module.regrade_assessments(run_id)
+        elapsed = time.perf_counter() - begin
+        run = RegradeRun.query.get(run_id)
+        if run.status != 'completed':
+            raise RuntimeError(f"re-grade ended {run.status}: {run.error}")
+        return elapsed, app_module.regrade_status(run)
+
+
+def per_assessment(app_module, job_id, n):
+    """Seconds per assessment re-scored without the engine, from a sample"""
+    from models import db, Assessment
+    service, leaderboard = app_module.evaluation_service, app_module.leaderboard_service
+    with app_module.app.app_context():
+        sample = Assessment.query.filter_by(job_description_id=job_id).limit(SAMPLE).all()
+        begin = time.perf_counter()
+        for assessment in sample:
+            result = service.evaluate_assessment(assessment, assessment.submitted_answers)
+            assessment.total_score = result['total_score']
+            assessment.section_scores = result['section_scores']
+            assessment.skill_scores = result['skill_scores']
+            assessment.is_passed = result['total_score'] >= assessment.job_description.cutoff_score
+            leaderboard.record(assessment)
+            db.session.commit()
+        return (time.perf_counter() - begin) / len(sample) * n
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    with tempfile.TemporaryDirectory() as tmp:
+        app_module = load_app(tmp)
+        from models import db, Question
+        with app_module.app.app_context():
+            db.create_all()
+        app_module.evaluation_service.code_executor.warm()
+        begin = time.perf_counter()
+        job_id, layout = seed(app_module, n)
+        print(f"seeded {n} evaluated assessments x {len(layout)} answers in {time.perf_counter() - begin:.0f}s, "
+              f"{app_module.evaluation_service.code_executor.workers} executor workers")
+
+        results = [('full (no stored scores)',) + regrade(app_module, job_id)]
+        with app_module.app.app_context():
+            mcq = Question.query.get(layout[0][0])
+            mcq.correct_answer = 'Option B'
+            db.session.commit()
+        results.append(('one MCQ key fixed',) + regrade(app_module, job_id))
+        with app_module.app.app_context():
+            coding = Question.query.get(next(q for q, kind in layout if kind == 'coding'))
+            coding.test_cases = coding.test_cases + [{"input": "''", "output": "''"}]
+            db.session.commit()
+        results.append(('one coding test case',) + regrade(app_module, job_id))
+        scaled = per_assessment(app_module, job_id, n)
+        app_module.evaluation_service.code_executor.shutdown()
+
+        print(f"\n{'re-grade of ' + str(n):<26} {'seconds':>8} {'assess/s':>9} {'regraded':>9} {'rescored answers':>17}")
+        print(f"{'per-assessment (scaled)':<26} {scaled:>8.1f} {n / scaled:>9.0f}")
+        for label, elapsed, status in results:
+            print(f"{label:<26} {elapsed:>8.1f} {status['processed'] / elapsed:>9.0f} {status['regraded']:>9} "
+                  f"{status['rescored_answers']:>17}")
+        print(f"verdict cache: {app_module.evaluation_service.verdict_cache.stats()}")
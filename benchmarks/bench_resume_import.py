@@ -0,0 +1,158 @@
+"""Bulk resume import: wall-clock time and peak RSS, before and after.
+
+Builds a zip of synthetic text resumes (name, email, phone, a skills
+section, dated roles and a few paragraphs of prose) and imports it into a
+throwaway SQLite database, each mode in its own process so peak RSS is
+its own:
+
+  inline    the upload read into memory, every member read and parsed
+            in the request thread, one commit per candidate
+  pipeline  POST /api/candidates/resumes/bulk with the zip as a raw
+            streamed body: saved to disk in chunks, unpacked member by
+            member, text extracted in the ResumeIngestor process pool,
+            candidates written in RESUME_WRITE_BATCH batches through
+            db_writer (eager task queue, so the import runs inline)
+
+Peak RSS is reported for the importing process and, separately, its
+largest pool worker. Real resumes are mostly PDFs, which compress poorly
+inside the zip; the .txt resumes here compress about 3x, so the
+in-memory upload of ``inline`` is smaller than it would be in production.
+
+    python benchmarks/bench_resume_import.py [resumes] [workers]
+"""
+import io
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SKILLS = ['Python', 'Java', 'JavaScript', 'React', 'Node.js', 'PostgreSQL', 'MongoDB', 'AWS', 'Docker',
+          'Kubernetes', 'machine learning', 'pandas', 'Jenkins', 'Agile', 'Scrum', 'Git', 'C++', 'Django',
+          'Flask', 'Linux', 'REST APIs', 'TypeScript', 'Golang']
+WORDS = ('designed built led migrated optimized services pipeline platform latency customers team '
+         'scalable reliable deployed monitoring reduced cost improved throughput data analytics '
+         'dashboards reporting backend frontend mobile payments search ranking').split()
+
+
+def resume(rng, i):
+    first, last = f"Candidate{i}", rng.choice(['Rao', 'Shah', 'Iyer', 'Das', 'Khan', 'Singh', 'Patel'])
+    start = rng.randint(2005, 2020)
+    roles = []
+    year = start
+    while year < 2024:
+        end = min(2024, year + rng.randint(1, 4))
+        roles.append(f"Software Engineer, Company {rng.randint(1, 500)}    {year} - {end if end < 2024 else 'present'}")
+        year = end
+    prose = '\n\n'.join(' '.join(rng.choice(WORDS) for _ in range(80)) for _ in range(6))
+    return (
+        f"{first} {last}\n{first.lower()}.{last.lower()}{i}@example.com | +91 98{rng.randint(10000000, 99999999)}\n\n"
+        f"SUMMARY\n{rng.randint(1, 15)} years of experience building software.\n\n"
+        f"SKILLS\n{', '.join(rng.sample(SKILLS, 6))}\n\nEXPERIENCE\n" + '\n'.join(roles) + f"\n\n{prose}\n"
+    )
+
+
+def build_zip(path, n):
+    rng = random.Random(21)
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for i in range(n):
+            archive.writestr(f"resumes/{i:05d}.txt", resume(rng, i))
+
+
+def load_app(tmp, workers):
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+    os.environ['TASK_QUEUE_BACKEND'] = 'eager'
+    os.environ['RESUME_PARSE_WORKERS'] = str(workers)
+    from config import Config
+    Config.UPLOAD_FOLDER = os.path.join(tmp, 'uploads')
+    import app as app_module
+    return app_module
+
+
+def run_inline(app_module, zip_path):
+    from models import db, Candidate
+    from resume_parser import parse_resume_text
+
+    with open(zip_path, 'rb') as f:
+        upload = f.read()  # request.files['file'].read()
+    imported = 0
+    with app_module.app.app_context():
+        with zipfile.ZipFile(io.BytesIO(upload)) as archive:
+            for member in archive.infolist():
+                text = archive.read(member).decode('utf-8', errors='replace')
+                parsed = parse_resume_text(text)
+                db.session.add(Candidate(
+                    id=str(uuid.uuid4()), email=parsed["email"], name=parsed["headline"], resume_text=text,
+                    claimed_skills=list(parsed["skills"]), experience_years=parsed["experience_years"],
+                    parsed_resume_data={"skills": parsed["skills"], "phone": parsed["phone"]}
+                ))
+                db.session.commit()
+                imported += 1
+    return imported
+
+
+def run_pipeline(app_module, zip_path):
+    from flask_jwt_extended import create_access_token
+    from models import db, ResumeImport, User
+
+    app = app_module.app
+    with app.app_context():
+        db.session.add(User(id='bench', email='bench@example.com'))
+        db.session.commit()
+        headers = {'Authorization': f'Bearer {create_access_token(identity="bench")}'}
+    app_module.resume_ingestor.warm()
+
+    client = app.test_client()
+    with open(zip_path, 'rb') as body:
+        response = client.post('/api/candidates/resumes/bulk', input_stream=body, headers=headers,
+                               content_type='application/zip', content_length=os.path.getsize(zip_path))
+    with app.app_context():
+        resume_import = ResumeImport.query.get(response.json["import_id"])
+        if resume_import.status != 'completed':
+            raise RuntimeError(f"import ended {resume_import.status}: {resume_import.errors}")
+        return resume_import.parsed
+
+
+def worker(mode, zip_path, workers):
+    tmp = tempfile.mkdtemp()
+    app_module = load_app(tmp, workers)
+    begin = time.perf_counter()
+    imported = (run_inline if mode == 'inline' else run_pipeline)(app_module, zip_path)
+    elapsed = time.perf_counter() - begin
+    app_module.resume_ingestor.shutdown()
+    print(json.dumps({
+        "imported": imported, "seconds": elapsed,
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "worker_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    }))
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--worker']:
+        worker(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+        sys.exit(0)
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 2)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        zip_path = os.path.join(tmp, 'resumes.zip')
+        build_zip(zip_path, n)
+        print(f"{n} resumes, zip {os.path.getsize(zip_path) / 2 ** 20:.1f} MiB, {workers} parse workers")
+        print(f"{'mode':>9} {'imported':>9} {'seconds':>8} {'resumes/s':>10} {'peak RSS MiB':>13} {'worker RSS':>11}")
+        for mode in ('inline', 'pipeline'):
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', mode, zip_path, str(workers)],
+                                 capture_output=True, text=True)
+            lines = [line for line in out.stdout.splitlines() if line.startswith('{')]
+            if not lines:
+                raise RuntimeError(out.stderr[-2000:])
+            r = json.loads(lines[-1])
+            print(f"{mode:>9} {r['imported']:>9} {r['seconds']:>8.1f} {r['imported'] / r['seconds']:>10.0f} "
+                  f"{r['rss_mb']:>13.1f} {r['worker_rss_mb']:>11.1f}")
@@ -0,0 +1,83 @@
+"""Cross-candidate similarity lookup latency at 100k stored answers.
+
+Fills one question's EmbeddingLSH with N answer embeddings (clustered, as
+answers to the same question are) and its MinHashLSH with N code answers,
+plants near-duplicates, then reports per-query latency against a
+brute-force scan and the fraction of planted duplicates found.
+
+    python benchmarks/bench_similarity_index.py [N]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from similarity_index import EmbeddingLSH, MinHashLSH
+
+DIM = 384
+QUERIES = 200
+
+
+def embeddings(n, rng):
+    # A few topical clusters plus noise, roughly like real answer embeddings
+    centers = rng.standard_normal((20, DIM)).astype(np.float32)
+    data = centers[rng.integers(0, 20, n)] + 0.8 * rng.standard_normal((n, DIM)).astype(np.float32)
+    return data / np.linalg.norm(data, axis=1, keepdims=True)
+
+
+def code_answer(i, rnd):
+    name = rnd.choice(['s', 'text', 'word', 'value'])
+    body = rnd.choice([f"return {name}[::-1]", f"return ''.join(reversed({name}))",
+                       f"out = ''\n    for ch in {name}:\n        out = ch + out\n    return out"])
+    extra = f"\n\ndef helper_{i}(x):\n    return x * {rnd.randint(2, 99)} + {i}\n"
+    return f"def solution({name}):\n    {body}\n{extra}"
+
+
+def bench_embeddings(n, rng):
+    data = embeddings(n, rng)
+    index = EmbeddingLSH(DIM)
+    start = time.perf_counter()
+    for i in range(0, n, 10000):
+        index.add(data[i:i + 10000], list(range(i, min(i + 10000, n))))
+    build = time.perf_counter() - start
+
+    targets = rng.integers(0, n, QUERIES)
+    queries = data[targets] + 0.15 * rng.standard_normal((QUERIES, DIM)).astype(np.float32) / np.sqrt(DIM)
+
+    start = time.perf_counter()
+    found = sum(index.query(q, exclude_owner=-1)[1] == t for q, t in zip(queries, targets))
+    lsh = (time.perf_counter() - start) / QUERIES
+
+    start = time.perf_counter()
+    for q in queries[:20]:
+        int(np.argmax(data @ (q / np.linalg.norm(q))))
+    brute = (time.perf_counter() - start) / 20
+
+    print(f"embedding LSH  n={n}: build {build:.1f}s, query {lsh * 1000:.2f} ms "
+          f"(brute force {brute * 1000:.2f} ms), near-duplicates found {found / QUERIES:.0%}")
+
+
+def bench_minhash(n):
+    rnd = random.Random(1)
+    answers = [code_answer(i, rnd) for i in range(n)]
+    index = MinHashLSH()
+    start = time.perf_counter()
+    for i, code in enumerate(answers):
+        index.add(code, i)
+    build = time.perf_counter() - start
+
+    targets = [rnd.randrange(n) for _ in range(QUERIES)]
+    start = time.perf_counter()
+    scores = [index.query("# copied\n" + answers[t].replace('    ', '  '), exclude_owner=-1)[0] for t in targets]
+    query = (time.perf_counter() - start) / QUERIES
+    print(f"code MinHash   n={n}: build {build:.1f}s, query {query * 1000:.2f} ms, "
+          f"median similarity of planted copies {sorted(scores)[len(scores) // 2]:.2f}")
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    bench_embeddings(n, np.random.default_rng(0))
+    bench_minhash(n)
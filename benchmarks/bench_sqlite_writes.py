@@ -0,0 +1,212 @@
+"""Concurrent start/submit/evaluate throughput on SQLite, per write mode.
+
+Each mode gets its own throwaway database and several worker processes
+(like gunicorn workers, each importing app.py) writing to it at once:
+
+  legacy    rollback journal, default pragmas, every request thread
+            commits for itself (what the app did before)
+  wal       SQLITE_PRAGMAS (WAL, synchronous=normal, busy_timeout), still
+            one commit per request thread
+  group     SQLITE_PRAGMAS plus SQLiteWriter: start, submit and the
+            evaluation's writes are group-committed by one writer thread
+            per process
+
+Writer threads loop start -> submit (evaluated inline, eager task queue)
+on an MCQ-only job while reader threads page the leaderboard. Reports
+completed submissions per second, submit latency, leaderboard read
+latency under write load, and errors, split out by "database is locked".
+
+    python benchmarks/bench_sqlite_writes.py [processes] [threads] [per_thread] [modes...]
+"""
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import traceback
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+READERS = 2  # per process
+
+
+def seed_job():
+    from models import db, JobDescription, Question
+
+    job_id = str(uuid.uuid4())
+    db.session.add(JobDescription(id=job_id, title='bench', description='bench', cutoff_score=50))
+    db.session.add_all(
+        Question(id=str(uuid.uuid4()), job_description_id=job_id, question_type='mcq',
+                 skill_category=skill, difficulty='medium', question_text=f'{skill} {i}',
+                 options=['a', 'b', 'c', 'd'], correct_answer='a')
+        for skill in ('python', 'sql', 'docker') for i in range(20)
+    )
+    db.session.commit()
+    return job_id
+
+
+def load_app(mode, database):
+    os.environ['DATABASE_URL'] = f"sqlite:///{database}"
+    os.environ['TASK_QUEUE_BACKEND'] = 'eager'
+    os.environ['SQLITE_GROUP_COMMIT'] = 'true' if mode == 'group' else 'false'
+    from config import Config
+    if mode == 'legacy':
+        Config.SQLITE_PRAGMAS = {}
+    import app as app_module
+    return app_module
+
+
+def work(mode, database, job_id, worker, threads, per_thread, start_at):
+    """One worker process: writer and reader threads against the shared database"""
+    app_module = load_app(mode, database)
+    app = app_module.app
+    app.config['PROPAGATE_EXCEPTIONS'] = True
+    errors = {"locked": 0, "other": 0}
+    errors_lock = threading.Lock()
+
+    def record_error(text):
+        with errors_lock:
+            errors["locked" if 'database is locked' in text else "other"] += 1
+
+    class TaskErrors(logging.Handler):
+        # Eager evaluation failures are logged by the task queue, not raised
+        def emit(self, record):
+            text = record.getMessage()
+            if record.exc_info:
+                text += ''.join(traceback.format_exception(*record.exc_info))
+            record_error(text)
+
+    logging.getLogger('task_queue').addHandler(TaskErrors())
+
+    submit_times, read_times = [], []
+    done = []
+    stop_reading = threading.Event()
+
+    def write_loop(thread):
+        client = app.test_client()
+        for i in range(per_thread):
+            try:
+                started = client.post('/api/assessments/start', json={
+                    'email': f'{worker}-{thread}-{i}@example.com', 'name': f'Candidate {i}', 'job_id': job_id
+                })
+                if started.status_code != 200:
+                    record_error(started.get_data(as_text=True))
+                    continue
+                body = started.json
+                answers = [{'question_id': q['id'], 'answer': 'a' if n % 2 else 'b'}
+                           for n, q in enumerate(body['questions'])]
+                begin = time.perf_counter()
+                submitted = client.post(f"/api/assessments/{body['assessment_id']}/submit", json={'answers': answers})
+                submit_times.append(time.perf_counter() - begin)
+                if submitted.status_code != 202:
+                    record_error(submitted.get_data(as_text=True))
+                    continue
+                done.append(1)
+            except Exception:
+                record_error(traceback.format_exc())
+
+    def read_loop():
+        client = app.test_client()
+        while not stop_reading.is_set():
+            begin = time.perf_counter()
+            try:
+                client.get(f'/api/jobs/{job_id}/leaderboard?per_page=20')
+            except Exception:
+                record_error(traceback.format_exc())
+            read_times.append(time.perf_counter() - begin)
+
+    readers = [threading.Thread(target=read_loop) for _ in range(READERS)]
+    writers = [threading.Thread(target=write_loop, args=(t,)) for t in range(threads)]
+    time.sleep(max(0.0, start_at - time.time()))
+    for t in readers + writers:
+        t.start()
+    for t in writers:
+        t.join()
+    finished_at = time.time()
+    stop_reading.set()
+    for t in readers:
+        t.join()
+    app_module.db_writer.stop()
+
+    print(json.dumps({
+        "done": len(done), "finished_at": finished_at, "submit_times": submit_times, "read_times": read_times,
+        "locked": errors["locked"], "other": errors["other"], "writer": app_module.db_writer.stats()
+    }))
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] * 1000 if values else 0.0
+
+
+def run_mode(mode, processes, threads, per_thread):
+    import sqlite3
+
+    database = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    script = os.path.abspath(__file__)
+    seeded = subprocess.run([sys.executable, script, '--seed', mode, database],
+                            capture_output=True, text=True, check=True)
+    job_id = seeded.stdout.split()[-1]
+
+    start_at = time.time() + 3  # after every worker has imported app.py
+    workers = [subprocess.Popen(
+        [sys.executable, script, '--work', mode, database, job_id, str(w), str(threads), str(per_thread),
+         str(start_at)], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    ) for w in range(processes)]
+    results = []
+    for worker in workers:
+        out, err = worker.communicate()
+        lines = [line for line in out.splitlines() if line.startswith('{')]
+        if not lines:
+            raise RuntimeError(err[-2000:])
+        results.append(json.loads(lines[-1]))
+
+    with sqlite3.connect(database) as conn:
+        journal_mode = conn.execute('PRAGMA journal_mode').fetchone()[0]
+        evaluated = conn.execute("SELECT count(*) FROM assessments WHERE status = 'evaluated'").fetchone()[0]
+
+    elapsed = max(r["finished_at"] for r in results) - start_at
+    submit_times = [t for r in results for t in r["submit_times"]]
+    read_times = [t for r in results for t in r["read_times"]]
+    commits = sum(r["writer"]["commits"] for r in results)
+    return {
+        "mode": mode, "journal_mode": journal_mode, "submits_per_s": sum(r["done"] for r in results) / elapsed,
+        "evaluated": evaluated, "submit_p50": percentile(submit_times, 0.5),
+        "submit_p99": percentile(submit_times, 0.99), "read_p50": percentile(read_times, 0.5),
+        "read_p99": percentile(read_times, 0.99), "locked": sum(r["locked"] for r in results),
+        "other": sum(r["other"] for r in results),
+        "jobs_per_commit": sum(r["writer"]["jobs"] for r in results) / commits if commits else 0.0
+    }
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--seed']:
+        app_module = load_app(sys.argv[2], sys.argv[3])
+        with app_module.app.app_context():
+            print(seed_job())
+        sys.exit(0)
+    if sys.argv[1:2] == ['--work']:
+        mode, database, job_id, worker, threads, per_thread, start_at = sys.argv[2:9]
+        work(mode, database, job_id, int(worker), int(threads), int(per_thread), float(start_at))
+        sys.exit(0)
+
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    per_thread = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    modes = sys.argv[4:] or ['legacy', 'wal', 'group']
+    total = processes * threads * per_thread
+
+    print(f"{processes} processes x {threads} writer threads x {per_thread} submissions, "
+          f"{READERS} leaderboard readers per process")
+    print(f"{'mode':>7} {'journal':>8} {'submits/s':>10} {'evaluated':>10} {'submit p50/p99 ms':>18} "
+          f"{'read p50/p99 ms':>16} {'locked':>7} {'other':>6} {'jobs/commit':>12}")
+    for mode in modes:
+        r = run_mode(mode, processes, threads, per_thread)
+        print(f"{r['mode']:>7} {r['journal_mode']:>8} {r['submits_per_s']:>10.1f} "
+              f"{r['evaluated']:>5}/{total:<4} {r['submit_p50']:>8.1f}/{r['submit_p99']:<9.1f} "
+              f"{r['read_p50']:>7.1f}/{r['read_p99']:<8.1f} {r['locked']:>7} {r['other']:>6} "
+              f"{r['jobs_per_commit']:>12.1f}")
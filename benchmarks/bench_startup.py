@@ -0,0 +1,55 @@
+"""Application startup cost: import time and first-request latency.
+
+Each run starts a fresh interpreter, imports app.py, then times the first
+/api/login request (which needs no ML model) and the first call that does
+need the embedding model. It also lists which heavy libraries were already
+imported by ``import app``.
+
+    python benchmarks/bench_startup.py [runs]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY = ['sentence_transformers', 'torch', 'sklearn', 'nltk', 'textstat', 'openai']
+
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+loaded = [m for m in %(heavy)r if m in sys.modules]
+client = app.app.test_client()
+t2 = time.perf_counter()
+client.post('/api/login', json={'email': 'nobody@example.com', 'password': 'x'})
+t3 = time.perf_counter()
+app.ai_service.detect_plagiarism(['first answer', 'second answer'])
+t4 = time.perf_counter()
+print(json.dumps({'import': t1 - t0, 'first_login': t3 - t2, 'first_model_call': t4 - t3,
+                  'loaded': loaded}))
+"""
+
+
+def run_once(db_path):
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{db_path}')
+    out = subprocess.run(
+        [sys.executable, '-c', PROBE % {'heavy': HEAVY}],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+if __name__ == '__main__':
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [run_once(os.path.join(tmp, f'startup{i}.db')) for i in range(runs)]
+
+    for key in ('import', 'first_login', 'first_model_call'):
+        values = [r[key] * 1000 for r in results]
+        print(f"{key:<18} median {statistics.median(values):8.1f} ms")
+    print(f"heavy modules loaded by 'import app': {', '.join(results[0]['loaded']) or 'none'}")
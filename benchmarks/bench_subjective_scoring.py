@@ -0,0 +1,116 @@
+"""Subjective answer scoring throughput: one LLM call per answer vs SubjectiveScorer.
+
+Builds a synthetic bank of subjective questions (model answer + rubric
+keywords) and candidate answers that paraphrase, partially cover or ignore
+the model answer. The baseline sends every answer to a stand-in LLM with a
+fixed latency (what evaluate_subjective_answer costs per answer); the
+scorer embeds, keyword-matches and readability-scores the whole batch at
+once and only sends the borderline band to the stand-in LLM.
+
+The embedding model is a stand-in with a per-text cost unless --real is
+given, in which case all-MiniLM-L6-v2 is loaded.
+
+    python benchmarks/bench_subjective_scoring.py [--real] [answers] [questions]
+"""
+import os
+import random
+import sys
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from embedding_service import EmbeddingService
+from subjective_scoring import SubjectiveScorer
+
+LLM_LATENCY = 1.5  # seconds per completion
+LLM_CONCURRENCY = 8
+PER_TEXT = 0.0002  # seconds per text for the stand-in embedding model
+
+WORDS = ("cache index query latency throughput thread process memory lock queue "
+         "transaction replica shard partition consistency availability hash tree "
+         "graph vector batch stream buffer socket request response token schema").split()
+FILLER = "the a it is we then so that this when because and of to in for with".split()
+
+
+class StandInModel:
+    """Bag-of-words embedding: shared words give similar vectors"""
+
+    def __init__(self, dim=384):
+        self.dim = dim
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True):
+        time.sleep(PER_TEXT * len(texts))
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                out[row, zlib.crc32(word.encode()) % self.dim] += 1
+        return out
+
+
+def make_bank(num_questions, rng):
+    questions = []
+    for i in range(num_questions):
+        keywords = rng.sample(WORDS, 5)
+        sentences = [f"{rng.choice(FILLER)} {k} {rng.choice(FILLER)} {rng.choice(WORDS)}" for k in keywords]
+        questions.append(SimpleNamespace(
+            id=f"q{i}",
+            question_text=f"Explain how {keywords[0]} relates to {keywords[1]}",
+            model_answer='. '.join(sentences) + '.',
+            rubric={"keywords": keywords}
+        ))
+    return questions
+
+
+def make_answer(question, rng):
+    words = question.model_answer.rstrip('.').split()
+    kind = rng.random()
+    if kind < 0.4:
+        kept = words
+    elif kind < 0.8:
+        kept = [w for w in words if rng.random() < 0.5]
+    else:
+        kept = rng.sample(WORDS, 6)
+    return ' '.join(kept + rng.sample(FILLER, 4)) + '.'
+
+
+def llm_score(question, answer):
+    time.sleep(LLM_LATENCY)
+    return 50.0
+
+
+if __name__ == '__main__':
+    args = [a for a in sys.argv[1:] if a != '--real']
+    num_answers = int(args[0]) if args else 5000
+    num_questions = int(args[1]) if len(args) > 1 else 50
+
+    rng = random.Random(7)
+    bank = make_bank(num_questions, rng)
+    items = [(q, make_answer(q, rng)) for q in (rng.choice(bank) for _ in range(num_answers))]
+
+    model = None if '--real' in sys.argv else StandInModel()
+    embeddings = EmbeddingService(model=model, cache_size=0)
+    # Load sklearn/textstat before timing
+    SubjectiveScorer(embeddings).score_batch(items[:10])
+
+    # Baseline: one LLM completion per answer, LLM_CONCURRENCY at a time;
+    # timed on a sample since the full batch would take minutes
+    sample = items[:LLM_CONCURRENCY * 4]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=LLM_CONCURRENCY) as pool:
+        list(pool.map(lambda item: llm_score(*item), sample))
+    baseline_rate = len(sample) / (time.perf_counter() - start)
+
+    for label, evaluator in (("vectorized only", None), ("vectorized + LLM band", llm_score)):
+        scorer = SubjectiveScorer(embeddings, llm_evaluator=evaluator, llm_concurrency=LLM_CONCURRENCY)
+        start = time.perf_counter()
+        scores = scorer.score_batch(items)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<24} {num_answers / elapsed:9.0f} answers/s  "
+              f"llm calls {scorer.llm_calls:5d}  mean score {np.mean(scores):5.1f}")
+
+    print(f"{'LLM per answer':<24} {baseline_rate:9.1f} answers/s  "
+          f"(stand-in latency {LLM_LATENCY}s, concurrency {LLM_CONCURRENCY})")
@@ -0,0 +1,105 @@
+"""Coding evaluation of a drive's submissions with and without the verdict cache.
+
+Builds a stream of coding answers to a few questions the way a drive
+produces them: most candidates submit the starter template or a reversal
+that differs only in whitespace and comments, some resubmit an answer they
+already sent, and the rest write their own (renamed variables, a different
+algorithm). Every answer is scored with EvaluationService.submit_coding,
+first with the cache bypassed (straight to the executor pool, as before)
+and then through the VerdictCache, and the scores compared.
+
+    python benchmarks/bench_verdict_cache.py [submissions] [questions] [cases]
+"""
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from code_executor import CodeExecutorPool
+from evaluation_service import EvaluationService
+from verdict_cache import VerdictCache
+
+# Each case does a little real work so a run costs what a typical answer does
+TEMPLATE = "def solution(s):\n    return ''.join(reversed(s * 200))[-len(s):]\n"
+VARIANTS = [
+    "def solution(s):\n\n    return ''.join(reversed(s * 200))[-len(s):]   \n",
+    "# reverse the string\ndef solution(s):\n    return ''.join(reversed(s*200))[-len(s):]  # done\n",
+    "def solution(s):\n\treturn ''.join( reversed( s * 200 ) )[ -len(s): ]\n",
+]
+
+
+def own_answer(rng, i):
+    name = f"text_{i}"
+    if rng.random() < 0.5:
+        return f"def solution({name}):\n    return {name}[::-1] if {i} >= 0 else None\n"
+    return (f"def solution({name}):\n    out = []\n    for ch in {name}:\n        out.insert(0, ch)\n"
+            f"    return ''.join(out) + '' * {i}\n")
+
+
+def submissions(rng, n, questions):
+    stream = []
+    for i in range(n):
+        question = rng.choice(questions)
+        draw = rng.random()
+        if draw < 0.1 and stream:
+            stream.append(rng.choice(stream))  # a retried submit
+        elif draw < 0.5:
+            stream.append((question, TEMPLATE))
+        elif draw < 0.7:
+            stream.append((question, rng.choice(VARIANTS)))
+        else:
+            stream.append((question, own_answer(rng, i)))
+    return stream
+
+
+def score_all(service, stream, cached, sheet=4):
+    """Scores in order, a sheet of answers in flight at a time as evaluate_assessment sends them"""
+    scores = []
+    for start in range(0, len(stream), sheet):
+        futures = []
+        for question, code in stream[start:start + sheet]:
+            if cached:
+                futures.append(service.submit_coding(question, code))
+            else:
+                futures.append(service.code_executor.submit(code, question.test_cases, question.programming_language))
+        scores.extend(service.score_verdicts(question, service.collect_verdicts(f))
+                      for (question, _), f in zip(stream[start:start + sheet], futures))
+    return scores
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    question_count = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    cases = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+
+    questions = [
+        SimpleNamespace(id=f"q{q}", programming_language='python', test_cases=[
+            {"input": repr(f"q{q}case{i}" * 50), "output": repr((f"q{q}case{i}" * 50)[::-1])} for i in range(cases)
+        ]) for q in range(question_count)
+    ]
+    stream = submissions(random.Random(24), n, questions)
+
+    pool = CodeExecutorPool()
+    pool.warm()
+    service = EvaluationService(code_executor=pool, verdict_cache=VerdictCache())
+
+    begin = time.perf_counter()
+    uncached = score_all(service, stream, cached=False)
+    uncached_s = time.perf_counter() - begin
+
+    begin = time.perf_counter()
+    cached = score_all(service, stream, cached=True)
+    cached_s = time.perf_counter() - begin
+    pool.shutdown()
+
+    stats = service.verdict_cache.stats()
+    print(f"{n} coding answers, {question_count} questions x {cases} cases, {pool.workers} workers")
+    print(f"{'path':<12} {'seconds':>8} {'answers/s':>10}")
+    print(f"{'uncached':<12} {uncached_s:>8.2f} {n / uncached_s:>10.0f}")
+    print(f"{'cached':<12} {cached_s:>8.2f} {n / cached_s:>10.0f}")
+    print(f"hit rate {stats['hit_rate']:.1%}, coalesced {stats['coalesced']}, entries {stats['size']}, "
+          f"executor runs {stats['misses'] - stats['coalesced']}")
+    print(f"scores identical: {uncached == cached}")
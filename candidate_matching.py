@@ -0,0 +1,316 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from embedding_service import from_bytes
+from models import db, Candidate, CandidateSkillProfile
+
+_LEVELS = 255  # proficiency 0..1 is stored as a uint8
+_LOAD_BATCH = 5000
+_REFRESH_BATCH = 500
+
+# candidate id, {skill: proficiency 0..1}, experience years, resume embedding
+MatchRecord = Tuple[str, Dict[str, float], float, Optional[np.ndarray]]
+
+
+def normalize_skill(name) -> str:
+    return str(name or '').strip().lower()
+
+
+class CandidateMatchIndex:
+    """Whole-pool candidate ranking for a job description, in NumPy.
+
+    Each skill is a column of uint8 proficiencies (0..255 for 0..1), one
+    entry per candidate, so a JD only touches the columns of its required
+    skills: a million candidates cost a megabyte per skill. A candidate's
+    proficiency is their assessed average from ``candidate_skill_profiles``
+    where they have one, otherwise the resume claim scaled by
+    ``claimed_weight``.
+
+    The skill fit mirrors ``AIService.analyze_skill_gaps``: one minus the
+    summed shortfall ``max(0, required - current)`` over the summed
+    requirement. Since ``required - min(required, current)`` is that
+    shortfall, the pool is scored with one ``np.minimum`` and one add per
+    required skill in integer arithmetic, and ``np.argpartition`` picks the
+    best without sorting the pool. With resume embeddings loaded, the best
+    ``shortlist`` skill fits are re-ranked by blending in cosine similarity
+    to the JD's embedding (``embedding_weight``); the float16 embedding
+    matrix is only read for those rows.
+
+    The index is loaded on first use. ``sync`` then re-reads candidates
+    whose ``skills_updated_at`` moved since the last check (resume imports
+    and evaluations stamp it), at most every ``sync_interval`` seconds, so
+    every worker process picks up changes made by the others. Each check
+    looks back ``sync_overlap`` seconds for transactions that committed
+    late with an earlier stamp.
+    """
+
+    def __init__(self, claimed_weight: float = 0.6, embedding_weight: float = 0.3, shortlist: int = 1000,
+                 sync_interval: float = 2.0, sync_overlap: float = 30.0):
+        self.claimed_weight = claimed_weight
+        self.embedding_weight = embedding_weight
+        self.shortlist = shortlist
+        self.sync_interval = sync_interval
+        self.sync_overlap = timedelta(seconds=sync_overlap)
+        self._lock = threading.RLock()
+        self._reset()
+        self.queries = 0
+        self.refreshed = 0
+        self.last_query_ms = 0.0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _reset(self):
+        self.ids: List[str] = []
+        self.row_of: Dict[str, int] = {}
+        self.columns: Dict[str, np.ndarray] = {}
+        self.experience = np.zeros(0, dtype=np.float32)
+        self.embeddings: Optional[np.ndarray] = None
+        self.has_embedding = np.zeros(0, dtype=bool)
+        self._capacity = 0
+        self._watermark: Optional[datetime] = None
+        self._synced_at = 0.0
+
+    # ============ Building ============
+
+    def add(self, records: Iterable[MatchRecord]):
+        """Insert or replace candidates' rows"""
+        records = list(records)
+        if not records:
+            return
+        with self._lock:
+            size = len(self.ids)
+            rows = np.empty(len(records), dtype=np.int64)
+            replaced = []
+            for i, record in enumerate(records):
+                row = self.row_of.get(record[0])
+                if row is None:
+                    row = len(self.ids)
+                    self.row_of[record[0]] = row
+                    self.ids.append(record[0])
+                else:
+                    replaced.append(row)
+                rows[i] = row
+            self._grow(len(self.ids), size)
+
+            if replaced:
+                for column in self.columns.values():
+                    column[replaced] = 0
+
+            by_skill: Dict[str, Tuple[List[int], List[float]]] = {}
+            for row, (_, skills, _, _) in zip(rows.tolist(), records):
+                for skill, value in skills.items():
+                    skill_rows, values = by_skill.setdefault(skill, ([], []))
+                    skill_rows.append(row)
+                    values.append(value)
+            for skill, (skill_rows, values) in by_skill.items():
+                column = self.columns.get(skill)
+                if column is None:
+                    column = self.columns[skill] = np.zeros(self._capacity, dtype=np.uint8)
+                column[skill_rows] = np.clip(np.rint(np.asarray(values, dtype=np.float32) * _LEVELS), 0, _LEVELS)
+
+            self.experience[rows] = [record[2] or 0.0 for record in records]
+            embedded = [(row, record[3]) for row, record in zip(rows.tolist(), records) if record[3] is not None]
+            self.has_embedding[rows] = False
+            if embedded:
+                vectors = np.vstack([vector for _, vector in embedded]).astype(np.float32)
+                vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+                if self.embeddings is None:
+                    self.embeddings = np.zeros((self._capacity, vectors.shape[1]), dtype=np.float16)
+                embedded_rows = [row for row, _ in embedded]
+                self.embeddings[embedded_rows] = vectors
+                self.has_embedding[embedded_rows] = True
+
+    def reserve(self, capacity: int):
+        """Allocate room for this many candidates up front, rather than doubling into it"""
+        with self._lock:
+            self._grow(capacity, len(self.ids))
+
+    def _grow(self, needed: int, size: int):
+        if needed <= self._capacity:
+            return
+        capacity = max(needed, min(2 * self._capacity, needed + (1 << 20)), 1024)
+
+        def grown(array: np.ndarray) -> np.ndarray:
+            bigger = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+            bigger[:size] = array[:size]
+            return bigger
+
+        self.columns = {skill: grown(column) for skill, column in self.columns.items()}
+        self.experience = grown(self.experience)
+        self.has_embedding = grown(self.has_embedding)
+        if self.embeddings is not None:
+            self.embeddings = grown(self.embeddings)
+        self._capacity = capacity
+
+    def record(self, candidate_id: str, claimed, experience_years, resume_embedding,
+               assessed: Dict[str, float]) -> MatchRecord:
+        """Index row for one candidate from their columns and assessed averages"""
+        skills: Dict[str, float] = {}
+        if isinstance(claimed, dict):
+            for skill, value in claimed.items():
+                try:
+                    skills[normalize_skill(skill)] = min(max(float(value), 0.0), 1.0) * self.claimed_weight
+                except (TypeError, ValueError):
+                    continue
+        elif isinstance(claimed, list):
+            for skill in claimed:
+                skills[normalize_skill(skill)] = self.claimed_weight
+        skills.update(assessed)
+        skills.pop('', None)
+        vector = from_bytes(resume_embedding) if resume_embedding else None
+        return candidate_id, skills, float(experience_years or 0.0), vector
+
+    def _assessed(self, candidate_ids: Optional[List[str]]) -> Dict[str, Dict[str, float]]:
+        """{candidate id: {skill: average assessed score / 100}}"""
+        table = CandidateSkillProfile.__table__
+        query = db.select(table.c.candidate_id, table.c.skill, table.c.assessments, table.c.score_sum)
+        if candidate_ids is not None:
+            query = query.where(table.c.candidate_id.in_(candidate_ids))
+        assessed: Dict[str, Dict[str, float]] = {}
+        for candidate_id, skill, assessments, score_sum in db.session.execute(query):
+            if assessments:
+                assessed.setdefault(candidate_id, {})[normalize_skill(skill)] = \
+                    min(max(score_sum / assessments / 100, 0.0), 1.0)
+        return assessed
+
+    def _columns_query(self):
+        return db.select(
+            Candidate.id, Candidate.claimed_skills, Candidate.experience_years, Candidate.resume_embedding
+        )
+
+    def load(self):
+        """Rebuild from every candidate with claimed or assessed skills"""
+        with self._lock:
+            started = datetime.utcnow()
+            self._reset()
+            self.reserve(db.session.execute(db.select(db.func.count()).select_from(Candidate)).scalar())
+            assessed = self._assessed(None)
+            batch = []
+            for row in db.session.execute(self._columns_query().execution_options(yield_per=_LOAD_BATCH)):
+                record = self.record(row.id, row.claimed_skills, row.experience_years, row.resume_embedding,
+                                     assessed.pop(row.id, {}))
+                if record[1] or record[3] is not None:
+                    batch.append(record)
+                if len(batch) >= _LOAD_BATCH:
+                    self.add(batch)
+                    batch = []
+            self.add(batch)
+            self._watermark = started
+            self._synced_at = time.monotonic()
+
+    def refresh(self, candidate_ids: List[str]):
+        """Re-read these candidates' skills, experience and resume embedding"""
+        for start in range(0, len(candidate_ids), _REFRESH_BATCH):
+            chunk = candidate_ids[start:start + _REFRESH_BATCH]
+            assessed = self._assessed(chunk)
+            rows = db.session.execute(self._columns_query().where(Candidate.id.in_(chunk))).all()
+            self.add(
+                self.record(row.id, row.claimed_skills, row.experience_years, row.resume_embedding,
+                            assessed.get(row.id, {}))
+                for row in rows
+            )
+            self.refreshed += len(rows)
+
+    def sync(self):
+        """Load on first use, then pick up candidates changed since the last check"""
+        if self._watermark is not None and time.monotonic() - self._synced_at < self.sync_interval:
+            return
+        with self._lock:
+            if self._watermark is None:
+                self.load()
+                return
+            if time.monotonic() - self._synced_at < self.sync_interval:
+                return
+            started = datetime.utcnow()
+            changed = list(db.session.execute(
+                db.select(Candidate.id).where(Candidate.skills_updated_at >= self._watermark - self.sync_overlap)
+            ).scalars())
+            self.refresh(changed)
+            self._watermark = started
+            self._synced_at = time.monotonic()
+
+    # ============ Querying ============
+
+    def top_k(self, required: Dict, k: int = 50, min_experience: float = 0.0,
+              query_vector: Optional[np.ndarray] = None) -> List[Dict]:
+        """Best k candidates for {skill: required proficiency 0..1}, best first"""
+        levels: Dict[str, int] = {}
+        for skill, proficiency in (required or {}).items():
+            try:
+                level = int(round(min(max(float(proficiency), 0.0), 1.0) * _LEVELS))
+            except (TypeError, ValueError):
+                continue
+            if level:
+                skill = normalize_skill(skill)
+                levels[skill] = max(levels.get(skill, 0), level)
+        if not levels or k <= 0:
+            return []
+
+        begin = time.perf_counter()
+        with self._lock:
+            n = len(self.ids)
+            if n == 0:
+                return []
+
+            # covered = sum of min(required, current): the part of the
+            # requirement met, so the summed shortfall is total - covered
+            covered = np.zeros(n, dtype=np.int32)
+            for skill, level in levels.items():
+                column = self.columns.get(skill)
+                if column is not None:
+                    covered += np.minimum(column[:n], np.uint8(level))
+            if min_experience:
+                covered[self.experience[:n] < min_experience] = -1
+
+            rerank = query_vector is not None and self.embeddings is not None and self.embedding_weight > 0
+            m = min(n, max(k, self.shortlist) if rerank else k)
+            rows = np.argpartition(covered, n - m)[n - m:]
+            rows = rows[covered[rows] > 0]
+            fit = covered[rows] / np.float32(sum(levels.values()))
+
+            semantic = None
+            score = fit
+            if rerank and len(rows):
+                query = np.asarray(query_vector, dtype=np.float32)
+                query /= max(float(np.linalg.norm(query)), 1e-12)
+                embedded = self.has_embedding[rows]
+                semantic = np.zeros(len(rows), dtype=np.float32)
+                semantic[embedded] = np.clip(self.embeddings[rows[embedded]].astype(np.float32) @ query, 0, 1)
+                # Without a resume embedding the skill fit stands in for similarity
+                score = np.where(embedded, (1 - self.embedding_weight) * fit + self.embedding_weight * semantic, fit)
+
+            order = np.argsort(-score, kind='stable')[:k]
+            matches = []
+            for i in order.tolist():
+                row = int(rows[i])
+                matches.append({
+                    "candidate_id": self.ids[row],
+                    "score": round(float(score[i]) * 100, 1),
+                    "skill_fit": round(float(fit[i]) * 100, 1),
+                    "semantic_similarity": round(float(semantic[i]), 3)
+                    if semantic is not None and self.has_embedding[row] else None,
+                    "experience_years": float(self.experience[row]),
+                    "skills": {
+                        skill: round(float(self.columns[skill][row]) / _LEVELS, 2) if skill in self.columns else 0.0
+                        for skill in levels
+                    }
+                })
+
+        self.queries += 1
+        self.last_query_ms = (time.perf_counter() - begin) * 1000
+        return matches
+
+    def stats(self) -> Dict:
+        return {
+            "candidates": len(self.ids),
+            "skills": len(self.columns),
+            "with_embeddings": int(self.has_embedding[:len(self.ids)].sum()),
+            "memory_mb": round((sum(c.nbytes for c in self.columns.values()) + self.experience.nbytes
+                                + (self.embeddings.nbytes if self.embeddings is not None else 0)) / 2 ** 20, 1),
+            "queries": self.queries,
+            "refreshed": self.refreshed,
+            "last_query_ms": round(self.last_query_ms, 2)
+        }
@@ -0,0 +1,161 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Tuple
+from models import db, Assessment, Candidate, CandidateSkillProfile, JobDescription
+
+
+class CandidateProfileService:
+    """Per-candidate skill aggregates, maintained as assessments are evaluated.
+
+    ``record`` folds one evaluated assessment's ``skill_scores`` into the
+    candidate's ``candidate_skill_profiles`` rows (count, sum, min and max
+    per skill) with a couple of statements, so a report reads the profile
+    in one query however long the candidate's history is.
+
+    ``Candidate.profiled_assessments`` counts the assessments folded in.
+    A candidate evaluated before profiles existed has fewer than
+    ``total_assessments`` and gets rebuilt from their assessments once.
+    """
+
+    def __init__(self, strength_threshold: float = 70, top_n: int = 3):
+        self.strength_threshold = strength_threshold
+        self.top_n = top_n
+
+    def record(self, assessment: Assessment):
+        """Add an evaluated assessment's skill scores to its candidate's profile"""
+        table = CandidateSkillProfile.__table__
+        scores = {
+            skill: float(score) for skill, score in (assessment.skill_scores or {}).items()
+            if score is not None
+        }
+        now = datetime.utcnow()
+
+        if scores:
+            existing = set(db.session.execute(
+                db.select(table.c.skill).where(
+                    table.c.candidate_id == assessment.candidate_id, table.c.skill.in_(scores)
+                )
+            ).scalars())
+
+            updates = [{"p_skill": s, "p_score": v} for s, v in scores.items() if s in existing]
+            if updates:
+                score = db.bindparam('p_score')
+                db.session.execute(
+                    table.update()
+                    .where(table.c.candidate_id == assessment.candidate_id,
+                           table.c.skill == db.bindparam('p_skill'))
+                    .values(
+                        assessments=table.c.assessments + 1,
+                        score_sum=table.c.score_sum + score,
+                        min_score=db.case((table.c.min_score > score, score), else_=table.c.min_score),
+                        max_score=db.case((table.c.max_score < score, score), else_=table.c.max_score),
+                        updated_at=now
+                    ),
+                    updates
+                )
+
+            inserts = [{
+                "candidate_id": assessment.candidate_id, "skill": s, "assessments": 1,
+                "score_sum": v, "min_score": v, "max_score": v, "updated_at": now
+            } for s, v in scores.items() if s not in existing]
+            if inserts:
+                db.session.execute(table.insert(), inserts)
+
+        candidates = Candidate.__table__
+        db.session.execute(
+            candidates.update().where(candidates.c.id == assessment.candidate_id)
+            .values(profiled_assessments=db.func.coalesce(candidates.c.profiled_assessments, 0) + 1)
+        )
+
+    def rebuild(self, candidate_id: str):
+        """Recompute a candidate's profile from all their evaluated assessments"""
+        self.rebuild_many([candidate_id])
+
+    def rebuild_many(self, candidate_ids: List[str]):
+        """Recompute several candidates' profiles with one read and a bulk delete and insert"""
+        if not candidate_ids:
+            return
+        table = CandidateSkillProfile.__table__
+        rows = db.session.execute(
+            db.select(Assessment.candidate_id, Assessment.skill_scores)
+            .where(Assessment.candidate_id.in_(candidate_ids), Assessment.status == 'evaluated')
+        ).all()
+
+        aggregates: Dict[str, Dict[str, List[float]]] = {
+            candidate_id: defaultdict(list) for candidate_id in candidate_ids
+        }
+        evaluated = dict.fromkeys(candidate_ids, 0)
+        for candidate_id, skill_scores in rows:
+            evaluated[candidate_id] += 1
+            for skill, score in (skill_scores or {}).items():
+                if score is not None:
+                    aggregates[candidate_id][skill].append(float(score))
+
+        now = datetime.utcnow()
+        db.session.execute(table.delete().where(table.c.candidate_id.in_(candidate_ids)))
+        inserts = [{
+            "candidate_id": candidate_id, "skill": skill, "assessments": len(values),
+            "score_sum": sum(values), "min_score": min(values), "max_score": max(values),
+            "updated_at": now
+        } for candidate_id, skills in aggregates.items() for skill, values in skills.items()]
+        if inserts:
+            db.session.execute(table.insert(), inserts)
+
+        candidates = Candidate.__table__
+        db.session.execute(
+            candidates.update().where(candidates.c.id == db.bindparam('p_id'))
+            .values(profiled_assessments=db.bindparam('p_count')),
+            [{"p_id": candidate_id, "p_count": count} for candidate_id, count in evaluated.items()]
+        )
+
+    def profile(self, candidate_id: str) -> Dict:
+        """Per-skill statistics with strengths and weaknesses"""
+        rows = CandidateSkillProfile.query.filter_by(candidate_id=candidate_id).all()
+        skills = {
+            row.skill: {
+                "assessments": row.assessments,
+                "average": row.score_sum / row.assessments if row.assessments else 0.0,
+                "min": row.min_score,
+                "max": row.max_score
+            }
+            for row in rows
+        }
+
+        ranked = sorted(skills.items(), key=lambda item: item[1]["average"], reverse=True)
+        return {
+            "skills": skills,
+            "strengths": [s for s, stats in ranked[:self.top_n] if stats["average"] >= self.strength_threshold],
+            "weaknesses": [s for s, stats in ranked[-self.top_n:] if stats["average"] < self.strength_threshold]
+        }
+
+    def history(self, candidate_id: str, page: int, per_page: int) -> Tuple[List[Dict], int]:
+        """One page of the candidate's assessments, newest first, and the total count"""
+        # Job titles come from the join rather than a lazy load per row.
+        # Both queries walk ix_assessments_candidate_completed; a window
+        # count in the page query would materialize the whole history.
+        rows = db.session.execute(
+            db.select(
+                Assessment.id, Assessment.total_score, Assessment.is_passed, Assessment.status,
+                Assessment.completed_at, JobDescription.title
+            )
+            .outerjoin(JobDescription, JobDescription.id == Assessment.job_description_id)
+            .where(Assessment.candidate_id == candidate_id)
+            .order_by(Assessment.completed_at.desc().nullslast(), Assessment.id)
+            .limit(per_page).offset((page - 1) * per_page)
+        ).all()
+        total = db.session.execute(
+            db.select(db.func.count()).select_from(Assessment)
+            .where(Assessment.candidate_id == candidate_id)
+        ).scalar()
+
+        return [
+            {
+                "assessment_id": row.id,
+                "job_title": row.title,
+                "score": row.total_score,
+                "status": "Passed" if row.is_passed else "Failed",
+                "assessment_status": row.status,
+                "date": row.completed_at.isoformat() if row.completed_at else None
+            }
+            for row in rows
+        ], total
@@ -0,0 +1,424 @@
+import ast
+import ctypes
+import json
+import math
+import os
+import platform
+import resource
+import select
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+CLONE_NEWUSER = 0x10000000
+CLONE_NEWNET = 0x40000000
+
+PR_SET_NO_NEW_PRIVS = 38
+PR_SET_SECCOMP = 22
+SECCOMP_MODE_FILTER = 2
+SECCOMP_RET_KILL_PROCESS = 0x80000000
+SECCOMP_RET_ERRNO_EPERM = 0x00050001
+SECCOMP_RET_ALLOW = 0x7fff0000
+
+# Syscalls candidate code never needs: new processes and threads,
+# sockets, leaving or re-entering the jail, touching other processes,
+# raising its own limits. (audit arch, numbers, first x32 number or None)
+SECCOMP_DENIED = {
+    'x86_64': (0xC000003E, [
+        56, 57, 58, 435, 59, 322,       # clone, fork, vfork, clone3, execve, execveat
+        41, 42, 53,                     # socket, connect, socketpair
+        101, 310, 311,                  # ptrace, process_vm_readv/writev
+        161, 165, 166, 155, 272, 308,   # chroot, mount, umount2, pivot_root, unshare, setns
+        62, 200, 234,                   # kill, tkill, tgkill
+        160, 302,                       # setrlimit, prlimit64
+        304, 321, 250,                  # open_by_handle_at, bpf, keyctl
+    ], 0x40000000),
+    'aarch64': (0xC00000B7, [
+        220, 435, 221, 281,
+        198, 203, 199,
+        117, 270, 271,
+        51, 40, 39, 41, 97, 268,
+        129, 130, 131,
+        164, 261,
+        265, 280, 219,
+    ], None),
+}
+
+# Imported by the helper before it forks: a chrooted child can't load
+# anything from disk, so these are the modules a solution may import
+PRELOADED_MODULES = (
+    'array', 'bisect', 'collections', 'copy', 'dataclasses', 'datetime', 'decimal',
+    'enum', 'fractions', 'functools', 'heapq', 'itertools', 'json', 'math',
+    'operator', 'random', 're', 'statistics', 'string', 'typing'
+)
+
+# The only environment the helpers (and so candidate code) ever see
+HELPER_ENV = {'PATH': '/usr/bin:/bin', 'LANG': 'C.UTF-8'}
+
+MALFORMED_OUTPUT = "Runtime error: malformed sandbox output"
+
+
+class CaseTimeout(Exception):
+    pass
+
+
+class CodeExecutorPool:
+    """Pool of warm, sandboxed Python executors for coding questions.
+
+    Each worker is a small helper interpreter: this file run with
+    ``python -I`` and a scrubbed environment, so it holds none of the web
+    app's memory (the embedding model, DB handles, listening sockets) or
+    secrets. A submission (candidate code plus its test-case inputs) is
+    sent to a helper in one JSON line; the helper forks a jailed child
+    that runs every case in-process and reports each result's ``str()``
+    and timing. Forking a warm interpreter costs about a millisecond,
+    versus tens of milliseconds to start a fresh ``python`` per test case.
+
+    Expected outputs never leave this process: the child shares the
+    helper's memory and writes to a pipe it could fill with anything, so
+    results are compared here, and output that isn't exactly one
+    well-formed result per case fails the whole submission.
+
+    A thread per helper does the round trip, so submissions return
+    futures as before. A helper that dies is replaced on its next
+    submission.
+    """
+
+    def __init__(self, workers: Optional[int] = None, case_timeout: float = 5.0,
+                 memory_limit_mb: int = 256, max_output_kb: int = 64, sandbox_uid: int = 65534):
+        self.workers = workers or os.cpu_count() or 2
+        self.limits = {
+            "case_timeout": case_timeout,
+            "memory_bytes": memory_limit_mb * 1024 * 1024,
+            "file_size_bytes": max_output_kb * 1024,
+            "sandbox_uid": sandbox_uid,
+        }
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._local = threading.local()
+        self._helpers: List[subprocess.Popen] = []
+        self._lock = threading.Lock()
+        self.restarts = 0
+
+    @property
+    def threads(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._threads is None:
+                self._threads = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='code-executor')
+            return self._threads
+
+    def warm(self):
+        """Start every helper ahead of the first submission"""
+        barrier = threading.Barrier(self.workers)
+
+        def start():
+            self._helper()
+            barrier.wait(timeout=30)
+
+        for future in [self.threads.submit(start) for _ in range(self.workers)]:
+            future.result()
+
+    def submit(self, code: str, test_cases: List[Dict], language: str = 'python') -> Future:
+        """Queue one submission; the future resolves to a list of verdicts"""
+        return self.threads.submit(self._execute, code, test_cases, language)
+
+    def run(self, code: str, test_cases: List[Dict], language: str = 'python') -> List[Dict]:
+        """Run one submission and wait for its verdicts"""
+        return self.submit(code, test_cases, language).result()
+
+    def _helper(self) -> subprocess.Popen:
+        helper = getattr(self._local, 'helper', None)
+        if helper is None or helper.poll() is not None:
+            helper = subprocess.Popen(
+                [sys.executable, '-I', os.path.abspath(__file__)],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                env=HELPER_ENV, cwd='/', close_fds=True
+            )
+            self._local.helper = helper
+            with self._lock:
+                self._helpers = [h for h in self._helpers if h.poll() is None] + [helper]
+        return helper
+
+    def _execute(self, code: str, test_cases: List[Dict], language: str) -> List[Dict]:
+        helper = self._helper()
+        inputs = [test_case.get('input', '') for test_case in test_cases]
+        request = json.dumps([code, inputs, language, self.limits]).encode() + b'\n'
+        try:
+            helper.stdin.write(request)
+            helper.stdin.flush()
+            line = helper.stdout.readline()
+        except OSError:
+            line = b''
+        if not line:
+            # The helper itself died; the next submission starts a new one
+            helper.kill()
+            helper.wait()
+            self._local.helper = None
+            with self._lock:
+                self.restarts += 1
+            return _failed(test_cases, "Execution aborted (resource limit)")
+        return judge(test_cases, json.loads(line))
+
+    def shutdown(self):
+        if self._threads is not None:
+            self._threads.shutdown(wait=True)
+            self._threads = None
+        with self._lock:
+            helpers, self._helpers = self._helpers, []
+        for helper in helpers:
+            helper.stdin.close()
+            helper.wait()
+        self._local = threading.local()
+
+
+def _failed(test_cases: List, error: str) -> List[Dict]:
+    return [{"passed": False, "time_ms": 0.0, "error": error} for _ in test_cases]
+
+
+def _expected(expected) -> str:
+    """A test case's expected output as the str() a solution's result must match"""
+    try:
+        return str(ast.literal_eval(str(expected)))
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return str(expected)
+
+
+def _well_formed(output) -> bool:
+    return (
+        isinstance(output, dict) and set(output) == {"result", "time_ms", "error"}
+        and isinstance(output["time_ms"], (int, float)) and math.isfinite(output["time_ms"])
+        and (isinstance(output["result"], str) if output["error"] is None
+             else isinstance(output["error"], str) and output["result"] is None)
+    )
+
+
+def judge(test_cases: List[Dict], outputs) -> List[Dict]:
+    """Verdicts from a helper's per-case outputs; anything but one well-formed output per case fails every case"""
+    if not isinstance(outputs, list) or len(outputs) != len(test_cases) \
+            or not all(_well_formed(output) for output in outputs):
+        return _failed(test_cases, MALFORMED_OUTPUT)
+    return [
+        {
+            "passed": output["error"] is None and output["result"] == _expected(test_case.get('output', '')),
+            "time_ms": float(output["time_ms"]),
+            "error": output["error"]
+        }
+        for test_case, output in zip(test_cases, outputs)
+    ]
+
+
+def _aborted(inputs: List, error: str) -> List[Dict]:
+    return [{"result": None, "time_ms": 0.0, "error": error} for _ in inputs]
+
+
+def execute_submission(code: str, inputs: List, language: str, limits: Dict) -> List[Dict]:
+    """Run one submission on every test-case input in a forked, sandboxed child.
+
+    Returns {"result": str() of the solution's return value or None,
+    "time_ms", "error"} per input, as the child reported them; judge()
+    checks them.
+    """
+    if language != 'python':
+        return _aborted(inputs, f"Unsupported language: {language}")
+
+    jail = tempfile.mkdtemp(prefix='sandbox-')
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+
+    if pid == 0:
+        os.close(read_fd)
+        status = 0
+        try:
+            outputs = _run_sandboxed(code, inputs, limits, jail, write_fd)
+            payload = json.dumps(outputs).encode()
+            with os.fdopen(write_fd, 'wb') as out:
+                out.write(payload)
+        except BaseException:
+            status = 1
+        finally:
+            os._exit(status)
+
+    os.close(write_fd)
+    # Every case has its own timer in the child; this is the backstop
+    deadline = time.monotonic() + limits["case_timeout"] * max(len(inputs), 1) + 1
+    max_bytes = (limits["file_size_bytes"] + 256) * max(len(inputs), 1)
+    chunks, received = [], 0
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([read_fd], [], [], remaining)[0]:
+                os.kill(pid, signal.SIGKILL)
+                return _aborted(inputs, "Time limit exceeded")
+            chunk = os.read(read_fd, 65536)
+            if not chunk:
+                break
+            received += len(chunk)
+            if received > max_bytes:
+                os.kill(pid, signal.SIGKILL)
+                return _aborted(inputs, MALFORMED_OUTPUT)
+            chunks.append(chunk)
+    finally:
+        os.close(read_fd)
+        os.waitpid(pid, 0)
+        shutil.rmtree(jail, ignore_errors=True)
+
+    if not chunks:
+        # Killed before it wrote anything (memory, CPU time)
+        return _aborted(inputs, "Execution aborted (resource limit)")
+    try:
+        return json.loads(b''.join(chunks))
+    except ValueError:
+        return _aborted(inputs, MALFORMED_OUTPUT)
+
+
+def _data_size() -> int:
+    """Bytes of this process's data segment (VmData), 0 if /proc isn't there"""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmData:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def _apply_limits(limits: Dict, total_cases: int, data_size: int):
+    cpu_seconds = int(limits["case_timeout"] * max(total_cases, 1)) + 1
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    # The memory budget is on top of what the interpreter already holds;
+    # RLIMIT_AS would also count shared libraries and reserved mappings
+    memory = data_size + limits["memory_bytes"]
+    resource.setrlimit(resource.RLIMIT_DATA, (memory, memory))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (limits["file_size_bytes"], limits["file_size_bytes"]))
+    resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+
+
+def _isolate(jail: str, uid: int):
+    """Chroot into the empty jail with no network, as an unprivileged user.
+
+    As root: a private network namespace, chroot, then setuid to ``uid``.
+    Otherwise: a user namespace (root inside it only) gives the same
+    network namespace and chroot. Where neither is allowed the child keeps
+    the filesystem view; seccomp still applies.
+    """
+    libc = ctypes.CDLL(None, use_errno=True)
+    if os.geteuid() == 0:
+        libc.unshare(CLONE_NEWNET)
+        os.chown(jail, uid, uid)
+        os.chroot(jail)
+        os.chdir('/')
+        os.setgroups([])
+        os.setgid(uid)
+        os.setuid(uid)
+        return
+
+    euid, egid = os.geteuid(), os.getegid()
+    if libc.unshare(CLONE_NEWUSER | CLONE_NEWNET) == 0:
+        for name, value in (('setgroups', 'deny'), ('uid_map', f'0 {euid} 1'), ('gid_map', f'0 {egid} 1')):
+            with open(f'/proc/self/{name}', 'w') as f:
+                f.write(value)
+        os.chroot(jail)
+        os.chdir('/')
+    else:
+        os.chdir(jail)
+
+
+def _seccomp():
+    """Deny SECCOMP_DENIED syscalls with EPERM (kill on a foreign arch)"""
+    entry = SECCOMP_DENIED.get(platform.machine())
+    if entry is None:
+        return
+    arch, denied, x32 = entry
+
+    class SockFilter(ctypes.Structure):
+        _fields_ = [("code", ctypes.c_ushort), ("jt", ctypes.c_ubyte), ("jf", ctypes.c_ubyte), ("k", ctypes.c_uint)]
+
+    class SockFprog(ctypes.Structure):
+        _fields_ = [("len", ctypes.c_ushort), ("filter", ctypes.POINTER(SockFilter))]
+
+    load, jeq, jge, ret = 0x20, 0x15, 0x35, 0x06
+    program = [(load, 0, 0, 4), (jeq, 1, 0, arch), (ret, 0, 0, SECCOMP_RET_KILL_PROCESS), (load, 0, 0, 0)]
+    if x32 is not None:
+        program.append((jge, len(denied) + 1, 0, x32))
+    for i, number in enumerate(denied):
+        program.append((jeq, len(denied) - i, 0, number))
+    program += [(ret, 0, 0, SECCOMP_RET_ALLOW), (ret, 0, 0, SECCOMP_RET_ERRNO_EPERM)]
+
+    filters = (SockFilter * len(program))(*[SockFilter(*instruction) for instruction in program])
+    fprog = SockFprog(len(program), filters)
+    libc = ctypes.CDLL(None, use_errno=True)
+    if libc.prctl(PR_SET_NO_NEW_PRIVS, 1, 0, 0, 0) != 0 or \
+            libc.prctl(PR_SET_SECCOMP, SECCOMP_MODE_FILTER, ctypes.byref(fprog), 0, 0) != 0:
+        raise OSError(ctypes.get_errno(), "seccomp filter not installed")
+
+
+def _on_timeout(signum, frame):
+    raise CaseTimeout()
+
+
+def _run_sandboxed(code: str, inputs: List, limits: Dict, jail: str, verdict_fd: int) -> List[Dict]:
+    # Candidate output is not part of the result, and nothing but the
+    # result pipe stays open
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    os.closerange(3, verdict_fd)
+    os.closerange(verdict_fd + 1, os.sysconf('SC_OPEN_MAX'))
+    os.environ.clear()
+
+    data_size = _data_size()
+    _isolate(jail, limits["sandbox_uid"])
+    _apply_limits(limits, len(inputs), data_size)
+    _seccomp()
+    signal.signal(signal.SIGALRM, _on_timeout)
+
+    namespace = {"__name__": "__main__"}
+    try:
+        signal.setitimer(signal.ITIMER_REAL, limits["case_timeout"])
+        exec(compile(code, '<submission>', 'exec'), namespace)
+    except CaseTimeout:
+        return _aborted(inputs, "Time limit exceeded")
+    except BaseException as e:
+        return _aborted(inputs, f"{type(e).__name__}: {e}")
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+    outputs = []
+    for input_val in inputs:
+        start = time.perf_counter()
+        output = {"result": None, "time_ms": 0.0, "error": None}
+        try:
+            signal.setitimer(signal.ITIMER_REAL, limits["case_timeout"])
+            output["result"] = str(eval(f'solution({input_val})', namespace))[:limits["file_size_bytes"]]
+        except CaseTimeout:
+            output["error"] = "Time limit exceeded"
+        except BaseException as e:
+            output["error"] = f"{type(e).__name__}: {e}"[:1000]
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        output["time_ms"] = (time.perf_counter() - start) * 1000
+        outputs.append(output)
+
+    return outputs
+
+
+def serve():
+    """Helper loop: one JSON request per line on stdin, one line of per-case outputs back"""
+    for module in PRELOADED_MODULES:
+        __import__(module)
+    stdin, stdout = sys.stdin.buffer, sys.stdout.buffer
+    for line in stdin:
+        code, inputs, language, limits = json.loads(line)
+        stdout.write(json.dumps(execute_submission(code, inputs, language, limits)).encode() + b'\n')
+        stdout.flush()
+
+
+if __name__ == '__main__':
+    serve()
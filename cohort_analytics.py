@@ -0,0 +1,289 @@
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from cache import TTLCache
+from candidate_matching import normalize_skill
+from models import db, Assessment
+
+PERCENTILES = (10, 25, 50, 75, 90)
+GAP_BIN_WIDTH = 10  # score points; gaps 0-9, 10-19, ..., 100
+SIGNIFICANT_GAP = 20  # as analyze_skill_gaps: a gap over 0.2 of full marks
+HIGH_GAP = 50
+BANDS = (('top 10%', 90), ('75-90th percentile', 75), ('50-75th percentile', 50), ('bottom half', 0))
+
+
+class _Cohort:
+    """A job's evaluated assessments as a (assessments x skills) score matrix; NaN where not assessed"""
+
+    def __init__(self):
+        self.row_of: Dict[str, int] = {}
+        self.col_of: Dict[str, int] = {}
+        self._raw: Dict[str, Optional[int]] = {}  # skill_scores key -> column, None if blank
+        self.scores = np.full((0, 0), np.nan, dtype=np.float32)
+        self.total = np.zeros(0, dtype=np.float32)
+        self.passed = np.zeros(0, dtype=bool)
+        self.watermark: Optional[datetime] = None
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.row_of)
+
+    @property
+    def skills(self) -> List[str]:
+        return sorted(self.col_of, key=self.col_of.get)
+
+    def upsert(self, rows: List[Tuple]):
+        """(assessment id, skill_scores, total_score, is_passed) rows, new or re-evaluated"""
+        if not rows:
+            return
+        n = len(self.row_of)
+        indexes = []
+        for assessment_id, skill_scores, _, _ in rows:
+            row = self.row_of.get(assessment_id)
+            if row is None:
+                row = self.row_of[assessment_id] = len(self.row_of)
+            indexes.append(row)
+            for raw in (skill_scores or {}):
+                if raw not in self._raw:
+                    skill = normalize_skill(raw)
+                    if skill and skill not in self.col_of:
+                        self.col_of[skill] = len(self.col_of)
+                    self._raw[raw] = self.col_of.get(skill) if skill else None
+
+        needed, width = len(self.row_of), len(self.col_of)
+        if needed > len(self.total) or width > self.scores.shape[1]:
+            capacity = max(needed, 2 * len(self.total), 256) if needed > len(self.total) else len(self.total)
+            scores = np.full((capacity, max(width, self.scores.shape[1])), np.nan, dtype=np.float32)
+            scores[:n, :self.scores.shape[1]] = self.scores[:n]
+            self.scores = scores
+            self.total = np.resize(self.total, capacity)
+            self.passed = np.resize(self.passed, capacity)
+
+        self.scores[indexes] = np.nan
+        cells_rows, cells_cols, cells_values = [], [], []
+        for row, (_, skill_scores, total, passed) in zip(indexes, rows):
+            self.total[row] = total or 0.0
+            self.passed[row] = bool(passed)
+            for raw, score in (skill_scores or {}).items():
+                column = self._raw[raw]
+                if score is not None and column is not None:
+                    cells_rows.append(row)
+                    cells_cols.append(column)
+                    cells_values.append(score)
+        if cells_rows:
+            self.scores[cells_rows, cells_cols] = np.asarray(cells_values, dtype=np.float32)
+
+
+class CohortAnalytics:
+    """Skill-gap analytics over every evaluated assessment of a job.
+
+    A job's ``Assessment.skill_scores`` are kept as a float32 matrix with
+    one row per evaluated assessment and one column per skill (NaN where a
+    skill wasn't assessed). Score percentiles, gap histograms against the
+    JD's ``required_skills``, pass rates by skill and per-band skill means
+    then come out of a handful of whole-matrix NumPy reductions rather
+    than a per-candidate ``analyze_skill_gaps`` loop.
+
+    Results are cached per (job, leaderboard version, requirements):
+    the version is bumped whenever an evaluated submission is recorded, so
+    a cached result stands until the next one lands. When it moves, only
+    assessments evaluated since the matrix's watermark are read (looking
+    back ``overlap`` seconds for late commits) and upserted by id, so a
+    job with 100k assessments isn't re-read per submission. Matrices for
+    up to ``max_jobs`` jobs are kept.
+    """
+
+    def __init__(self, max_jobs: int = 32, overlap: float = 30.0):
+        self.overlap = timedelta(seconds=overlap)
+        self.cohorts = TTLCache(max_size=max_jobs)
+        self.results = TTLCache(max_size=max_jobs * 4)
+        self._lock = threading.Lock()
+        self.full_loads = 0
+        self.incremental_loads = 0
+        self.rows_read = 0
+
+    def analyze(self, job_id: str, required: Dict[str, float], version) -> Dict:
+        """Cohort skill analytics for a job; required is {skill: proficiency 0..1}"""
+        required = {
+            normalize_skill(s): float(p) for s, p in (required or {}).items()
+            if normalize_skill(s) and isinstance(p, (int, float))
+        }
+        key = (job_id, version, tuple(sorted(required.items())))
+        result = self.results.get(key)
+        if result is not None:
+            return result
+
+        cohort = self._cohort(job_id)
+        with cohort.lock:
+            self._catch_up(job_id, cohort)
+            result = summarize(cohort, required)
+        result["job_id"] = job_id
+        result["version"] = version
+        self.results.set(key, result)
+        return result
+
+    def _cohort(self, job_id: str) -> _Cohort:
+        with self._lock:
+            cohort = self.cohorts.get(job_id)
+            if cohort is None:
+                cohort = _Cohort()
+                self.cohorts.set(job_id, cohort)
+            return cohort
+
+    def _catch_up(self, job_id: str, cohort: _Cohort):
+        started = datetime.utcnow()
+        query = db.select(
+            Assessment.id, Assessment.skill_scores, Assessment.total_score, Assessment.is_passed
+        ).where(Assessment.job_description_id == job_id, Assessment.status == 'evaluated')
+        if cohort.watermark is None:
+            self.full_loads += 1
+        else:
+            query = query.where(Assessment.evaluated_at >= cohort.watermark - self.overlap)
+            self.incremental_loads += 1
+
+        batch = []
+        for row in db.session.execute(query.execution_options(yield_per=10000)):
+            batch.append(tuple(row))
+            if len(batch) >= 10000:
+                cohort.upsert(batch)
+                self.rows_read += len(batch)
+                batch = []
+        cohort.upsert(batch)
+        self.rows_read += len(batch)
+        cohort.watermark = started
+
+    def invalidate(self, job_id: str):
+        """Drop a job's matrix, e.g. after its assessments were re-graded in bulk"""
+        self.cohorts.pop(job_id)
+
+    def stats(self) -> Dict:
+        return {
+            "jobs": len(self.cohorts),
+            "full_loads": self.full_loads,
+            "incremental_loads": self.incremental_loads,
+            "rows_read": self.rows_read,
+            "results": self.results.stats()
+        }
+
+
+def summarize(cohort: _Cohort, required: Dict[str, float]) -> Dict:
+    """Percentiles, gaps, pass rates and band means over a cohort matrix"""
+    n = len(cohort)
+    skills = cohort.skills
+    for skill in required:
+        if skill not in cohort.col_of:
+            skills.append(skill)  # required but never assessed: reported with no data
+    width = len(cohort.col_of)
+    scores = cohort.scores[:n, :width]
+    if len(skills) > width:
+        scores = np.hstack([scores, np.full((n, len(skills) - width), np.nan, dtype=np.float32)])
+    total = cohort.total[:n]
+    passed = cohort.passed[:n]
+
+    assessed = ~np.isnan(scores)
+    weights = assessed.astype(np.float32)
+    filled = np.nan_to_num(scores, nan=0.0)
+    counts = assessed.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = filled.sum(axis=0, dtype=np.float64) / counts
+        squares = np.einsum('ij,ij->j', filled, filled, dtype=np.float64) / counts
+        stds = np.sqrt(np.maximum(squares - means ** 2, 0.0))
+        percentiles = _column_percentiles(scores, counts)
+        pass_rates = passed.astype(np.float32) @ weights / counts
+
+    # Gaps only for the columns the JD requires, and only where assessed
+    required_columns = [j for j, skill in enumerate(skills) if skill in required]
+    targets = np.array([required[skills[j]] * 100 for j in required_columns], dtype=np.float32)
+    has_gap = assessed[:, required_columns]
+    gaps = np.maximum(targets - filled[:, required_columns], 0.0) * has_gap
+    bins = 100 // GAP_BIN_WIDTH + 1
+    codes = np.arange(len(required_columns)) * bins + np.minimum(gaps // GAP_BIN_WIDTH, bins - 1).astype(np.int64)
+    histograms = np.bincount(codes[has_gap], minlength=len(required_columns) * bins).reshape(-1, bins)
+    below = gaps > 0
+    meeting = has_gap & ~below
+    with np.errstate(invalid='ignore', divide='ignore'):
+        gap_counts = counts[required_columns]
+        gap_means = gaps.sum(axis=0, dtype=np.float64) / gap_counts
+        significant = (gaps > SIGNIFICANT_GAP).sum(axis=0) / gap_counts
+        high = (gaps > HIGH_GAP).sum(axis=0) / gap_counts
+        pass_meeting = meeting[passed].sum(axis=0) / meeting.sum(axis=0)
+        pass_below = below[passed].sum(axis=0) / below.sum(axis=0)
+    gap_of = {skills[j]: i for i, j in enumerate(required_columns)}
+
+    # Bands by total-score percentile; per-band sums as one (bands x skills) product
+    total_percentiles = np.percentile(total, PERCENTILES) if n else np.full(len(PERCENTILES), np.nan)
+    thresholds = {90: total_percentiles[4], 75: total_percentiles[3], 50: total_percentiles[2], 0: -np.inf}
+    edges = np.array([thresholds[percentile] for _, percentile in BANDS])
+    band_of = np.searchsorted(-edges, -total, side='left')
+    membership = np.zeros((len(BANDS), n), dtype=np.float32)
+    membership[band_of, np.arange(n)] = 1.0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        band_means = (membership @ filled) / (membership @ weights)
+    bands = []
+    for b, (label, _) in enumerate(BANDS):
+        bands.append({
+            "band": label,
+            "min_score": _number(edges[b]) if np.isfinite(edges[b]) else None,
+            "candidates": int(membership[b].sum()),
+            "skill_means": {skill: _number(band_means[b, j]) for j, skill in enumerate(skills)}
+        })
+
+    report = []
+    for j, skill in enumerate(skills):
+        entry = {
+            "skill": skill,
+            "required": required.get(skill),
+            "assessed": int(counts[j]),
+            "mean": _number(means[j]),
+            "std": _number(stds[j]),
+            "percentiles": {f"p{p}": _number(percentiles[i, j]) for i, p in enumerate(PERCENTILES)},
+            "pass_rate": _number(pass_rates[j], 4)
+        }
+        if skill in required:
+            g = gap_of[skill]
+            entry["gap"] = {
+                "mean": _number(gap_means[g]),
+                "significant_share": _number(significant[g], 4),
+                "high_share": _number(high[g], 4),
+                "histogram": histograms[g].tolist()
+            }
+            entry["pass_rate_meeting_requirement"] = _number(pass_meeting[g], 4)
+            entry["pass_rate_below_requirement"] = _number(pass_below[g], 4)
+        report.append(entry)
+    # Required skills first, widest average gap first; then by coverage
+    report.sort(key=lambda e: (e["required"] is None, -(e.get("gap", {}).get("mean") or 0), -e["assessed"]))
+
+    return {
+        "cohort_size": n,
+        "pass_rate": _number(passed.mean(), 4) if n else None,
+        "total_score_percentiles": {f"p{p}": _number(v) for p, v in zip(PERCENTILES, total_percentiles)},
+        "gap_bin_width": GAP_BIN_WIDTH,
+        "skills": report,
+        "bands": bands,
+        "generated_at": datetime.utcnow().isoformat()
+    }
+
+
+def _column_percentiles(scores: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """np.nanpercentile per column, by one sort of the matrix (NaNs sort last)"""
+    ordered = np.sort(scores, axis=0)
+    out = np.full((len(PERCENTILES), scores.shape[1]), np.nan, dtype=np.float64)
+    present = counts > 0
+    if not present.any():
+        return out
+    columns = np.nonzero(present)[0]
+    last = counts[columns] - 1
+    for i, p in enumerate(PERCENTILES):
+        # linear interpolation between closest ranks, as np.percentile
+        position = last * p / 100
+        low = np.floor(position).astype(np.int64)
+        high = np.minimum(low + 1, last)
+        fraction = position - low
+        out[i, columns] = ordered[low, columns] * (1 - fraction) + ordered[high, columns] * fraction
+    return out
+
+
+def _number(value, digits: int = 2):
+    value = float(value)
+    return None if np.isnan(value) else round(value, digits)
@@ -11,6 +11,26 @@ class Config:
     # Database
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///assessment.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Apply pending migrations.py steps when app.py is imported; turn off
+    # to run them as a deploy step with `flask --app app migrate`
+    AUTO_MIGRATE = os.getenv('AUTO_MIGRATE', 'true').lower() == 'true'
+    
+    # SQLite profile, applied when DATABASE_URL is sqlite: these pragmas on
+    # every connection (WAL lets reads proceed during a write), and the
+    # start/submit/evaluation writes committed in groups by one writer
+    # thread instead of contending for the write lock
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'wal',
+        'synchronous': 'normal',  # with WAL, durable at checkpoints; never corrupts
+        'busy_timeout': 5000,  # ms other writers (flushers, other workers) wait for the lock
+        'cache_size': -64000,  # KiB
+        'temp_store': 'memory',
+        'mmap_size': 256 * 1024 * 1024
+    }
+    SQLITE_GROUP_COMMIT = os.getenv('SQLITE_GROUP_COMMIT', 'true').lower() == 'true'
+    SQLITE_GROUP_COMMIT_MAX_BATCH = 64  # jobs per transaction
+    SQLITE_GROUP_COMMIT_WAIT_MS = 0  # hold a batch open for more jobs; 0 takes only those already queued
+    SQLITE_LOCK_TIMEOUT = 60  # seconds the writer waits on other processes before failing a batch
     
     # JWT
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'jwt-secret-key')
@@ -18,17 +38,131 @@ class Config:
     
     # OpenAI
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+    LLM_MODEL = os.getenv('LLM_MODEL', 'gpt-3.5-turbo')
+    LLM_MAX_CONCURRENCY = 8  # parallel question-generation calls
+    LLM_REQUEST_TIMEOUT = 60  # seconds per call
+    LLM_MAX_RETRIES = 2
+    
+    # Parsed job description cache
+    JD_CACHE_SIZE = 1024  # in-memory entries
+    JD_CACHE_TTL = 7 * 24 * 3600  # seconds
+    JD_CACHE_PERSISTENT = os.getenv('JD_CACHE_PERSISTENT', 'true').lower() == 'true'
+    JD_CACHE_MAX_ROWS = 50000
+    
+    # Sentence embeddings
+    EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
+    EMBEDDING_BATCH_SIZE = 64
+    EMBEDDING_BATCH_WAIT_MS = 5  # how long to hold a batch open for more texts
+    EMBEDDING_CACHE_SIZE = 10000
+    EMBEDDING_STORAGE_DTYPE = 'float16'  # Question.embedding blobs: float16 or float32
+    # Load the model when app.py is imported (in the gunicorn master with
+    # preload_app) rather than on the first request that needs it
+    PRELOAD_MODELS = os.getenv('PRELOAD_MODELS', 'false').lower() == 'true'
     
     # Redis for Celery
     CELERY_BROKER_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
     CELERY_RESULT_BACKEND = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
     
+    # Background jobs: celery, inprocess (thread pool) or eager (inline)
+    TASK_QUEUE_BACKEND = os.getenv('TASK_QUEUE_BACKEND', 'inprocess')
+    TASK_QUEUE_WORKERS = int(os.getenv('TASK_QUEUE_WORKERS', 4))
+    # Submissions whose evaluation was lost with the worker that queued it
+    # (inprocess jobs live in memory) are queued again by an idle worker
+    EVALUATION_REQUEUE_INTERVAL = 60  # seconds between sweeps in each worker
+    EVALUATION_REQUEUE_AFTER = 600  # seconds queued before an evaluation counts as lost
+    EVALUATION_REQUEUE_BATCH = 200  # per sweep
+    
     # Assessment settings
     MAX_ASSESSMENT_TIME = 7200  # 2 hours in seconds
     QUESTION_BANK_SIZE = 1000
     SIMILARITY_THRESHOLD = 0.8
     
+    # Question selection
+    QUESTIONS_PER_ASSESSMENT = 10
+    QUESTION_INDEX_REFRESH = 300  # seconds before a job's index is reloaded
+    QUESTION_EXPOSURE_FLUSH_EVERY = 500  # pending usage_count increments
+    QUESTION_EXPOSURE_FLUSH_INTERVAL = 5  # seconds
+    QUESTION_CATALOG_SIZE = 512  # jobs whose candidate-facing questions are cached
+    
+    # Pre-built assessment packets for scheduled drives
+    PACKET_POOL_PREFETCH = 256  # ready packets each worker holds ids for
+    PACKET_POOL_MAX_BUILD = 20000  # per request
+    
+    # Leaderboard reads
+    LEADERBOARD_MAX_PER_PAGE = 100
+    LEADERBOARD_EXPORT_MAX = 100000  # rows per streamed export
+    LEADERBOARD_VERSION_SHARDS = 16  # counter rows per job; concurrent evaluations rarely share one
+    
+    # Admin dashboard
+    DASHBOARD_CACHE_TTL = 10  # seconds a computed dashboard is served for
+    STATS_FLUSH_INTERVAL = 5  # seconds between job_stats writes
+    STATS_RATE_WINDOW = 15  # minutes behind submissions_per_min
+    STATS_RETENTION_MINUTES = 1440  # per-minute buckets kept
+    
+    # Answer autosave (write-behind, last save per question wins)
+    AUTOSAVE_FLUSH_INTERVAL = 1.0  # seconds between group commits
+    AUTOSAVE_MAX_PENDING = 20000  # buffered answers that trigger an early flush
+    AUTOSAVE_BATCH_SIZE = 1000  # answers per transaction
+    
+    # Proctoring activity (tab switches, pastes, focus loss, answer timing)
+    ACTIVITY_FLUSH_INTERVAL = 1.0  # seconds between log appends
+    ACTIVITY_MAX_BATCH = 500  # events per request
+    ACTIVITY_BURST_WINDOW = 30  # seconds
+    ACTIVITY_BURST_THRESHOLD = 5  # focus losses within about one window
+    ACTIVITY_MAX_FOCUS_LOSSES = 15
+    ACTIVITY_LARGE_PASTE_CHARS = 200
+    ACTIVITY_MAX_LARGE_PASTES = 3
+    ACTIVITY_MIN_ANSWER_SECONDS = 3
+    ACTIVITY_FAST_ANSWER_Z = 3.0  # below the question's mean log answer time
+    ACTIVITY_MAX_FAST_ANSWERS = 3
+    
+    # Cross-candidate answer similarity (ANN indexes per question)
+    SIMILARITY_LSH_TABLES = 16
+    SIMILARITY_LSH_BITS = 12
+    MINHASH_PERMUTATIONS = 64
+    MINHASH_BANDS = 16
+    SIMILARITY_INDEX_JOBS = 64  # jobs whose indexes each worker keeps
+    
+    # Subjective answer scoring
+    SUBJECTIVE_WEIGHTS = (0.6, 0.3, 0.1)  # semantic, keyword coverage, readability
+    SUBJECTIVE_SIMILARITY_RANGE = (0.2, 0.85)  # cosine mapped to 0 and full marks
+    # Vectorized scores in this band are re-scored by the LLM; set
+    # SUBJECTIVE_LLM_RESCORE=false to never call it during evaluation
+    SUBJECTIVE_LLM_BAND = (40.0, 60.0)
+    SUBJECTIVE_LLM_RESCORE = os.getenv('SUBJECTIVE_LLM_RESCORE', 'true').lower() == 'true'
+    
+    # Code execution sandbox
+    CODE_EXECUTOR_WORKERS = int(os.getenv('CODE_EXECUTOR_WORKERS', os.cpu_count() or 2))
+    CODE_EXECUTION_TIMEOUT = 5  # seconds per test case
+    CODE_EXECUTION_MEMORY_MB = 256  # on top of the helper interpreter's own
+    CODE_SANDBOX_UID = int(os.getenv('CODE_SANDBOX_UID', 65534))  # candidate code runs as this user when we're root
+    VERDICT_CACHE_SIZE = 20000  # (question, test cases, normalized code) verdict lists kept
+    REGRADE_CHUNK_SIZE = 500  # assessments re-graded and written per transaction
+    
     # File upload
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
     UPLOAD_FOLDER = 'uploads'
-    ALLOWED_EXTENSIONS = {'pdf', 'docx', 'txt'}
\ No newline at end of file
+    ALLOWED_EXTENSIONS = {'pdf', 'docx', 'txt'}
+    
+    # Resume ingestion: files kept under UPLOAD_FOLDER/resumes/<import id>,
+    # text extracted in a process pool
+    RESUME_PARSE_WORKERS = int(os.getenv('RESUME_PARSE_WORKERS', 2))  # per gunicorn worker
+    RESUME_PARSE_TIMEOUT = 30  # seconds per file
+    RESUME_PARSE_MEMORY_MB = 512  # per parse worker, on top of what it was forked with
+    RESUME_BULK_MAX_BYTES = 2 * 1024 * 1024 * 1024  # raw application/zip body; multipart is held to MAX_CONTENT_LENGTH
+    RESUME_BULK_MAX_FILES = 20000
+    RESUME_WRITE_BATCH = 200  # parsed resumes per write transaction
+    RESUME_MAX_TEXT_CHARS = 100000  # kept in Candidate.resume_text
+    RESUME_MAX_ERRORS = 100  # per import, reported by the status endpoint
+    
+    # Candidate matching (/api/jobs/<job_id>/matches)
+    MATCH_CLAIMED_WEIGHT = 0.6  # a resume-claimed skill counts as this proficiency; assessed scores override
+    MATCH_EMBEDDING_WEIGHT = 0.3  # share of the score from resume-to-JD embedding similarity
+    MATCH_SHORTLIST = 1000  # best skill fits re-ranked by embedding similarity
+    MATCH_SYNC_INTERVAL = 2  # seconds between checks for changed candidates
+    MATCH_MAX_LIMIT = 200
+    # Embed resumes as they are imported (one model pass per write batch)
+    MATCH_RESUME_EMBEDDINGS = os.getenv('MATCH_RESUME_EMBEDDINGS', 'true').lower() == 'true'
+    
+    # Cohort skill-gap analytics (/api/jobs/<job_id>/skill-gaps)
+    COHORT_ANALYTICS_JOBS = 32  # jobs whose score matrices are kept in memory
\ No newline at end of file
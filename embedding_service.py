@@ -0,0 +1,171 @@
+import hashlib
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+import numpy as np
+from cache import TTLCache
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha1((text or '').encode('utf-8')).hexdigest()
+
+
+class EmbeddingService:
+    """Sentence embeddings with micro-batching and memoization.
+
+    Texts are looked up in a bounded LRU keyed by their hash first. Misses
+    from concurrent callers are queued and a single batching thread encodes
+    them together, waiting at most ``max_wait_ms`` to fill a batch of
+    ``max_batch_size`` texts, so the model runs a few large forward passes
+    instead of many tiny ones.
+    """
+
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', device: str = 'cpu',
+                 max_batch_size: int = 64, max_wait_ms: float = 5.0,
+                 cache_size: int = 10000, storage_dtype: str = 'float16', model=None):
+        self.model_name = model_name
+        self.storage_dtype = storage_dtype
+        self.device = device
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.cache = TTLCache(max_size=cache_size)
+        self._model = model
+        self._model_lock = threading.Lock()
+        self._requests: "queue.Queue" = queue.Queue()
+        self._batcher: Optional[threading.Thread] = None
+        self._batcher_lock = threading.Lock()
+        self.batches = 0
+        self.encoded = 0
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+                    self._model = SentenceTransformer(self.model_name, device=self.device)
+        return self._model
+
+    def encode(self, texts: List[str], cache: bool = True) -> np.ndarray:
+        """Embed texts, returning a float32 matrix with one row per text.
+
+        cache=False skips the LRU for one-off texts (resumes) that would
+        only evict entries worth keeping.
+        """
+        keys = [text_key(t) for t in texts]
+        vectors: Dict[str, np.ndarray] = {}
+        missing: Dict[str, str] = {}
+
+        for key, text in zip(keys, texts):
+            if key in vectors or key in missing:
+                continue
+            cached = self.cache.get(key) if cache else None
+            if cached is not None:
+                vectors[key] = cached
+            else:
+                missing[key] = text
+
+        if missing:
+            future = Future()
+            self._ensure_batcher()
+            self._requests.put((list(missing.values()), future))
+            for key, vector in zip(missing.keys(), future.result()):
+                # Copy so the cache doesn't pin the whole batch matrix
+                vector = vector.copy()
+                if cache:
+                    self.cache.set(key, vector)
+                vectors[key] = vector
+
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack([vectors[key] for key in keys])
+
+    def encode_one(self, text: str) -> np.ndarray:
+        return self.encode([text])[0]
+
+    def _ensure_batcher(self):
+        if self._batcher is None or not self._batcher.is_alive():
+            with self._batcher_lock:
+                if self._batcher is None or not self._batcher.is_alive():
+                    self._batcher = threading.Thread(
+                        target=self._run_batcher, name='embedding-batcher', daemon=True
+                    )
+                    self._batcher.start()
+
+    def _run_batcher(self):
+        while True:
+            pending = [self._requests.get()]
+            size = len(pending[0][0])
+            deadline = time.monotonic() + self.max_wait
+
+            while size < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                pending.append(request)
+                size += len(request[0])
+
+            self._encode_batch(pending)
+
+    def _encode_batch(self, pending):
+        batch = [text for texts, _ in pending for text in texts]
+        try:
+            embeddings = np.asarray(
+                self.model.encode(batch, batch_size=self.max_batch_size, convert_to_numpy=True),
+                dtype=np.float32
+            )
+        except Exception as e:
+            for _, future in pending:
+                future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.encoded += len(batch)
+        offset = 0
+        for texts, future in pending:
+            future.set_result(embeddings[offset:offset + len(texts)])
+            offset += len(texts)
+
+    def question_embeddings(self, questions) -> np.ndarray:
+        """Embeddings for Question rows, reusing and filling Question.embedding.
+
+        Newly computed vectors are assigned to the rows; the caller commits.
+        """
+        vectors: List[Optional[np.ndarray]] = [
+            from_bytes(q.embedding) if q.embedding else None for q in questions
+        ]
+        todo = [i for i, v in enumerate(vectors) if v is None]
+
+        if todo:
+            fresh = self.encode([questions[i].question_text or '' for i in todo])
+            for i, vector in zip(todo, fresh):
+                questions[i].embedding = to_bytes(vector, self.storage_dtype)
+                vectors[i] = vector
+
+        if not vectors:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack(vectors)
+
+    def stats(self) -> Dict:
+        stats = self.cache.stats()
+        stats["batches"] = self.batches
+        stats["encoded"] = self.encoded
+        stats["avg_batch_size"] = self.encoded / self.batches if self.batches else 0.0
+        return stats
+
+
+def to_bytes(vector: np.ndarray, dtype: str = 'float16') -> bytes:
+    """Compact blob for a LargeBinary column: one byte of item size, then the values"""
+    array = np.asarray(vector, dtype=dtype)
+    return bytes([array.itemsize]) + array.tobytes()
+
+
+def from_bytes(blob: bytes) -> np.ndarray:
+    dtype = {2: np.float16, 4: np.float32}[blob[0]]
+    return np.frombuffer(blob[1:], dtype=dtype).astype(np.float32)
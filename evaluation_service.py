@@ -1,39 +1,94 @@
 import json
+import logging
 from typing import Dict, List, Any
+from concurrent.futures import Future
 import ast
-import subprocess
-import tempfile
-import os
 from models import Question, Assessment
+from IITG.project_route.config import Config
+from code_executor import CodeExecutorPool
+from subjective_scoring import SubjectiveScorer
+from verdict_cache import VerdictCache
+
+logger = logging.getLogger(__name__)
 
 class EvaluationService:
-    def __init__(self):
-        pass
+    def __init__(self, code_executor: CodeExecutorPool = None,
+                 subjective_scorer: SubjectiveScorer = None,
+                 verdict_cache: VerdictCache = None):
+        self.code_executor = code_executor or CodeExecutorPool(
+            workers=Config.CODE_EXECUTOR_WORKERS,
+            case_timeout=Config.CODE_EXECUTION_TIMEOUT,
+            memory_limit_mb=Config.CODE_EXECUTION_MEMORY_MB,
+            sandbox_uid=Config.CODE_SANDBOX_UID
+        )
+        # Without a scorer, subjective answers use the word-overlap heuristic
+        self.subjective_scorer = subjective_scorer
+        # Identical code against unchanged test cases is run once
+        self.verdict_cache = verdict_cache or VerdictCache(max_size=Config.VERDICT_CACHE_SIZE)
     
     def evaluate_assessment(self, assessment: Assessment, answers: List[Dict]) -> Dict:
         """Evaluate complete assessment"""
         
-        total_score = 0
-        section_scores = {"mcq": 0, "coding": 0, "subjective": 0}
-        skill_scores = {}
-        section_counts = {"mcq": 0, "coding": 0, "subjective": 0}
+        # One IN query for the whole sheet instead of one lookup per answer
+        question_ids = set(assessment.question_set or [])
+        question_ids.update(a.get('question_id') for a in answers if a.get('question_id'))
+        questions = self.load_questions(question_ids)
         
-        for answer in answers:
-            question_id = answer.get('question_id')
-            question = Question.query.get(question_id)
-            
-            if not question:
-                continue
+        answered = []
+        positions = []
+        for position, answer in enumerate(answers):
+            question = questions.get(answer.get('question_id'))
             
+            if question:
+                answered.append((question, answer))
+                positions.append(position)
+        
+        # Send every coding answer to the executor pool up front so they run
+        # concurrently while the rest of the sheet is scored
+        coding_runs = {
+            idx: self.submit_coding(question, answer.get('code', ''))
+            for idx, (question, answer) in enumerate(answered)
+            if question.question_type == 'coding'
+        }
+        subjective_scores = self.score_subjective_batch([
+            (idx, question, answer.get('answer', ''))
+            for idx, (question, answer) in enumerate(answered)
+            if question.question_type not in ('mcq', 'coding')
+        ])
+        
+        # Per answer, in sheet order: [score, the question's grading_version],
+        # None where the question is unknown. Re-grades reuse the scores of
+        # questions whose grading hasn't changed since
+        answer_scores = [None] * len(answers)
+        scored = []
+        for idx, (question, answer) in enumerate(answered):
             # Evaluate based on question type
             if question.question_type == 'mcq':
                 score = self.evaluate_mcq(question, answer.get('answer', ''))
-                section = 'mcq'
             elif question.question_type == 'coding':
-                score = self.evaluate_coding(question, answer.get('code', ''))
-                section = 'coding'
+                score = self.score_verdicts(question, self.collect_verdicts(coding_runs[idx]))
             else:  # subjective
-                score = self.evaluate_subjective(question, answer.get('answer', ''))
+                score = subjective_scores[idx]
+            
+            scored.append((question, score))
+            answer_scores[positions[idx]] = [score, question.grading_version or 0]
+        
+        result = self.aggregate(scored, len(answers))
+        result["plagiarism_score"] = self.check_plagiarism(answers)
+        result["answer_scores"] = answer_scores
+        return result
+    
+    def aggregate(self, scored: List, answer_count: int) -> Dict:
+        """Total, section and skill scores from (question, score) pairs of a sheet of answer_count answers"""
+        total_score = 0
+        section_scores = {"mcq": 0, "coding": 0, "subjective": 0}
+        skill_scores = {}
+        section_counts = {"mcq": 0, "coding": 0, "subjective": 0}
+        
+        for question, score in scored:
+            if question.question_type in ('mcq', 'coding'):
+                section = question.question_type
+            else:
                 section = 'subjective'
             
             # Update scores
@@ -57,67 +112,74 @@ class EvaluationService:
             avg_skill_scores[skill] = sum(scores) / len(scores)
         
         # Calculate total percentage
-        total_percentage = (total_score / (len(answers) * 100)) * 100 if answers else 0
+        total_percentage = (total_score / (answer_count * 100)) * 100 if answer_count else 0
         
         return {
             "total_score": total_percentage,
             "section_scores": section_scores,
-            "skill_scores": avg_skill_scores,
-            "plagiarism_score": self.check_plagiarism(answers)
+            "skill_scores": avg_skill_scores
         }
     
+    def load_questions(self, question_ids) -> Dict[str, Question]:
+        """Fetch questions by id in a single query"""
+        if not question_ids:
+            return {}
+        
+        questions = Question.query.filter(Question.id.in_(list(question_ids))).all()
+        return {question.id: question for question in questions}
+    
     def evaluate_mcq(self, question: Question, answer: str) -> float:
         """Evaluate multiple choice question"""
         return 100.0 if answer == question.correct_answer else 0.0
     
     def evaluate_coding(self, question: Question, code: str) -> float:
         """Evaluate coding question"""
-        
+        return self.score_verdicts(question, self.collect_verdicts(self.submit_coding(question, code)))
+    
+    def submit_coding(self, question: Question, code: str):
+        """Queue a coding answer on the executor pool, returning a future of verdicts"""
+        future = Future()
         test_cases = question.test_cases or []
+        
         if not test_cases:
+            future.set_result([])
+            return future
+        
+        try:
+            key = self.verdict_cache.key(question.id, test_cases, question.programming_language,
+                                         code, self.code_executor.limits)
+            return self.verdict_cache.run(
+                key, lambda: self.code_executor.submit(code, test_cases, question.programming_language)
+            )
+        except Exception:
+            logger.exception("Queueing coding answer to question %s failed", question.id)
+            future.set_result([])
+            return future
+    
+    def collect_verdicts(self, future) -> List[Dict]:
+        """Wait for a queued coding run; a crashed run counts as all cases failed"""
+        try:
+            return future.result()
+        except Exception:
+            logger.exception("Coding run failed")
+            return []
+    
+    def score_verdicts(self, question: Question, verdicts: List[Dict]) -> float:
+        """Turn per-test-case verdicts into a 0-100 score"""
+        total = len(question.test_cases or [])
+        if not total:
             return 50.0  # Default score if no test cases
         
-        passed = 0
-        total = len(test_cases)
-        
-        for test_case in test_cases:
-            try:
-                # Create temp file with code
-                with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
-                    # Add code to execute function
-                    f.write(code + '\n\n')
-                    
-                    # Add test execution
-                    if question.programming_language == 'python':
-                        input_val = test_case.get('input', '')
-                        expected = test_case.get('output', '')
-                        
-                        # Simple execution for demonstration
-                        # In production, use secure sandbox
-                        f.write(f'result = solution({input_val})\n')
-                        f.write(f'print(str(result) == str({expected}))')
-                    
-                    temp_file = f.name
-                
-                # Execute code
-                result = subprocess.run(
-                    ['python', temp_file],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                
-                if result.stdout.strip() == 'True':
-                    passed += 1
-                
-                # Clean up
-                os.unlink(temp_file)
-                
-            except Exception as e:
-                print(f"Error evaluating code: {e}")
-                continue
-        
-        return (passed / total) * 100 if total > 0 else 0
+        passed = sum(1 for verdict in verdicts if verdict.get('passed'))
+        return (passed / total) * 100
+    
+    def score_subjective_batch(self, items: List) -> Dict[int, float]:
+        """Score (key, question, answer) triples in one pass, keyed by key"""
+        if self.subjective_scorer is None:
+            return {key: self.evaluate_subjective(question, answer) for key, question, answer in items}
+        
+        scores = self.subjective_scorer.score_batch([(question, answer) for _, question, answer in items])
+        return {key: score for (key, _, _), score in zip(items, scores)}
     
     def evaluate_subjective(self, question: Question, answer: str) -> float:
         """Evaluate subjective answer"""
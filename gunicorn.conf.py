@@ -0,0 +1,27 @@
+# gunicorn -c gunicorn.conf.py app:app
+import gc
+import os
+
+bind = os.getenv('BIND', '0.0.0.0:5000')
+workers = int(os.getenv('WEB_CONCURRENCY', 4))
+timeout = 120
+
+# Import app.py once in the master. With PRELOAD_MODELS=true the embedding
+# model is loaded there too, and forked workers share it copy-on-write.
+preload_app = True
+os.environ.setdefault('PRELOAD_MODELS', 'true')
+
+
+def when_ready(server):
+    # Move everything loaded so far out of the GC's reach so collections in
+    # the workers don't touch (and un-share) the preloaded pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Code executor helpers are fresh interpreters with their own pipes:
+    # start them per gunicorn worker, never share them from the master.
+    # Resume parse workers are forked, so while still single-threaded
+    from app import evaluation_service, resume_ingestor
+    evaluation_service.code_executor.warm()
+    resume_ingestor.warm()
@@ -0,0 +1,35 @@
+from typing import List
+from sqlalchemy import event
+
+
+class QueryCounter:
+    """Count the SQL statements an engine executes while the block is active.
+
+    Usage:
+        with QueryCounter(db.engine) as counter:
+            evaluation_service.evaluate_assessment(assessment, answers)
+        assert counter.selects == 1
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements: List[str] = []
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._on_execute)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        event.remove(self.engine, 'before_cursor_execute', self._on_execute)
+        return False
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def selects(self) -> int:
+        return sum(1 for s in self.statements if s.lstrip().upper().startswith('SELECT'))
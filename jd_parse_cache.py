@@ -0,0 +1,113 @@
+import re
+import copy
+import hashlib
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from cache import TTLCache
+from models import db, JDParseCacheEntry
+
+
+def jd_cache_key(jd_text: str) -> str:
+    """Hash of the JD text with case and whitespace differences removed"""
+    normalized = re.sub(r'\s+', ' ', jd_text or '').strip().lower()
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+class SQLJDParseStore:
+    """Persistent tier for parsed JDs in the jd_parse_cache table.
+
+    Uses its own connection (not db.session) so a cache write never commits
+    the caller's pending ORM changes.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, max_rows: int = 50000, prune_every: int = 100):
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.prune_every = prune_every
+        self._writes = 0
+
+    def get(self, key: str) -> Optional[Dict]:
+        table = JDParseCacheEntry.__table__
+        with db.engine.connect() as conn:
+            row = conn.execute(
+                db.select(table.c.result, table.c.created_at).where(table.c.key == key)
+            ).first()
+
+        if row is None:
+            return None
+        if self.ttl and row.created_at < datetime.utcnow() - timedelta(seconds=self.ttl):
+            return None
+        return row.result
+
+    def set(self, key: str, result: Dict):
+        table = JDParseCacheEntry.__table__
+        with db.engine.begin() as conn:
+            conn.execute(table.delete().where(table.c.key == key))
+            conn.execute(table.insert().values(key=key, result=result, created_at=datetime.utcnow()))
+
+        self._writes += 1
+        if self._writes % self.prune_every == 0:
+            self.prune()
+
+    def prune(self):
+        """Drop expired rows, then the oldest rows beyond max_rows"""
+        table = JDParseCacheEntry.__table__
+        with db.engine.begin() as conn:
+            if self.ttl:
+                cutoff = datetime.utcnow() - timedelta(seconds=self.ttl)
+                conn.execute(table.delete().where(table.c.created_at < cutoff))
+
+            oldest_kept = conn.execute(
+                db.select(table.c.created_at).order_by(table.c.created_at.desc())
+                .offset(self.max_rows - 1).limit(1)
+            ).scalar()
+            if oldest_kept is not None:
+                conn.execute(table.delete().where(table.c.created_at < oldest_kept))
+
+
+class JDParseCache:
+    """Two-tier cache of LLM job-description parses.
+
+    An in-memory LRU in front of an optional persistent store; a store hit
+    is promoted into memory. Only LLM results belong here, never the
+    rule-based fallback.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = None,
+                 store: Optional[SQLJDParseStore] = None):
+        self.memory = TTLCache(max_size=max_size, ttl=ttl)
+        self.store = store
+        self.store_hits = 0
+        self.store_errors = 0
+
+    def get(self, jd_text: str) -> Optional[Dict]:
+        key = jd_cache_key(jd_text)
+        result = self.memory.get(key)
+
+        if result is None and self.store is not None:
+            try:
+                result = self.store.get(key)
+            except Exception:
+                self.store_errors += 1
+                result = None
+            if result is not None:
+                self.store_hits += 1
+                self.memory.set(key, result)
+
+        return copy.deepcopy(result) if result is not None else None
+
+    def set(self, jd_text: str, result: Dict):
+        key = jd_cache_key(jd_text)
+        self.memory.set(key, copy.deepcopy(result))
+
+        if self.store is not None:
+            try:
+                self.store.set(key, result)
+            except Exception:
+                self.store_errors += 1
+
+    def stats(self) -> Dict:
+        stats = self.memory.stats()
+        stats["store_hits"] = self.store_hits
+        stats["store_errors"] = self.store_errors
+        return stats
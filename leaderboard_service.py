@@ -0,0 +1,238 @@
+import base64
+import json
+import random
+import uuid
+from typing import Dict, Iterator, List, Optional, Tuple
+from sqlalchemy.dialects import postgresql, sqlite
+from cache import TTLCache
+from models import db, Candidate, Leaderboard, LeaderboardVersion
+
+
+class LeaderboardService:
+    """Incrementally maintained leaderboard.
+
+    Only the entry of the assessment being submitted is written; rank and
+    percentile are derived at read time from the (job_description_id,
+    score desc, id) index, so a submit costs the same whether the job has
+    10 or 20k entries.
+
+    Pages are read as plain rows with the candidate's name joined in.
+    ``after`` pages by keyset: the cursor holds the (score, id) of the last
+    entry shown, so page 500 costs the same index seek as page 1. Entries
+    without a score are not ranked by any of the read paths.
+
+    Every write bumps the job's version (``bump``), which callers use as a
+    validator for conditional GETs. It is a sum over ``version_shards``
+    LeaderboardVersion rows, one picked at random per bump, so concurrent
+    evaluations of a job rarely wait on the same row lock. Totals are
+    cached per version, and a cursor issued at the current version also
+    carries the rank and position to continue from, so its page needs no
+    counting at all.
+    """
+
+    def __init__(self, totals_cache_size: int = 1024, version_shards: int = 16):
+        # (job id, version) -> entry count
+        self._totals = TTLCache(max_size=totals_cache_size)
+        self.version_shards = version_shards
+
+    def record(self, assessment) -> Leaderboard:
+        """Insert or update the leaderboard entry for one assessment"""
+        entry = Leaderboard.query.filter_by(assessment_id=assessment.id).first()
+
+        if not entry:
+            entry = Leaderboard(
+                id=str(uuid.uuid4()),
+                job_description_id=assessment.job_description_id,
+                assessment_id=assessment.id,
+                candidate_id=assessment.candidate_id
+            )
+            db.session.add(entry)
+
+        entry.score = assessment.total_score
+        self.bump(assessment.job_description_id)
+
+        # Calculate time efficiency if time_taken is available
+        if assessment.time_taken and assessment.question_set:
+            entry.time_efficiency = len(assessment.question_set) / (assessment.time_taken / 60)
+
+        return entry
+
+    def bump(self, job_id: str):
+        """Move the job's version on, in the caller's transaction"""
+        table = LeaderboardVersion.__table__
+        shard = random.randrange(self.version_shards)
+        dialect = db.session.get_bind().dialect.name
+        if dialect in ('postgresql', 'sqlite'):
+            insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+            db.session.execute(
+                insert(table).values(job_description_id=job_id, shard=shard, version=1)
+                .on_conflict_do_update(index_elements=[table.c.job_description_id, table.c.shard],
+                                       set_={"version": table.c.version + 1})
+            )
+            return
+        updated = db.session.execute(
+            table.update().where(table.c.job_description_id == job_id, table.c.shard == shard)
+            .values(version=table.c.version + 1)
+        ).rowcount
+        if not updated:
+            db.session.execute(table.insert().values(job_description_id=job_id, shard=shard, version=1))
+
+    def total(self, job_id: str, version: Optional[int] = None) -> int:
+        """Number of ranked entries for a job, cached per version when given"""
+        if version is not None:
+            total = self._totals.get((job_id, version))
+            if total is not None:
+                return total
+
+        total = db.session.execute(
+            db.select(db.func.count()).select_from(Leaderboard)
+            .where(Leaderboard.job_description_id == job_id, Leaderboard.score.isnot(None))
+        ).scalar()
+        if version is not None:
+            self._totals.set((job_id, version), total)
+        return total
+
+    def rank_of(self, job_id: str, score: float) -> int:
+        """Competition rank of a score: 1 + number of strictly better scores"""
+        better = db.session.execute(
+            db.select(db.func.count()).select_from(Leaderboard)
+            .where(Leaderboard.job_description_id == job_id, Leaderboard.score > score)
+        ).scalar()
+        return better + 1
+
+    @staticmethod
+    def percentile(rank: int, total: int) -> float:
+        """Share of candidates ranked below this one"""
+        return (total - rank) / total * 100 if total else 0.0
+
+    def position(self, entry: Leaderboard) -> Dict:
+        """Rank and percentile for a single entry"""
+        total = self.total(entry.job_description_id)
+        rank = self.rank_of(entry.job_description_id, entry.score or 0.0)
+        return {"rank": rank, "percentile": self.percentile(rank, total)}
+
+    def version(self, job_id: str) -> int:
+        """The job's leaderboard version: its shards summed, 0 before any write"""
+        return db.session.execute(
+            db.select(db.func.coalesce(db.func.sum(LeaderboardVersion.version), 0))
+            .where(LeaderboardVersion.job_description_id == job_id)
+        ).scalar()
+
+    @staticmethod
+    def ordered(job_id: str):
+        """Entry rows of a job in leaderboard order, candidate name joined in"""
+        return db.select(
+            Leaderboard.id, Leaderboard.score, Leaderboard.time_efficiency, Leaderboard.accuracy_rate,
+            Leaderboard.candidate_id, Candidate.name.label('candidate_name')
+        ).outerjoin(
+            Candidate, Candidate.id == Leaderboard.candidate_id
+        ).where(
+            Leaderboard.job_description_id == job_id, Leaderboard.score.isnot(None)
+        ).order_by(
+            Leaderboard.score.desc(), Leaderboard.id
+        )
+
+    def page(self, job_id: str, page: int, per_page: int,
+             version: Optional[int] = None) -> Tuple[List[Dict], int]:
+        """One page by offset with ranks filled in, and the total"""
+        offset = (page - 1) * per_page
+        # Skip rows on the covering index alone, then join only the page
+        page_ids = db.select(Leaderboard.id).where(
+            Leaderboard.job_description_id == job_id, Leaderboard.score.isnot(None)
+        ).order_by(
+            Leaderboard.score.desc(), Leaderboard.id
+        ).limit(per_page).offset(offset).subquery()
+        rows = db.session.execute(
+            self.ordered(job_id).join(page_ids, page_ids.c.id == Leaderboard.id)
+        ).all()
+        total = self.total(job_id, version)
+        return self.assign_ranks(job_id, rows, offset, total), total
+
+    def after(self, job_id: str, cursor: Optional[Dict], per_page: int,
+              version: Optional[int] = None) -> Tuple[List[Dict], int]:
+        """The page following cursor (the first page for None) with ranks filled in, and the total"""
+        query = self.ordered(job_id)
+        if cursor is not None:
+            # score <= x bounds the index range; the OR only filters ties
+            query = query.where(
+                Leaderboard.score <= cursor["score"],
+                db.or_(Leaderboard.score < cursor["score"], Leaderboard.id > cursor["id"])
+            )
+        rows = db.session.execute(query.limit(per_page)).all()
+        total = self.total(job_id, version)
+        if not rows:
+            return [], total
+
+        first = rows[0]
+        if cursor is None:
+            return self.assign_ranks(job_id, rows, 0, total, first_rank=1), total
+        if version is not None and cursor.get("version") == version:
+            # Nothing changed since the cursor was issued: continue its numbering
+            offset = cursor["position"] + 1
+            first_rank = cursor["rank"] if first.score == cursor["score"] else offset + 1
+            return self.assign_ranks(job_id, rows, offset, total, first_rank=first_rank), total
+
+        # The first row's offset: entries scoring higher plus ties listed before it
+        better = self.rank_of(job_id, first.score) - 1
+        tied_before = db.session.execute(
+            db.select(db.func.count()).select_from(Leaderboard).where(
+                Leaderboard.job_description_id == job_id,
+                Leaderboard.score == first.score,
+                Leaderboard.id < first.id
+            )
+        ).scalar()
+        return self.assign_ranks(job_id, rows, better + tied_before, total, first_rank=better + 1), total
+
+    def stream(self, job_id: str, limit: int, batch_size: int = 1000) -> Iterator[Dict]:
+        """The top limit entries in order with ranks, read in batches"""
+        total = self.total(job_id)
+        rank, previous_score = 0, None
+        rows = db.session.execute(
+            self.ordered(job_id).limit(limit).execution_options(yield_per=batch_size)
+        )
+        for idx, row in enumerate(rows):
+            if row.score != previous_score:
+                rank = idx + 1
+            previous_score = row.score
+            yield {"entry": row, "rank": rank, "percentile": self.percentile(rank, total)}
+
+    @staticmethod
+    def encode_cursor(last: Dict, version: Optional[int]) -> str:
+        """Opaque cursor for the page after a ranked row"""
+        payload = [last["entry"].score, last["entry"].id, last["rank"], last["position"], version]
+        return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Dict:
+        """The fields encode_cursor packed; ValueError if malformed"""
+        try:
+            score, entry_id, rank, position, version = json.loads(
+                base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            )
+            return {"score": float(score), "id": str(entry_id), "rank": int(rank),
+                    "position": int(position), "version": version}
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f"Invalid cursor: {cursor!r}") from exc
+
+    def assign_ranks(self, job_id: str, entries: List, offset: int, total: int,
+                     first_rank: Optional[int] = None) -> List[Dict]:
+        """Rank an ordered slice, asking the database only for the first rank"""
+        ranked = []
+        rank: Optional[int] = first_rank
+        previous_score = entries[0].score if entries and first_rank is not None else None
+
+        for idx, entry in enumerate(entries):
+            if rank is None:
+                rank = self.rank_of(job_id, entry.score or 0.0)
+            elif entry.score != previous_score:
+                rank = offset + idx + 1
+            previous_score = entry.score
+
+            ranked.append({
+                "entry": entry,
+                "rank": rank,
+                "position": offset + idx,
+                "percentile": self.percentile(rank, total)
+            })
+
+        return ranked
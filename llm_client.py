@@ -0,0 +1,76 @@
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# openai.error classes (matched by name so this module never imports openai)
+# that will fail the same way on every attempt
+NON_RETRYABLE_ERRORS = {'AuthenticationError', 'InvalidRequestError', 'PermissionError'}
+
+
+class OpenAIChatClient:
+    """Completion client backed by openai.ChatCompletion.
+
+    Anything with the same ``complete(prompt, temperature, timeout)`` method
+    can be passed to AIService instead, e.g. a stub in tests or a client for
+    a local fake completion server.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, model: str = 'gpt-3.5-turbo'):
+        self.api_key = api_key
+        self.model = model
+
+    def complete(self, prompt: str, temperature: float = 0.7, timeout: Optional[float] = None) -> str:
+        import openai
+
+        response = openai.ChatCompletion.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature,
+            api_key=self.api_key,
+            request_timeout=timeout
+        )
+        return response.choices[0].message.content
+
+
+def call_with_retry(fn: Callable[[], Any], retries: int = 2, backoff: float = 0.5) -> Any:
+    """Call fn, retrying failures with exponential backoff"""
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == retries or type(e).__name__ in NON_RETRYABLE_ERRORS:
+                raise
+            logger.warning("LLM call failed (%s), retrying", e)
+            time.sleep(backoff * (2 ** attempt))
+
+
+def run_concurrently(fn: Callable[[Any], Any], items: List[Any], max_workers: int = 8,
+                     retries: int = 2, backoff: float = 0.5) -> List[Any]:
+    """Apply fn to every item on a bounded thread pool.
+
+    Each call is retried independently; an item whose calls all fail yields
+    None in its slot, so callers can merge whatever succeeded.
+    """
+    def attempt(item):
+        calls = 0
+
+        def call():
+            nonlocal calls
+            calls += 1
+            return fn(item)
+
+        try:
+            return call_with_retry(call, retries=retries, backoff=backoff)
+        except Exception as e:
+            # A non-retryable error gives up after the first call
+            logger.warning("LLM call gave up after %d attempt(s): %s", calls, e)
+            return None
+
+    if not items:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        return list(pool.map(attempt, items))
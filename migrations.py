@@ -0,0 +1,230 @@
+from datetime import datetime
+from typing import Callable, List, NamedTuple
+from sqlalchemy import inspect, text
+from models import (
+    db, ActivityDetector, ActivityLogChunk, Assessment, AssessmentPacket, Candidate, CandidateAnswer,
+    CandidateSkillProfile, Company, JDParseCacheEntry, JobDescription, JobStats, JobStatsMinute, Leaderboard,
+    LeaderboardVersion, Question, QuestionTiming, RegradeRun, ResumeImport, SchemaMigration, User
+)
+from stats_rollup import recount
+
+
+class Migration(NamedTuple):
+    version: str
+    description: str
+    apply: Callable
+
+
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version: str, description: str):
+    """Register a step; steps run in registration order"""
+    def register(fn):
+        MIGRATIONS.append(Migration(version, description, fn))
+        return fn
+    return register
+
+
+class SchemaEditor:
+    """Idempotent DDL against one connection.
+
+    Every operation inspects the live schema first and does nothing when
+    it is already in place. Databases created by ``db.create_all()``
+    before migrations existed have no ``schema_migrations`` rows; all
+    steps run on them and only add what is missing. The same holds for a
+    step interrupted half-way on a backend without transactional DDL.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.preparer = conn.dialect.identifier_preparer
+
+    def create_tables(self, *models):
+        db.metadata.create_all(self.conn, tables=[m.__table__ for m in models], checkfirst=True)
+
+    def add_column(self, model, name: str, default=None):
+        """ALTER TABLE ... ADD COLUMN; NOT NULL columns need a default for existing rows"""
+        table = model.__table__
+        if name in {c['name'] for c in inspect(self.conn).get_columns(table.name)}:
+            return
+        column = table.c[name]
+        ddl = (f"ALTER TABLE {self.preparer.format_table(table)} ADD COLUMN "
+               f"{self.preparer.format_column(column)} {column.type.compile(dialect=self.conn.dialect)}")
+        if default is not None:
+            ddl += f" DEFAULT {default}"
+            if not column.nullable:
+                ddl += " NOT NULL"
+        self.conn.execute(text(ddl))
+
+    def create_index(self, model, name: str):
+        """Create an index declared on the model, by name"""
+        table = model.__table__
+        if name in self._index_names(table.name):
+            return
+        next(index for index in table.indexes if index.name == name).create(self.conn)
+
+    def _index_names(self, table_name: str):
+        return {index['name'] for index in inspect(self.conn).get_indexes(table_name)}
+
+
+def applied_versions(engine) -> List[str]:
+    table = SchemaMigration.__table__
+    with engine.begin() as conn:
+        table.create(conn, checkfirst=True)
+        return list(conn.execute(db.select(table.c.version)).scalars())
+
+
+def pending_migrations(engine) -> List[Migration]:
+    applied = set(applied_versions(engine))
+    return [step for step in MIGRATIONS if step.version not in applied]
+
+
+def migrate(engine) -> List[str]:
+    """Apply pending steps in order, each in its own transaction; returns the versions applied"""
+    table = SchemaMigration.__table__
+    done = []
+    for step in pending_migrations(engine):
+        with engine.begin() as conn:
+            step.apply(SchemaEditor(conn))
+            conn.execute(table.insert().values(
+                version=step.version, description=step.description, applied_at=datetime.utcnow()
+            ))
+        done.append(step.version)
+    return done
+
+
+# ============ Steps ============
+# Append new steps at the end and never edit one that has shipped. Tables
+# are created from the current models, so on a new database later steps
+# find their columns and indexes already there.
+
+@migration('0001', 'Core tables')
+def core_tables(schema: SchemaEditor):
+    schema.create_tables(Company, User, JobDescription, Question, Candidate, Assessment, Leaderboard)
+
+
+@migration('0002', 'Background evaluation and leaderboard lookup by assessment')
+def background_evaluation(schema: SchemaEditor):
+    schema.add_column(Assessment, 'submitted_answers')
+    schema.create_index(Leaderboard, 'ix_leaderboards_assessment_id')
+
+
+@migration('0003', 'Parsed job description cache')
+def jd_parse_cache(schema: SchemaEditor):
+    schema.create_tables(JDParseCacheEntry)
+
+
+@migration('0004', 'Question catalog versions')
+def question_version(schema: SchemaEditor):
+    schema.add_column(JobDescription, 'question_version', default=0)
+
+
+@migration('0005', 'Assessment packets for scheduled drives')
+def assessment_packets(schema: SchemaEditor):
+    schema.add_column(JobDescription, 'scheduled_start')
+    schema.create_tables(AssessmentPacket)
+
+
+@migration('0006', 'Autosaved answers and proctoring activity')
+def answers_and_activity(schema: SchemaEditor):
+    schema.create_tables(CandidateAnswer, ActivityLogChunk)
+
+
+@migration('0007', 'Candidate skill profiles')
+def candidate_skill_profiles(schema: SchemaEditor):
+    # profiled_assessments starts at 0, so reports rebuild each profile once
+    schema.add_column(Candidate, 'profiled_assessments', default=0)
+    schema.create_tables(CandidateSkillProfile)
+    schema.create_index(Assessment, 'ix_assessments_candidate_completed')
+
+
+@migration('0008', 'Keyset leaderboard pages and ETags')
+def leaderboard_keyset(schema: SchemaEditor):
+    schema.create_tables(LeaderboardVersion)
+    schema.create_index(Leaderboard, 'ix_leaderboards_job_score_id')
+
+
+@migration('0009', 'Dashboard job stats rollup')
+def job_stats(schema: SchemaEditor):
+    schema.create_tables(JobStats, JobStatsMinute)
+    schema.create_index(Assessment, 'ix_assessments_created_at')
+    # Assessments from before the rollup existed; flushed deltas add to these
+    if not schema.conn.execute(db.select(JobStats.job_description_id).limit(1)).first():
+        recount(schema.conn, datetime.utcnow())
+
+
+@migration('0010', 'Composite indexes for job-scoped assessment and question queries')
+def route_indexes(schema: SchemaEditor):
+    schema.create_index(Question, 'ix_questions_job_active')
+    schema.create_index(Assessment, 'ix_assessments_job_status_score')
+    schema.create_index(Assessment, 'ix_assessments_job_completed')
+
+
+@migration('0011', 'Resume imports')
+def resume_imports(schema: SchemaEditor):
+    schema.create_tables(ResumeImport)
+
+
+@migration('0012', 'Candidate matching index')
+def candidate_matching(schema: SchemaEditor):
+    schema.add_column(Candidate, 'resume_embedding')
+    schema.add_column(Candidate, 'skills_updated_at')
+    schema.create_index(Candidate, 'ix_candidates_skills_updated_at')
+
+
+@migration('0013', 'Cohort analytics catch-up by evaluation time')
+def cohort_analytics(schema: SchemaEditor):
+    schema.create_index(Assessment, 'ix_assessments_job_evaluated')
+
+
+@migration('0014', 'Bulk re-grades')
+def regrades(schema: SchemaEditor):
+    # Assessments evaluated before 0014 have no answer_scores; a re-grade
+    # rescores every answer of those
+    schema.add_column(Question, 'grading_version', default=0)
+    schema.add_column(Assessment, 'answer_scores')
+    schema.create_tables(RegradeRun)
+
+
+@migration('0015', 'Stats rollup rebuild cutoff')
+def stats_rebuild_cutoff(schema: SchemaEditor):
+    schema.add_column(JobStats, 'rebuilt_at')
+
+
+@migration('0016', 'Legacy scored submissions')
+def legacy_scored_submissions(schema: SchemaEditor):
+    # Before 0002 submissions were scored on submit and left 'completed',
+    # with no answer sheet to evaluate: they are evaluated already
+    assessments = Assessment.__table__
+    moved = schema.conn.execute(
+        assessments.update()
+        .where(assessments.c.status == 'completed', assessments.c.submitted_answers.is_(None))
+        .values(status='evaluated', evaluated_at=assessments.c.completed_at)
+    ).rowcount
+    # 0009 counted them as waiting for evaluation
+    if moved and schema.conn.execute(db.select(JobStats.job_description_id).limit(1)).first():
+        recount(schema.conn, datetime.utcnow())
+
+
+@migration('0017', 'Evaluation re-queue sweep')
+def evaluation_requeue(schema: SchemaEditor):
+    schema.add_column(Assessment, 'evaluation_queued_at')
+    schema.create_index(Assessment, 'ix_assessments_status_queued')
+    # Submissions still waiting were queued when they were submitted
+    assessments = Assessment.__table__
+    schema.conn.execute(
+        assessments.update()
+        .where(assessments.c.status == 'completed', assessments.c.evaluation_queued_at.is_(None))
+        .values(evaluation_queued_at=assessments.c.completed_at)
+    )
+
+
+@migration('0018', 'Stored answer embeddings for similarity checks')
+def answer_embeddings(schema: SchemaEditor):
+    schema.add_column(CandidateAnswer, 'embedding')
+
+
+@migration('0019', 'Shared proctoring detector state')
+def activity_detectors(schema: SchemaEditor):
+    schema.create_tables(ActivityDetector, QuestionTiming)
\ No newline at end of file
@@ -1,5 +1,7 @@
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
 
 db = SQLAlchemy()
 
@@ -26,12 +28,22 @@ class JobDescription(db.Model):
     cutoff_score = db.Column(db.Float, default=70.0)
     difficulty_level = db.Column(db.String(20), default="intermediate")
     
+    # Bumped whenever this job's questions change; keys the question caches
+    question_version = db.Column(db.Integer, default=0, nullable=False)
+    
+    # Set for a scheduled hiring drive: starts claim pre-built packets
+    scheduled_start = db.Column(db.DateTime)
+    
     # Relationships
     assessments = db.relationship('Assessment', backref='job_description', lazy=True)
     questions = db.relationship('Question', backref='job_description', lazy=True)
 
 class Question(db.Model):
     __tablename__ = 'questions'
+    __table_args__ = (
+        # A job's active questions: the catalog, the selector and evaluation
+        db.Index('ix_questions_job_active', 'job_description_id', 'is_active'),
+    )
     
     id = db.Column(db.String(36), primary_key=True)
     job_description_id = db.Column(db.String(36), db.ForeignKey('job_descriptions.id'))
@@ -58,12 +70,41 @@ class Question(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     usage_count = db.Column(db.Integer, default=0)
     is_active = db.Column(db.Boolean, default=True)
+    # Bumped whenever how answers are scored changes (answer key, test
+    # cases, rubric); re-grades rescore answers graded at an older version
+    grading_version = db.Column(db.Integer, default=0, nullable=False)
     
     # Vector embedding for similarity check (to avoid repetition)
     embedding = db.Column(db.LargeBinary)
 
+class SchemaMigration(db.Model):
+    """One applied step of migrations.py"""
+    __tablename__ = 'schema_migrations'
+    
+    version = db.Column(db.String(64), primary_key=True)
+    description = db.Column(db.String(200))
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class JDParseCacheEntry(db.Model):
+    __tablename__ = 'jd_parse_cache'
+    
+    key = db.Column(db.String(64), primary_key=True)  # sha256 of normalized JD text
+    result = db.Column(db.JSON, nullable=False)  # LLM parse result only, never the fallback
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
 class Assessment(db.Model):
     __tablename__ = 'assessments'
+    __table_args__ = (
+        db.Index('ix_assessments_candidate_completed', 'candidate_id', 'completed_at'),
+        # A job's assessments by status, best first (rebuilds, cohort stats, re-grades)
+        db.Index('ix_assessments_job_status_score', 'job_description_id', 'status', 'total_score'),
+        # A job's submissions since a watermark (plagiarism index sync)
+        db.Index('ix_assessments_job_completed', 'job_description_id', 'completed_at'),
+        # A job's evaluations since a watermark (cohort analytics catch-up)
+        db.Index('ix_assessments_job_evaluated', 'job_description_id', 'evaluated_at'),
+        # Submissions whose evaluation has waited longest (re-queue sweep)
+        db.Index('ix_assessments_status_queued', 'status', 'evaluation_queued_at'),
+    )
     
     id = db.Column(db.String(36), primary_key=True)
     job_description_id = db.Column(db.String(36), db.ForeignKey('job_descriptions.id'))
@@ -71,13 +112,15 @@ class Assessment(db.Model):
     assessment_code = db.Column(db.String(100), unique=True)
     
     # Assessment status
-    status = db.Column(db.String(50), default='pending')  # pending, in_progress, completed, evaluated
+    status = db.Column(db.String(50), default='pending')  # pending, in_progress, completed, evaluated, failed
     start_time = db.Column(db.DateTime)
     end_time = db.Column(db.DateTime)
     time_taken = db.Column(db.Integer)  # seconds
     
     # Questions in this assessment
     question_set = db.Column(db.JSON)  # List of question IDs
+    submitted_answers = db.Column(db.JSON)  # Raw answer sheet, evaluated in the background
+    answer_scores = db.Column(db.JSON)  # [score, question grading_version] per submitted answer, None if unscored
     
     # Results
     total_score = db.Column(db.Float, default=0.0)
@@ -91,9 +134,119 @@ class Assessment(db.Model):
     similarity_with_others = db.Column(db.Float, default=0.0)
     
     # Timestamps
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     completed_at = db.Column(db.DateTime)
     evaluated_at = db.Column(db.DateTime)
+    evaluation_queued_at = db.Column(db.DateTime)  # last time evaluate_submission was queued for it
+
+class JobStats(db.Model):
+    """Running assessment counters per job, maintained by stats_rollup"""
+    __tablename__ = 'job_stats'
+    
+    job_description_id = db.Column(db.String(36), db.ForeignKey('job_descriptions.id'), primary_key=True)
+    company_id = db.Column(db.String(36), db.ForeignKey('companies.id'), index=True)
+    started = db.Column(db.Integer, nullable=False, default=0)
+    submitted = db.Column(db.Integer, nullable=False, default=0)
+    evaluated = db.Column(db.Integer, nullable=False, default=0)
+    passed = db.Column(db.Integer, nullable=False, default=0)
+    score_sum = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Cutoff of the last recount: deltas recorded before it are already in
+    rebuilt_at = db.Column(db.DateTime)
+
+class LeaderboardVersion(db.Model):
+    """A job's leaderboard version, split over a few counter rows.
+
+    Every leaderboard write bumps one shard, picked at random, in the
+    writer's transaction; the version is the sum over the job's shards and
+    keys leaderboard ETags, totals and cohort caches.
+    """
+    __tablename__ = 'leaderboard_versions'
+    
+    job_description_id = db.Column(db.String(36), db.ForeignKey('job_descriptions.id'), primary_key=True)
+    shard = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+class JobStatsMinute(db.Model):
+    """Submissions per job per minute, kept for a rolling window"""
+    __tablename__ = 'job_stats_minutes'
+    
+    job_description_id = db.Column(db.String(36), db.ForeignKey('job_descriptions.id'), primary_key=True)
+    minute = db.Column(db.DateTime, primary_key=True, index=True)
+    submitted = db.Column(db.Integer, nullable=False, default=0)
+
+class CandidateAnswer(db.Model):
+    """Latest autosaved answer per (assessment, question)"""
+    __tablename__ = 'candidate_answers'
+    __table_args__ = (
+        db.UniqueConstraint('assessment_id', 'question_id', name='uq_candidate_answers_question'),
+    )
+    
+    id = db.Column(db.String(36), primary_key=True)
+    assessment_id = db.Column(db.String(36), db.ForeignKey('assessments.id'), nullable=False)
+    candidate_id = db.Column(db.String(36), db.ForeignKey('candidates.id'))
+    question_id = db.Column(db.String(36), nullable=False)
+    answer = db.Column(db.Text)
+    code = db.Column(db.Text)  # For coding questions
+    time_spent = db.Column(db.Integer)  # seconds, as reported by the client
+    embedding = db.Column(db.LargeBinary)  # subjective answers, stored at evaluation for similarity checks
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ActivityLogChunk(db.Model):
+    """A batch of proctoring events for one assessment, packed by activity_monitor"""
+    __tablename__ = 'activity_log_chunks'
+    
+    id = db.Column(db.String(36), primary_key=True)
+    assessment_id = db.Column(db.String(36), db.ForeignKey('assessments.id'), nullable=False, index=True)
+    started_at = db.Column(db.DateTime, nullable=False)  # event offsets are relative to this
+    event_count = db.Column(db.Integer, nullable=False)
+    events = db.Column(db.LargeBinary, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ActivityDetector(db.Model):
+    """Running proctoring signals for one assessment, shared by every worker's activity flushes"""
+    __tablename__ = 'activity_detectors'
+    
+    assessment_id = db.Column(db.String(36), db.ForeignKey('assessments.id'), primary_key=True)
+    burst_at = db.Column(db.Float)  # epoch seconds of the latest focus loss counted in burst
+    burst = db.Column(db.Float, nullable=False, default=0.0)  # decayed count of recent focus losses
+    received_at = db.Column(db.Float)  # epoch seconds the latest batch of events reached the server
+    focus_losses = db.Column(db.Integer, nullable=False, default=0)
+    large_pastes = db.Column(db.Integer, nullable=False, default=0)
+    fast_answers = db.Column(db.Integer, nullable=False, default=0)
+    reasons = db.Column(db.JSON)  # why the assessment was flagged, in the order the rules tripped
+
+class QuestionTiming(db.Model):
+    """Running mean and variance of log answer seconds for one question (Welford)"""
+    __tablename__ = 'question_timings'
+    
+    question_id = db.Column(db.String(36), primary_key=True)
+    samples = db.Column(db.Integer, nullable=False, default=0)
+    mean = db.Column(db.Float, nullable=False, default=0.0)
+    m2 = db.Column(db.Float, nullable=False, default=0.0)  # sum of squared deviations
+
+class AssessmentPacket(db.Model):
+    """A ready-to-start assessment built ahead of a scheduled drive"""
+    __tablename__ = 'assessment_packets'
+    __table_args__ = (
+        db.Index('ix_assessment_packets_claim', 'job_description_id', 'status', 'slot'),
+    )
+    
+    id = db.Column(db.String(36), primary_key=True)
+    job_description_id = db.Column(db.String(36), db.ForeignKey('job_descriptions.id'), nullable=False)
+    question_version = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), default='ready')  # ready, claimed
+    slot = db.Column(db.Integer, nullable=False)  # random; spreads workers' claims apart
+    
+    # Reserved for the assessment created on claim
+    assessment_id = db.Column(db.String(36), unique=True, nullable=False)
+    assessment_code = db.Column(db.String(100), unique=True, nullable=False)
+    question_set = db.Column(db.JSON)  # List of question IDs
+    questions_json = db.Column(db.Text)  # Candidate-facing question list, already serialized
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    claimed_at = db.Column(db.DateTime)
 
 class Candidate(db.Model):
     __tablename__ = 'candidates'
@@ -107,6 +260,10 @@ class Candidate(db.Model):
     
     # Resume parsing data
     parsed_resume_data = db.Column(db.JSON)
+    resume_embedding = db.Column(db.LargeBinary)
+    # Claimed skills or assessed skill profile last changed; the matching
+    # index re-reads candidates past its watermark
+    skills_updated_at = db.Column(db.DateTime, index=True)
     
     # Assessment history
     assessments = db.relationship('Assessment', backref='candidate', lazy=True)
@@ -114,8 +271,65 @@ class Candidate(db.Model):
     # Statistics
     total_assessments = db.Column(db.Integer, default=0)
     avg_score = db.Column(db.Float, default=0.0)
+    profiled_assessments = db.Column(db.Integer, default=0)  # folded into candidate_skill_profiles
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ResumeImport(db.Model):
+    """One resume upload (a single file or a bulk zip) and its parsing progress"""
+    __tablename__ = 'resume_imports'
+    
+    id = db.Column(db.String(36), primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # single, bulk
+    status = db.Column(db.String(20), default='queued')  # queued, processing, completed, failed
+    source_path = db.Column(db.String(500))  # uploaded file or zip, under UPLOAD_FOLDER
+    candidate_fields = db.Column(db.JSON)  # email/name sent with a single upload
     
+    total_files = db.Column(db.Integer, nullable=False, default=0)
+    parsed = db.Column(db.Integer, nullable=False, default=0)
+    failed = db.Column(db.Integer, nullable=False, default=0)
+    errors = db.Column(db.JSON)  # first few {"file", "error"}
+    
+    created_by = db.Column(db.String(36), db.ForeignKey('users.id'))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    completed_at = db.Column(db.DateTime)
+
+class RegradeRun(db.Model):
+    """One bulk re-grade of a job's evaluated assessments and its progress"""
+    __tablename__ = 'regrade_runs'
+    
+    id = db.Column(db.String(36), primary_key=True)
+    job_description_id = db.Column(db.String(36), db.ForeignKey('job_descriptions.id'), index=True)
+    status = db.Column(db.String(20), default='queued')  # queued, running, completed, failed
+    question_ids = db.Column(db.JSON)  # rescored regardless of grading_version
+    # Assessments are re-graded in id order; the last id written, so an
+    # interrupted run resumes after it
+    cursor = db.Column(db.String(36))
+    
+    total = db.Column(db.Integer, nullable=False, default=0)
+    processed = db.Column(db.Integer, nullable=False, default=0)
+    regraded = db.Column(db.Integer, nullable=False, default=0)  # assessments whose scores changed
+    rescored_answers = db.Column(db.Integer, nullable=False, default=0)
+    skipped = db.Column(db.Integer, nullable=False, default=0)  # no stored answer sheet
+    seconds = db.Column(db.Float, nullable=False, default=0.0)  # spent processing, across resumes
+    error = db.Column(db.Text)
+    
+    created_by = db.Column(db.String(36), db.ForeignKey('users.id'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    completed_at = db.Column(db.DateTime)
+
+class CandidateSkillProfile(db.Model):
+    """Running aggregate of one skill's scores across a candidate's evaluated assessments"""
+    __tablename__ = 'candidate_skill_profiles'
+    
+    candidate_id = db.Column(db.String(36), db.ForeignKey('candidates.id'), primary_key=True)
+    skill = db.Column(db.String(100), primary_key=True)
+    assessments = db.Column(db.Integer, nullable=False, default=0)
+    score_sum = db.Column(db.Float, nullable=False, default=0.0)
+    min_score = db.Column(db.Float)
+    max_score = db.Column(db.Float)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 class Company(db.Model):
     __tablename__ = 'companies'
@@ -145,9 +359,10 @@ class Leaderboard(db.Model):
     
     id = db.Column(db.String(36), primary_key=True)
     job_description_id = db.Column(db.String(36), db.ForeignKey('job_descriptions.id'))
-    assessment_id = db.Column(db.String(36), db.ForeignKey('assessments.id'))
+    assessment_id = db.Column(db.String(36), db.ForeignKey('assessments.id'), index=True)
     candidate_id = db.Column(db.String(36), db.ForeignKey('candidates.id'))
     
+    # rank/percentile are derived at read time by LeaderboardService
     rank = db.Column(db.Integer)
     score = db.Column(db.Float)
     percentile = db.Column(db.Float)
@@ -156,5 +371,57 @@ class Leaderboard(db.Model):
     time_efficiency = db.Column(db.Float)  # Questions per minute
     accuracy_rate = db.Column(db.Float)
     
+    candidate = db.relationship('Candidate', lazy=True)
+    
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
\ No newline at end of file
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+# Serves the leaderboard in display order (keyset pages seek to a
+# (score, id) cursor) and rank as COUNT(score > x) per job
+db.Index('ix_leaderboards_job_score_id', Leaderboard.job_description_id, Leaderboard.score.desc(), Leaderboard.id)
+
+
+# Question columns the cached catalog and selection index are built from
+QUESTION_CATALOG_FIELDS = ('job_description_id', 'question_type', 'skill_category', 'difficulty',
+                           'question_text', 'options', 'is_active')
+
+@event.listens_for(Session, 'after_flush')
+def bump_question_versions(session, flush_context):
+    """Bump question_version of every job whose questions were added, removed or edited"""
+    job_ids = set()
+    for obj in session.new | session.deleted:
+        if isinstance(obj, Question):
+            job_ids.add(obj.job_description_id)
+    
+    for obj in session.dirty:
+        if not isinstance(obj, Question):
+            continue
+        state = inspect(obj)
+        for field in QUESTION_CATALOG_FIELDS:
+            history = state.attrs[field].history
+            if history.has_changes():
+                job_ids.add(obj.job_description_id)
+                if field == 'job_description_id':
+                    job_ids.update(history.deleted)
+    
+    job_ids.discard(None)
+    if job_ids:
+        table = JobDescription.__table__
+        session.connection().execute(
+            table.update().where(table.c.id.in_(job_ids))
+            .values(question_version=db.func.coalesce(table.c.question_version, 0) + 1)
+        )
+
+# Question columns that decide how an answer is scored
+QUESTION_GRADING_FIELDS = ('question_type', 'skill_category', 'correct_answer', 'test_cases',
+                           'programming_language', 'rubric', 'model_answer')
+
+@event.listens_for(Session, 'before_flush')
+def bump_grading_versions(session, flush_context, instances):
+    """Bump grading_version of every edited question whose scoring fields changed"""
+    for obj in session.dirty:
+        if not isinstance(obj, Question):
+            continue
+        state = inspect(obj)
+        if any(state.attrs[field].history.has_changes() for field in QUESTION_GRADING_FIELDS):
+            obj.grading_version = (obj.grading_version or 0) + 1
\ No newline at end of file
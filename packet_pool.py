@@ -0,0 +1,159 @@
+import json
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, Tuple
+from models import db, AssessmentPacket
+
+SLOT_RANGE = 1 << 30
+
+
+def new_assessment_code() -> str:
+    return f"ASS-{datetime.now().strftime('%Y%m%d')}-{str(uuid.uuid4())[:8]}"
+
+
+class AssessmentPacketPool:
+    """Pre-built assessments for scheduled drives, claimed at start time.
+
+    ``build`` runs ahead of the drive and stores packets: a selected
+    question set, its candidate-facing JSON already serialized, and a
+    reserved assessment id and code. ``claim`` then costs one conditional
+    UPDATE (``status = 'ready'`` guards against two workers taking the same
+    packet) in the caller's transaction.
+
+    Each process prefetches batches of ready packets starting at a random
+    ``slot``, so concurrent workers mostly claim different rows; a lost
+    race just moves on to the next packet.
+    """
+
+    def __init__(self, question_selector, question_catalog, prefetch: int = 256,
+                 max_attempts: int = 8, empty_backoff: float = 5):
+        self.selector = question_selector
+        self.catalog = question_catalog
+        self.prefetch = prefetch
+        self.max_attempts = max_attempts
+        self.empty_backoff = empty_backoff
+        self._queues: Dict[Tuple[str, int], Deque] = {}
+        self._empty_since: Dict[Tuple[str, int], float] = {}
+        self._lock = threading.Lock()
+        self.built = 0
+        self.claims = 0
+        self.misses = 0
+        self.collisions = 0
+
+    def build(self, job_id: str, version: int, count: int, num_questions: int) -> int:
+        """Create count ready packets for the job's current question version"""
+        table = AssessmentPacket.__table__
+        rows = []
+        for _ in range(count):
+            question_ids = self.selector.select(job_id, num_questions, version=version)
+            questions = self.catalog.questions(job_id, version, question_ids)
+            rows.append({
+                "id": str(uuid.uuid4()),
+                "job_description_id": job_id,
+                "question_version": version,
+                "status": 'ready',
+                "slot": random.randrange(SLOT_RANGE),
+                "assessment_id": str(uuid.uuid4()),
+                "assessment_code": new_assessment_code(),
+                "question_set": [q['id'] for q in questions],
+                "questions_json": json.dumps(questions),
+                "created_at": datetime.utcnow()
+            })
+
+        # Select everything before writing: selection flushes exposure
+        # counts on its own connection, which our open write would block.
+        # Packets for an older question set would never be claimed.
+        db.session.execute(table.delete().where(
+            table.c.job_description_id == job_id, table.c.status == 'ready',
+            table.c.question_version != version
+        ))
+        for start in range(0, len(rows), 500):
+            db.session.execute(table.insert(), rows[start:start + 500])
+        db.session.commit()
+
+        with self._lock:
+            self._empty_since.pop((job_id, version), None)
+        self.built += len(rows)
+        return len(rows)
+
+    def claim(self, job_id: str, version: int):
+        """Mark one ready packet claimed in the current transaction; None if the pool is empty"""
+        table = AssessmentPacket.__table__
+        for _ in range(self.max_attempts):
+            packet = self._next(job_id, version)
+            if packet is None:
+                break
+
+            result = db.session.execute(
+                table.update()
+                .where(table.c.id == packet.id, table.c.status == 'ready')
+                .values(status='claimed', claimed_at=datetime.utcnow())
+            )
+            if result.rowcount == 1:
+                self.claims += 1
+                return packet
+            self.collisions += 1
+
+        self.misses += 1
+        return None
+
+    def _next(self, job_id: str, version: int):
+        key = (job_id, version)
+        with self._lock:
+            queue = self._queues.setdefault(key, deque())
+            if queue:
+                return queue.popleft()
+
+            # Don't query an exhausted pool on every start
+            empty_since = self._empty_since.get(key)
+            if empty_since is not None and time.monotonic() - empty_since < self.empty_backoff:
+                return None
+
+            queue.extend(self._fetch(job_id, version))
+            if not queue:
+                self._empty_since[key] = time.monotonic()
+                return None
+            self._empty_since.pop(key, None)
+            return queue.popleft()
+
+    def _fetch(self, job_id: str, version: int):
+        """A batch of ready packets from a random slot onwards, wrapping around"""
+        table = AssessmentPacket.__table__
+        query = db.select(
+            table.c.id, table.c.assessment_id, table.c.assessment_code,
+            table.c.question_set, table.c.questions_json
+        ).where(
+            table.c.job_description_id == job_id, table.c.status == 'ready',
+            table.c.question_version == version
+        ).limit(self.prefetch)
+
+        start = random.randrange(SLOT_RANGE)
+        # No autoflush: the caller's pending inserts wait for its commit
+        with db.session.no_autoflush:
+            rows = db.session.execute(query.where(table.c.slot >= start).order_by(table.c.slot)).all()
+            if len(rows) < self.prefetch:
+                rows += db.session.execute(
+                    query.where(table.c.slot < start).order_by(table.c.slot).limit(self.prefetch - len(rows))
+                ).all()
+        return rows
+
+    def ready_count(self, job_id: str) -> int:
+        table = AssessmentPacket.__table__
+        return db.session.execute(
+            db.select(db.func.count()).select_from(table)
+            .where(table.c.job_description_id == job_id, table.c.status == 'ready')
+        ).scalar()
+
+    def stats(self) -> Dict:
+        attempts = self.claims + self.misses
+        return {
+            "built": self.built,
+            "claims": self.claims,
+            "misses": self.misses,
+            "collisions": self.collisions,
+            "claim_rate": self.claims / attempts if attempts else 0.0
+        }
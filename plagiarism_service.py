@@ -0,0 +1,190 @@
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from cache import TTLCache
+from embedding_service import from_bytes, to_bytes
+from models import db, Assessment, CandidateAnswer, Question
+from similarity_index import EmbeddingLSH, MinHashLSH
+
+
+class _JobIndex:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.question_types: Dict[str, str] = {}
+        self.text_indexes: Dict[str, EmbeddingLSH] = {}
+        self.code_indexes: Dict[str, MinHashLSH] = {}
+        # assessment id -> completed_at, for ids inside the lookback window
+        self.seen: Dict[str, datetime] = {}
+        self.watermark: Optional[datetime] = None
+
+
+class CrossCandidateSimilarity:
+    """Compares each submission with every earlier candidate's answers.
+
+    Keeps one ANN index per question: embedding LSH for subjective answers,
+    MinHash LSH for code. MCQ answers are skipped since identical choices are
+    expected. Indexes live in process memory and catch up from the database
+    on every check, so each worker sees submissions evaluated by the others:
+    assessments completed since the last catch-up are read, looking back
+    ``overlap`` seconds for submissions that committed after a later one,
+    and de-duplicated by id within that window.
+
+    A checked submission's answer embeddings are returned for the caller to
+    store in ``CandidateAnswer.embedding``; catching up decodes those rather
+    than re-embedding a job's answer history, so a worker's first check on
+    a job costs one read. Indexes for up to ``max_jobs`` jobs are kept,
+    least recently checked dropped first.
+    """
+
+    def __init__(self, embedding_service, lsh_tables: int = 16, lsh_bits: int = 12,
+                 minhash_permutations: int = 64, minhash_bands: int = 16, max_jobs: int = 64,
+                 overlap: float = 30.0):
+        self.embeddings = embedding_service
+        self.lsh_tables = lsh_tables
+        self.lsh_bits = lsh_bits
+        self.minhash_permutations = minhash_permutations
+        self.minhash_bands = minhash_bands
+        self.overlap = timedelta(seconds=overlap)
+        self._jobs = TTLCache(max_size=max_jobs)
+        self._jobs_lock = threading.Lock()
+        self.answers_indexed = 0
+        self.answers_embedded = 0
+
+    def check(self, assessment: Assessment) -> Tuple[float, Dict[str, bytes]]:
+        """(highest similarity of this submission's answers to another candidate's, 0-1;
+        embedding blob per subjective answer's question id)"""
+        index = self._job_index(assessment.job_description_id)
+
+        with index.lock:
+            self._sync(index, assessment.job_description_id, exclude_id=assessment.id)
+            texts, codes = self._split_answers(index, assessment.job_description_id,
+                                               assessment.submitted_answers or [])
+
+            best = 0.0
+            embeddings = {}
+            if texts:
+                vectors = self.embeddings.encode([text for _, text in texts])
+                for (question_id, _), vector in zip(texts, vectors):
+                    text_index = index.text_indexes.get(question_id)
+                    if text_index is not None:
+                        best = max(best, text_index.query(vector, exclude_owner=assessment.candidate_id)[0])
+                    embeddings[question_id] = to_bytes(vector, self.embeddings.storage_dtype)
+                self._add_texts(index, texts, vectors, assessment.candidate_id)
+
+            for question_id, code in codes:
+                code_index = index.code_indexes.get(question_id)
+                if code_index is not None:
+                    best = max(best, code_index.query(code, exclude_owner=assessment.candidate_id)[0])
+                self._code_index(index, question_id).add(code, assessment.candidate_id)
+
+            index.seen[assessment.id] = assessment.completed_at or datetime.utcnow()
+            return min(max(best, 0.0), 1.0), embeddings
+
+    def _job_index(self, job_id: str) -> _JobIndex:
+        with self._jobs_lock:
+            index = self._jobs.get(job_id)
+            if index is None:
+                index = _JobIndex()
+                self._jobs.set(job_id, index)
+            return index
+
+    def _sync(self, index: _JobIndex, job_id: str, exclude_id: Optional[str] = None):
+        """Index answers of assessments completed since the last sync"""
+        started = datetime.utcnow()
+        query = db.select(
+            Assessment.id, Assessment.candidate_id, Assessment.submitted_answers, Assessment.completed_at
+        ).where(
+            Assessment.job_description_id == job_id,
+            Assessment.completed_at.isnot(None),
+            Assessment.id != exclude_id
+        )
+        if index.watermark is not None:
+            since = index.watermark - self.overlap
+            query = query.where(Assessment.completed_at >= since)
+            # Ids older than the window can't come back; keep seen bounded
+            index.seen = {
+                assessment_id: completed_at for assessment_id, completed_at in index.seen.items()
+                if completed_at >= since
+            }
+
+        rows = [row for row in db.session.execute(query).all() if row.id not in index.seen]
+        stored = self._stored_embeddings([row.id for row in rows])
+
+        texts, vectors, owners, missing = [], [], [], []
+        for row in rows:
+            index.seen[row.id] = row.completed_at
+            row_texts, codes = self._split_answers(index, job_id, row.submitted_answers or [])
+            for question_id, text in row_texts:
+                blob = stored.get((row.id, question_id))
+                if blob is None:
+                    # Not evaluated yet, or submitted before embeddings were stored
+                    missing.append(len(texts))
+                    vectors.append(None)
+                else:
+                    vectors.append(from_bytes(blob))
+                texts.append((question_id, text))
+                owners.append(row.candidate_id)
+            for question_id, code in codes:
+                self._code_index(index, question_id).add(code, row.candidate_id)
+        index.watermark = started
+
+        if missing:
+            for position, vector in zip(missing, self.embeddings.encode([texts[i][1] for i in missing])):
+                vectors[position] = vector
+            self.answers_embedded += len(missing)
+        for text, vector, owner in zip(texts, vectors, owners):
+            self._add_texts(index, [text], np.asarray(vector)[None, :], owner)
+        self.answers_indexed += len(texts)
+
+    @staticmethod
+    def _stored_embeddings(assessment_ids: List[str]) -> Dict[Tuple[str, str], bytes]:
+        """(assessment id, question id) -> stored answer embedding"""
+        stored = {}
+        for start in range(0, len(assessment_ids), 500):
+            rows = db.session.execute(
+                db.select(CandidateAnswer.assessment_id, CandidateAnswer.question_id, CandidateAnswer.embedding)
+                .where(CandidateAnswer.assessment_id.in_(assessment_ids[start:start + 500]),
+                       CandidateAnswer.embedding.isnot(None))
+            ).all()
+            stored.update({(row.assessment_id, row.question_id): row.embedding for row in rows})
+        return stored
+
+    def _split_answers(self, index: _JobIndex, job_id: str, answers: List[Dict]):
+        """(question_id, text) pairs for subjective answers and for code answers"""
+        if any(a.get('question_id') not in index.question_types for a in answers):
+            index.question_types = dict(
+                Question.query.with_entities(Question.id, Question.question_type)
+                .filter_by(job_description_id=job_id).all()
+            )
+
+        texts, codes = [], []
+        for answer in answers:
+            question_type = index.question_types.get(answer.get('question_id'))
+            if question_type == 'coding' and answer.get('code'):
+                codes.append((answer['question_id'], answer['code']))
+            elif question_type == 'subjective' and answer.get('answer'):
+                texts.append((answer['question_id'], answer['answer']))
+        return texts, codes
+
+    def _add_texts(self, index: _JobIndex, texts, vectors, owner):
+        for (question_id, _), vector in zip(texts, vectors):
+            text_index = index.text_indexes.get(question_id)
+            if text_index is None:
+                text_index = index.text_indexes[question_id] = EmbeddingLSH(
+                    len(vector), tables=self.lsh_tables, bits=self.lsh_bits
+                )
+            text_index.add(vector[None, :], [owner])
+
+    def _code_index(self, index: _JobIndex, question_id: str) -> MinHashLSH:
+        if question_id not in index.code_indexes:
+            index.code_indexes[question_id] = MinHashLSH(
+                num_perm=self.minhash_permutations, bands=self.minhash_bands
+            )
+        return index.code_indexes[question_id]
+
+    def stats(self) -> Dict:
+        stats = self._jobs.stats()
+        stats["answers_indexed"] = self.answers_indexed
+        stats["answers_embedded"] = self.answers_embedded
+        return stats
@@ -0,0 +1,56 @@
+import threading
+from typing import Dict, List
+from cache import TTLCache
+from models import db, Question
+
+# Candidate-facing fields only: answers, test cases and rubrics never leave the server
+CATALOG_COLUMNS = ('id', 'question_type', 'skill_category', 'difficulty', 'question_text', 'options')
+
+
+class QuestionCatalog:
+    """Read-through cache of each job's questions as candidates see them.
+
+    Entries are keyed by (job id, JobDescription.question_version), and the
+    version is bumped whenever the job's questions change, so a stale
+    catalog is never served: the next start simply misses and reloads.
+    Cached dicts are shared between requests and must not be mutated.
+    """
+
+    def __init__(self, max_jobs: int = 512, ttl: float = None):
+        self.cache = TTLCache(max_size=max_jobs, ttl=ttl)
+        self._load_lock = threading.Lock()
+
+    def get(self, job_id: str, version: int) -> Dict[str, Dict]:
+        """Projection of the job's active questions by id"""
+        key = (job_id, version)
+        catalog = self.cache.get(key)
+        if catalog is not None:
+            return catalog
+
+        # A burst of starts on a cold job waits for one load instead of each
+        # running the query on its own connection
+        with self._load_lock:
+            catalog = self.cache.pop(key)
+            if catalog is None:
+                catalog = self._load(job_id)
+            self.cache.set(key, catalog)
+        return catalog
+
+    def questions(self, job_id: str, version: int, question_ids: List[str]) -> List[Dict]:
+        """Projections for question_ids in order, skipping ids not in the catalog"""
+        catalog = self.get(job_id, version)
+        return [catalog[question_id] for question_id in question_ids if question_id in catalog]
+
+    def _load(self, job_id: str) -> Dict[str, Dict]:
+        # Read through the request's session rather than a second pooled
+        # connection, which a waiting burst could starve
+        table = Question.__table__
+        with db.session.no_autoflush:
+            rows = db.session.execute(
+                db.select(*[table.c[column] for column in CATALOG_COLUMNS])
+                .where(table.c.job_description_id == job_id, table.c.is_active.isnot(False))
+            ).all()
+        return {row.id: dict(zip(CATALOG_COLUMNS, row)) for row in rows}
+
+    def stats(self) -> Dict:
+        return self.cache.stats()
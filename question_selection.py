@@ -0,0 +1,294 @@
+import random
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from models import db, Question
+from ai_service import QUESTION_TYPE_MIX
+
+
+class SQLQuestionStore:
+    """Reads question metadata and writes exposure counts to the questions table.
+
+    Reads go through the caller's session; writes use their own connection
+    so a flush never commits the caller's pending changes. Counts are added
+    with ``usage_count = usage_count + n`` so increments from every worker
+    accumulate instead of overwriting each other.
+    """
+
+    def load(self, job_id: str) -> List[Tuple]:
+        """(id, question_type, skill_category, difficulty, usage_count) for active questions"""
+        table = Question.__table__
+        # No autoflush: the caller's pending inserts must not take write
+        # locks that our own exposure flush would then wait on
+        with db.session.no_autoflush:
+            return db.session.execute(
+                db.select(table.c.id, table.c.question_type, table.c.skill_category,
+                          table.c.difficulty, table.c.usage_count)
+                .where(table.c.job_description_id == job_id, table.c.is_active.isnot(False))
+            ).all()
+
+    def add_exposures(self, counts: Dict[str, int]):
+        table = Question.__table__
+        statement = table.update().where(table.c.id == db.bindparam('question_id')).values(
+            usage_count=db.func.coalesce(table.c.usage_count, 0) + db.bindparam('increment')
+        )
+        with db.engine.begin() as conn:
+            conn.execute(statement, [
+                {"question_id": question_id, "increment": n} for question_id, n in counts.items()
+            ])
+
+
+class _Stratum:
+    """Questions sharing (type, skill, difficulty), least exposed first"""
+
+    def __init__(self, question_ids: List[str]):
+        self.question_ids = question_ids
+        self.cursor = 0
+
+    def take(self) -> str:
+        question_id = self.question_ids[self.cursor]
+        self.cursor = (self.cursor + 1) % len(self.question_ids)
+        return question_id
+
+
+class _JobIndex:
+    def __init__(self, strata: Dict[str, List[_Stratum]], loaded_at: float, version: Optional[int]):
+        self.lock = threading.Lock()
+        self.strata = strata
+        self.cursors = {question_type: 0 for question_type in strata}
+        self.loaded_at = loaded_at
+        self.version = version
+
+    def size(self, question_type: str) -> int:
+        return sum(len(s.question_ids) for s in self.strata.get(question_type, []))
+
+
+class QuestionSelector:
+    """Picks each candidate's question set from a per-job stratified index.
+
+    A job's active questions are bucketed by question type, then by
+    (skill_category, difficulty); each stratum is ordered least exposed
+    first (by ``Question.usage_count``). A start takes the type mix and
+    round-robins over the strata of each type, so a set of k questions costs
+    O(k) and spreads across skills and difficulties.
+
+    Exposures are counted in memory and added to ``usage_count`` in batches.
+    Given the Flask ``app``, batches are written by a background thread, so
+    a request that already holds a write lock never waits on a second
+    connection; without it they are written inline by the selecting thread.
+    Indexes are rebuilt from the store when the job's question_version
+    changes, after ``refresh_interval`` seconds (which is how one worker
+    sees the others' exposures) or on ``invalidate``.
+    """
+
+    def __init__(self, store: Optional[SQLQuestionStore] = None, type_mix: Dict[str, float] = None,
+                 refresh_interval: float = 300, flush_every: int = 500, flush_interval: float = 5,
+                 app=None):
+        self.store = store or SQLQuestionStore()
+        self.app = app
+        self.type_mix = type_mix or QUESTION_TYPE_MIX
+        self.refresh_interval = refresh_interval
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._jobs: Dict[str, _JobIndex] = {}
+        self._jobs_lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._pending: Counter = Counter()
+        self._pending_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._flush_lock = threading.Lock()
+        self._flush_wanted = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self.selections = 0
+        self.rebuilds = 0
+        self.flushes = 0
+        self.flush_errors = 0
+
+    def select(self, job_id: str, num_questions: int, version: Optional[int] = None) -> List[str]:
+        """Question ids for one assessment, shuffled"""
+        index = self._job_index(job_id, version)
+
+        with index.lock:
+            selected = []
+            counts = self._type_counts(index, num_questions)
+            for question_type, count in counts.items():
+                selected.extend(self._take(index, question_type, count))
+
+        random.shuffle(selected)
+        self.selections += 1
+        self._record_exposures(selected)
+        return selected
+
+    def invalidate(self, job_id: str):
+        """Rebuild the job's index on its next selection"""
+        with self._jobs_lock:
+            self._jobs.pop(job_id, None)
+
+    def _type_counts(self, index: _JobIndex, num_questions: int) -> Dict[str, int]:
+        """Split num_questions by type_mix, moving any shortfall to types with spare questions"""
+        counts = {
+            "mcq": round(num_questions * self.type_mix.get("mcq", 0)),
+            "coding": round(num_questions * self.type_mix.get("coding", 0))
+        }
+        counts["subjective"] = max(num_questions - counts["mcq"] - counts["coding"], 0)
+
+        available = {t: index.size(t) for t in index.strata}
+        counts = {t: min(n, available.get(t, 0)) for t, n in counts.items()}
+        for question_type in index.strata:
+            counts.setdefault(question_type, 0)
+
+        shortfall = num_questions - sum(counts.values())
+        for question_type in sorted(index.strata, key=lambda t: -(available[t] - counts[t])):
+            if shortfall <= 0:
+                break
+            extra = min(shortfall, available[question_type] - counts[question_type])
+            counts[question_type] += extra
+            shortfall -= extra
+
+        return counts
+
+    def _take(self, index: _JobIndex, question_type: str, count: int) -> List[str]:
+        strata = index.strata.get(question_type, [])
+        if not count or not strata:
+            return []
+
+        # One question per stratum in turn; a stratum's cursor wraps, so
+        # cap at the type's size to never hand out a question twice
+        count = min(count, index.size(question_type))
+        taken, seen = [], set()
+        cursor = index.cursors[question_type]
+        while len(taken) < count:
+            question_id = strata[cursor % len(strata)].take()
+            cursor += 1
+            if question_id not in seen:
+                seen.add(question_id)
+                taken.append(question_id)
+
+        index.cursors[question_type] = cursor % len(strata)
+        return taken
+
+    def _job_index(self, job_id: str, version: Optional[int]) -> _JobIndex:
+        index = self._fresh_index(job_id, version)
+        if index is not None:
+            return index
+
+        # Write our exposures first so the rebuilt ordering includes them
+        self._request_flush()
+
+        # One rebuild at a time, so a burst of starts on a cold job loads it once
+        with self._build_lock:
+            index = self._fresh_index(job_id, version)
+            if index is None:
+                index = self._build(job_id, version)
+                with self._jobs_lock:
+                    self._jobs[job_id] = index
+        return index
+
+    def _fresh_index(self, job_id: str, version: Optional[int]) -> Optional[_JobIndex]:
+        with self._jobs_lock:
+            index = self._jobs.get(job_id)
+        if index is None or (version is not None and index.version != version):
+            return None
+        if time.monotonic() - index.loaded_at >= self.refresh_interval:
+            return None
+        return index
+
+    def _build(self, job_id: str, version: Optional[int]) -> _JobIndex:
+        rows = self.store.load(job_id)
+        # Shuffle before the stable sort so workers rebuilding from the same
+        # counts don't all hand out the same questions in the same order
+        rows = list(rows)
+        random.shuffle(rows)
+        rows.sort(key=lambda row: row[4] or 0)
+
+        grouped: Dict[str, Dict[Tuple, List[str]]] = {}
+        for question_id, question_type, skill, difficulty, _ in rows:
+            grouped.setdefault(question_type, {}).setdefault((skill, difficulty), []).append(question_id)
+
+        strata = {
+            question_type: [_Stratum(by_stratum[key]) for key in self._interleave(by_stratum)]
+            for question_type, by_stratum in grouped.items()
+        }
+        self.rebuilds += 1
+        return _JobIndex(strata, time.monotonic(), version)
+
+    @staticmethod
+    def _interleave(by_stratum: Dict[Tuple, List[str]]) -> List[Tuple]:
+        """Order (skill, difficulty) keys so neighbours differ in skill and, where possible, difficulty"""
+        by_skill: Dict[str, List[Tuple]] = {}
+        for key in sorted(by_stratum, key=lambda k: (str(k[0]), str(k[1]))):
+            by_skill.setdefault(str(key[0]), []).append(key)
+
+        ranked = []
+        for skill_index, keys in enumerate(by_skill.values()):
+            for position, key in enumerate(keys):
+                ranked.append(((position + skill_index) % len(keys), skill_index, key))
+        return [key for _, _, key in sorted(ranked)]
+
+    def _record_exposures(self, question_ids: List[str]):
+        with self._pending_lock:
+            self._pending.update(question_ids)
+            due = (sum(self._pending.values()) >= self.flush_every
+                   or time.monotonic() - self._last_flush >= self.flush_interval)
+        if due:
+            self._request_flush()
+
+    def _request_flush(self):
+        if self.app is None:
+            # Skip if another thread is already flushing: each waiting
+            # thread would hold a pooled connection and could exhaust the pool
+            if self._flush_lock.acquire(blocking=False):
+                try:
+                    self._write_pending()
+                finally:
+                    self._flush_lock.release()
+            return
+
+        # Started lazily so each forked worker gets its own thread
+        if self._flusher is None or not self._flusher.is_alive():
+            with self._pending_lock:
+                if self._flusher is None or not self._flusher.is_alive():
+                    self._flusher = threading.Thread(
+                        target=self._flush_loop, name='question-exposure-flush', daemon=True
+                    )
+                    self._flusher.start()
+        self._flush_wanted.set()
+
+    def _flush_loop(self):
+        while True:
+            self._flush_wanted.wait(self.flush_interval)
+            self._flush_wanted.clear()
+            with self.app.app_context():
+                self.flush()
+
+    def flush(self):
+        """Write pending exposure counts to the store"""
+        with self._flush_lock:
+            self._write_pending()
+
+    def _write_pending(self):
+        with self._pending_lock:
+            pending, self._pending = self._pending, Counter()
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+
+        try:
+            self.store.add_exposures(dict(pending))
+            self.flushes += 1
+        except Exception:
+            # Keep the counts for the next flush rather than losing them
+            self.flush_errors += 1
+            with self._pending_lock:
+                self._pending.update(pending)
+
+    def stats(self) -> Dict:
+        return {
+            "jobs_indexed": len(self._jobs),
+            "selections": self.selections,
+            "rebuilds": self.rebuilds,
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+            "pending_exposures": sum(self._pending.values())
+        }
@@ -0,0 +1,152 @@
+import threading
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from models import db, Assessment, Question
+
+
+class RegradeEngine:
+    """Re-scores a job's evaluated assessments after its questions' grading changed.
+
+    Every evaluated assessment keeps its submitted answer sheet and, per
+    answer, the score it got and the question's ``grading_version`` at the
+    time. Fixing a question's answer key, test cases or rubric bumps that
+    version, so a re-grade rescores only the answers whose question has
+    moved on (or is named in ``forced``) and re-aggregates the sheet from
+    the stored scores of the rest with ``EvaluationService.aggregate``: the
+    totals a fresh evaluation would give, without re-running the whole
+    sheet. Sheets evaluated before scores were stored are rescored in full.
+
+    Assessments are read in id order, ``chunk_size`` at a time. Within a
+    chunk the coding answers to rescore all go to the evaluation service's
+    executor pool up front, through its verdict cache, so the many
+    identical submissions of a drive run once; subjective answers are
+    scored in one batch, which gives each the score it would get alone
+    (SubjectiveScorer's signals never depend on the rest of the batch), so
+    a re-graded answer matches a fresh evaluation whatever chunk it falls
+    in. ``regrade`` only computes: it returns plain row updates for the
+    caller to write, with the chunk's last id as a resume cursor.
+    """
+
+    def __init__(self, evaluation_service, chunk_size: int = 500):
+        self.evaluation_service = evaluation_service
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+        self.assessments = 0
+        self.regraded = 0
+        self.rescored_answers = 0
+
+    def pending_ids(self, job_id: str, after: Optional[str] = None) -> List[str]:
+        """Ids of the job's evaluated assessments after the cursor, in order"""
+        query = db.select(Assessment.id).where(
+            Assessment.job_description_id == job_id, Assessment.status == 'evaluated'
+        )
+        if after is not None:
+            query = query.where(Assessment.id > after)
+        return list(db.session.execute(query.order_by(Assessment.id)).scalars())
+
+    def chunks(self, ids: List[str]) -> Iterator[List]:
+        """Rows to re-grade, chunk_size at a time in id order"""
+        for start in range(0, len(ids), self.chunk_size):
+            rows = db.session.execute(
+                db.select(
+                    Assessment.id, Assessment.candidate_id, Assessment.submitted_answers,
+                    Assessment.answer_scores, Assessment.total_score, Assessment.section_scores,
+                    Assessment.skill_scores, Assessment.is_passed
+                ).where(Assessment.id.in_(ids[start:start + self.chunk_size]))
+            ).all()
+            yield sorted(rows, key=lambda row: row.id)
+
+    def questions(self, job_id: str) -> Dict[str, Question]:
+        """The job's questions by id"""
+        return {question.id: question for question in Question.query.filter_by(job_description_id=job_id)}
+
+    def regrade(self, rows: List, questions: Dict[str, Question], cutoff: float,
+                forced: Set[str]) -> Tuple[List[Dict], int, int]:
+        """(updates for rows whose scores or stored versions moved, answers rescored, sheets skipped)"""
+        service = self.evaluation_service
+        missing = {
+            answer.get('question_id') for row in rows for answer in (row.submitted_answers or [])
+            if answer.get('question_id') and answer.get('question_id') not in questions
+        }
+        if missing:
+            # Answers to another job's questions, as evaluate_assessment allows
+            questions.update(service.load_questions(missing))
+
+        plans, coding_runs, subjective = [], {}, []
+        skipped = 0
+        for r, row in enumerate(rows):
+            answers = row.submitted_answers
+            if answers is None:
+                # Evaluated before answer sheets were stored: nothing to re-grade from
+                plans.append(None)
+                skipped += 1
+                continue
+
+            stored = row.answer_scores or []
+            plan = []
+            for position, answer in enumerate(answers):
+                question = questions.get(answer.get('question_id'))
+                previous = stored[position] if position < len(stored) else None
+                if question is None:
+                    plan.append(None)
+                elif (previous is not None and question.id not in forced
+                      and previous[1] == (question.grading_version or 0)):
+                    plan.append([question, previous[0], False])
+                elif question.question_type == 'mcq':
+                    plan.append([question, service.evaluate_mcq(question, answer.get('answer', '')), True])
+                elif question.question_type == 'coding':
+                    coding_runs[(r, position)] = service.submit_coding(question, answer.get('code', ''))
+                    plan.append([question, None, True])
+                else:
+                    subjective.append(((r, position), question, answer.get('answer', '')))
+                    plan.append([question, None, True])
+            plans.append(plan)
+
+        rescored = service.score_subjective_batch(subjective)
+        for (r, position), future in coding_runs.items():
+            question = plans[r][position][0]
+            rescored[(r, position)] = service.score_verdicts(question, service.collect_verdicts(future))
+        for (r, position), score in rescored.items():
+            plans[r][position][1] = score
+
+        updates = []
+        rescored_answers = 0
+        for row, plan in zip(rows, plans):
+            if plan is None:
+                continue
+            rescored_answers += sum(1 for entry in plan if entry is not None and entry[2])
+            result = service.aggregate([(entry[0], entry[1]) for entry in plan if entry is not None], len(plan))
+            answer_scores = [
+                [entry[1], entry[0].grading_version or 0] if entry is not None else None for entry in plan
+            ]
+            is_passed = result["total_score"] >= cutoff
+            changed = (
+                result["total_score"] != row.total_score or is_passed != bool(row.is_passed)
+                or result["section_scores"] != row.section_scores or result["skill_scores"] != row.skill_scores
+            )
+            if not changed and answer_scores == row.answer_scores:
+                continue
+            updates.append({
+                "id": row.id,
+                "candidate_id": row.candidate_id,
+                "changed": changed,
+                "total_score": result["total_score"],
+                "section_scores": result["section_scores"],
+                "skill_scores": result["skill_scores"],
+                "is_passed": is_passed,
+                "answer_scores": answer_scores,
+                "score_delta": result["total_score"] - (row.total_score or 0.0),
+                "passed_delta": int(is_passed) - int(bool(row.is_passed))
+            })
+
+        with self._lock:
+            self.assessments += len(rows)
+            self.regraded += sum(1 for update in updates if update["changed"])
+            self.rescored_answers += rescored_answers
+        return updates, rescored_answers, skipped
+
+    def stats(self) -> Dict:
+        return {
+            "assessments": self.assessments,
+            "regraded": self.regraded,
+            "rescored_answers": self.rescored_answers
+        }
@@ -0,0 +1,413 @@
+import csv
+import io
+import multiprocessing
+import os
+import re
+import resource
+import signal
+import zipfile
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from werkzeug.utils import secure_filename
+
+CHUNK_SIZE = 64 * 1024
+MANIFEST_NAMES = ('manifest.csv', 'candidates.csv')
+
+# Canonical names match AIService's JD skill keys so resumes and job
+# descriptions line up; aliases are matched as whole words, lowercased
+SKILL_ALIASES: Dict[str, Tuple[str, ...]] = {
+    'python': ('python',),
+    'java': ('java',),
+    'javascript': ('javascript', 'js', 'ecmascript'),
+    'typescript': ('typescript',),
+    'react': ('react', 'reactjs', 'react.js'),
+    'angular': ('angular', 'angularjs'),
+    'node': ('node', 'nodejs', 'node.js'),
+    'sql': ('sql', 'mysql', 'postgresql', 'postgres', 'sqlite', 'oracle'),
+    'mongodb': ('mongodb', 'mongo'),
+    'aws': ('aws', 'amazon web services'),
+    'docker': ('docker',),
+    'kubernetes': ('kubernetes', 'k8s'),
+    'machine learning': ('machine learning', 'deep learning', 'scikit-learn', 'tensorflow', 'pytorch'),
+    'data analysis': ('data analysis', 'data analytics', 'pandas'),
+    'devops': ('devops', 'ci/cd', 'jenkins'),
+    'agile': ('agile',),
+    'scrum': ('scrum',),
+    'git': ('git', 'github', 'gitlab'),
+    'c++': ('c++', 'cpp'),
+    'go': ('golang',),
+    'django': ('django',),
+    'flask': ('flask',),
+    'linux': ('linux',),
+    'rest': ('rest api', 'restful', 'rest apis'),
+}
+_ALIAS_SKILL = {alias: skill for skill, aliases in SKILL_ALIASES.items() for alias in aliases}
+_SKILL_PATTERN = re.compile(
+    r'(?<![\w+#.])(' + '|'.join(re.escape(a) for a in sorted(_ALIAS_SKILL, key=len, reverse=True)) + r')(?![\w+#])'
+)
+_EMAIL_PATTERN = re.compile(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+')
+_PHONE_PATTERN = re.compile(r'\+?\(?\d(?:[ ().-]{0,2}\d){9,14}')
+# "5 years of experience", "7+ yrs professional experience"
+_STATED_EXPERIENCE = re.compile(
+    r'(\d{1,2}(?:\.\d+)?)\s*\+?\s*(?:years?|yrs?)\b(?:\W+\w+){0,3}?\W+experience'
+)
+# "2016 - 2019", "2019 to present"
+_YEAR_RANGE = re.compile(r'\b((?:19|20)\d{2})\s*(?:-|–|—|to)\s*((?:19|20)\d{2}|present|current|now)\b')
+_MAX_EXPERIENCE_YEARS = 50
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+class ParseTimeout(BaseException):
+    # Not an Exception, so extract_text's callers can't swallow it
+    pass
+
+
+def allowed_file(filename: str, extensions: Set[str]) -> bool:
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in extensions
+
+
+def save_stream(stream, path: str, max_bytes: Optional[int] = None) -> int:
+    """Copy a file-like object to path in CHUNK_SIZE pieces; returns the bytes written"""
+    written = 0
+    try:
+        with open(path, 'wb') as out:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if max_bytes is not None and written > max_bytes:
+                    raise UploadTooLarge(f"Larger than {max_bytes} bytes")
+                out.write(chunk)
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return written
+
+
+# ============ Parsing (runs in pool workers) ============
+
+def extract_text(path: str) -> str:
+    """Plain text of a .txt, .pdf or .docx file"""
+    extension = path.rsplit('.', 1)[-1].lower()
+    if extension == 'txt':
+        with open(path, 'rb') as f:
+            return f.read().decode('utf-8', errors='replace')
+    if extension == 'pdf':
+        from PyPDF2 import PdfReader
+        return '\n'.join(page.extract_text() or '' for page in PdfReader(path).pages)
+    if extension == 'docx':
+        import docx
+        document = docx.Document(path)
+        lines = [p.text for p in document.paragraphs]
+        for table in document.tables:
+            for row in table.rows:
+                lines.append(' | '.join(cell.text for cell in row.cells))
+        return '\n'.join(lines)
+    raise ValueError(f"Unsupported file type: .{extension}")
+
+
+def experience_years(text: str) -> float:
+    """Largest stated figure, else the union of the year ranges listed"""
+    lowered = text.lower()
+    stated = [float(m.group(1)) for m in _STATED_EXPERIENCE.finditer(lowered)]
+    if stated:
+        return min(max(stated), _MAX_EXPERIENCE_YEARS)
+
+    this_year = datetime.utcnow().year
+    spans = []
+    for start, end in _YEAR_RANGE.findall(lowered):
+        start = int(start)
+        end = this_year if not end[0].isdigit() else int(end)
+        if start <= end <= this_year:
+            spans.append((start, end))
+    total, reach = 0, None
+    for start, end in sorted(spans):
+        if reach is None or start > reach:
+            total += end - start
+            reach = end
+        elif end > reach:
+            total += end - reach
+            reach = end
+    return float(min(total, _MAX_EXPERIENCE_YEARS))
+
+
+def parse_resume_text(text: str) -> Dict:
+    """Skills (with mention counts), experience and contact details found in resume text"""
+    lowered = text.lower()
+    mentions = Counter(_ALIAS_SKILL[m] for m in _SKILL_PATTERN.findall(lowered))
+    email = _EMAIL_PATTERN.search(text)
+    phone = _PHONE_PATTERN.search(text)
+    first_line = next((line.strip() for line in text.splitlines() if line.strip()), '')
+    return {
+        "skills": dict(mentions.most_common()),
+        "experience_years": experience_years(text),
+        "email": email.group(0).lower() if email else None,
+        "phone": phone.group(0).strip() if phone else None,
+        "headline": first_line[:100]
+    }
+
+
+def parse_resume_file(path: str, max_chars: int) -> Dict:
+    """Text and parsed fields of one resume, or {"error": ...}; never raises"""
+    try:
+        text = extract_text(path)
+    except ImportError as e:
+        return {"error": f"Parser not installed: {e.name}"}
+    except MemoryError:
+        return {"error": "Out of memory while parsing"}
+    except Exception as e:
+        return {"error": f"Unreadable file: {e}"}
+    text = text.replace('\x00', '')[:max_chars]
+    if not text.strip():
+        return {"error": "No text found (scanned image?)"}
+    parsed = parse_resume_text(text)
+    parsed["text"] = text
+    return parsed
+
+
+def _data_size() -> int:
+    """Bytes of this process's data segment (VmData), 0 if /proc isn't there"""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmData:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def _on_timeout(signum, frame):
+    raise ParseTimeout()
+
+
+def _init_worker(memory_bytes: int):
+    """Cap the worker's heap at what the forked web worker left it plus memory_bytes"""
+    if memory_bytes:
+        limit = _data_size() + memory_bytes
+        resource.setrlimit(resource.RLIMIT_DATA, (limit, limit))
+    signal.signal(signal.SIGALRM, _on_timeout)
+
+
+def parse_resume_file_limited(path: str, max_chars: int, timeout: float) -> Dict:
+    """parse_resume_file under a wall-clock alarm of timeout seconds.
+
+    A parser stuck in C code never sees the alarm, so the worker's CPU time
+    is also capped a little past it; SIGXCPU kills the worker and the pool
+    reports it broken.
+    """
+    if not timeout:
+        return parse_resume_file(path, max_chars)
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    resource.setrlimit(resource.RLIMIT_CPU, (int(usage.ru_utime + usage.ru_stime + timeout) + 2, hard))
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return parse_resume_file(path, max_chars)
+    except ParseTimeout:
+        return {"error": f"Parsing took longer than {timeout:g}s"}
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+# ============ Ingestion ============
+
+class ResumeIngestor:
+    """Streams uploaded resumes to disk and parses them in a process pool.
+
+    Uploads are copied to ``upload_folder`` in ``CHUNK_SIZE`` pieces and a
+    bulk zip is unpacked one member at a time, so no upload or archive is
+    ever held in memory whole. ``parse`` feeds paths to a pool of worker
+    processes (text extraction and PDF decoding are CPU-bound and would
+    hold the GIL) and yields results in order as they finish. At most
+    ``max_in_flight`` files are queued on the pool at once: a 10k-file
+    import keeps a bounded number of texts in memory, and the caller
+    writes each batch of results while the workers parse the next.
+
+    Each file gets ``parse_timeout`` seconds and each worker's heap is
+    capped at ``memory_mb`` over what it was forked with, so a hostile PDF
+    fails on its own. A worker that dies anyway (out of memory or CPU
+    time) breaks the whole pool and every file queued on it: the pool is
+    rebuilt and those files are re-run one at a time, so only the file
+    that kills a worker alone is reported as crashed. The pool is sized
+    per web worker; ``workers`` defaults to 2 rather than the CPU count,
+    which every gunicorn worker would multiply.
+
+    PyPDF2 and python-docx are imported in the workers on first use; when
+    one is missing, files of that type fail with an error and the rest of
+    the import goes ahead.
+    """
+
+    def __init__(self, upload_folder: str, workers: int = 2, extensions: Iterable[str] = ('pdf', 'docx', 'txt'),
+                 max_file_bytes: int = 16 * 1024 * 1024, max_files: int = 20000, max_text_chars: int = 100000,
+                 max_in_flight: Optional[int] = None, parse_timeout: float = 30, memory_mb: int = 512):
+        self.upload_folder = upload_folder
+        self.workers = workers
+        self.extensions = set(extensions)
+        self.max_file_bytes = max_file_bytes
+        self.max_files = max_files
+        self.max_text_chars = max_text_chars
+        self.max_in_flight = max_in_flight or self.workers * 4
+        self.parse_timeout = parse_timeout
+        self.memory_mb = memory_mb
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.files_parsed = 0
+        self.files_failed = 0
+        self.pool_restarts = 0
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # fork, as CodeExecutorPool does: spawn would re-import the web app
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context('fork'),
+                initializer=_init_worker, initargs=(self.memory_mb * 1024 * 1024,)
+            )
+        return self._pool
+
+    def _restart(self):
+        """Drop a broken pool; the next use forks a fresh one"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        self.pool_restarts += 1
+
+    def warm(self):
+        """Start every worker ahead of the first import"""
+        for future in [self.pool.submit(os.getpid) for _ in range(self.workers)]:
+            future.result()
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def import_dir(self, import_id: str) -> str:
+        path = os.path.join(self.upload_folder, 'resumes', import_id)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def save_upload(self, import_id: str, stream, filename: str, max_bytes: Optional[int] = None) -> str:
+        """Stream one upload into the import's directory; returns its path"""
+        path = os.path.join(self.import_dir(import_id), secure_filename(filename) or 'upload')
+        save_stream(stream, path, max_bytes if max_bytes is not None else self.max_file_bytes)
+        return path
+
+    def unpack(self, zip_path: str, dest: str) -> Iterator[Tuple[str, Optional[str], Optional[str], Dict]]:
+        """Extract a bulk zip member by member.
+
+        Yields (member name, extracted path or None, error or None, manifest
+        fields). A ``manifest.csv`` / ``candidates.csv`` member with
+        ``filename,email,name`` columns supplies candidate details; without
+        one they are read from each resume.
+        """
+        with zipfile.ZipFile(zip_path) as archive:
+            members = [m for m in archive.infolist() if not m.is_dir()
+                       and not m.filename.startswith('__MACOSX/') and not os.path.basename(m.filename).startswith('.')]
+            manifest = self._manifest(archive, members)
+            count = 0
+            for index, member in enumerate(members):
+                name = member.filename
+                base = os.path.basename(name)
+                if base.lower() in MANIFEST_NAMES:
+                    continue
+                fields = manifest.get(base.lower(), {})
+                if not allowed_file(base, self.extensions):
+                    yield name, None, "Unsupported file type", fields
+                    continue
+                count += 1
+                if count > self.max_files:
+                    yield name, None, f"More than {self.max_files} files in one import", fields
+                    continue
+                if member.file_size > self.max_file_bytes:
+                    yield name, None, f"Larger than {self.max_file_bytes} bytes", fields
+                    continue
+                path = os.path.join(dest, f"{index:06d}-{secure_filename(base) or 'resume'}")
+                try:
+                    # The declared size can lie; save_stream enforces it again
+                    with archive.open(member) as source:
+                        save_stream(source, path, self.max_file_bytes)
+                except (UploadTooLarge, zipfile.BadZipFile, OSError, RuntimeError) as e:
+                    yield name, None, str(e), fields
+                    continue
+                yield name, path, None, fields
+
+    @staticmethod
+    def _manifest(archive: zipfile.ZipFile, members: List[zipfile.ZipInfo]) -> Dict[str, Dict]:
+        found = next((m for m in members if os.path.basename(m.filename).lower() in MANIFEST_NAMES), None)
+        if found is None:
+            return {}
+        with archive.open(found) as raw:
+            rows = csv.DictReader(io.TextIOWrapper(raw, encoding='utf-8', errors='replace'))
+            return {
+                os.path.basename(row.get('filename') or '').lower(): {
+                    key: row[key].strip() for key in ('email', 'name') if row.get(key)
+                }
+                for row in rows
+            }
+
+    def parse(self, items: Iterable[Tuple]) -> Iterator[Tuple[Tuple, Dict]]:
+        """Parse (path, *context) items in the pool; yields (item, result) in input order"""
+        in_flight = deque()
+        for item in items:
+            in_flight.append((item, self._submit(item)))
+            while len(in_flight) >= self.max_in_flight or (in_flight and in_flight[0][1].done()):
+                yield self._result(in_flight)
+        while in_flight:
+            yield self._result(in_flight)
+
+    def _submit(self, item: Tuple) -> Future:
+        try:
+            return self.pool.submit(parse_resume_file_limited, item[0], self.max_text_chars, self.parse_timeout)
+        except BrokenProcessPool as e:
+            # Broke since the last result; _recover re-runs this file with the rest
+            future = Future()
+            future.set_exception(e)
+            return future
+
+    def _recover(self, in_flight: deque):
+        """Re-run every in-flight file the broken pool failed, one at a time on a fresh pool"""
+        self._restart()
+        for position, (item, future) in enumerate(in_flight):
+            if not isinstance(future.exception(), BrokenProcessPool):
+                continue
+            alone = Future()
+            try:
+                alone.set_result(self._submit(item).result())
+            except BrokenProcessPool as e:
+                # This file kills a worker on its own
+                self._restart()
+                alone.set_result({"error": f"Parser crashed: {e}"})
+            in_flight[position] = (item, alone)
+
+    def _result(self, in_flight: deque) -> Tuple[Tuple, Dict]:
+        item, future = in_flight[0]
+        if isinstance(future.exception(), BrokenProcessPool):
+            self._recover(in_flight)
+            item, future = in_flight[0]
+        in_flight.popleft()
+        try:
+            result = future.result()
+        except Exception as e:
+            result = {"error": f"Parser crashed: {e}"}
+        if "error" in result:
+            self.files_failed += 1
+        else:
+            self.files_parsed += 1
+        return item, result
+
+    def stats(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "files_parsed": self.files_parsed,
+            "files_failed": self.files_failed,
+            "pool_restarts": self.pool_restarts
+        }
@@ -0,0 +1,147 @@
+import re
+import zlib
+from typing import Dict, Hashable, List, Optional, Tuple
+import numpy as np
+
+MERSENNE_PRIME = (1 << 31) - 1
+
+
+class EmbeddingLSH:
+    """Approximate nearest-neighbour index for cosine similarity.
+
+    Random-hyperplane LSH: each of ``tables`` hash tables buckets a vector
+    by the signs of ``bits`` random projections. A query is compared exactly
+    only against vectors sharing a bucket in at least one table, so its cost
+    depends on bucket occupancy rather than on how many vectors are stored.
+    """
+
+    def __init__(self, dim: int, tables: int = 16, bits: int = 12, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.dim = dim
+        self.tables = tables
+        self.bits = bits
+        self.planes = rng.standard_normal((tables * bits, dim)).astype(np.float32)
+        self.powers = (1 << np.arange(bits, dtype=np.int64))
+        self.buckets: List[Dict[int, List[int]]] = [{} for _ in range(tables)]
+        self.vectors = np.zeros((1024, dim), dtype=np.float32)
+        self.owners: List[Hashable] = []
+
+    def __len__(self) -> int:
+        return len(self.owners)
+
+    def _normalize(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def _hashes(self, vectors: np.ndarray) -> np.ndarray:
+        """Bucket id per (vector, table)"""
+        signs = (vectors @ self.planes.T > 0).reshape(len(vectors), self.tables, self.bits)
+        return signs.astype(np.int64) @ self.powers
+
+    def add(self, vectors: np.ndarray, owners: List[Hashable]):
+        vectors = self._normalize(vectors)
+        start = len(self.owners)
+        needed = start + len(vectors)
+
+        if needed > len(self.vectors):
+            grown = np.zeros((max(needed, 2 * len(self.vectors)), self.dim), dtype=np.float32)
+            grown[:start] = self.vectors[:start]
+            self.vectors = grown
+
+        self.vectors[start:needed] = vectors
+        self.owners.extend(owners)
+
+        for offset, row_hashes in enumerate(self._hashes(vectors)):
+            for table, bucket in enumerate(row_hashes):
+                self.buckets[table].setdefault(int(bucket), []).append(start + offset)
+
+    def query(self, vector: np.ndarray, exclude_owner: Hashable = None) -> Tuple[float, Optional[Hashable]]:
+        """Best cosine similarity among bucket-mates, ignoring exclude_owner's own rows"""
+        vector = self._normalize(vector)
+        candidates = set()
+        for table, bucket in enumerate(self._hashes(vector)[0]):
+            candidates.update(self.buckets[table].get(int(bucket), ()))
+
+        rows = [i for i in candidates if self.owners[i] != exclude_owner]
+        if not rows:
+            return 0.0, None
+
+        rows = np.fromiter(rows, dtype=np.int64, count=len(rows))
+        scores = self.vectors[rows] @ vector[0]
+        best = int(np.argmax(scores))
+        return float(scores[best]), self.owners[rows[best]]
+
+
+def code_shingles(code: str, size: int = 4) -> np.ndarray:
+    """Hashed token n-grams of code, ignoring comments, whitespace and case"""
+    code = re.sub(r'#.*', '', code or '')
+    tokens = re.findall(r'\w+|[^\w\s]', code.lower())
+    if len(tokens) < size:
+        tokens = tokens + [''] * (size - len(tokens))
+
+    shingles = {' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+    return np.fromiter(
+        (zlib.crc32(s.encode('utf-8')) & MERSENNE_PRIME for s in shingles),
+        dtype=np.int64, count=len(shingles)
+    )
+
+
+class MinHashLSH:
+    """Near-duplicate index for code using MinHash signatures and LSH banding.
+
+    Signatures estimate Jaccard similarity of token shingles; ``bands`` bands
+    of ``num_perm / bands`` rows each are hashed into buckets so only likely
+    matches are compared.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, seed: int = 0):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.a = rng.integers(1, MERSENNE_PRIME, size=num_perm, dtype=np.int64)
+        self.b = rng.integers(0, MERSENNE_PRIME, size=num_perm, dtype=np.int64)
+        self.buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+        self.signatures = np.zeros((1024, num_perm), dtype=np.int64)
+        self.owners: List[Hashable] = []
+
+    def __len__(self) -> int:
+        return len(self.owners)
+
+    def signature(self, code: str) -> np.ndarray:
+        shingles = code_shingles(code)
+        hashed = (np.outer(shingles, self.a) + self.b) % MERSENNE_PRIME
+        return hashed.min(axis=0)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def add(self, code: str, owner: Hashable):
+        signature = self.signature(code)
+        row = len(self.owners)
+        if row == len(self.signatures):
+            self.signatures = np.vstack([self.signatures, np.zeros_like(self.signatures)])
+        self.signatures[row] = signature
+        self.owners.append(owner)
+        for band, key in enumerate(self._band_keys(signature)):
+            self.buckets[band].setdefault(key, []).append(row)
+
+    def query(self, code: str, exclude_owner: Hashable = None) -> Tuple[float, Optional[Hashable]]:
+        """Best estimated Jaccard similarity among band-mates"""
+        signature = self.signature(code)
+        candidates = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates.update(self.buckets[band].get(key, ()))
+
+        rows = [i for i in candidates if self.owners[i] != exclude_owner]
+        if not rows:
+            return 0.0, None
+
+        rows = np.fromiter(rows, dtype=np.int64, count=len(rows))
+        matches = (self.signatures[rows] == signature).mean(axis=1)
+        best = int(np.argmax(matches))
+        return float(matches[best]), self.owners[rows[best]]
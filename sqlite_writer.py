@@ -0,0 +1,234 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+from models import db
+
+
+def is_sqlite_file(url) -> bool:
+    """True for an on-disk SQLite database (not an in-memory one)"""
+    url = make_url(url)
+    database = url.database or ''
+    return url.get_backend_name() == 'sqlite' and database not in ('', ':memory:') \
+        and not database.startswith('file::memory:')
+
+
+def apply_pragmas(engine, pragmas: Dict):
+    """Run ``PRAGMA name=value`` on every new connection of an SQLite engine"""
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+class _Job:
+    __slots__ = ('fn', 'args', 'future')
+
+    def __init__(self, fn: Callable, args: tuple):
+        self.fn = fn
+        self.args = args
+        self.future = Future()
+
+
+class SQLiteWriter:
+    """One writer thread that commits callers' write jobs in groups.
+
+    SQLite has a single write lock. Request threads that each commit queue
+    on it, fail with "database is locked" once busy_timeout runs out, and
+    every commit pays its own WAL append. ``run(fn, *args)`` instead hands
+    ``fn`` to a thread that owns the write connection. It takes every job
+    waiting (up to ``max_batch``; ``max_wait`` seconds to gather more),
+    opens one ``BEGIN IMMEDIATE`` transaction, runs each job in its own
+    savepoint and commits once. A job that raises is rolled back to its
+    savepoint and the exception re-raised to its caller; the rest of the
+    group still commits.
+
+    Jobs use ``db.session`` as usual: on the writer thread it is a session
+    bound to the write connection. They must not commit, and return plain
+    values rather than ORM objects, which are detached afterwards. Reads
+    belong in the caller before ``run`` so the write lock only covers
+    writes; with WAL they never wait on it.
+
+    Disabled (another database, or in-memory SQLite), ``run`` calls ``fn``
+    and commits ``db.session`` in the caller's thread, so routes keep a
+    single code path. Each gunicorn worker has its own writer, and the
+    SQLite lock serializes them. A writer waiting on another process keeps
+    retrying past busy_timeout, up to ``lock_timeout`` seconds, since its
+    queued jobs have nowhere else to go.
+    """
+
+    def __init__(self, app=None, url=None, enabled: bool = True, pragmas: Optional[Dict] = None,
+                 max_batch: int = 64, max_wait: float = 0.0, lock_timeout: float = 60):
+        self.app = app
+        self.url = url
+        self.enabled = enabled and url is not None and is_sqlite_file(url)
+        self.pragmas = pragmas or {}
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.lock_timeout = lock_timeout
+        self._queue: "queue.Queue[Optional[_Job]]" = queue.Queue()
+        self._conn = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.jobs = 0
+        self.job_errors = 0
+        self.commits = 0
+        self.commit_errors = 0
+        self.largest_batch = 0
+        self.lock_retries = 0
+
+    def run(self, fn: Callable, *args):
+        """Run fn(*args) in a write transaction; returns its result once committed"""
+        if not self.enabled:
+            try:
+                result = fn(*args)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            return result
+
+        if threading.current_thread() is self._thread:
+            # A job calling run: already inside the group's transaction
+            return fn(*args)
+
+        job = _Job(fn, args)
+        self._start()
+        self._queue.put(job)
+        return job.future.result()
+
+    def _start(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name='sqlite-writer', daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """Commit whatever is queued and stop the writer thread"""
+        thread = self._thread
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _loop(self):
+        with self.app.app_context():
+            while True:
+                batch = self._gather()
+                stopping = None in batch
+                jobs = [job for job in batch if job is not None and job.future.set_running_or_notify_cancel()]
+                if jobs:
+                    self._commit(jobs)
+                if stopping:
+                    break
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._thread = None
+
+    def _gather(self) -> List[Optional[_Job]]:
+        """The next job plus whatever queued behind it, up to max_batch"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch and batch[-1] is not None:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+        return batch
+
+    def _connection(self):
+        if self._conn is None:
+            engine = create_engine(self.url, poolclass=NullPool)
+            apply_pragmas(engine, self.pragmas)
+            self._conn = engine.connect()
+            # Transactions are begun explicitly (BEGIN IMMEDIATE), not by pysqlite
+            self._conn.connection.driver_connection.isolation_level = None
+        return self._conn
+
+    def _commit(self, jobs: List[_Job]):
+        outcomes = []
+        session = None
+        try:
+            conn = self._connection()
+            self._begin(conn)
+            session = Session(bind=conn, autoflush=True, expire_on_commit=False)
+            db.session.registry.set(session)
+            for job in jobs:
+                try:
+                    with session.begin_nested():
+                        outcomes.append((job, job.fn(*job.args), None))
+                except Exception as e:
+                    outcomes.append((job, None, e))
+            conn.commit()
+        except Exception as e:
+            self.commit_errors += 1
+            self._discard_connection()
+            for job in jobs:
+                job.future.set_exception(e)
+            return
+        finally:
+            if session is not None:
+                session.close()
+            db.session.registry.clear()
+
+        self.commits += 1
+        self.jobs += len(jobs)
+        self.largest_batch = max(self.largest_batch, len(jobs))
+        for job, result, error in outcomes:
+            if error is not None:
+                self.job_errors += 1
+                job.future.set_exception(error)
+            else:
+                job.future.set_result(result)
+
+    def _begin(self, conn):
+        # Take the write lock up front: a deferred transaction could find
+        # its snapshot stale when it first writes, which no wait resolves
+        deadline = time.monotonic() + self.lock_timeout
+        while True:
+            try:
+                conn.exec_driver_sql('BEGIN IMMEDIATE')
+                return
+            except OperationalError as e:
+                if 'locked' not in str(e.orig) or time.monotonic() >= deadline:
+                    raise
+                self.lock_retries += 1
+
+    def _discard_connection(self):
+        if self._conn is None:
+            return
+        try:
+            self._conn.rollback()
+            self._conn.close()
+        except Exception:
+            pass
+        self._conn = None
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "queued": self._queue.qsize(),
+            "jobs": self.jobs,
+            "job_errors": self.job_errors,
+            "commits": self.commits,
+            "commit_errors": self.commit_errors,
+            "jobs_per_commit": self.jobs / self.commits if self.commits else 0.0,
+            "largest_batch": self.largest_batch,
+            "lock_retries": self.lock_retries
+        }
@@ -0,0 +1,361 @@
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+from cache import TTLCache
+from models import db, Assessment, Candidate, Company, JobDescription, JobStats, JobStatsMinute
+
+COUNTERS = ('started', 'submitted', 'evaluated', 'passed', 'score_sum')
+SUBMITTED_STATUSES = ('completed', 'evaluated', 'failed')
+
+
+def recount(conn, cutoff: datetime, retention: int = 1440):
+    """Set job_stats and the recent minute buckets to what the assessments table holds.
+
+    Rows are overwritten in place and stamped ``rebuilt_at = cutoff``. A
+    flush committed before this is overwritten with counts that include
+    its events; a later one drops deltas recorded before the cutoff, in
+    whichever worker they were pending. Used by ``StatsRollup.rebuild``
+    and to backfill on migration.
+    """
+    stats, buckets = JobStats.__table__, JobStatsMinute.__table__
+    now = datetime.utcnow()
+    evaluated = Assessment.status == 'evaluated'
+    rows = conn.execute(
+        db.select(
+            Assessment.job_description_id,
+            JobDescription.company_id,
+            db.func.count(),
+            db.func.sum(db.case((Assessment.status.in_(SUBMITTED_STATUSES), 1), else_=0)),
+            db.func.sum(db.case((evaluated, 1), else_=0)),
+            db.func.sum(db.case((db.and_(evaluated, Assessment.is_passed.is_(True)), 1), else_=0)),
+            db.func.sum(db.case((evaluated, Assessment.total_score), else_=0.0))
+        )
+        .join(JobDescription, JobDescription.id == Assessment.job_description_id)
+        .group_by(Assessment.job_description_id, JobDescription.company_id)
+    ).all()
+    counted = {
+        job_id: {"company_id": company_id, "started": started, "submitted": submitted or 0,
+                 "evaluated": evaluated_count or 0, "passed": passed or 0, "score_sum": score_sum or 0.0}
+        for job_id, company_id, started, submitted, evaluated_count, passed, score_sum in rows
+    }
+
+    minutes = Counter()
+    for job_id, completed_at in conn.execute(
+        db.select(Assessment.job_description_id, Assessment.completed_at).where(
+            Assessment.completed_at >= now - timedelta(minutes=retention)
+        )
+    ):
+        if job_id:
+            minutes[(job_id, completed_at.replace(second=0, microsecond=0))] += 1
+
+    existing = set(conn.execute(db.select(stats.c.job_description_id)).scalars())
+    zero = {"started": 0, "submitted": 0, "evaluated": 0, "passed": 0, "score_sum": 0.0}
+    if existing:
+        conn.execute(
+            stats.update().where(stats.c.job_description_id == db.bindparam('p_job')).values(
+                rebuilt_at=cutoff, updated_at=now,
+                **{counter: db.bindparam(f'v_{counter}') for counter in COUNTERS}
+            ),
+            [dict({"p_job": job_id}, **{f'v_{c}': counted.get(job_id, zero)[c] for c in COUNTERS})
+             for job_id in existing]
+        )
+    if set(counted) - existing:
+        conn.execute(stats.insert(), [
+            dict(counted[job_id], job_description_id=job_id, rebuilt_at=cutoff, updated_at=now)
+            for job_id in set(counted) - existing
+        ])
+
+    conn.execute(buckets.delete())
+    if minutes:
+        conn.execute(buckets.insert(), [
+            {"job_description_id": job_id, "minute": minute, "submitted": n}
+            for (job_id, minute), n in minutes.items()
+        ])
+
+
+class StatsRollup:
+    """Per-job assessment counters behind the admin dashboard.
+
+    Starts, submits and evaluations add to in-memory deltas, kept per
+    (job, second recorded), that a background thread writes every
+    ``flush_interval`` seconds: one executemany ``UPDATE job_stats SET
+    started = started + n, ...`` plus per-minute submission buckets (kept
+    for ``retention`` minutes), so a job taking hundreds of submissions a
+    second costs a few row writes per flush. Per-job and per-company pass
+    rates, average scores and submissions per minute are all read from
+    these rows.
+
+    ``dashboard`` is cached for ``cache_ttl`` seconds, so any number of
+    admins refreshing costs at most one set of queries per interval per
+    worker. Deltas not yet flushed are lost if a worker dies; ``rebuild``
+    recomputes everything from the assessments table (see ``recount``),
+    and migration 0009 does the same for assessments from before the
+    rollup existed.
+    """
+
+    def __init__(self, flush_interval: float = 5, rate_window: int = 15, retention: int = 1440,
+                 cache_ttl: float = 10, recent_limit: int = 10, top_jobs: int = 50, app=None):
+        self.flush_interval = flush_interval
+        self.rate_window = rate_window
+        self.retention = retention
+        self.recent_limit = recent_limit
+        self.top_jobs = top_jobs
+        self.app = app
+        self.cache = TTLCache(max_size=1, ttl=cache_ttl)
+        # (job id, second recorded) -> counter deltas
+        self._deltas: Dict[Tuple[str, datetime], Counter] = defaultdict(Counter)
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flush_wanted = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self.flushes = 0
+        self.flush_errors = 0
+        self.rebuilds = 0
+
+    def record_started(self, job_id: str):
+        self._add(job_id, started=1)
+
+    def record_submitted(self, job_id: str):
+        self._add(job_id, submitted=1)
+
+    def record_evaluated(self, job_id: str, score: float, passed: bool):
+        self._add(job_id, evaluated=1, passed=int(bool(passed)), score_sum=score or 0.0)
+
+    def record_regraded(self, job_id: str, score_delta: float, passed_delta: int):
+        """Re-graded evaluations, already counted: only their scores and pass results move"""
+        self._add(job_id, passed=passed_delta, score_sum=score_delta)
+
+    def _add(self, job_id: str, **deltas):
+        if not job_id:
+            return
+        second = datetime.utcnow().replace(microsecond=0)
+        with self._pending_lock:
+            self._deltas[(job_id, second)].update(deltas)
+        self._request_flush()
+
+    def _request_flush(self):
+        if self.app is None:
+            return
+
+        # Started lazily so each forked worker gets its own thread
+        if self._flusher is None or not self._flusher.is_alive():
+            with self._pending_lock:
+                if self._flusher is None or not self._flusher.is_alive():
+                    self._flusher = threading.Thread(
+                        target=self._flush_loop, name='stats-rollup-flush', daemon=True
+                    )
+                    self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            self._flush_wanted.wait(self.flush_interval)
+            self._flush_wanted.clear()
+            with self.app.app_context():
+                self.flush()
+
+    def flush(self):
+        """Add pending deltas to job_stats and job_stats_minutes in one transaction"""
+        with self._flush_lock:
+            with self._pending_lock:
+                deltas, self._deltas = self._deltas, defaultdict(Counter)
+            if not deltas:
+                return
+
+            try:
+                self._write(deltas)
+                db.session.commit()
+                self.flushes += 1
+            except Exception:
+                # Keep the deltas for the next flush rather than losing them
+                db.session.rollback()
+                self.flush_errors += 1
+                with self._pending_lock:
+                    for key, counts in deltas.items():
+                        self._deltas[key].update(counts)
+
+    def _write(self, pending: Dict[Tuple[str, datetime], Counter]):
+        now = datetime.utcnow()
+        stats = JobStats.__table__
+        job_ids = {job_id for job_id, _ in pending}
+
+        # Locked so a concurrent rebuild either overwrites this flush or
+        # commits first and has its cutoff seen here
+        rebuilt = dict(db.session.execute(
+            db.select(stats.c.job_description_id, stats.c.rebuilt_at)
+            .where(stats.c.job_description_id.in_(job_ids)).with_for_update()
+        ).tuples().all())
+        existing = set(rebuilt)
+        known = set(existing)
+        if job_ids - existing:
+            jobs = db.session.execute(
+                db.select(JobDescription.id, JobDescription.company_id)
+                .where(JobDescription.id.in_(job_ids - existing))
+            ).all()
+            if jobs:
+                db.session.execute(stats.insert(), [
+                    {"job_description_id": job.id, "company_id": job.company_id, "started": 0,
+                     "submitted": 0, "evaluated": 0, "passed": 0, "score_sum": 0.0, "updated_at": now}
+                    for job in jobs
+                ])
+                known.update(job.id for job in jobs)
+
+        # Deltas recorded before a job's last rebuild are in its counts already
+        deltas: Dict[str, Counter] = defaultdict(Counter)
+        minutes = Counter()
+        for (job_id, second), counts in pending.items():
+            if job_id not in known or (rebuilt.get(job_id) is not None and second < rebuilt[job_id]):
+                continue
+            deltas[job_id].update(counts)
+            if counts.get('submitted'):
+                minutes[(job_id, second.replace(second=0))] += counts['submitted']
+
+        if deltas:
+            db.session.execute(
+                stats.update()
+                .where(stats.c.job_description_id == db.bindparam('p_job'))
+                .values(updated_at=now, **{
+                    counter: stats.c[counter] + db.bindparam(f'd_{counter}') for counter in COUNTERS
+                }),
+                [dict({"p_job": job_id}, **{f'd_{c}': counts.get(c, 0) for c in COUNTERS})
+                 for job_id, counts in deltas.items()]
+            )
+
+        if minutes:
+            buckets = JobStatsMinute.__table__
+            present = set(db.session.execute(
+                db.select(buckets.c.job_description_id, buckets.c.minute).where(
+                    buckets.c.job_description_id.in_({job_id for job_id, _ in minutes}),
+                    buckets.c.minute.in_({minute for _, minute in minutes})
+                )
+            ).tuples())
+            updates = [{"p_job": j, "p_minute": m, "d_submitted": n}
+                       for (j, m), n in minutes.items() if (j, m) in present]
+            inserts = [{"job_description_id": j, "minute": m, "submitted": n}
+                       for (j, m), n in minutes.items() if (j, m) not in present]
+            if updates:
+                db.session.execute(
+                    buckets.update()
+                    .where(buckets.c.job_description_id == db.bindparam('p_job'),
+                           buckets.c.minute == db.bindparam('p_minute'))
+                    .values(submitted=buckets.c.submitted + db.bindparam('d_submitted')),
+                    updates
+                )
+            if inserts:
+                db.session.execute(buckets.insert(), inserts)
+            db.session.execute(buckets.delete().where(buckets.c.minute < now - timedelta(minutes=self.retention)))
+
+    def rebuild(self):
+        """Recompute job_stats and the recent minute buckets from assessments"""
+        # Cut off on a whole second: pending deltas are kept per second
+        # recorded, and every worker drops those before the cutoff
+        time.sleep(1 - datetime.utcnow().microsecond / 1e6)
+        cutoff = datetime.utcnow().replace(microsecond=0)
+        with self._flush_lock:
+            recount(db.session, cutoff, self.retention)
+            db.session.commit()
+        self.cache.clear()
+        self.rebuilds += 1
+
+    def dashboard(self) -> Dict:
+        """Totals, per-job and per-company aggregates and recent activity, cached"""
+        snapshot = self.cache.get('dashboard')
+        if snapshot is None:
+            snapshot = self._compute()
+            self.cache.set('dashboard', snapshot)
+        return snapshot
+
+    def _compute(self) -> Dict:
+        stats = JobStats.__table__
+        totals = db.session.execute(
+            db.select(db.func.count(), db.func.sum(stats.c.started), db.func.sum(stats.c.submitted))
+            .select_from(stats)
+        ).one()
+
+        since = datetime.utcnow().replace(second=0, microsecond=0) - timedelta(minutes=self.rate_window - 1)
+        rates = dict(db.session.execute(
+            db.select(JobStatsMinute.job_description_id, db.func.sum(JobStatsMinute.submitted))
+            .where(JobStatsMinute.minute >= since)
+            .group_by(JobStatsMinute.job_description_id)
+        ).tuples().all())
+
+        jobs = db.session.execute(
+            db.select(stats, JobDescription.title)
+            .join(JobDescription, JobDescription.id == stats.c.job_description_id)
+            .order_by(stats.c.submitted.desc())
+            .limit(self.top_jobs)
+        ).all()
+
+        companies = db.session.execute(
+            db.select(
+                stats.c.company_id, Company.name, db.func.count(), db.func.sum(stats.c.started),
+                db.func.sum(stats.c.submitted), db.func.sum(stats.c.evaluated),
+                db.func.sum(stats.c.passed), db.func.sum(stats.c.score_sum)
+            )
+            .outerjoin(Company, Company.id == stats.c.company_id)
+            .group_by(stats.c.company_id, Company.name)
+        ).all()
+        company_rates = Counter()
+        for job_id, company_id in db.session.execute(
+            db.select(stats.c.job_description_id, stats.c.company_id)
+            .where(stats.c.job_description_id.in_(rates))
+        ):
+            company_rates[company_id] += rates[job_id]
+
+        recent = db.session.execute(
+            db.select(Assessment.total_score, Assessment.status, Assessment.created_at,
+                      Candidate.name, JobDescription.title)
+            .outerjoin(Candidate, Candidate.id == Assessment.candidate_id)
+            .outerjoin(JobDescription, JobDescription.id == Assessment.job_description_id)
+            .order_by(Assessment.created_at.desc())
+            .limit(self.recent_limit)
+        ).all()
+
+        return {
+            "total_candidates": db.session.execute(db.select(db.func.count()).select_from(Candidate)).scalar(),
+            "total_assessments": totals[1] or 0,
+            "total_submissions": totals[2] or 0,
+            "total_jobs": db.session.execute(db.select(db.func.count()).select_from(JobDescription)).scalar(),
+            "jobs": [dict(self._aggregate(job.started, job.submitted, job.evaluated, job.passed,
+                                          job.score_sum, rates.get(job.job_description_id, 0)),
+                          job_id=job.job_description_id, title=job.title)
+                     for job in jobs],
+            "companies": [dict(self._aggregate(started, submitted, evaluated, passed, score_sum,
+                                               company_rates[company_id]),
+                               company_id=company_id, name=name, jobs=job_count)
+                          for company_id, name, job_count, started, submitted, evaluated, passed, score_sum
+                          in companies],
+            "recent_activity": [
+                {
+                    "candidate": row.name,
+                    "job_title": row.title,
+                    "score": row.total_score,
+                    "status": row.status,
+                    "time": row.created_at.isoformat() if row.created_at else None
+                }
+                for row in recent
+            ],
+            "generated_at": datetime.utcnow().isoformat()
+        }
+
+    def _aggregate(self, started, submitted, evaluated, passed, score_sum, recent_submissions) -> Dict:
+        return {
+            "started": started or 0,
+            "submitted": submitted or 0,
+            "evaluated": evaluated or 0,
+            "pass_rate": passed / evaluated if evaluated else None,
+            "average_score": score_sum / evaluated if evaluated else None,
+            "submissions_per_min": recent_submissions / self.rate_window
+        }
+
+    def stats(self) -> Dict:
+        with self._pending_lock:
+            pending = len({job_id for job_id, _ in self._deltas})
+        return {
+            "pending_jobs": pending,
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+            "rebuilds": self.rebuilds,
+            "cache": self.cache.stats()
+        }
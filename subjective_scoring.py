@@ -0,0 +1,190 @@
+import math
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from llm_client import run_concurrently
+
+
+class SubjectiveScorer:
+    """Scores batches of subjective answers in one vectorized pass.
+
+    Each answer gets three signals, combined with ``weights``:
+      semantic    cosine similarity of its embedding to the model answer's,
+                  rescaled from ``similarity_range`` to 0-1
+      keywords    share of the rubric keywords it mentions (falls back to
+                  the model answer's most frequent non-stop-word terms)
+      readability Flesch reading ease, clipped to 0-100
+    Signals that can't be computed (no model answer, no keywords, textstat
+    unavailable) are left out and the remaining weights renormalized. Scores that land inside
+    ``llm_band`` are re-scored by ``llm_evaluator`` when one is given.
+
+    Every signal depends only on the answer and its question, never on the
+    other answers in the batch, so an answer scores the same alone, in its
+    sheet or in a re-grade chunk.
+    """
+
+    def __init__(self, embedding_service, llm_evaluator: Optional[Callable] = None,
+                 weights: Tuple[float, float, float] = (0.6, 0.3, 0.1),
+                 similarity_range: Tuple[float, float] = (0.2, 0.85),
+                 llm_band: Tuple[float, float] = (40.0, 60.0),
+                 llm_concurrency: int = 8, keywords_per_answer: int = 10):
+        self.embeddings = embedding_service
+        self.llm_evaluator = llm_evaluator
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.similarity_range = similarity_range
+        self.llm_band = llm_band
+        self.llm_concurrency = llm_concurrency
+        self.keywords_per_answer = keywords_per_answer
+        self.llm_calls = 0
+
+    def score_batch(self, items: Sequence[Tuple[object, str]]) -> List[float]:
+        """Score (question, answer_text) pairs; returns 0-100 per pair"""
+        if not items:
+            return []
+
+        answers = [answer or '' for _, answer in items]
+        model_answers = [q.model_answer or '' for q, _ in items]
+        answered = np.array([bool(a.strip()) for a in answers])
+
+        semantic, has_model = self._semantic(answers, model_answers)
+        coverage, has_keywords = self._keyword_coverage(items, answers, model_answers)
+        readability, has_readability = self._readability(answers)
+
+        signals = np.vstack([semantic, coverage, readability]).T
+        available = np.vstack([has_model, has_keywords, has_readability]).T
+        weights = available * self.weights
+        combined = (signals * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-12) * 100
+
+        # Nothing to compare against: keep the old neutral default
+        scores = np.where(has_model | has_keywords, combined, 50.0)
+        scores = np.where(answered, scores, 0.0)
+
+        if self.llm_evaluator is not None:
+            self._rescore_borderline(items, answers, scores)
+
+        return [float(s) for s in np.clip(scores, 0, 100)]
+
+    def _semantic(self, answers: List[str], model_answers: List[str]):
+        has_model = np.array([bool(m.strip()) for m in model_answers])
+        semantic = np.zeros(len(answers), dtype=np.float32)
+        if not has_model.any():
+            return semantic, has_model
+
+        rows = np.flatnonzero(has_model)
+        unique_models = sorted({model_answers[i] for i in rows})
+        vectors = self.embeddings.encode([answers[i] for i in rows] + unique_models)
+        vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+        answer_vectors = vectors[:len(rows)]
+        model_row = {text: len(rows) + i for i, text in enumerate(unique_models)}
+        model_vectors = vectors[[model_row[model_answers[i]] for i in rows]]
+
+        low, high = self.similarity_range
+        cosine = (answer_vectors * model_vectors).sum(axis=1)
+        semantic[rows] = np.clip((cosine - low) / (high - low), 0, 1)
+        return semantic, has_model
+
+    def _keyword_coverage(self, items, answers: List[str], model_answers: List[str]):
+        from scipy import sparse
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        analyzer = CountVectorizer().build_analyzer()
+        keyword_lists = self._keywords(items, model_answers, analyzer)
+        has_keywords = np.array([bool(k) for k in keyword_lists])
+        coverage = np.zeros(len(answers), dtype=np.float32)
+        if not has_keywords.any():
+            return coverage, has_keywords
+
+        vocabulary = sorted({k for keywords in keyword_lists for k in keywords})
+        column = {k: i for i, k in enumerate(vocabulary)}
+        max_ngram = max(len(k.split()) for k in vocabulary)
+
+        presence = CountVectorizer(
+            vocabulary=vocabulary, ngram_range=(1, max_ngram), binary=True
+        ).transform(answers)
+
+        rows = [i for i, keywords in enumerate(keyword_lists) for _ in keywords]
+        cols = [column[k] for keywords in keyword_lists for k in keywords]
+        expected = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=presence.shape
+        )
+
+        # Every keyword of a question weighs the same: a weight learned from
+        # the batch would make one answer's score depend on the others
+        hit = np.asarray(presence.multiply(expected).sum(axis=1)).ravel()
+        total = np.asarray(expected.sum(axis=1)).ravel()
+        coverage[has_keywords] = hit[has_keywords] / total[has_keywords]
+        return coverage, has_keywords
+
+    def _keywords(self, items, model_answers: List[str], analyzer) -> List[List[str]]:
+        """Normalized keywords per item: rubric 'keywords' first, else model-answer terms"""
+        rubric_keywords: Dict[int, Optional[List[str]]] = {}
+        keyword_lists: List[Optional[List[str]]] = []
+        for question, _ in items:
+            if id(question) not in rubric_keywords:
+                rubric = question.rubric if isinstance(question.rubric, dict) else {}
+                keywords = {' '.join(analyzer(str(k))) for k in rubric.get('keywords', [])}
+                rubric_keywords[id(question)] = sorted(k for k in keywords if k) or None
+            keyword_lists.append(rubric_keywords[id(question)])
+
+        missing = [i for i, k in enumerate(keyword_lists) if k is None and model_answers[i].strip()]
+        if missing:
+            for i, terms in zip(missing, self._top_terms([model_answers[i] for i in missing])):
+                keyword_lists[i] = terms
+
+        return [k or [] for k in keyword_lists]
+
+    def _top_terms(self, documents: List[str]) -> List[List[str]]:
+        """Each model answer's most frequent terms, from that answer alone"""
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        top = {}
+        for doc in set(documents):
+            try:
+                vectorizer = CountVectorizer(stop_words='english')
+                counts = vectorizer.fit_transform([doc]).toarray()[0]
+            except ValueError:  # only stop words
+                top[doc] = []
+                continue
+            # Stable sort: ties keep the vectorizer's alphabetical order
+            order = np.argsort(-counts, kind='stable')[:self.keywords_per_answer]
+            terms = vectorizer.get_feature_names_out()
+            top[doc] = [terms[i] for i in order]
+        return [top[doc] for doc in documents]
+
+    def _readability(self, answers: List[str]):
+        scores = np.zeros(len(answers), dtype=np.float32)
+        try:
+            import textstat
+
+            for i, answer in enumerate(answers):
+                if answer.strip():
+                    score = textstat.flesch_reading_ease(answer)
+                    scores[i] = 0.0 if math.isnan(score) else score
+        except (ImportError, LookupError):  # textstat or its syllable dictionary missing
+            return scores, np.zeros(len(answers), dtype=bool)
+
+        return np.clip(scores, 0, 100) / 100, np.ones(len(answers), dtype=bool)
+
+    def _rescore_borderline(self, items, answers: List[str], scores: np.ndarray):
+        low, high = self.llm_band
+        borderline = [i for i, s in enumerate(scores) if low <= s <= high and answers[i].strip()]
+        if not borderline:
+            return
+
+        def evaluate(i):
+            question = items[i][0]
+            return self.llm_evaluator({
+                "question_text": question.question_text,
+                "model_answer": question.model_answer,
+                "rubric": question.rubric
+            }, answers[i])
+
+        # A failed LLM call keeps the vectorized score
+        results = run_concurrently(evaluate, borderline, max_workers=self.llm_concurrency, retries=0)
+        for i, llm_score in zip(borderline, results):
+            if llm_score is not None:
+                scores[i] = llm_score
+        self.llm_calls += len(borderline)
+
+    def stats(self) -> Dict:
+        return {"llm_calls": self.llm_calls}
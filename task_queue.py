@@ -0,0 +1,145 @@
+import os
+import threading
+import time
+import uuid
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TaskQueue:
+    """Background job queue with pluggable backends.
+
+    backend='celery'    jobs go to Celery using CELERY_BROKER_URL /
+                        CELERY_RESULT_BACKEND; run workers with
+                        ``celery -A app.task_queue.celery worker``
+    backend='inprocess' jobs run on a local thread pool; no broker needed
+    backend='eager'     jobs run inline at enqueue time (tests, scripts)
+
+    Every job runs inside a Flask app context, so it can use db.session.
+
+    Jobs registered with ``periodic`` run every so many seconds on a
+    thread of each process that serves requests, started by the first
+    request it handles (so forked gunicorn workers each start their own,
+    and never the master). The eager backend has nothing queued to lose
+    and runs none.
+    """
+
+    BACKENDS = ('celery', 'inprocess', 'eager')
+
+    def __init__(self, app, backend: str = 'inprocess', max_workers: int = 4):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown task queue backend: {backend}")
+
+        self.app = app
+        self.backend = backend
+        self.max_workers = max_workers
+        self._tasks: Dict[str, Callable] = {}
+        self._executor = None
+        self._celery = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._periodic: List[Tuple[Callable, float]] = []
+        self._periodic_pid: Optional[int] = None
+        if backend != 'eager':
+            app.before_request(self.start_periodic)
+
+    @property
+    def celery(self):
+        if self._celery is None:
+            from celery import Celery
+            self._celery = Celery(
+                self.app.import_name,
+                broker=self.app.config['CELERY_BROKER_URL'],
+                backend=self.app.config['CELERY_RESULT_BACKEND']
+            )
+        return self._celery
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix='task-queue'
+            )
+        return self._executor
+
+    def task(self, fn: Callable) -> Callable:
+        """Register a job; call ``fn.delay(*args)`` to enqueue it"""
+        name = fn.__name__
+
+        @wraps(fn)
+        def run_in_app_context(*args):
+            with self.app.app_context():
+                return fn(*args)
+
+        self._tasks[name] = run_in_app_context
+        if self.backend == 'celery':
+            self.celery.task(name=name)(run_in_app_context)
+
+        fn.delay = lambda *args: self.enqueue(name, *args)
+        return fn
+
+    def periodic(self, interval: float) -> Callable:
+        """Register a job to run every interval seconds in each serving process"""
+        def register(fn: Callable) -> Callable:
+            self._periodic.append((fn, interval))
+            return fn
+        return register
+
+    def start_periodic(self):
+        """Start this process's periodic job threads, once"""
+        if self._periodic_pid == os.getpid() or not self._periodic:
+            return
+        with self._lock:
+            if self._periodic_pid == os.getpid():
+                return
+            self._periodic_pid = os.getpid()
+            for fn, interval in self._periodic:
+                threading.Thread(
+                    target=self._every, args=(fn, interval), name=f'periodic-{fn.__name__}', daemon=True
+                ).start()
+
+    def _every(self, fn: Callable, interval: float):
+        while True:
+            try:
+                with self.app.app_context():
+                    fn()
+            except Exception:
+                logger.exception("Periodic job %s failed", fn.__name__)
+            time.sleep(interval)
+
+    def pending(self) -> int:
+        """Jobs queued or running on this process's thread pool (0 for celery)"""
+        return self._pending
+
+    def enqueue(self, name: str, *args) -> str:
+        """Queue a registered job and return its id"""
+        if self.backend == 'celery':
+            return self.celery.send_task(name, args=args).id
+
+        job_id = str(uuid.uuid4())
+        if self.backend == 'eager':
+            self._run(name, job_id, args)
+        else:
+            with self._lock:
+                self._pending += 1
+            self.executor.submit(self._run, name, job_id, args, True)
+        return job_id
+
+    def _run(self, name: str, job_id: str, args, queued: bool = False):
+        try:
+            self._tasks[name](*args)
+        except Exception:
+            logger.exception("Task %s (%s) failed", name, job_id)
+        finally:
+            if queued:
+                with self._lock:
+                    self._pending -= 1
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -0,0 +1,119 @@
+import ast
+import hashlib
+import json
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+from cache import TTLCache
+from code_executor import MALFORMED_OUTPUT
+
+# Verdicts that say more about the machine than the code: never cached. A
+# child killed mid-write (memory, file size) leaves malformed output.
+TRANSIENT_ERRORS = ("Time limit exceeded", "Execution aborted (resource limit)", MALFORMED_OUTPUT)
+
+
+def code_hash(code: str) -> str:
+    """Hash of a submission's AST, so whitespace, comments and blank lines don't matter"""
+    try:
+        normalized = ast.dump(ast.parse(code or ''))
+    except (SyntaxError, ValueError):
+        # Unparseable code fails the same way whatever its layout, but its
+        # error message carries a line number: hash the exact text
+        normalized = 'raw:' + (code or '')
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def test_case_version(test_cases: List[Dict], language: Optional[str], limits: Optional[Dict] = None) -> str:
+    """Hash of a question's test cases, language and sandbox limits; changes whenever they do"""
+    payload = json.dumps([test_cases or [], language, limits or {}], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def _judged(verdict) -> bool:
+    return isinstance(verdict, dict) and isinstance(verdict.get('passed'), bool) \
+        and 'time_ms' in verdict and 'error' in verdict
+
+
+class VerdictCache:
+    """Memoized per-test-case verdicts for coding answers.
+
+    Keyed by (question id, test-case version, code hash). The version is a
+    hash of the question's ``test_cases``, language and sandbox limits, so
+    editing a question's test cases moves every later lookup to a new key
+    and the old verdicts are never served again; they age out of the LRU.
+    The code hash is taken over ``ast.dump`` of the submission, so
+    byte-identical and whitespace- or comment-only variants of a template
+    share one entry.
+
+    ``run`` also coalesces identical submissions that are in flight at the
+    same time (a candidate double-clicking submit, a cohort pasting the
+    same template) onto one executor run. Runs with a timeout or resource
+    abort, and crashed runs, aren't cached: they depend on load, not code.
+    Only verdicts as judged by CodeExecutorPool (a bool ``passed`` per
+    case) are stored; the sandboxed child never produces them itself.
+    """
+
+    def __init__(self, max_size: int = 20000, max_questions: int = 4096):
+        self.entries = TTLCache(max_size=max_size)
+        self._pending: Dict[Hashable, Future] = {}
+        # question id -> latest test-case version, only to count invalidations
+        self._versions = TTLCache(max_size=max_questions)
+        self._lock = threading.Lock()
+        self.coalesced = 0
+        self.invalidations = 0
+        self.uncacheable = 0
+
+    def key(self, question_id: str, test_cases: List[Dict], language: Optional[str],
+            code: str, limits: Optional[Dict] = None) -> Tuple[str, str, str]:
+        version = test_case_version(test_cases, language, limits)
+        with self._lock:
+            previous = self._versions.get(question_id)
+            if previous is not None and previous != version:
+                self.invalidations += 1
+            self._versions.set(question_id, version)
+        return question_id, version, code_hash(code)
+
+    def run(self, key: Hashable, execute: Callable[[], Future]) -> Future:
+        """A future of verdicts for key: cached, joined to an identical run, or from execute()"""
+        verdicts = self.entries.get(key)
+        if verdicts is not None:
+            future = Future()
+            future.set_result([dict(verdict) for verdict in verdicts])
+            return future
+
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is not None:
+                self.coalesced += 1
+                return pending
+            future = execute()
+            self._pending[key] = future
+        future.add_done_callback(lambda done: self._finished(key, done))
+        return future
+
+    def _finished(self, key: Hashable, future: Future):
+        with self._lock:
+            self._pending.pop(key, None)
+        if future.cancelled() or future.exception() is not None:
+            self.uncacheable += 1
+            return
+
+        verdicts = future.result()
+        if not verdicts or not all(_judged(verdict) for verdict in verdicts) \
+                or any(verdict['error'] in TRANSIENT_ERRORS for verdict in verdicts):
+            self.uncacheable += 1
+            return
+        self.entries.set(key, tuple(verdicts))
+
+    def clear(self):
+        self.entries.clear()
+        self._versions.clear()
+
+    def stats(self) -> Dict:
+        stats = self.entries.stats()
+        stats["coalesced"] = self.coalesced
+        stats["invalidations"] = self.invalidations
+        stats["uncacheable"] = self.uncacheable
+        stats["questions"] = len(self._versions)
+        stats["max_questions"] = self._versions.max_size
+        return stats